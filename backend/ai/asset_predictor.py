@@ -5,9 +5,6 @@ Unified Asset Predictor
 
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
-import os
-import pickle
-import glob
 import sys
 import numpy as np
 import pandas as pd
@@ -39,40 +36,20 @@ class AssetType(str, Enum):
     SENTIMENT = "sentiment"
 
 
-def get_shap_explanation(model, features_df: pd.DataFrame) -> Dict[str, float]:
-    """Return the top 5 SHAP feature contributions for a tree-based model."""
-    try:
-        import shap
-
-        explainer = shap.TreeExplainer(model)
-        shap_values = explainer.shap_values(features_df)
+def get_shap_explanation(
+    model,
+    features_df: pd.DataFrame,
+    symbol: Optional[str] = None,
+    version: Optional[str] = None,
+) -> Dict[str, float]:
+    """Return the top 5 SHAP feature contributions for a tree-based model.
 
-        if isinstance(shap_values, list):
-            shap_values = shap_values[-1]
-
-        shap_array = np.asarray(shap_values)
-        if shap_array.ndim == 3:
-            shap_array = shap_array[0]
-        if shap_array.ndim == 2:
-            shap_row = shap_array[0]
-        elif shap_array.ndim == 1:
-            shap_row = shap_array
-        else:
-            return {}
-
-        contributions = []
-        for feature_name, shap_value in zip(features_df.columns.tolist(), shap_row.tolist()):
-            try:
-                numeric_value = float(shap_value)
-            except Exception:
-                continue
-            contributions.append((feature_name, numeric_value))
+    Explainers are cached per model and results per (symbol, version, row);
+    see ``ai.shap_service``.
+    """
+    from ai.shap_service import shap_service
 
-        contributions.sort(key=lambda item: abs(item[1]), reverse=True)
-        return {name: round(value, 6) for name, value in contributions[:5]}
-    except Exception as e:
-        logger.debug(f"SHAP explanation failed: {e}")
-        return {}
+    return shap_service.explain(model, features_df, symbol=symbol, version=version)
 
 
 def fetch_multi_timeframe_data(symbol: str) -> Dict[str, pd.DataFrame]:
@@ -651,86 +628,32 @@ class AssetPredictor:
         self._price_cache: Dict[str, dict] = {}
         self._price_cache_ttl = 300  # 5 minutes
 
-        # Load trained models
-        self.models = {}
-        self.scalers = {}
-        self.model_features: Dict[str, List[str]] = {}  # XGBoost feature columns
-        self.ensemble_models: Dict[str, Dict[str, Any]] = {}
-        self.lstm_symbols_loaded = set()
+        # Trained models are indexed from file metadata and loaded on first use.
+        from ml.model_registry import (
+            KIND_ENSEMBLE, KIND_LSTM, KIND_XGBOOST, ArtifactView, model_registry,
+        )
+        self.registry = model_registry
+        self._lstm_kind = KIND_LSTM
+        self.models = ArtifactView(self.registry, "model")
+        self.scalers = ArtifactView(self.registry, "scaler")
+        self.model_features = ArtifactView(self.registry, "feature_cols", kinds=(KIND_XGBOOST,))  # XGBoost feature columns
+        self.ensemble_models = ArtifactView(self.registry, None, kinds=(KIND_ENSEMBLE,))
         self._load_models()
-    
-    def _load_models(self):
-        """Load trained ML models from disk (XGBoost preferred, Random Forest fallback)."""
-        try:
-            from ml.model_storage import get_models_dir, seed_models_dir
-            seed_models_dir()  # first-boot copy of bundled models into the volume
-            models_dir = get_models_dir()
-        except Exception as e:
-            print(f"[!] model_storage unavailable, using bundled dir: {e}")
-            models_dir = os.path.join(os.path.dirname(__file__), "..", "models")
 
-        if not os.path.exists(models_dir):
-            print(f"[!] Models directory not found: {models_dir}")
-            return
+    @property
+    def lstm_symbols_loaded(self) -> set:
+        """Symbols with an LSTM sidecar on disk (loaded lazily by ml.lstm_model)."""
+        return set(self.registry.symbols(self._lstm_kind))
 
-        # 1) Load XGBoost "latest" models first (from auto_trainer)
-        xgb_files = glob.glob(os.path.join(models_dir, "*_xgboost_latest.pkl"))
-        for model_path in xgb_files:
-            try:
-                filename = os.path.basename(model_path)
-                symbol = filename.split("_xgboost")[0]
-
-                with open(model_path, "rb") as f:
-                    model_data = pickle.load(f)
-                    self.models[symbol] = model_data["model"]
-                    self.scalers[symbol] = model_data["scaler"]
-                    self.model_features[symbol] = model_data.get("feature_cols", [])
-
-                print(f"[+] Loaded XGBoost model for {symbol}")
-            except Exception as e:
-                print(f"[-] Error loading XGBoost model {model_path}: {e}")
-
-        # 2) Fallback: load Random Forest models for symbols not yet covered
-        rf_files = glob.glob(os.path.join(models_dir, "*_random_forest_*.pkl"))
-        rf_files = [f for f in rf_files if "scaler" not in os.path.basename(f)]
-
-        for model_path in rf_files:
-            try:
-                filename = os.path.basename(model_path)
-                symbol = filename.split("_")[0]
-
-                if symbol in self.models:
-                    continue  # XGBoost already loaded
-
-                with open(model_path, "rb") as f:
-                    model_data = pickle.load(f)
-                    self.models[symbol] = model_data["model"]
-                    self.scalers[symbol] = model_data["scaler"]
-
-                print(f"[+] Loaded RF model for {symbol} (fallback)")
-            except Exception as e:
-                print(f"[-] Error loading RF model {model_path}: {e}")
-
-        # 3) Optional enhanced ensemble artifacts (XGBoost + RF sidecar)
-        ensemble_files = glob.glob(os.path.join(models_dir, "*_ensemble_latest.pkl"))
-        for model_path in ensemble_files:
-            try:
-                filename = os.path.basename(model_path)
-                symbol = filename.split("_ensemble")[0]
-                with open(model_path, "rb") as f:
-                    self.ensemble_models[symbol] = pickle.load(f)
-                print(f"[+] Loaded enhanced ensemble sidecar for {symbol}")
-            except Exception as e:
-                print(f"[-] Error loading enhanced ensemble {model_path}: {e}")
+    def _load_models(self):
+        """Re-index trained models on disk (XGBoost preferred, Random Forest fallback).
 
-        # 4) Optional LSTM sidecars
-        try:
-            from ml.lstm_model import load_all_lstm_models
+        Nothing is unpickled here; artifacts load on first use and changed files
+        are picked up on their next access.
+        """
+        count = self.registry.scan()
+        print(f"[+] Indexed {count} model artifacts in {self.registry.models_dir}")
 
-            self.lstm_symbols_loaded = set(load_all_lstm_models().keys())
-        except Exception as e:
-            logger.debug(f"LSTM preload skipped: {e}")
-    
     def _fetch_binance_klines(self, symbol: str, days: int = 7) -> Optional[List[float]]:
         """Fetch daily closing prices from Binance public API (no auth needed)."""
         try:
@@ -838,6 +761,15 @@ class AssetPredictor:
         
         return features
     
+    def _model_version(self, symbol: str) -> Optional[str]:
+        """Version of the primary model artifact currently indexed for ``symbol``."""
+        try:
+            kind = self.registry.primary_kind(symbol)
+            info = self.registry.info(symbol, kind) if kind else None
+            return f"{kind}:{info.version}" if info else None
+        except Exception:
+            return None
+
     def _predict_xgboost(self, symbol: str, current_price: float, recent_df: Optional[pd.DataFrame] = None):
         """
         Run prediction using XGBoost model with full feature engineering.
@@ -883,7 +815,7 @@ class AssetPredictor:
         scaled = scaler.transform(last_row)
         scaled_df = pd.DataFrame(scaled, columns=feature_cols)
         predicted_price = float(model.predict(scaled)[0])
-        shap_explanation = get_shap_explanation(model, scaled_df)
+        shap_explanation = get_shap_explanation(model, scaled_df, symbol=symbol, version=self._model_version(symbol))
 
         price_change = predicted_price - current_price
         price_change_pct = (price_change / current_price) * 100 if current_price > 0 else 0
@@ -996,13 +928,58 @@ class AssetPredictor:
             }
         }
     
-    def predict_price(self, symbol: str, days: int = 7) -> Dict:
+    def _uses_xgboost(self, symbol: str) -> bool:
+        return (
+            symbol in self.models and symbol in self.scalers
+            and symbol in self.model_features and len(self.model_features[symbol]) > 10
+        )
+
+    def _batch_lstm_inputs(self, symbols: List[str]) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Optional[float]]]:
+        """Recent OHLCV and LSTM up-probabilities for every LSTM-eligible symbol, in one batched inference."""
+        try:
+            from ml.lstm_model import LSTM_SYMBOLS, predict_lstm_batch
+        except Exception as e:
+            logger.debug(f"LSTM batch unavailable: {e}")
+            return {}, {}
+
+        frames: Dict[str, pd.DataFrame] = {}
+        for symbol in symbols:
+            if (
+                symbol in LSTM_SYMBOLS
+                and self.all_assets.get(symbol, {}).get("type") == AssetType.CRYPTO
+                and self._uses_xgboost(symbol)
+            ):
+                try:
+                    frame = self._get_recent_ohlcv(symbol, days=500)
+                except Exception as e:
+                    logger.debug(f"OHLCV prefetch failed for {symbol}: {e}")
+                    continue
+                if frame is not None:
+                    frames[symbol] = frame
+        if not frames:
+            return frames, {}
+        try:
+            return frames, predict_lstm_batch(frames)
+        except Exception as e:
+            logger.debug(f"LSTM batch prediction failed: {e}")
+            return frames, {}
+
+    def predict_price(
+        self,
+        symbol: str,
+        days: int = 7,
+        recent_df: Optional[pd.DataFrame] = None,
+        lstm_probs: Optional[Dict[str, Optional[float]]] = None,
+    ) -> Dict:
         """
         Predict price for any asset type
         
         Args:
             symbol: Asset symbol
             days: Prediction horizon in days
+            recent_df: Already-fetched recent OHLCV for ``symbol`` (batch callers)
+            lstm_probs: LSTM probabilities from ``predict_lstm_batch``; a symbol
+                present here is not run through the LSTM again
             
         Returns:
             Prediction with confidence, trend, and price forecast
@@ -1032,7 +1009,8 @@ class AssetPredictor:
         if use_ml_model:
             try:
                 is_xgboost = symbol in self.model_features and len(self.model_features[symbol]) > 10
-                recent_df = self._get_recent_ohlcv(symbol, days=500) if is_xgboost else None
+                if is_xgboost and recent_df is None:
+                    recent_df = self._get_recent_ohlcv(symbol, days=500)
 
                 if is_xgboost:
                     # XGBoost path: use auto_trainer's feature engineering
@@ -1046,7 +1024,9 @@ class AssetPredictor:
                     rf_prob = self._predict_rf_sidecar(symbol, recent_df)
                     lstm_prob = None
 
-                    if symbol in self.all_assets and self.all_assets[symbol].get("type") == AssetType.CRYPTO:
+                    if lstm_probs is not None and symbol in lstm_probs:
+                        lstm_prob = lstm_probs[symbol]
+                    elif symbol in self.all_assets and self.all_assets[symbol].get("type") == AssetType.CRYPTO:
                         try:
                             from ml.lstm_model import LSTM_SYMBOLS, predict_lstm
 
@@ -1117,7 +1097,9 @@ class AssetPredictor:
                         "price_lag_3",
                     ]
                     shap_features_df = pd.DataFrame(features_scaled, columns=feature_names)
-                    shap_explanation = get_shap_explanation(model, shap_features_df)
+                    shap_explanation = get_shap_explanation(
+                        model, shap_features_df, symbol=symbol, version=self._model_version(symbol)
+                    )
 
                     price_change = predicted_price - current_price
                     price_change_pct = (price_change / current_price) * 100 if current_price > 0 else 0
@@ -1307,10 +1289,25 @@ class AssetPredictor:
             ]
         else:
             symbols = list(self.all_assets.keys())
+
+        # Warm every crypto symbol's on-chain signals in one batch so the
+        # per-symbol lookups in predict_price hit the cache.
+        try:
+            from services.onchain_service import collect_onchain_signals
+            collect_onchain_signals(
+                sym for sym in symbols if self.all_assets.get(sym, {}).get("type") == AssetType.CRYPTO
+            )
+        except Exception as e:
+            logger.debug(f"On-chain batch prefetch failed: {e}")
         
+        # One batched LSTM forward pass for every eligible symbol instead of one per symbol.
+        frames, lstm_probs = self._batch_lstm_inputs(symbols)
+
         predictions = {}
         for symbol in symbols:
-            predictions[symbol] = self.predict_price(symbol, days)
+            predictions[symbol] = self.predict_price(
+                symbol, days, recent_df=frames.get(symbol), lstm_probs=lstm_probs,
+            )
         
         return {
             "predictions": predictions,
@@ -0,0 +1,142 @@
+"""
+SHAP explanation service
+
+Keeps one ``shap.TreeExplainer`` per loaded model object (a registry
+hot-swap loads a new object, so a new model version gets a new explainer)
+and memoizes results by (symbol, model version, feature-row hash). Every
+symbol has its own model, so rows from different symbols can never share a
+``shap_values`` call; each prediction explains its latest row only.
+"""
+
+import hashlib
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SHAP_MEMO_SIZE = 4096
+TOP_FEATURES = 5
+
+
+def _row_hash(columns: Sequence[str], row: np.ndarray) -> str:
+    digest = hashlib.sha1("\x1f".join(map(str, columns)).encode("utf-8"))
+    digest.update(np.ascontiguousarray(row, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def _shap_matrix(shap_values: Any, n_rows: int) -> Optional[np.ndarray]:
+    """Normalize shap_values output to (n_rows, n_features) for the positive/last output."""
+    if isinstance(shap_values, list):
+        shap_values = shap_values[-1]
+    arr = np.asarray(shap_values)
+    if arr.ndim == 3:
+        # (rows, features, outputs) for multi-output models
+        arr = arr[:, :, -1] if arr.shape[0] == n_rows else arr[-1]
+    if arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+    if arr.ndim != 2 or arr.shape[0] != n_rows:
+        return None
+    return arr
+
+
+def _top_contributions(columns: Sequence[str], shap_row: np.ndarray) -> Dict[str, float]:
+    contributions: List[Tuple[str, float]] = []
+    for feature_name, shap_value in zip(columns, shap_row.tolist()):
+        try:
+            contributions.append((feature_name, float(shap_value)))
+        except Exception:
+            continue
+    contributions.sort(key=lambda item: abs(item[1]), reverse=True)
+    return {name: round(value, 6) for name, value in contributions[:TOP_FEATURES]}
+
+
+class ShapExplanationService:
+    """Cached TreeExplainers plus a bounded per-row explanation memo."""
+
+    def __init__(self, memo_size: int = SHAP_MEMO_SIZE):
+        self._explainers: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+        self._memo: "OrderedDict[Tuple[str, str, str], Dict[str, float]]" = OrderedDict()
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+        self.stats = {"explainers_built": 0, "memo_hits": 0, "rows_computed": 0}
+
+    def _explainer(self, model: Any) -> Any:
+        with self._lock:
+            try:
+                explainer = self._explainers.get(model)
+            except TypeError:  # not weak-referenceable
+                explainer = None
+        if explainer is not None:
+            return explainer
+
+        import shap
+
+        explainer = shap.TreeExplainer(model)
+        with self._lock:
+            try:
+                self._explainers[model] = explainer
+            except TypeError:
+                pass
+            self.stats["explainers_built"] += 1
+        return explainer
+
+    def _explain_row(
+        self,
+        model: Any,
+        features_df: pd.DataFrame,
+        symbol: Optional[str],
+        version: Optional[str],
+    ) -> Dict[str, float]:
+        columns = [str(c) for c in features_df.columns]
+        row = features_df.iloc[:1]
+        sym = str(symbol or "")
+        ver = str(version) if version is not None else f"obj:{id(model)}"
+        key = (sym, ver, _row_hash(columns, row.to_numpy(dtype=np.float64)[0]))
+
+        with self._lock:
+            hit = self._memo.get(key)
+            if hit is not None:
+                self._memo.move_to_end(key)
+                self.stats["memo_hits"] += 1
+                return dict(hit)
+
+        matrix = _shap_matrix(self._explainer(model).shap_values(row), 1)
+        if matrix is None:
+            raise ValueError("Unexpected SHAP output shape")
+        explanation = _top_contributions(columns, matrix[0])
+        with self._lock:
+            self.stats["rows_computed"] += 1
+            self._memo[key] = explanation
+            while len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return dict(explanation)
+
+    def explain(
+        self,
+        model: Any,
+        features_df: pd.DataFrame,
+        symbol: Optional[str] = None,
+        version: Optional[str] = None,
+    ) -> Dict[str, float]:
+        """Top SHAP contributions for the first row; empty on any failure."""
+        if features_df is None or len(features_df) == 0:
+            return {}
+        try:
+            return self._explain_row(model, features_df, symbol, version)
+        except Exception as e:
+            logger.debug(f"SHAP explanation failed: {e}")
+            return {}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memo.clear()
+            self._explainers = weakref.WeakKeyDictionary()
+
+
+shap_service = ShapExplanationService()
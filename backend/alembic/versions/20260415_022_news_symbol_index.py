@@ -0,0 +1,64 @@
+"""normalized news-to-symbol index for news impact scoring
+
+Revision ID: 022_news_symbol_index
+Revises: 021_raw_sql_to_sqlalchemy
+Create Date: 2026-04-15
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "022_news_symbol_index"
+down_revision: Union[str, None] = "021_raw_sql_to_sqlalchemy"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS news_symbols (
+            news_id INTEGER NOT NULL REFERENCES financial_news(id) ON DELETE CASCADE,
+            symbol VARCHAR(20) NOT NULL,
+            published_at TIMESTAMP NOT NULL,
+            sentiment_score FLOAT,
+            PRIMARY KEY (news_id, symbol)
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_news_symbols_symbol_published ON news_symbols (symbol, published_at)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_news_symbols_published ON news_symbols (published_at)"
+    )
+    # Backfill from the comma-separated financial_news.symbols column using
+    # the same key normalization as services.news_impact.news_symbol_key.
+    op.execute(
+        """
+        INSERT INTO news_symbols (news_id, symbol, published_at, sentiment_score)
+        SELECT DISTINCT ON (n.id, k.key) n.id, k.key, n.published_at, n.sentiment_score
+        FROM financial_news n
+        CROSS JOIN LATERAL (
+            SELECT LEFT(
+                CASE
+                    WHEN raw ~ '(USDC|USDT)$' AND LENGTH(raw) > 4 THEN LEFT(raw, LENGTH(raw) - 4)
+                    WHEN raw ~ '-USD$' AND LENGTH(raw) > 4 THEN LEFT(raw, LENGTH(raw) - 4)
+                    WHEN raw ~ 'USD$' AND LENGTH(raw) > 3 THEN LEFT(raw, LENGTH(raw) - 3)
+                    ELSE raw
+                END, 20) AS key
+            FROM (
+                SELECT REPLACE(REPLACE(REPLACE(UPPER(TRIM(part)), '=F', ''), '=X', ''), '^', '') AS raw
+                FROM unnest(string_to_array(COALESCE(n.symbols, ''), ',')) AS part
+            ) parts
+            WHERE raw <> ''
+        ) k
+        WHERE n.published_at IS NOT NULL
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    # Brownfield-safe downgrade: intentionally non-destructive.
+    pass
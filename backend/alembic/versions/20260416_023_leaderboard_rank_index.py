@@ -0,0 +1,30 @@
+"""materialized leaderboard rank and keyset pagination index
+
+Revision ID: 023_leaderboard_rank_index
+Revises: 022_news_symbol_index
+Create Date: 2026-04-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "023_leaderboard_rank_index"
+down_revision: Union[str, None] = "022_news_symbol_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE leaderboard_snapshots ADD COLUMN IF NOT EXISTS rank INTEGER")
+    op.execute("ALTER TABLE leaderboard_snapshots ADD COLUMN IF NOT EXISTS position INTEGER")
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_leaderboard_period_date_position
+        ON leaderboard_snapshots (period, snapshot_date, position)
+        """
+    )
+
+
+def downgrade() -> None:
+    # Brownfield-safe downgrade: intentionally non-destructive.
+    pass
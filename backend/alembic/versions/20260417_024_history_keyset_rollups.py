@@ -0,0 +1,133 @@
+"""keyset indexes for history tables and incrementally maintained summary rollups
+
+Revision ID: 024_history_keyset_rollups
+Revises: 023_leaderboard_rank_index
+Create Date: 2026-04-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "024_history_keyset_rollups"
+down_revision: Union[str, None] = "023_leaderboard_rank_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns). Every history read is
+# "<equality filters> ORDER BY created_at DESC, id DESC" with an optional
+# "(created_at, id) < cursor" predicate, so each index ends in (created_at, id).
+KEYSET_INDEXES = (
+    ("ix_ai_decision_user_keyset", "ai_decision_events", "user_id, created_at, id"),
+    ("ix_ai_decision_symbol_keyset", "ai_decision_events", "symbol, created_at, id"),
+    ("ix_ai_decision_user_symbol_keyset", "ai_decision_events", "user_id, symbol, created_at, id"),
+    ("ix_prisk_user_keyset", "persistent_risk_events", "user_id, created_at, id"),
+    ("ix_prisk_symbol_keyset", "persistent_risk_events", "symbol, created_at, id"),
+    ("ix_prisk_user_type_keyset", "persistent_risk_events", "user_id, event_type, created_at, id"),
+    ("ix_audit_user_keyset", "audit_events", "user_id, created_at, id"),
+    ("ix_audit_user_domain_keyset", "audit_events", "user_id, event_domain, created_at, id"),
+    ("ix_audit_user_severity_keyset", "audit_events", "user_id, severity, created_at, id"),
+    ("ix_audit_entity_keyset", "audit_events", "entity_type, entity_id, created_at, id"),
+    ("ix_pfeed_user_keyset", "persistent_feed_events", "user_id, created_at, id"),
+    ("ix_pfeed_user_type_keyset", "persistent_feed_events", "user_id, event_type, created_at, id"),
+    ("ix_pfeed_user_symbol_keyset", "persistent_feed_events", "user_id, related_symbol, created_at, id"),
+    ("ix_pfeed_user_priority_keyset", "persistent_feed_events", "user_id, priority, created_at, id"),
+    ("ix_feed_events_keyset", "feed_events", "created_at, id"),
+    ("ix_feed_events_type_keyset", "feed_events", "event_type, created_at, id"),
+    ("ix_feed_events_symbol_keyset", "feed_events", "symbol, created_at, id"),
+    ("ix_feed_events_severity_keyset", "feed_events", "severity, created_at, id"),
+)
+
+# Two-column indexes that are now strict prefixes of a keyset index above.
+SUPERSEDED_INDEXES = (
+    "ix_ai_decision_user_ts",
+    "ix_ai_decision_symbol_ts",
+    "ix_prisk_user_ts",
+    "ix_prisk_symbol_ts",
+    "ix_audit_user_ts",
+    "ix_audit_entity",
+    "ix_pfeed_user_ts",
+    "ix_pfeed_user_type_ts",
+)
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS audit_event_rollups (
+            user_id INTEGER NOT NULL,
+            event_domain VARCHAR(20) NOT NULL,
+            severity VARCHAR(10) NOT NULL,
+            event_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, event_domain, severity)
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS persistent_risk_event_rollups (
+            user_id INTEGER NOT NULL,
+            symbol VARCHAR(20) NOT NULL,
+            event_type VARCHAR(30) NOT NULL,
+            severity VARCHAR(10) NOT NULL,
+            event_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, symbol, event_type, severity)
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ai_decision_reason_code_rollups (
+            symbol VARCHAR(20) NOT NULL,
+            code VARCHAR(60) NOT NULL,
+            category VARCHAR(20) NOT NULL,
+            event_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (symbol, code, category)
+        )
+        """
+    )
+
+    # Backfill; re-running recomputes the counts from the event tables.
+    op.execute(
+        """
+        INSERT INTO audit_event_rollups (user_id, event_domain, severity, event_count)
+        SELECT COALESCE(user_id, 0), event_domain, severity, COUNT(*)
+        FROM audit_events
+        GROUP BY COALESCE(user_id, 0), event_domain, severity
+        ON CONFLICT (user_id, event_domain, severity)
+        DO UPDATE SET event_count = EXCLUDED.event_count
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO persistent_risk_event_rollups (user_id, symbol, event_type, severity, event_count)
+        SELECT COALESCE(user_id, 0), COALESCE(symbol, ''), event_type, severity, COUNT(*)
+        FROM persistent_risk_events
+        GROUP BY COALESCE(user_id, 0), COALESCE(symbol, ''), event_type, severity
+        ON CONFLICT (user_id, symbol, event_type, severity)
+        DO UPDATE SET event_count = EXCLUDED.event_count
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO ai_decision_reason_code_rollups (symbol, code, category, event_count)
+        SELECT e.symbol, rc.code, rc.category, COUNT(*)
+        FROM ai_decision_reason_codes rc
+        JOIN ai_decision_events e ON e.id = rc.decision_event_id
+        GROUP BY e.symbol, rc.code, rc.category
+        ON CONFLICT (symbol, code, category)
+        DO UPDATE SET event_count = EXCLUDED.event_count
+        """
+    )
+
+    # Build the history indexes without blocking writers on large tables.
+    with op.get_context().autocommit_block():
+        for name, table, columns in KEYSET_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+        for name in SUPERSEDED_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def downgrade() -> None:
+    # Brownfield-safe downgrade: intentionally non-destructive.
+    pass
@@ -0,0 +1,93 @@
+"""compact portfolio equity points and hourly/daily/weekly OHLC rollups
+
+Revision ID: 025_portfolio_equity_rollups
+Revises: 024_history_keyset_rollups
+Create Date: 2026-04-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "025_portfolio_equity_rollups"
+down_revision: Union[str, None] = "024_history_keyset_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# resolution -> date_trunc field (date_trunc('week') starts on Monday,
+# matching services.portfolio_persistence.bucket_start)
+RESOLUTIONS = (("1h", "hour"), ("1d", "day"), ("1w", "week"))
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS portfolio_equity_points (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            ts TIMESTAMP NOT NULL DEFAULT NOW(),
+            total_equity FLOAT NOT NULL,
+            available_cash FLOAT,
+            total_exposure FLOAT,
+            risk_score FLOAT,
+            drawdown_pct FLOAT
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_pequity_user_ts ON portfolio_equity_points (user_id, ts)"
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS portfolio_equity_rollups (
+            user_id INTEGER NOT NULL,
+            resolution VARCHAR(2) NOT NULL,
+            bucket_start TIMESTAMP NOT NULL,
+            open FLOAT NOT NULL,
+            high FLOAT NOT NULL,
+            low FLOAT NOT NULL,
+            close FLOAT NOT NULL,
+            first_ts TIMESTAMP NOT NULL,
+            last_ts TIMESTAMP NOT NULL,
+            samples INTEGER NOT NULL DEFAULT 1,
+            risk_score FLOAT,
+            total_exposure FLOAT,
+            PRIMARY KEY (user_id, resolution, bucket_start)
+        )
+        """
+    )
+
+    # Backfill from the full snapshots written so far.
+    op.execute(
+        """
+        INSERT INTO portfolio_equity_points
+            (user_id, ts, total_equity, available_cash, total_exposure, risk_score, drawdown_pct)
+        SELECT s.user_id, s.snapshot_timestamp, s.total_equity, s.available_cash,
+               s.total_exposure, s.risk_score, s.drawdown_pct
+        FROM portfolio_state_snapshots s
+        WHERE NOT EXISTS (SELECT 1 FROM portfolio_equity_points p WHERE p.user_id = s.user_id AND p.ts = s.snapshot_timestamp)
+        """
+    )
+    for resolution, field in RESOLUTIONS:
+        op.execute(
+            f"""
+            INSERT INTO portfolio_equity_rollups
+                (user_id, resolution, bucket_start, open, high, low, close,
+                 first_ts, last_ts, samples, risk_score, total_exposure)
+            SELECT user_id, '{resolution}', date_trunc('{field}', ts),
+                   (array_agg(total_equity ORDER BY ts))[1],
+                   MAX(total_equity), MIN(total_equity),
+                   (array_agg(total_equity ORDER BY ts DESC))[1],
+                   MIN(ts), MAX(ts), COUNT(*),
+                   (array_agg(risk_score ORDER BY ts DESC))[1],
+                   (array_agg(total_exposure ORDER BY ts DESC))[1]
+            FROM portfolio_equity_points
+            GROUP BY user_id, date_trunc('{field}', ts)
+            ON CONFLICT (user_id, resolution, bucket_start) DO NOTHING
+            """
+        )
+
+
+def downgrade() -> None:
+    # Brownfield-safe downgrade: intentionally non-destructive.
+    pass
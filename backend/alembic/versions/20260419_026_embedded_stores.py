@@ -0,0 +1,126 @@
+"""indexed stores for prediction accuracy and notifications (replacing JSON files)
+
+Revision ID: 026_embedded_stores
+Revises: 025_portfolio_equity_rollups
+Create Date: 2026-04-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "026_embedded_stores"
+down_revision: Union[str, None] = "025_portfolio_equity_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The legacy JSON files are imported by the services on first use
+    # (guarded by embedded_store_meta), not here: they live on the app host.
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS accuracy_predictions (
+            id SERIAL PRIMARY KEY,
+            asset_id VARCHAR(30) NOT NULL,
+            predicted_price FLOAT NOT NULL,
+            predicted_date TIMESTAMP NOT NULL,
+            confidence FLOAT,
+            recorded_at TIMESTAMP NOT NULL,
+            actual_price FLOAT,
+            actual_date TIMESTAMP,
+            error FLOAT,
+            error_pct FLOAT,
+            accuracy FLOAT
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_accpred_asset_predicted ON accuracy_predictions (asset_id, predicted_date)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_accpred_asset_recorded ON accuracy_predictions (asset_id, recorded_at)"
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS accuracy_trade_outcomes (
+            id SERIAL PRIMARY KEY,
+            asset_id VARCHAR(30) NOT NULL,
+            side VARCHAR(10) NOT NULL,
+            entry_price FLOAT NOT NULL,
+            exit_price FLOAT NOT NULL,
+            profit FLOAT,
+            correct_direction BOOLEAN NOT NULL,
+            opened_at VARCHAR(40),
+            closed_at VARCHAR(40),
+            recorded_at TIMESTAMP NOT NULL
+        )
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_accout_asset_closed ON accuracy_trade_outcomes (asset_id, closed_at)"
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS accuracy_asset_stats (
+            asset_id VARCHAR(30) PRIMARY KEY,
+            total_predictions INTEGER NOT NULL DEFAULT 0,
+            evaluated_predictions INTEGER NOT NULL DEFAULT 0,
+            accuracy_sum FLOAT NOT NULL DEFAULT 0,
+            error_pct_sum FLOAT NOT NULL DEFAULT 0,
+            outcome_count INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS accuracy_daily_stats (
+            asset_id VARCHAR(30) NOT NULL,
+            day VARCHAR(10) NOT NULL,
+            evaluated INTEGER NOT NULL DEFAULT 0,
+            accuracy_sum FLOAT NOT NULL DEFAULT 0,
+            outcomes INTEGER NOT NULL DEFAULT 0,
+            correct INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (asset_id, day)
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS notifications (
+            seq SERIAL PRIMARY KEY,
+            id VARCHAR(40) NOT NULL UNIQUE,
+            type VARCHAR(30) NOT NULL,
+            title TEXT NOT NULL,
+            message TEXT NOT NULL,
+            priority VARCHAR(10) NOT NULL,
+            data TEXT,
+            read BOOLEAN NOT NULL DEFAULT FALSE,
+            created_at VARCHAR(32) NOT NULL,
+            read_at VARCHAR(32)
+        )
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_notifications_read_seq ON notifications (read, seq)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_notifications_type_seq ON notifications (type, seq)")
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS notification_counters (
+            key VARCHAR(40) PRIMARY KEY,
+            n INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS embedded_store_meta (
+            key VARCHAR(60) PRIMARY KEY,
+            value TEXT,
+            created_at TIMESTAMP DEFAULT NOW()
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    # Brownfield-safe downgrade: intentionally non-destructive.
+    pass
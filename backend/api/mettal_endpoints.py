@@ -3,6 +3,7 @@ API Endpoints από mettal-app
 Προσθήκη όλων των endpoints από το mettal-app στο AURA
 """
 
+import asyncio
 import os
 
 from fastapi import APIRouter, HTTPException, Depends, Query, status, Request
@@ -10,6 +11,7 @@ from fastapi.security import HTTPAuthorizationCredentials
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel, EmailStr
+from sqlalchemy import delete
 # yfinance is now available via market_data module
 from market_data.yfinance_client import get_price as yf_get_price, get_historical_prices as yf_get_historical_prices
 from cache.connection import check_redis_connection
@@ -53,18 +55,73 @@ ACCESS_TOKEN_TTL = timedelta(hours=1)
 REFRESH_TOKEN_TTL = timedelta(days=7)
 
 
-def _persist_session(db, user_id: int, access_token: str, refresh_token: str) -> None:
-    """Insert a user_sessions row tying the access/refresh tokens to the user."""
+def _new_session_row(user_id: int, access_token: str, refresh_token: str):
     from database.models import UserSession
 
-    session = UserSession(
+    return UserSession(
         user_id=user_id,
         access_token=access_token,
         refresh_token=refresh_token,
         expires_at=datetime.utcnow() + REFRESH_TOKEN_TTL,
     )
-    db.add(session)
-    db.commit()
+
+
+def _persist_session_sync(user_id: int, access_token: str, refresh_token: str,
+                          replaces: Optional[str] = None) -> bool:
+    from database.connection import SessionLocal
+    from database.models import UserSession
+
+    db = SessionLocal()
+    try:
+        if replaces is not None:
+            deleted = (
+                db.query(UserSession)
+                .filter(UserSession.refresh_token == replaces)
+                .delete(synchronize_session=False)
+            )
+            if not deleted:
+                db.rollback()
+                return False
+        db.add(_new_session_row(user_id, access_token, refresh_token))
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def _persist_session(user_id: int, access_token: str, refresh_token: str,
+                           replaces: Optional[str] = None) -> bool:
+    """Insert a user_sessions row tying the access/refresh tokens to the user.
+
+    Runs on the async engine so the write never blocks the event loop (a
+    worker thread is used when no async engine is configured). With
+    ``replaces``, the old refresh session is deleted in the same transaction;
+    returns False if it no longer exists (already rotated or revoked).
+    """
+    from database.connection import AsyncSessionLocal
+    from database.models import UserSession
+
+    if AsyncSessionLocal is None:
+        return await asyncio.to_thread(_persist_session_sync, user_id, access_token, refresh_token, replaces)
+
+    async with AsyncSessionLocal() as session:
+        try:
+            if replaces is not None:
+                result = await session.execute(
+                    delete(UserSession).where(UserSession.refresh_token == replaces)
+                )
+                if not result.rowcount:
+                    await session.rollback()
+                    return False
+            session.add(_new_session_row(user_id, access_token, refresh_token))
+            await session.commit()
+            return True
+        except Exception:
+            await session.rollback()
+            raise
 
 @router.post("/auth/register", response_model=Token, status_code=201)
 @limiter.limit("10/minute")
@@ -124,7 +181,7 @@ async def register(request: Request, user_create: UserCreate):
         access_token = create_access_token(token_data, expires_delta=ACCESS_TOKEN_TTL)
         refresh_token = create_refresh_token(token_data, expires_delta=REFRESH_TOKEN_TTL)
 
-        _persist_session(db, new_user.id, access_token, refresh_token)
+        await _persist_session(new_user.id, access_token, refresh_token)
 
         return Token(
             access_token=access_token,
@@ -177,7 +234,7 @@ async def login(request: Request, user_login: UserLogin):
         access_token = create_access_token(token_data, expires_delta=ACCESS_TOKEN_TTL)
         refresh_token = create_refresh_token(token_data, expires_delta=REFRESH_TOKEN_TTL)
 
-        _persist_session(db, db_user.id, access_token, refresh_token)
+        await _persist_session(db_user.id, access_token, refresh_token)
 
         log_auth_event("LOGIN", "SUCCESS", user_id=db_user.id, email=email_lower,
                        ip_address=client_ip, user_agent=user_agent)
@@ -201,7 +258,6 @@ async def refresh_token_endpoint(refresh_request: RefreshTokenRequest):
     access token (1h) and refresh token (7d).
     """
     from database.connection import SessionLocal
-    from database.models import UserSession
 
     if not SessionLocal:
         raise HTTPException(status_code=503, detail="Database not available")
@@ -219,41 +275,34 @@ async def refresh_token_endpoint(refresh_request: RefreshTokenRequest):
     full_name = payload.get("full_name")
     token_version = payload.get("token_version")
 
-    db = SessionLocal()
-    try:
-        existing = (
-            db.query(UserSession)
-            .filter(UserSession.refresh_token == refresh_request.refresh_token)
-            .first()
-        )
-        if not existing:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired refresh token",
-            )
-
-        token_data = {
-            "sub": user_id,
-            "email": email,
-            "full_name": full_name,
-        }
-        if token_version is not None:
-            token_data["token_version"] = token_version
-
-        new_access_token = create_access_token(token_data, expires_delta=ACCESS_TOKEN_TTL)
-        new_refresh_token = create_refresh_token(token_data, expires_delta=REFRESH_TOKEN_TTL)
+    token_data = {
+        "sub": user_id,
+        "email": email,
+        "full_name": full_name,
+    }
+    if token_version is not None:
+        token_data["token_version"] = token_version
 
-        db.delete(existing)
-        db.flush()
-        _persist_session(db, int(user_id), new_access_token, new_refresh_token)
+    new_access_token = create_access_token(token_data, expires_delta=ACCESS_TOKEN_TTL)
+    new_refresh_token = create_refresh_token(token_data, expires_delta=REFRESH_TOKEN_TTL)
 
-        return Token(
-            access_token=new_access_token,
-            refresh_token=new_refresh_token,
-            token_type="bearer",
+    # Delete-and-insert in one transaction: a refresh token that was already
+    # rotated or revoked matches no row and is rejected.
+    rotated = await _persist_session(
+        int(user_id), new_access_token, new_refresh_token,
+        replaces=refresh_request.refresh_token,
+    )
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
         )
-    finally:
-        db.close()
+
+    return Token(
+        access_token=new_access_token,
+        refresh_token=new_refresh_token,
+        token_type="bearer",
+    )
 
 @router.get("/auth/me", response_model=dict)
 async def get_current_user_info(request: Request):
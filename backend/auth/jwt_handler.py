@@ -3,9 +3,13 @@ JWT Token Handler for AURA
 Token generation, validation, and refresh
 """
 
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 import jwt
 from jwt import PyJWTError
 from fastapi import HTTPException, status
@@ -18,6 +22,12 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 REFRESH_TOKEN_EXPIRE_DAYS = 90  # 90 days
 
+# Verified-claims cache: token hash -> (claims, exp). Entries never outlive the
+# token's own expiry; revocation is enforced separately via token_version.
+CLAIMS_CACHE_SIZE = int(os.environ.get("JWT_CLAIMS_CACHE_SIZE", "10000"))
+_claims_cache: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+_claims_lock = threading.Lock()
+
 print(f"[JWT] Using secret key: {SECRET_KEY[:10]}...")
 
 
@@ -76,10 +86,57 @@ def create_refresh_token(data: Dict, expires_delta: Optional[timedelta] = None)
     return encoded_jwt
 
 
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _cached_claims(key: str) -> Optional[Dict]:
+    with _claims_lock:
+        entry = _claims_cache.get(key)
+        if entry is None:
+            return None
+        claims, exp = entry
+        if exp <= time.time():
+            del _claims_cache[key]
+            return None
+        _claims_cache.move_to_end(key)
+        return claims
+
+
+def _remember_claims(key: str, claims: Dict) -> None:
+    try:
+        exp = float(claims.get("exp"))
+    except (TypeError, ValueError):
+        return
+    with _claims_lock:
+        _claims_cache[key] = (claims, exp)
+        _claims_cache.move_to_end(key)
+        while len(_claims_cache) > CLAIMS_CACHE_SIZE:
+            _claims_cache.popitem(last=False)
+
+
+def invalidate_user_claims(user_id) -> int:
+    """Drop every cached token for ``user_id`` (e.g. after a token_version bump)."""
+    sub = str(user_id)
+    with _claims_lock:
+        stale = [k for k, (claims, _) in _claims_cache.items() if str(claims.get("sub")) == sub]
+        for k in stale:
+            del _claims_cache[k]
+    return len(stale)
+
+
+def clear_claims_cache() -> None:
+    with _claims_lock:
+        _claims_cache.clear()
+
+
 def verify_token(token: str, token_type: str = "access") -> Dict:
     """
     Verify and decode JWT token
     
+    Signature checks are cached per token hash until the token expires, so
+    repeat requests with the same token skip the HMAC verification.
+
     Args:
         token: JWT token to verify
         token_type: Expected token type ("access" or "refresh")
@@ -90,6 +147,13 @@ def verify_token(token: str, token_type: str = "access") -> Dict:
     Raises:
         AuthenticationError: If token is invalid
     """
+    key = _token_key(token or "")
+    payload = _cached_claims(key)
+    if payload is not None:
+        if payload.get("type") != token_type:
+            raise AuthenticationError("Invalid token type")
+        return dict(payload)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         
@@ -97,7 +161,10 @@ def verify_token(token: str, token_type: str = "access") -> Dict:
         if payload.get("type") != token_type:
             raise AuthenticationError("Invalid token type")
         
-        return payload
+        _remember_claims(key, payload)
+        return dict(payload)
+    except AuthenticationError:
+        raise
     except jwt.ExpiredSignatureError:
         raise AuthenticationError("Token has expired")
     except jwt.InvalidTokenError:
@@ -0,0 +1,152 @@
+"""
+Token revocation state for AURA
+
+Each user's current ``token_version`` is cached in Redis so authenticated
+requests can reject revoked tokens without a ``users`` lookup. Writers that
+bump the version publish the new value and drop the local claims cache.
+If a publish cannot be written, the cached entry is deleted instead, and this
+worker reads the DB for that user until any stale entry would have expired.
+"""
+
+import json
+import logging
+import time
+from typing import Dict, Optional
+
+from cache.connection import cache_add, cache_delete, cache_get, cache_set, get_async_redis
+
+logger = logging.getLogger("aura.auth")
+
+TOKEN_VERSION_TTL = 300  # seconds; bounds staleness if a publish is missed
+_KEY = "auth:token_version:{}"
+PUBLISH_RETRIES = 3
+PUBLISH_RETRY_DELAY = 0.05  # seconds, doubled per attempt
+
+# user_id -> monotonic deadline until which the cached version may be stale
+_unpublished: Dict[int, float] = {}
+
+
+class RevocationLookupError(Exception):
+    """Raised when the token version can be read from neither Redis nor the DB."""
+
+
+def _token_version_statement(user_id: int):
+    from sqlalchemy import select
+    from database.models import User
+
+    return select(User.token_version).where(User.id == user_id)
+
+
+def _load_token_version(user_id: int) -> Optional[int]:
+    from database.connection import SessionLocal
+
+    if not SessionLocal:
+        raise RevocationLookupError("Database not available")
+    db = SessionLocal()
+    try:
+        row = db.execute(_token_version_statement(user_id)).first()
+    except Exception as e:
+        raise RevocationLookupError(str(e)) from e
+    finally:
+        db.close()
+    return int(row[0] or 0) if row else None
+
+
+def _publish_failed(user_id: int) -> bool:
+    deadline = _unpublished.get(user_id)
+    if deadline is None:
+        return False
+    if time.monotonic() < deadline:
+        return True
+    _unpublished.pop(user_id, None)
+    return False
+
+
+def get_token_version(user_id: int) -> Optional[int]:
+    """Current token_version for ``user_id``; ``None`` if the user does not exist."""
+    user_id = int(user_id)
+    key = _KEY.format(user_id)
+    if _publish_failed(user_id):
+        # The cache may still hold the pre-revocation version; trust only the DB
+        # and overwrite the entry so other workers stop reading the stale one.
+        version = _load_token_version(user_id)
+        if cache_set(key, {"version": version}, expire=TOKEN_VERSION_TTL):
+            _unpublished.pop(user_id, None)
+        return version
+
+    cached = cache_get(key)
+    if isinstance(cached, dict) and "version" in cached:
+        return cached["version"]
+
+    version = _load_token_version(user_id)
+    # NX: a version published while we read the DB must not be overwritten by ours.
+    cache_add(key, {"version": version}, expire=TOKEN_VERSION_TTL)
+    return version
+
+
+async def _cached_version_async(key: str) -> Optional[dict]:
+    client = await get_async_redis()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(key)
+        return json.loads(raw) if raw is not None else None
+    except Exception as e:
+        logger.debug(f"[AUTH_TOKEN_VERSION_CACHE] read failed: {e}")
+        return None
+
+
+async def _cache_store_async(key: str, value: dict, nx: bool = True) -> bool:
+    client = await get_async_redis()
+    if client is None:
+        return False
+    try:
+        return bool(await client.set(key, json.dumps(value), ex=TOKEN_VERSION_TTL, nx=nx))
+    except Exception as e:
+        logger.debug(f"[AUTH_TOKEN_VERSION_CACHE] fill failed: {e}")
+        return False
+
+
+async def get_token_version_async(user_id: int) -> Optional[int]:
+    """:func:`get_token_version` for async callers; Redis and the DB are both read without blocking the loop."""
+    user_id = int(user_id)
+    key = _KEY.format(user_id)
+    stale = _publish_failed(user_id)
+    if not stale:
+        cached = await _cached_version_async(key)
+        if isinstance(cached, dict) and "version" in cached:
+            return cached["version"]
+
+    from database.async_repository import fetch_token_version
+
+    try:
+        version = await fetch_token_version(user_id)
+    except RevocationLookupError:
+        raise
+    except Exception as e:
+        raise RevocationLookupError(str(e)) from e
+    if await _cache_store_async(key, {"version": version}, nx=not stale) and stale:
+        _unpublished.pop(user_id, None)
+    return version
+
+
+def publish_token_version(user_id: int, version: Optional[int]) -> None:
+    """Record a committed token_version bump so every worker sees it immediately."""
+    from auth.jwt_handler import invalidate_user_claims
+
+    invalidate_user_claims(user_id)
+    user_id = int(user_id)
+    key = _KEY.format(user_id)
+    if cache_set(key, {"version": version}, expire=TOKEN_VERSION_TTL):
+        _unpublished.pop(user_id, None)
+        return
+
+    # A stale version must not outlive the revocation: drop the entry so every
+    # worker falls back to the DB, and until that is confirmed read the DB here.
+    _unpublished[user_id] = time.monotonic() + TOKEN_VERSION_TTL
+    for attempt in range(PUBLISH_RETRIES):
+        if cache_delete(key):
+            logger.warning(f"[AUTH_TOKEN_VERSION_PUBLISH_FAILED] user={user_id} cached version dropped")
+            return
+        time.sleep(PUBLISH_RETRY_DELAY * (2 ** attempt))
+    logger.error(f"[AUTH_TOKEN_VERSION_PUBLISH_FAILED] user={user_id} cached version could not be dropped")
@@ -87,6 +87,31 @@ def cache_get(key: str, default: Any = None) -> Any:
         return default
 
 
+def cache_mget(keys: list) -> dict:
+    """
+    Get many values in one round trip; missing keys are omitted
+    """
+    client = get_redis()
+    if client is None or not keys:
+        return {}
+
+    try:
+        values = client.mget(keys)
+    except Exception as e:
+        print(f"[-] Cache mget error: {e}")
+        return {}
+
+    out = {}
+    for key, value in zip(keys, values):
+        if value is None:
+            continue
+        try:
+            out[key] = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            out[key] = value
+    return out
+
+
 def cache_set(key: str, value: Any, expire: int = 3600) -> bool:
     """
     Set value in cache with expiration (default 1 hour)
@@ -106,6 +131,44 @@ def cache_set(key: str, value: Any, expire: int = 3600) -> bool:
         return False
 
 
+def cache_add(key: str, value: Any, expire: int = 3600) -> bool:
+    """
+    Set value in cache only if the key is absent (SET NX); True if it was stored
+    """
+    client = get_redis()
+    if client is None:
+        return False
+
+    try:
+        if not isinstance(value, str):
+            value = json.dumps(value)
+        return bool(client.set(key, value, ex=expire, nx=True))
+    except Exception as e:
+        print(f"[-] Cache add error: {e}")
+        return False
+
+
+def cache_mset(values: dict, expire: int = 3600) -> bool:
+    """
+    Set many values with the same expiration in one pipelined round trip
+    """
+    client = get_redis()
+    if client is None or not values:
+        return False
+
+    try:
+        pipe = client.pipeline(transaction=False)
+        for key, value in values.items():
+            if not isinstance(value, str):
+                value = json.dumps(value)
+            pipe.setex(key, expire, value)
+        pipe.execute()
+        return True
+    except Exception as e:
+        print(f"[-] Cache mset error: {e}")
+        return False
+
+
 def cache_delete(key: str) -> bool:
     """
     Delete key from cache
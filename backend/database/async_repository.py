@@ -0,0 +1,187 @@
+"""
+Async read repository for the hot request paths
+
+Each function runs on ``AsyncSessionLocal`` (the pooled asyncpg engine) so
+handlers await the database instead of parking a threadpool worker on a
+sync session. Statements and row mappers are shared with the sync services,
+so both paths return identical payloads. Without an async engine the sync
+service runs in a worker thread instead.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+async def _run(query: Callable[[Any], Awaitable[Any]], fallback: Callable[[], Any]) -> Any:
+    """``await query(session)`` on the async engine, or ``fallback()`` in a worker thread."""
+    from database.connection import AsyncSessionLocal
+
+    if AsyncSessionLocal is None:
+        return await asyncio.to_thread(fallback)
+    async with AsyncSessionLocal() as session:
+        return await query(session)
+
+
+# ── users ────────────────────────────────────────────────────────
+
+async def fetch_token_version(user_id: int) -> Optional[int]:
+    """Current ``users.token_version``; None if the user does not exist."""
+    from auth.revocation import _load_token_version, _token_version_statement
+
+    async def query(session):
+        row = (await session.execute(_token_version_statement(user_id))).first()
+        return int(row[0] or 0) if row else None
+
+    return await _run(query, lambda: _load_token_version(user_id))
+
+
+# ── subscriptions ────────────────────────────────────────────────
+
+async def fetch_subscription_status(user_id: int) -> Dict:
+    """Subscription tier and feature access, creating the FREE row on first use."""
+    from services.subscription_service import (
+        _build_status, _new_subscription, _subscription_statement, get_subscription_status,
+    )
+
+    async def query(session):
+        sub = (await session.execute(_subscription_statement(user_id))).scalars().first()
+        if sub is None:
+            sub = _new_subscription(user_id)
+            session.add(sub)
+            try:
+                await session.commit()
+            except Exception:
+                # Lost a race with a concurrent first request; read its row.
+                await session.rollback()
+                sub = (await session.execute(_subscription_statement(user_id))).scalars().one()
+        return _build_status(sub)
+
+    return await _run(query, lambda: get_subscription_status(user_id))
+
+
+# ── feed ─────────────────────────────────────────────────────────
+
+async def fetch_user_feed(
+    user_id: int,
+    event_type: Optional[str] = None,
+    priority: Optional[str] = None,
+    symbol: Optional[str] = None,
+    include_expired: bool = False,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> List[Dict]:
+    """Async :func:`services.feed_persistence.get_user_feed`."""
+    from database.keyset import decode_cursor
+    from services.feed_persistence import (
+        _feed_event_dict, _feed_statement, _read_ids_statement, get_user_feed,
+    )
+
+    position = decode_cursor(cursor)
+
+    async def query(session):
+        try:
+            events = (await session.execute(
+                _feed_statement(user_id, event_type, priority, symbol, include_expired, limit, position)
+            )).scalars().all()
+            read_ids = set()
+            if events:
+                read_ids = set((await session.execute(
+                    _read_ids_statement(user_id, [e.id for e in events])
+                )).scalars().all())
+            return [_feed_event_dict(e, read_ids) for e in events]
+        except Exception as e:
+            logger.warning(f"[async_repo] Failed to get feed: {e}")
+            return []
+
+    return await _run(query, lambda: get_user_feed(
+        user_id=user_id, event_type=event_type, priority=priority, symbol=symbol,
+        include_expired=include_expired, limit=limit, cursor=cursor,
+    ))
+
+
+async def fetch_unread_count(user_id: int) -> int:
+    """Async :func:`services.feed_persistence.get_unread_count`."""
+    from services.feed_persistence import _unread_statements, get_unread_count
+
+    async def query(session):
+        try:
+            total_stmt, read_stmt = _unread_statements(user_id)
+            total = (await session.execute(total_stmt)).scalar() or 0
+            read_count = (await session.execute(read_stmt)).scalar() or 0
+            return max(0, total - read_count)
+        except Exception as e:
+            logger.warning(f"[async_repo] Failed to get unread count: {e}")
+            return 0
+
+    return await _run(query, lambda: get_unread_count(user_id))
+
+
+# ── predictions ──────────────────────────────────────────────────
+
+async def fetch_prediction_accuracy(symbol: Optional[str] = None) -> Dict:
+    """Async :meth:`PredictionOutcomesService.get_accuracy`."""
+    from database.schema_registry import is_ready
+    from services.prediction_outcomes import prediction_outcomes_service as service
+
+    if not is_ready("prediction_outcomes"):
+        # First call in this process runs the DDL; keep that off the event loop.
+        await asyncio.to_thread(service._ensure_table)
+
+    async def query(session):
+        try:
+            statement, params = service._accuracy_query(symbol)
+            rows = (await session.execute(statement, params)).mappings().all()
+            return service._summarize_accuracy(rows, symbol)
+        except Exception as e:
+            logger.warning(f"[async_repo] Failed to get prediction accuracy: {e}")
+            return service._empty_accuracy(symbol)
+
+    return await _run(query, lambda: service.get_accuracy(symbol=symbol))
+
+
+# ── portfolio ────────────────────────────────────────────────────
+
+async def fetch_snapshot_history(user_id: int, limit: int = 30) -> List[Dict]:
+    """Async :func:`services.portfolio_persistence.get_snapshot_history`."""
+    from services.portfolio_persistence import (
+        _snapshot_history_statement, _snapshot_summary, get_snapshot_history,
+    )
+
+    async def query(session):
+        try:
+            rows = (await session.execute(_snapshot_history_statement(user_id, limit))).scalars().all()
+            return [_snapshot_summary(r) for r in rows]
+        except Exception as e:
+            logger.warning(f"[async_repo] Failed to load portfolio history: {e}")
+            return []
+
+    return await _run(query, lambda: get_snapshot_history(user_id=user_id, limit=limit))
+
+
+async def fetch_equity_chart(
+    user_id: int,
+    days: int = 90,
+    points: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> Dict:
+    """Async :func:`services.portfolio_persistence.get_equity_chart`."""
+    from services.portfolio_persistence import (
+        CHART_DEFAULT_POINTS, _chart_payload, _chart_window, _equity_chart_statement, get_equity_chart,
+    )
+
+    points = CHART_DEFAULT_POINTS if points is None else points
+    resolution, start, end = _chart_window(days, now)
+
+    async def query(session):
+        try:
+            rows = (await session.execute(_equity_chart_statement(user_id, resolution, start))).scalars().all()
+            return _chart_payload(rows, resolution, days, start, end, points)
+        except Exception as e:
+            logger.warning(f"[async_repo] Failed to load equity chart: {e}")
+            return {"resolution": resolution, "days": days, "series": [], "count": 0}
+
+    return await _run(query, lambda: get_equity_chart(user_id=user_id, days=days, points=points, now=now))
@@ -18,6 +18,29 @@ DATABASE_URL = os.getenv("DATABASE_URL", "")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# Pool sizing is per worker process. The async pool serves the request
+# handlers; the sync pool serves background jobs and not-yet-migrated routes.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "20"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Set when a transaction-mode pgbouncer sits in front of Postgres and owns pooling.
+DB_ASYNC_NULLPOOL = os.getenv("DB_ASYNC_NULLPOOL", "false").lower() == "true"
+
+
+def _async_pool_options() -> dict:
+    if DB_ASYNC_NULLPOOL:
+        return {"poolclass": NullPool}
+    return {
+        "pool_size": DB_ASYNC_POOL_SIZE,
+        "max_overflow": DB_ASYNC_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
 # Only create engines if DATABASE_URL is configured
 if DATABASE_URL:
     # Async database URL
@@ -27,8 +50,9 @@ if DATABASE_URL:
     sync_engine = create_engine(
         DATABASE_URL,
         pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
         echo=os.getenv("DB_ECHO", "false").lower() == "true"
     )
 
@@ -36,8 +60,8 @@ if DATABASE_URL:
     async_engine = create_async_engine(
         ASYNC_DATABASE_URL,
         pool_pre_ping=True,
-        poolclass=NullPool,
-        echo=os.getenv("DB_ECHO", "false").lower() == "true"
+        echo=os.getenv("DB_ECHO", "false").lower() == "true",
+        **_async_pool_options(),
     )
 
     # Session makers
@@ -0,0 +1,131 @@
+"""
+Indexed store for services that used to persist a whole JSON file.
+
+Uses the main Postgres engine when DATABASE_URL is configured and otherwise
+a local SQLite file in WAL mode (EMBEDDED_STORE_PATH, default
+backend/aura_store.db), so several worker processes can share it. Writes go
+through ``write_tx``, which takes the SQLite write lock up front
+(BEGIN IMMEDIATE) so concurrent read-modify-write transactions serialize
+instead of failing or losing updates.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
+
+from database.models import (
+    AccuracyAssetStats,
+    AccuracyDailyStats,
+    AccuracyPrediction,
+    AccuracyTradeOutcome,
+    Base,
+    EmbeddedStoreMeta,
+    NotificationCounter,
+    StoredNotification,
+)
+
+EMBEDDED_STORE_PATH = os.getenv(
+    "EMBEDDED_STORE_PATH", os.path.join(os.path.dirname(__file__), "..", "aura_store.db")
+)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("EMBEDDED_STORE_BUSY_TIMEOUT_MS", "30000"))
+
+STORE_TABLES = [
+    AccuracyPrediction.__table__,
+    AccuracyTradeOutcome.__table__,
+    AccuracyAssetStats.__table__,
+    AccuracyDailyStats.__table__,
+    StoredNotification.__table__,
+    NotificationCounter.__table__,
+    EmbeddedStoreMeta.__table__,
+]
+
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def _sqlite_engine(path: str) -> Engine:
+    engine = create_engine(
+        f"sqlite:///{os.path.abspath(path)}",
+        connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000, "check_same_thread": False},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        # Let SQLAlchemy's "begin" event issue BEGIN itself (see below).
+        dbapi_conn.isolation_level = None
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cur.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        if conn.get_execution_options().get("store_write"):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+def get_store_engine(path: Optional[str] = None) -> Engine:
+    """Engine for the embedded store, with its tables created on first use.
+
+    ``path`` forces a SQLite file (tests, tools); otherwise Postgres is used
+    when configured and EMBEDDED_STORE_PATH when not.
+    """
+    if path is None:
+        from database.connection import sync_engine
+        if sync_engine is not None:
+            key, factory = "postgres", lambda: sync_engine
+        else:
+            key, factory = EMBEDDED_STORE_PATH, lambda: _sqlite_engine(EMBEDDED_STORE_PATH)
+    else:
+        key, factory = os.path.abspath(path), lambda: _sqlite_engine(path)
+
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = factory()
+            Base.metadata.create_all(engine, tables=STORE_TABLES, checkfirst=True)
+            _engines[key] = engine
+        return engine
+
+
+def dispose_store_engines() -> None:
+    """Drop cached SQLite engines (after fork, or in tests)."""
+    with _engines_lock:
+        for key, engine in list(_engines.items()):
+            if key != "postgres":
+                engine.dispose()
+        _engines.clear()
+
+
+@contextmanager
+def write_tx(engine: Engine):
+    """Transaction that holds the write lock from its first statement."""
+    with engine.connect() as conn:
+        conn = conn.execution_options(store_write=True)
+        with conn.begin():
+            yield conn
+
+
+@contextmanager
+def read_conn(engine: Engine):
+    with engine.connect() as conn:
+        yield conn
+
+
+def claim_once(conn: Connection, key: str) -> bool:
+    """Insert marker ``key``; True only for the first transaction to do so."""
+    result = conn.execute(
+        text("INSERT INTO embedded_store_meta (key, created_at) VALUES (:key, CURRENT_TIMESTAMP) "
+             "ON CONFLICT (key) DO NOTHING"),
+        {"key": key},
+    )
+    return result.rowcount == 1
@@ -0,0 +1,54 @@
+"""
+Keyset pagination helpers
+
+History tables are read newest-first by ``(created_at, id)``. A cursor
+encodes the last row of a page; the next page starts strictly after it via
+a row-value comparison that the ``(..., created_at, id)`` composite indexes
+satisfy directly, so deep pages cost the same as the first one and rows
+inserted meanwhile never shift items between pages.
+"""
+
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+
+from utils.error_handler import ValidationError
+
+
+def encode_cursor(created_at: Any, row_id: int) -> str:
+    """Opaque cursor for a row; ``created_at`` may be a datetime or ISO string."""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = f"{created_at}|{int(row_id)}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Inverse of :func:`encode_cursor`; raises ValidationError (HTTP 400) on garbage."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode("utf-8").rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValidationError("Invalid cursor")
+
+
+def keyset_before(created_col, id_col, position: Optional[Tuple[datetime, int]]):
+    """Filter clause for rows strictly older than ``position`` (None: no filter)."""
+    if position is None:
+        return None
+    return tuple_(created_col, id_col) < tuple_(*position)
+
+
+def next_cursor(items: List[Dict], limit: int, created_key: str = "created_at") -> Optional[str]:
+    """Cursor for the page after ``items``; None once a short page shows the end."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    if last.get(created_key) is None:
+        return None
+    return encode_cursor(last[created_key], last["id"])
@@ -184,6 +184,26 @@ class FinancialNews(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class NewsSymbol(Base):
+    """Normalized news-to-symbol mapping with the article's stored sentiment.
+
+    ``symbol`` is the base key produced by ``services.news_impact.news_symbol_key``
+    (e.g. ``BTC`` for ``BTCUSDC`` and ``BTC-USD``). ``published_at`` and
+    ``sentiment_score`` are copied from ``financial_news`` so impact windows
+    aggregate straight off the (symbol, published_at) index.
+    """
+    __tablename__ = "news_symbols"
+    __table_args__ = (
+        Index("ix_news_symbols_symbol_published", "symbol", "published_at"),
+        Index("ix_news_symbols_published", "published_at"),
+    )
+
+    news_id = Column(Integer, ForeignKey("financial_news.id", ondelete="CASCADE"), primary_key=True)
+    symbol = Column(String(20), primary_key=True)
+    published_at = Column(DateTime, nullable=False)
+    sentiment_score = Column(Float)
+
+
 class TrainingFeature(Base):
     """Engineered features for ML training"""
     __tablename__ = "training_features"
@@ -305,6 +325,7 @@ class LeaderboardSnapshot(Base):
     __table_args__ = (
         UniqueConstraint("user_id", "period", "snapshot_date", name="uq_leaderboard_user_period_date"),
         Index("ix_leaderboard_period_date", "period", "snapshot_date"),
+        Index("ix_leaderboard_period_date_position", "period", "snapshot_date", "position"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -315,6 +336,8 @@ class LeaderboardSnapshot(Base):
     win_rate = Column(Float, default=0.0)
     period = Column(String(20), nullable=False, index=True)  # weekly|monthly|alltime
     snapshot_date = Column(Date, nullable=False, default=date.today)
+    rank = Column(Integer, nullable=True)  # RANK() within period/date (ties share)
+    position = Column(Integer, nullable=True)  # gap-free ordinal, keyset pagination key
 
 
 class Referral(Base):
@@ -526,6 +549,10 @@ class FeedEvent(Base):
     __table_args__ = (
         Index("idx_feed_events_created", "created_at"),
         Index("idx_feed_events_type", "event_type"),
+        Index("ix_feed_events_keyset", "created_at", "id"),
+        Index("ix_feed_events_type_keyset", "event_type", "created_at", "id"),
+        Index("ix_feed_events_symbol_keyset", "symbol", "created_at", "id"),
+        Index("ix_feed_events_severity_keyset", "severity", "created_at", "id"),
     )
 
     id = Column(Integer, primary_key=True)
@@ -672,8 +699,9 @@ class AIDecisionEvent(Base):
     """
     __tablename__ = "ai_decision_events"
     __table_args__ = (
-        Index("ix_ai_decision_user_ts", "user_id", "created_at"),
-        Index("ix_ai_decision_symbol_ts", "symbol", "created_at"),
+        Index("ix_ai_decision_user_keyset", "user_id", "created_at", "id"),
+        Index("ix_ai_decision_symbol_keyset", "symbol", "created_at", "id"),
+        Index("ix_ai_decision_user_symbol_keyset", "user_id", "symbol", "created_at", "id"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -733,6 +761,19 @@ class AIDecisionCounterfactual(Base):
     decision_event = relationship("AIDecisionEvent", back_populates="counterfactuals_rel")
 
 
+class AIDecisionReasonCodeRollup(Base):
+    """
+    Running reason-code counts per symbol, bumped in the same transaction
+    that inserts the codes. Backs the reason-code stats card.
+    """
+    __tablename__ = "ai_decision_reason_code_rollups"
+
+    symbol = Column(String(20), primary_key=True)
+    code = Column(String(60), primary_key=True)
+    category = Column(String(20), primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+
+
 class PortfolioSnapshot(Base):
     """Append-only periodic snapshot of portfolio state for analytics."""
     __tablename__ = "portfolio_snapshots"
@@ -829,8 +870,9 @@ class PersistentRiskEvent(Base):
     """
     __tablename__ = "persistent_risk_events"
     __table_args__ = (
-        Index("ix_prisk_user_ts", "user_id", "created_at"),
-        Index("ix_prisk_symbol_ts", "symbol", "created_at"),
+        Index("ix_prisk_user_keyset", "user_id", "created_at", "id"),
+        Index("ix_prisk_symbol_keyset", "symbol", "created_at", "id"),
+        Index("ix_prisk_user_type_keyset", "user_id", "event_type", "created_at", "id"),
         Index("ix_prisk_event_type", "event_type"),
         Index("ix_prisk_decision_event", "related_decision_event_id"),
     )
@@ -861,6 +903,20 @@ class PersistentRiskEvent(Base):
     decision_event = relationship("AIDecisionEvent", foreign_keys=[related_decision_event_id])
 
 
+class PersistentRiskEventRollup(Base):
+    """
+    Running risk event counts per (user, symbol, type, severity), maintained on insert.
+    user_id 0 / symbol '' stand for events without a user or symbol.
+    """
+    __tablename__ = "persistent_risk_event_rollups"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    symbol = Column(String(20), primary_key=True)
+    event_type = Column(String(30), primary_key=True)
+    severity = Column(String(10), primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+
+
 class PersistentFeedEvent(Base):
     """
     Append-only user-facing AI feed / timeline.
@@ -868,8 +924,10 @@ class PersistentFeedEvent(Base):
     """
     __tablename__ = "persistent_feed_events"
     __table_args__ = (
-        Index("ix_pfeed_user_ts", "user_id", "created_at"),
-        Index("ix_pfeed_user_type_ts", "user_id", "event_type", "created_at"),
+        Index("ix_pfeed_user_keyset", "user_id", "created_at", "id"),
+        Index("ix_pfeed_user_type_keyset", "user_id", "event_type", "created_at", "id"),
+        Index("ix_pfeed_user_symbol_keyset", "user_id", "related_symbol", "created_at", "id"),
+        Index("ix_pfeed_user_priority_keyset", "user_id", "priority", "created_at", "id"),
         Index("ix_pfeed_dedupe", "dedupe_key"),
     )
 
@@ -951,6 +1009,47 @@ class PortfolioStateSnapshot(Base):
     cluster_exposures = relationship("PortfolioClusterExposure", back_populates="snapshot", cascade="all, delete-orphan")
 
 
+class PortfolioEquityPoint(Base):
+    """
+    Compact per-user equity time series — one row per portfolio assessment.
+    Full snapshots (with exposure children) are only kept as periodic keyframes.
+    """
+    __tablename__ = "portfolio_equity_points"
+    __table_args__ = (
+        Index("ix_pequity_user_ts", "user_id", "ts"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    ts = Column(DateTime, nullable=False, default=datetime.utcnow)
+    total_equity = Column(Float, nullable=False)
+    available_cash = Column(Float, nullable=True)
+    total_exposure = Column(Float, nullable=True)
+    risk_score = Column(Float, nullable=True)
+    drawdown_pct = Column(Float, nullable=True)
+
+
+class PortfolioEquityRollup(Base):
+    """
+    Hourly / daily / weekly OHLC of equity per user, upserted with every point.
+    risk_score and total_exposure are the bucket's latest values.
+    """
+    __tablename__ = "portfolio_equity_rollups"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    resolution = Column(String(2), primary_key=True)  # 1h / 1d / 1w
+    bucket_start = Column(DateTime, primary_key=True)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    first_ts = Column(DateTime, nullable=False)
+    last_ts = Column(DateTime, nullable=False)
+    samples = Column(Integer, nullable=False, default=1)
+    risk_score = Column(Float, nullable=True)
+    total_exposure = Column(Float, nullable=True)
+
+
 class PortfolioSymbolExposure(Base):
     """
     Append-only per-symbol exposure within a portfolio snapshot.
@@ -1017,7 +1116,7 @@ class PersistentSimulationRun(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False, index=True)
     strategy_id = Column(String(30), nullable=True)  # ai_follow / conservative_ai / buy_and_hold / custom
-    run_type = Column(String(20), nullable=False, default="backtest")  # backtest / paper_simulation / what_if
+    run_type = Column(String(20), nullable=False, default="backtest")  # backtest / paper_simulation / what_if / monte_carlo
     symbol_universe_json = Column(JSON, nullable=False)  # ["BTCUSDC", "ETHUSDC", ...]
     timeframe_start = Column(DateTime, nullable=True)
     timeframe_end = Column(DateTime, nullable=True)
@@ -1179,9 +1278,11 @@ class AuditEvent(Base):
     """
     __tablename__ = "audit_events"
     __table_args__ = (
-        Index("ix_audit_user_ts", "user_id", "created_at"),
+        Index("ix_audit_user_keyset", "user_id", "created_at", "id"),
+        Index("ix_audit_user_domain_keyset", "user_id", "event_domain", "created_at", "id"),
+        Index("ix_audit_user_severity_keyset", "user_id", "severity", "created_at", "id"),
+        Index("ix_audit_entity_keyset", "entity_type", "entity_id", "created_at", "id"),
         Index("ix_audit_domain_ts", "event_domain", "created_at"),
-        Index("ix_audit_entity", "entity_type", "entity_id"),
         Index("ix_audit_severity_ts", "severity", "created_at"),
     )
 
@@ -1199,6 +1300,19 @@ class AuditEvent(Base):
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
 
+class AuditEventRollup(Base):
+    """
+    Running audit event counts per (user, domain, severity), maintained on insert.
+    user_id 0 stands for system events without a user.
+    """
+    __tablename__ = "audit_event_rollups"
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    event_domain = Column(String(20), primary_key=True)
+    severity = Column(String(10), primary_key=True)
+    event_count = Column(Integer, nullable=False, default=0)
+
+
 class PaperStrategySnapshot(Base):
     """Periodic equity/P&L snapshot per paper-trading user, tagged with the
     user's smart-score threshold so A/B comparison across thresholds is possible."""
@@ -1222,3 +1336,112 @@ class PaperStrategySnapshot(Base):
     losses = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
+
+
+# ── Embedded stores (database.embedded_store) ─────────────────────────────
+# These tables back AccuracyTracker and NotificationsService. They live in
+# Postgres when DATABASE_URL is set and in a local SQLite file otherwise, so
+# they avoid dialect-specific column types.
+
+class AccuracyPrediction(Base):
+    """One recorded price prediction; actual_* / error fields fill in once evaluated."""
+    __tablename__ = "accuracy_predictions"
+    __table_args__ = (
+        Index("ix_accpred_asset_predicted", "asset_id", "predicted_date"),
+        Index("ix_accpred_asset_recorded", "asset_id", "recorded_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    asset_id = Column(String(30), nullable=False)
+    predicted_price = Column(Float, nullable=False)
+    predicted_date = Column(DateTime, nullable=False)
+    confidence = Column(Float, nullable=True)
+    recorded_at = Column(DateTime, nullable=False)
+    actual_price = Column(Float, nullable=True)
+    actual_date = Column(DateTime, nullable=True)
+    error = Column(Float, nullable=True)
+    error_pct = Column(Float, nullable=True)
+    accuracy = Column(Float, nullable=True)
+
+
+class AccuracyTradeOutcome(Base):
+    """Closed-trade direction outcome per asset (last 100 kept per asset)."""
+    __tablename__ = "accuracy_trade_outcomes"
+    __table_args__ = (
+        Index("ix_accout_asset_closed", "asset_id", "closed_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    asset_id = Column(String(30), nullable=False)
+    side = Column(String(10), nullable=False)
+    entry_price = Column(Float, nullable=False)
+    exit_price = Column(Float, nullable=False)
+    profit = Column(Float, nullable=True)
+    correct_direction = Column(Boolean, nullable=False)
+    opened_at = Column(String(40), nullable=True)   # caller-supplied ISO strings
+    closed_at = Column(String(40), nullable=True)
+    recorded_at = Column(DateTime, nullable=False)
+
+
+class AccuracyAssetStats(Base):
+    """Running per-asset prediction / outcome totals, maintained on every write."""
+    __tablename__ = "accuracy_asset_stats"
+
+    asset_id = Column(String(30), primary_key=True)
+    total_predictions = Column(Integer, nullable=False, default=0)
+    evaluated_predictions = Column(Integer, nullable=False, default=0)
+    accuracy_sum = Column(Float, nullable=False, default=0.0)
+    error_pct_sum = Column(Float, nullable=False, default=0.0)
+    outcome_count = Column(Integer, nullable=False, default=0)
+
+
+class AccuracyDailyStats(Base):
+    """
+    Per-asset, per-day counters behind get_rolling_accuracy: evaluated
+    predictions by recorded_at day, trade outcomes by closed_at day.
+    """
+    __tablename__ = "accuracy_daily_stats"
+
+    asset_id = Column(String(30), primary_key=True)
+    day = Column(String(10), primary_key=True)  # YYYY-MM-DD
+    evaluated = Column(Integer, nullable=False, default=0)
+    accuracy_sum = Column(Float, nullable=False, default=0.0)
+    outcomes = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+
+
+class StoredNotification(Base):
+    """In-app notification; seq orders newest-first listing."""
+    __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_read_seq", "read", "seq"),
+        Index("ix_notifications_type_seq", "type", "seq"),
+    )
+
+    seq = Column(Integer, primary_key=True)
+    id = Column(String(40), nullable=False, unique=True)
+    type = Column(String(30), nullable=False)
+    title = Column(Text, nullable=False)
+    message = Column(Text, nullable=False)
+    priority = Column(String(10), nullable=False)
+    data = Column(Text, nullable=True)  # JSON
+    read = Column(Boolean, nullable=False, default=False)
+    created_at = Column(String(32), nullable=False)
+    read_at = Column(String(32), nullable=True)
+
+
+class NotificationCounter(Base):
+    """Running notification counts: total, unread, type:<t>, priority:<p>."""
+    __tablename__ = "notification_counters"
+
+    key = Column(String(40), primary_key=True)
+    n = Column(Integer, nullable=False, default=0)
+
+
+class EmbeddedStoreMeta(Base):
+    """One-time markers (e.g. legacy JSON imports) for the embedded stores."""
+    __tablename__ = "embedded_store_meta"
+
+    key = Column(String(60), primary_key=True)
+    value = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,123 @@
+"""
+Schema readiness registry
+
+Services that own tables outside Alembic declare their DDL here with
+``register_schema``. The DDL runs once per process (at startup via
+``ensure_all_schemas``, or on first use), after which ``ensure_schema`` is a
+set lookup. Readiness is reset when the engine reports a disconnect or a
+missing table/column, so the next call re-verifies the schema.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event, text
+
+from database.connection import SessionLocal, sync_engine
+
+logger = logging.getLogger(__name__)
+
+# Modules that register schemas at import time; imported by ensure_all_schemas().
+SCHEMA_OWNERS = (
+    "services.dca_engine",
+    "services.model_improver",
+    "services.onchain_service",
+    "services.prediction_outcomes",
+    "services.social_service",
+    "scheduler.cron_tasks",
+)
+
+RETRY_AFTER_FAILURE_SECONDS = 60.0
+
+# SQLSTATEs that mean the schema changed under us: undefined table / column.
+_SCHEMA_SQLSTATES = {"42P01", "42703"}
+
+_schemas: Dict[str, Tuple[str, ...]] = {}
+_ready: set = set()
+_failed_at: Dict[str, float] = {}
+_lock = threading.RLock()
+
+
+def register_schema(name: str, statements: Sequence[str]) -> None:
+    """Declare the idempotent DDL (CREATE ... IF NOT EXISTS, ALTER ... IF NOT EXISTS) for ``name``."""
+    with _lock:
+        _schemas[name] = tuple(statements)
+        _ready.discard(name)
+
+
+def is_ready(name: str) -> bool:
+    return name in _ready
+
+
+def ensure_schema(name: str) -> bool:
+    """Run ``name``'s DDL unless it already succeeded in this process."""
+    if name in _ready:
+        return True
+    if SessionLocal is None:
+        return False
+    with _lock:
+        if name in _ready:
+            return True
+        failed_at = _failed_at.get(name)
+        if failed_at is not None and time.time() - failed_at < RETRY_AFTER_FAILURE_SECONDS:
+            return False
+        statements = _schemas.get(name)
+        if statements is None:
+            raise KeyError(f"Schema '{name}' is not registered")
+
+        db = SessionLocal()
+        try:
+            for statement in statements:
+                db.execute(text(statement))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            _failed_at[name] = time.time()
+            logger.warning(f"[schema] Could not ensure '{name}': {e}")
+            return False
+        finally:
+            db.close()
+
+        _failed_at.pop(name, None)
+        _ready.add(name)
+        return True
+
+
+def ensure_all_schemas() -> Dict[str, bool]:
+    """Import every schema owner and verify all registered schemas (startup)."""
+    for module in SCHEMA_OWNERS:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.warning(f"[schema] Could not import {module}: {e}")
+    return {name: ensure_schema(name) for name in sorted(_schemas)}
+
+
+def mark_stale(name: Optional[str] = None) -> None:
+    """Force the next ensure_schema call(s) to re-run DDL."""
+    with _lock:
+        if name is None:
+            _ready.clear()
+            _failed_at.clear()
+        else:
+            _ready.discard(name)
+            _failed_at.pop(name, None)
+
+
+def _is_schema_error(exc: BaseException) -> bool:
+    orig = getattr(exc, "orig", exc)
+    return getattr(orig, "pgcode", None) in _SCHEMA_SQLSTATES
+
+
+def _on_engine_error(context) -> None:
+    if context.is_disconnect or _is_schema_error(context.original_exception):
+        if _ready:
+            logger.info("[schema] Connection/schema error — readiness will be re-checked")
+        mark_stale()
+
+
+if sync_engine is not None:
+    event.listen(sync_engine, "handle_error", _on_engine_error)
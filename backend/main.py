@@ -10,10 +10,10 @@ from slowapi.util import get_remote_address
 from typing import Dict, Optional, List
 from datetime import datetime, timedelta
 import json
-import math
 import os
 import secrets
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
 from sqlalchemy import text
 from brokers.binance import BinanceAPI
@@ -32,25 +32,15 @@ from ml.annotation_api import router as annotation_router
 from scheduler.cron_tasks import TASK_MAP as CRON_TASK_MAP, run_named_task as run_cron_named_task
 
 # Database and Cache imports
-from database.connection import init_db, check_db_connection, close_db, SessionLocal
+from database.connection import init_db, check_db_connection, close_db, close_async_db, SessionLocal
 from database.models import BrokerCredential
+from database.keyset import next_cursor
 from cache.connection import get_redis, check_redis_connection
 
 # Security and Error Handling
 from utils.error_handler import AuraError
 from utils.security import security_manager
-
-def sanitize_floats(obj):
-    """Replace NaN/Infinity with None to prevent JSON serialization errors."""
-    if isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return None
-        return obj
-    if isinstance(obj, dict):
-        return {k: sanitize_floats(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [sanitize_floats(i) for i in obj]
-    return obj
+from utils.json_response import FastJSONResponse, dumps, json_response, sanitize_floats, stream_json_list
 
 
 SYMBOL_ALIASES = {
@@ -75,7 +65,8 @@ limiter = Limiter(key_func=get_remote_address)
 app = FastAPI(
     title="AURA Backend API",
     description="Backend για το AURA - AI Trading Assistant",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -93,7 +84,7 @@ async def aura_error_handler(request: Request, exc: AuraError):
 # ── JWT Auth Dependency ──────────────────────────────────────────
 _bearer_scheme = HTTPBearer(auto_error=False)
 
-def require_auth(credentials: HTTPAuthorizationCredentials = Depends(_bearer_scheme)):
+async def require_auth(credentials: HTTPAuthorizationCredentials = Depends(_bearer_scheme)):
     """Dependency that enforces JWT authentication on protected endpoints."""
     if not credentials:
         raise HTTPException(status_code=401, detail="Missing authorization token")
@@ -120,19 +111,17 @@ def require_auth(credentials: HTTPAuthorizationCredentials = Depends(_bearer_sch
             raise HTTPException(status_code=401, detail="Invalid token")
 
         try:
-            from database.models import User as _User
-            db = SessionLocal()
-            user = db.query(_User).filter(_User.id == uid).first()
-            db.close()
+            from auth.revocation import get_token_version_async
+            current_version = await get_token_version_async(uid)
         except Exception:
             _auth_logger.error("[AUTH_TOKEN_VERSION_CHECK_FAILED] DB error during token validation", exc_info=True)
             raise HTTPException(status_code=503, detail="Authentication service unavailable")
 
-        if not user:
+        if current_version is None:
             raise HTTPException(status_code=404, detail="User not found")
 
-        if user.token_version != token_version_in_token:
-            _auth_logger.warning(f"[AUTH_TOKEN_VERSION_MISMATCH] user={uid} jwt_ver={token_version_in_token} db_ver={user.token_version}")
+        if current_version != token_version_in_token:
+            _auth_logger.warning(f"[AUTH_TOKEN_VERSION_MISMATCH] user={uid} jwt_ver={token_version_in_token} db_ver={current_version}")
             raise HTTPException(status_code=401, detail="Token invalidated")
 
     return payload
@@ -368,6 +357,9 @@ async def startup_event():
             finally:
                 db.close()
             print("[+] Database initialized")
+            from database.schema_registry import ensure_all_schemas
+            schemas = ensure_all_schemas()
+            print(f"[+] Service schemas ready: {sum(schemas.values())}/{len(schemas)}")
             _restore_broker_connections()
             # Seed default user right after tables are created
             _seed_default_user()
@@ -397,9 +389,21 @@ async def startup_event():
         )
         ws_status = start_websocket_feed(crypto_symbols)
         print(f"[+] WebSocket feed started for {len(ws_status.get('subscribed_symbols', []))} crypto symbols")
+
+        from ml.anomaly_detector import anomaly_detector
+        anomaly_detector.start(get_redis())
+        print("[+] Streaming anomaly detector attached to websocket feed")
     except Exception as e:
         print(f"[!] Failed to start websocket feed: {e}")
 
+    # Warm the model registry for the autopilot universe in the background;
+    # everything else loads on first request.
+    try:
+        from services.auto_trading_engine import ALLOWED_AUTO_TRADE_SYMBOLS
+        asset_predictor.registry.warm_up(sorted(ALLOWED_AUTO_TRADE_SYMBOLS))
+    except Exception as e:
+        print(f"[!] Model warm-up failed to start: {e}")
+
     # Start auto trading engine (per-user isolated loop)
     from services.auto_trading_engine import auto_trader as _auto_trader
 
@@ -504,6 +508,12 @@ async def startup_event():
             )
         )
         print("[+] Auto trading engine initialized (per-user mode)")
+        try:
+            from services.exit_engine import exit_engine
+            exit_engine.start(_auto_trader)
+            print("[+] Tick-driven exit engine attached to websocket feed")
+        except Exception as e:
+            print(f"[!] Failed to start exit engine: {e}")
 
     # Train missing models in background (survives ephemeral filesystem wipes)
     async def _train_missing_on_startup():
@@ -569,7 +579,33 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     from services.auto_trading_engine import auto_trader as _auto_trader
     _auto_trader.stop()
+    try:
+        from services.exit_engine import exit_engine
+        exit_engine.stop()
+    except Exception:
+        pass
+    try:
+        from ml.anomaly_detector import anomaly_detector
+        anomaly_detector.stop()
+    except Exception:
+        pass
+    try:
+        from services.push_notifications import push_dispatcher
+        push_dispatcher.flush(timeout=5.0)
+    except Exception:
+        pass
+    try:
+        from services.prediction_outcomes import prediction_tracker
+        prediction_tracker.flush(timeout=5.0)
+    except Exception:
+        pass
+    try:
+        from services.usage_counters import usage_counters
+        usage_counters.flush()
+    except Exception:
+        pass
     close_db()
+    await close_async_db()
     print("[+] Cleanup completed")
 
 # Include annotation router
@@ -1449,7 +1485,7 @@ def get_trading_portfolio(request: Request):
                 raise RuntimeError("no user broker")
             account = broker.get_account_balance()
             if "error" not in account:
-                return sanitize_floats({
+                return json_response({
                     "total_value": account.get("total_balance", 0),
                     "cash": account.get("available_balance", 0),
                     "locked": account.get("locked_balance", 0),
@@ -1525,7 +1561,7 @@ def get_live_portfolio_full():
     # Sort by value descending
     positions.sort(key=lambda p: p["value_usdc"], reverse=True)
 
-    return sanitize_floats({
+    return json_response({
         "total_value": round(total_value_usdc, 2),
         "cash": next((p["amount"] for p in positions if p["symbol"] == "USDC"), 0),
         "positions": positions,
@@ -1537,11 +1573,11 @@ def get_trading_history(request: Request, limit: int = 50):
     """Επιστρέφει trade history"""
     user_id = _optional_user_id_from_request(request)
     trades = paper_trading_service.get_trade_history(limit, user_id=user_id)
-    return {
-        "trades": trades,
-        "total": len(paper_trading_service.get_trade_history(limit=10000, user_id=user_id)),
-        "timestamp": datetime.now().isoformat()
-    }
+    return stream_json_list(
+        request, trades, key="trades",
+        total=len(paper_trading_service.get_trade_history(limit=10000, user_id=user_id)),
+        timestamp=datetime.now().isoformat(),
+    )
 
 @app.get("/api/trading/positions")
 def get_positions(request: Request):
@@ -1626,11 +1662,11 @@ def get_portfolio(request: Request):
 def get_trade_history(request: Request, limit: int = 50):
     """Επιστρέφει trade history"""
     user_id = _optional_user_id_from_request(request)
-    return {
-        "trades": paper_trading_service.get_trade_history(limit, user_id=user_id),
-        "total": len(paper_trading_service.get_trade_history(limit=10000, user_id=user_id)),
-        "timestamp": datetime.now().isoformat()
-    }
+    return stream_json_list(
+        request, paper_trading_service.get_trade_history(limit, user_id=user_id), key="trades",
+        total=len(paper_trading_service.get_trade_history(limit=10000, user_id=user_id)),
+        timestamp=datetime.now().isoformat(),
+    )
 
 @app.get("/api/paper-trading/statistics")
 def get_trading_statistics(request: Request):
@@ -1653,13 +1689,13 @@ def get_trading_statistics(request: Request):
                 result["total_value"] = total_balance
                 result["total_trades"] = len(trades) if isinstance(trades, list) else result.get("total_trades", 0)
                 result["mode"] = "live"
-                return sanitize_floats(result)
+                return json_response(result)
         except Exception as e:
             print(f"[!] Live stats failed, falling back to paper: {e}")
 
     result = paper_trading_service.get_statistics(user_id=user_id)
     result["mode"] = "paper"
-    return sanitize_floats(result)
+    return json_response(result)
 
 class PaperOrderRequest(BaseModel):
     symbol: str
@@ -1812,7 +1848,7 @@ def reset_paper_trading(request: Request):
 @app.get("/api/ai/predict/{symbol}")
 def get_prediction(symbol: str, days: int = 7):
     """Επιστρέφει AI prediction για οποιοδήποτε asset (metals, stocks, crypto, derivatives)"""
-    return sanitize_floats(asset_predictor.predict_price(symbol.upper(), days))
+    return json_response(asset_predictor.predict_price(symbol.upper(), days))
 
 
 @app.get("/api/v1/consensus/{symbol}")
@@ -1977,6 +2013,10 @@ async def get_rl_trade_outcomes_debug(
 @app.get("/api/ai/predictions")
 def get_all_predictions(request: Request, days: int = 7, asset_type: Optional[str] = None):
     """Επιστρέφει predictions για όλα τα assets ή filtered by type"""
+    return stream_json_list(request, _collect_all_predictions(request, days, asset_type))
+
+
+def _collect_all_predictions(request: Optional[Request], days: int = 7, asset_type: Optional[str] = None) -> List[dict]:
     if request is not None:
         user_id = _optional_user_id_from_request(request)
         if user_id is not None:
@@ -2118,10 +2158,11 @@ def get_all_predictions(request: Request, days: int = 7, asset_type: Optional[st
     try:
         from config.feature_flags import ENABLE_SENTIMENT_EXPOSURE
         if ENABLE_SENTIMENT_EXPOSURE:
-            from services.sentiment_scheduler import get_cached_sentiment
+            from services.sentiment_scheduler import get_cached_sentiments
+            sentiments = get_cached_sentiments(pred.get("symbol", "") for pred in result)
             for pred in result:
                 sym = pred.get("symbol", "")
-                sentiment = get_cached_sentiment(sym)
+                sentiment = sentiments.get(sym) or {}
                 pred["sentiment"] = {
                     "score": sentiment.get("score", 50.0),
                     "label": sentiment.get("label", "neutral"),
@@ -2148,20 +2189,19 @@ def get_all_predictions(request: Request, days: int = 7, asset_type: Optional[st
     except Exception:
         pass
 
-    safe_result = sanitize_floats(result)
     # Store in Redis cache (TTL 3600s) — aggregate key + per-symbol keys
     try:
         _r = get_redis()
         if _r is not None:
-            _r.setex(_all_cache_key, 3600, json.dumps(safe_result))
-            for _item in safe_result:
+            _r.setex(_all_cache_key, 3600, dumps(result))
+            for _item in result:
                 _sym = _item.get("symbol", "")
                 if _sym:
-                    _r.setex(f"prediction:{_sym}:{days}", 3600, json.dumps(_item))
-            print(f"[cache] Predictions cached: {_all_cache_key} ({len(safe_result)} items, TTL 3600s)")
+                    _r.setex(f"prediction:{_sym}:{days}", 3600, dumps(_item))
+            print(f"[cache] Predictions cached: {_all_cache_key} ({len(result)} items, TTL 3600s)")
     except Exception as _se:
         print(f"[!] Prediction cache store failed (non-fatal): {_se}")
-    return [{**item, "cached": False} for item in safe_result]
+    return [{**item, "cached": False} for item in result]
 
 
 @app.delete("/api/v1/predictions/cache/{symbol}")
@@ -2215,11 +2255,11 @@ def get_prediction_cache_status():
 
 
 @app.get("/api/ai/accuracy")
-def get_ai_accuracy_summary():
+async def get_ai_accuracy_summary():
     """Prediction direction accuracy summary from delayed outcome evaluation."""
-    from services.prediction_outcomes import prediction_outcomes_service
+    from database.async_repository import fetch_prediction_accuracy
 
-    return sanitize_floats(prediction_outcomes_service.get_accuracy(symbol=None))
+    return json_response(await fetch_prediction_accuracy(symbol=None))
 
 
 @app.get("/api/ai/accuracy/by-onchain-bucket")
@@ -2228,15 +2268,15 @@ def get_accuracy_by_onchain_bucket(symbol: Optional[str] = None, days: int = 30)
     from services.prediction_outcomes import prediction_outcomes_service
 
     result = prediction_outcomes_service.get_accuracy_by_onchain_bucket(symbol=symbol, days=days)
-    return sanitize_floats(result)
+    return json_response(result)
 
 
 @app.get("/api/ai/accuracy/{symbol}")
-def get_ai_accuracy_for_symbol(symbol: str):
+async def get_ai_accuracy_for_symbol(symbol: str):
     """Prediction direction accuracy for a specific asset symbol."""
-    from services.prediction_outcomes import prediction_outcomes_service
+    from database.async_repository import fetch_prediction_accuracy
 
-    return sanitize_floats(prediction_outcomes_service.get_accuracy(symbol=symbol.upper()))
+    return json_response(await fetch_prediction_accuracy(symbol=symbol.upper()))
 
 
 @app.get("/api/ai/model-health")
@@ -2244,14 +2284,14 @@ def get_ai_model_health():
     """Return model version/accuracy trend and feedback activity per symbol."""
     from services.model_improver import get_model_health
 
-    return sanitize_floats(get_model_health())
+    return json_response(get_model_health())
 
 @app.get("/api/v1/market/movers")
 def get_market_movers():
     """Top gainers, losers, and volume leaders across all assets."""
     try:
         # Use the predictions already computed (they have price + change data)
-        all_preds = get_all_predictions(days=1)  # call existing endpoint with 1-day horizon
+        all_preds = _collect_all_predictions(None, days=1)  # call existing endpoint with 1-day horizon
         if not isinstance(all_preds, list):
             all_preds = []
 
@@ -2294,7 +2334,7 @@ def get_market_onchain_summary(days: int = 7):
     """Return aggregate on-chain summary across tracked crypto assets."""
     from services.onchain_service import get_recent_onchain_summary
 
-    return sanitize_floats(get_recent_onchain_summary(days=max(1, min(days, 90))))
+    return json_response(get_recent_onchain_summary(days=max(1, min(days, 90))))
 
 
 @app.get("/api/market/onchain/{symbol}/history")
@@ -2306,7 +2346,7 @@ def get_market_onchain_history(symbol: str, days: int = 30, limit: int = 120):
     if not is_onchain_supported(sym):
         raise HTTPException(status_code=404, detail=f"On-chain signals not supported for {sym}")
 
-    return sanitize_floats(get_onchain_history(sym, days=max(1, min(days, 365)), limit=max(1, min(limit, 500))))
+    return json_response(get_onchain_history(sym, days=max(1, min(days, 365)), limit=max(1, min(limit, 500))))
 
 
 @app.get("/api/market/onchain/{symbol}")
@@ -2318,23 +2358,21 @@ def get_market_onchain(symbol: str):
     if not is_onchain_supported(sym):
         raise HTTPException(status_code=404, detail=f"On-chain signals not supported for {sym}")
 
-    return sanitize_floats(get_onchain_signals(sym))
+    return json_response(get_onchain_signals(sym))
 
 
 @app.get("/api/v1/news/impact/all")
 def get_news_impact_all():
     """News impact score for every supported symbol."""
-    from services.news_impact import compute_news_impact_score
+    from services.news_impact import compute_news_impact_scores
 
+    scores = compute_news_impact_scores(asset_predictor.all_assets.keys())
     items = []
-    for sym in asset_predictor.all_assets.keys():
-        try:
-            info = compute_news_impact_score(sym)
-        except Exception as e:
-            info = {"symbol": sym, "impact_level": "LOW", "error": str(e)}
+    for sym, info in scores.items():
+        info = dict(info)
         info["asset_name"] = asset_predictor.all_assets[sym].get("name", sym)
         items.append(info)
-    return sanitize_floats({
+    return json_response({
         "news_impact": items,
         "count": len(items),
         "timestamp": datetime.now().isoformat(),
@@ -2355,7 +2393,7 @@ def get_news_impact_for_symbol(symbol: str):
         raise HTTPException(status_code=500, detail=f"News impact failed: {e}")
     info["asset_name"] = asset_predictor.all_assets[sym].get("name", sym)
     info["timestamp"] = datetime.now().isoformat()
-    return sanitize_floats(info)
+    return json_response(info)
 
 
 @app.get("/api/v1/market/regime/all")
@@ -2371,7 +2409,7 @@ def get_market_regime_all():
             info = {"symbol": sym, "regime": "NEUTRAL", "error": str(e)}
         info["asset_name"] = asset_predictor.all_assets[sym].get("name", sym)
         items.append(info)
-    return sanitize_floats({
+    return json_response({
         "regimes": items,
         "count": len(items),
         "timestamp": datetime.now().isoformat(),
@@ -2392,7 +2430,7 @@ def get_market_regime_for_symbol(symbol: str):
         raise HTTPException(status_code=500, detail=f"Regime detection failed: {e}")
     info["asset_name"] = asset_predictor.all_assets[sym].get("name", sym)
     info["timestamp"] = datetime.now().isoformat()
-    return sanitize_floats(info)
+    return json_response(info)
 
 
 @app.get("/api/v1/market/volatility/all")
@@ -2406,7 +2444,7 @@ def get_volatility_all():
             info = {"symbol": sym, "volatility_pct": None, "regime": "MEDIUM", "threshold": 0.90, "error": str(e)}
         info["asset_name"] = asset_predictor.all_assets[sym].get("name", sym)
         items.append(info)
-    return sanitize_floats({
+    return json_response({
         "volatility": items,
         "count": len(items),
         "timestamp": datetime.now().isoformat(),
@@ -2425,7 +2463,7 @@ def get_volatility_for_symbol(symbol: str):
         raise HTTPException(status_code=500, detail=f"Volatility analysis failed: {e}")
     info["asset_name"] = asset_predictor.all_assets[sym].get("name", sym)
     info["timestamp"] = datetime.now().isoformat()
-    return sanitize_floats(info)
+    return json_response(info)
 
 
 @app.get("/api/v1/market/correlation/matrix")
@@ -2433,7 +2471,7 @@ def get_correlation_matrix_endpoint():
     """Pearson correlation matrix for default tracked universe (last 90d returns)."""
     from ai.correlation_matrix import compute_correlation_matrix
 
-    return sanitize_floats(compute_correlation_matrix(symbols=None))
+    return json_response(compute_correlation_matrix(symbols=None))
 
 
 @app.get("/api/v1/market/correlation/pairs")
@@ -2442,7 +2480,7 @@ def get_correlation_pairs_endpoint(threshold: float = Query(0.8, ge=0.0, le=1.0)
     from ai.correlation_matrix import get_correlated_pairs
 
     pairs = get_correlated_pairs(threshold=threshold)
-    return sanitize_floats(
+    return json_response(
         {
             "threshold": float(threshold),
             "pairs": pairs,
@@ -2466,15 +2504,20 @@ def get_portfolio_correlation_endpoint(payload=Depends(require_auth)):
     result = check_portfolio_correlation(symbols)
     result["symbols"] = symbols
     result["positions_count"] = len(symbols)
-    return sanitize_floats(result)
+    return json_response(result)
 
 
 @app.get("/api/v1/market/realtime/status")
 def get_market_realtime_status():
     """Show websocket feed status and live symbol activity."""
     from services.websocket_feed import get_websocket_feed_status
+    from services.exit_engine import exit_engine
+    from ml.anomaly_detector import anomaly_detector
 
-    return sanitize_floats(get_websocket_feed_status())
+    status = get_websocket_feed_status()
+    status["exit_engine"] = exit_engine.get_status()
+    status["anomaly_detector"] = anomaly_detector.get_status()
+    return json_response(status)
 
 
 @app.get("/api/v1/market/realtime/{symbol}")
@@ -2485,7 +2528,7 @@ def get_market_realtime_price(symbol: str):
     payload = get_realtime_price(symbol.upper())
     if payload.get("price") is None:
         raise HTTPException(status_code=404, detail=f"Realtime price unavailable for {symbol.upper()}")
-    return sanitize_floats(payload)
+    return json_response(payload)
 
 
 @app.get("/api/v1/predictions/ensemble/{symbol}")
@@ -2498,12 +2541,12 @@ def get_ensemble_prediction(symbol: str):
         result = compute_ensemble_vote(sym)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ensemble vote failed: {e}")
-    return sanitize_floats({
+    return {
         "symbol": sym,
         "asset_name": asset_predictor.all_assets[sym].get("name", sym),
         "ensemble_vote": result,
         "timestamp": datetime.now().isoformat(),
-    })
+    }
 
 
 @app.get("/api/v1/predictions/mtf/{symbol}")
@@ -2516,7 +2559,7 @@ def get_mtf_prediction(symbol: str):
         result = compute_mtf_agreement(sym)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"MTF analysis failed: {e}")
-    return sanitize_floats({
+    return json_response({
         "symbol": sym,
         "asset_name": asset_predictor.all_assets[sym].get("name", sym),
         "mtf_agreement": result,
@@ -2560,7 +2603,7 @@ def _build_shap_summary(signal: str, shap_explanation: Dict[str, float]) -> str:
     return "Top model drivers: " + "; ".join(parts[:3]) + "."
 
 
-def _build_prediction_explanation_payload(symbol: str, days: int = 7) -> Dict:
+def _build_prediction_explanation_payload(symbol: str, days: int = 7, news_impact: Optional[Dict] = None) -> Dict:
     """Build a full explainability payload for a single prediction symbol."""
     from ai.decision_explanation import build_explanation
     from ai.market_regime import detect_market_regime
@@ -2589,12 +2632,13 @@ def _build_prediction_explanation_payload(symbol: str, days: int = 7) -> Dict:
     ensemble_vote = compute_ensemble_vote(sym)
     market_regime = detect_market_regime(sym)
     mtf_agreement = compute_mtf_agreement(sym)
-    news_impact = compute_news_impact_score(sym)
+    if news_impact is None:
+        news_impact = compute_news_impact_score(sym)
 
     shap_summary = _build_shap_summary(signal, shap_explanation)
     human_readable_summary = f"{decision.narrative_summary} {shap_summary}".strip()
 
-    return sanitize_floats({
+    return {
         "symbol": sym,
         "asset_name": asset_predictor.all_assets[sym].get("name", sym),
         "signal": signal,
@@ -2606,7 +2650,10 @@ def _build_prediction_explanation_payload(symbol: str, days: int = 7) -> Dict:
         "mtf_agreement": mtf_agreement,
         "news_impact": news_impact,
         "timestamp": datetime.now().isoformat(),
-    })
+    }
+
+
+EXPLAIN_BATCH_CONCURRENCY = 8
 
 
 @app.get("/api/v1/predictions/explain/batch")
@@ -2632,17 +2679,25 @@ def get_prediction_explanations_batch(
             ]
 
     capped_symbols = selected_symbols[: max(1, min(limit, 100))]
-    items = []
-    errors = []
-    for sym in capped_symbols:
+
+    from services.news_impact import compute_news_impact_scores
+    news_impacts = compute_news_impact_scores(capped_symbols)
+
+    def _build(sym: str):
         try:
-            items.append(_build_prediction_explanation_payload(sym))
+            return _build_prediction_explanation_payload(sym, news_impact=news_impacts.get(sym)), None
         except HTTPException as exc:
-            errors.append({"symbol": sym, "detail": exc.detail})
+            return None, {"symbol": sym, "detail": exc.detail}
         except Exception as exc:
-            errors.append({"symbol": sym, "detail": str(exc)})
+            return None, {"symbol": sym, "detail": str(exc)}
+
+    # Symbols are independent (own model, own data); results keep request order.
+    with ThreadPoolExecutor(max_workers=min(EXPLAIN_BATCH_CONCURRENCY, len(capped_symbols))) as pool:
+        results = list(pool.map(_build, capped_symbols))
+    items = [item for item, _ in results if item is not None]
+    errors = [err for _, err in results if err is not None]
 
-    return sanitize_floats({
+    return json_response({
         "items": items,
         "count": len(items),
         "requested_symbols": capped_symbols,
@@ -2654,7 +2709,7 @@ def get_prediction_explanations_batch(
 @app.get("/api/v1/predictions/explain/{symbol}")
 def get_prediction_explanation(symbol: str):
     """Explain a single prediction with SHAP and decision context."""
-    return _build_prediction_explanation_payload(symbol)
+    return json_response(_build_prediction_explanation_payload(symbol))
 
 
 @app.get("/api/v1/predictions/extended")
@@ -2705,7 +2760,7 @@ def get_extended_predictions(days: int = 7):
             except Exception as e:
                 print(f"[!] Extended prediction failed for {symbol}: {e}")
 
-    return sanitize_floats({"predictions": results, "count": len(results)})
+    return json_response({"predictions": results, "count": len(results)})
 
 
 @app.get("/api/ai/predictions/{prediction_id}")
@@ -2789,7 +2844,7 @@ def get_prediction_by_id(prediction_id: str):
     trend_1d = "bullish" if trend == "BULLISH" else "bearish" if trend == "BEARISH" else "neutral"
     price_decimals = 2 if current_price >= 1 else 6
 
-    return {
+    result = {
         "id": prediction_id,
         "asset": p.get("asset_name") or symbol,
         "symbol": symbol,
@@ -2819,8 +2874,7 @@ def get_prediction_by_id(prediction_id: str):
         "pricePath": p.get("price_path", []),
         "modelVersion": p.get("model_version", "v1.0"),
     }
-    print(f"[DEBUG] Prediction detail response: asset={result['asset']}, price={result['price']}, targetPrice={result['targetPrice']}")
-    return sanitize_floats(result)
+    return json_response(result)
 
 
 @app.get("/api/ai/decision/{symbol}")
@@ -3038,10 +3092,10 @@ def get_ai_decision(symbol: str, payload=Depends(require_auth)):
         }
 
     result = {
-        "signal": sanitize_floats(signal),
+        "signal": signal,
         "explanation": explanation.model_dump(),
-        "sizing": sanitize_floats(sizing) if sizing else None,
-        "portfolio": sanitize_floats(portfolio_summary) if portfolio_summary else None,
+        "sizing": sizing,
+        "portfolio": portfolio_summary,
         "user_profile": {
             "risk_profile": risk_profile_name,
             "objective": user_profile.get("objective", "growth"),
@@ -3049,20 +3103,28 @@ def get_ai_decision(symbol: str, payload=Depends(require_auth)):
             "max_positions": user_profile.get("max_positions"),
         },
     }
-    return sanitize_floats(result)
+    return json_response(result)
 
 
 @app.get("/api/ai/decision-history")
 def get_decision_history(
+    request: Request,
     symbol: str = None,
     limit: int = 20,
+    cursor: Optional[str] = None,
     payload=Depends(require_auth),
 ):
-    """Get AI decision history with reason codes and counterfactuals."""
+    """Get AI decision history with reason codes and counterfactuals.
+
+    Pass the previous page's ``next_cursor`` as ``cursor`` to fetch the next page.
+    """
     from services.decision_persistence import get_decision_history as _get_history
     user_id = int(payload.get("sub", 0))
-    history = _get_history(user_id=user_id, symbol=symbol, limit=min(limit, 100))
-    return {"decisions": history, "count": len(history)}
+    limit = min(limit, 100)
+    history = _get_history(user_id=user_id, symbol=symbol, limit=limit, cursor=cursor)
+    return stream_json_list(
+        request, history, key="decisions", count=len(history), next_cursor=next_cursor(history, limit),
+    )
 
 
 @app.get("/api/ai/reason-code-stats")
@@ -3075,21 +3137,26 @@ def get_reason_code_stats(symbol: str = None, _user=Depends(require_auth)):
 
 @app.get("/api/risk-events")
 def get_risk_events(
+    request: Request,
     symbol: str = None,
     event_type: str = None,
     severity: str = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
     payload=Depends(require_auth),
 ):
-    """Get risk event history with optional filters."""
+    """Get risk event history with optional filters (keyset-paged via ``cursor``)."""
     from services.risk_event_persistence import get_risk_event_history
     user_id = int(payload.get("sub", 0))
+    limit = min(limit, 200)
     events = get_risk_event_history(
         user_id=user_id, symbol=symbol,
         event_type=event_type, severity=severity,
-        limit=min(limit, 200),
+        limit=limit, cursor=cursor,
+    )
+    return stream_json_list(
+        request, events, key="events", count=len(events), next_cursor=next_cursor(events, limit),
     )
-    return {"events": events, "count": len(events)}
 
 
 @app.get("/api/risk-events/summary")
@@ -3131,7 +3198,7 @@ def get_portfolio_risk(payload=Depends(require_auth)):
         print(f"[!] Portfolio risk fetch failed: {e}")
 
     assessment = assess_portfolio(positions=positions, account_balance=balance)
-    return sanitize_floats({
+    return json_response({
         "risk_score": assessment.portfolio_risk_score,
         "total_exposure_usd": assessment.total_exposure_usd,
         "position_count": assessment.position_count,
@@ -3147,12 +3214,12 @@ def get_portfolio_risk(payload=Depends(require_auth)):
 
 
 @app.get("/api/portfolio/history")
-def get_portfolio_history(limit: int = 30, payload=Depends(require_auth)):
+async def get_portfolio_history(request: Request, limit: int = 30, payload=Depends(require_auth)):
     """Get portfolio snapshot history for the current user."""
-    from services.portfolio_persistence import get_snapshot_history
+    from database.async_repository import fetch_snapshot_history
     user_id = int(payload.get("sub", 0))
-    snapshots = get_snapshot_history(user_id=user_id, limit=min(limit, 200))
-    return sanitize_floats({"snapshots": snapshots, "count": len(snapshots)})
+    snapshots = await fetch_snapshot_history(user_id=user_id, limit=min(limit, 200))
+    return stream_json_list(request, snapshots, key="snapshots", count=len(snapshots))
 
 
 @app.get("/api/portfolio/snapshot/{snapshot_id}")
@@ -3162,57 +3229,80 @@ def get_portfolio_snapshot_detail(snapshot_id: int, _user=Depends(require_auth))
     detail = get_snapshot_detail(snapshot_id)
     if not detail:
         raise HTTPException(status_code=404, detail="Snapshot not found")
-    return sanitize_floats(detail)
+    return json_response(detail)
 
 
 @app.get("/api/portfolio/equity-chart")
-def get_equity_chart(limit: int = 90, payload=Depends(require_auth)):
-    """Get equity timeseries for portfolio chart."""
-    from services.portfolio_persistence import get_equity_timeseries
+async def get_equity_chart(
+    days: int = 90,
+    points: int = 120,
+    limit: Optional[int] = Query(None, deprecated=True),
+    payload=Depends(require_auth),
+):
+    """Get equity OHLC for the portfolio chart.
+
+    The rollup resolution (1h / 1d / 1w) is chosen from ``days``; the series
+    is merged down to at most ``points`` entries. ``limit`` (the number of
+    snapshots, before rollups existed) is still accepted as an alias for
+    ``points`` so older clients keep working.
+    """
+    from database.async_repository import fetch_equity_chart
     user_id = int(payload.get("sub", 0))
-    series = get_equity_timeseries(user_id=user_id, limit=min(limit, 365))
-    return sanitize_floats({"series": series, "count": len(series)})
+    if limit is not None:
+        points = limit
+    chart = await fetch_equity_chart(user_id=user_id, days=max(1, min(days, 3650)), points=max(1, min(points, 500)))
+    return json_response(chart)
 
 
 @app.get("/api/feed")
 def get_ai_feed(
+    request: Request,
     limit: int = 50,
     event_type: Optional[str] = None,
     symbol: Optional[str] = None,
     severity: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
     """Get the AI feed — sorted, deduplicated events from all AURA systems (legacy)."""
     from services.feed_engine import get_feed
-    events = get_feed(limit=limit, event_type=event_type, symbol=symbol, severity=severity)
-    return sanitize_floats({"events": events, "count": len(events)})
+    events = get_feed(limit=limit, event_type=event_type, symbol=symbol, severity=severity, cursor=cursor)
+    return stream_json_list(
+        request, events, key="events", count=len(events),
+        next_cursor=next_cursor(events, limit, created_key="timestamp"),
+    )
 
 
 @app.get("/api/feed/v2")
-def get_user_feed_v2(
+async def get_user_feed_v2(
+    request: Request,
     event_type: Optional[str] = None,
     priority: Optional[str] = None,
     symbol: Optional[str] = None,
     include_expired: bool = False,
     limit: int = 50,
+    cursor: Optional[str] = None,
     payload=Depends(require_auth),
 ):
-    """Get personalized AI feed with read/unread state and expiry."""
-    from services.feed_persistence import get_user_feed
+    """Get personalized AI feed with read/unread state and expiry (keyset-paged via ``cursor``)."""
+    from database.async_repository import fetch_user_feed
     user_id = int(payload.get("sub", 0))
-    events = get_user_feed(
+    limit = min(limit, 200)
+    events = await fetch_user_feed(
         user_id=user_id, event_type=event_type,
         priority=priority, symbol=symbol,
-        include_expired=include_expired, limit=min(limit, 200),
+        include_expired=include_expired, limit=limit, cursor=cursor,
+    )
+    return stream_json_list(
+        request, events, key="events", count=len(events), next_cursor=next_cursor(events, limit),
     )
-    return {"events": sanitize_floats(events), "count": len(events)}
 
 
 @app.get("/api/feed/v2/unread")
-def get_feed_unread_count(payload=Depends(require_auth)):
+async def get_feed_unread_count(payload=Depends(require_auth)):
     """Get count of unread, non-expired feed events for the current user."""
-    from services.feed_persistence import get_unread_count
+    from database.async_repository import fetch_unread_count
     user_id = int(payload.get("sub", 0))
-    return {"unread_count": get_unread_count(user_id)}
+    return {"unread_count": await fetch_unread_count(user_id)}
 
 
 @app.post("/api/feed/v2/mark-read")
@@ -3246,6 +3336,10 @@ class SimulationRequest(BaseModel):
     take_profit_pct: float = 5.0
     max_positions: int = 3
     position_size_pct: float = 5.0
+    mode: str = "deterministic"  # deterministic / monte_carlo
+    n_paths: int = 2000
+    path_model: str = "bootstrap"  # bootstrap / gbm
+    seed: Optional[int] = None
 
 
 @app.post("/api/simulation/run")
@@ -3262,6 +3356,10 @@ def run_simulation_endpoint(req: SimulationRequest, payload=Depends(require_auth
         take_profit_pct=req.take_profit_pct / 100,
         max_positions=req.max_positions,
         position_size_pct=req.position_size_pct,
+        mode=req.mode,
+        n_paths=req.n_paths,
+        path_model=req.path_model,
+        seed=req.seed,
     )
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
@@ -3273,7 +3371,7 @@ def run_simulation_endpoint(req: SimulationRequest, payload=Depends(require_auth
         run_id = save_simulation_run(
             user_id=user_id,
             strategy_id=req.strategy,
-            run_type="backtest",
+            run_type="monte_carlo" if req.mode == "monte_carlo" else "backtest",
             symbols=req.symbols,
             initial_capital=req.capital,
             config={
@@ -3286,6 +3384,10 @@ def run_simulation_endpoint(req: SimulationRequest, payload=Depends(require_auth
                 "take_profit_pct": req.take_profit_pct,
                 "max_positions": req.max_positions,
                 "position_size_pct": req.position_size_pct,
+                "mode": req.mode,
+                "n_paths": req.n_paths,
+                "path_model": req.path_model,
+                "seed": req.seed,
             },
             disclaimer=DISCLAIMER,
             result=result,
@@ -3296,7 +3398,7 @@ def run_simulation_endpoint(req: SimulationRequest, payload=Depends(require_auth
     except Exception:
         pass
 
-    return sanitize_floats(result)
+    return json_response(result)
 
 
 @app.get("/api/simulation/strategies")
@@ -3316,7 +3418,7 @@ def get_simulation_history_endpoint(
     from services.simulation_persistence import get_simulation_history
     user_id = int(payload.get("sub", 0))
     history = get_simulation_history(user_id=user_id, run_type=run_type, limit=min(limit, 100))
-    return sanitize_floats({"runs": history, "count": len(history)})
+    return json_response({"runs": history, "count": len(history)})
 
 
 @app.get("/api/simulation/detail/{run_id}")
@@ -3326,7 +3428,7 @@ def get_simulation_detail_endpoint(run_id: int, _user=Depends(require_auth)):
     detail = get_simulation_detail(run_id)
     if not detail:
         raise HTTPException(status_code=404, detail="Simulation run not found")
-    return sanitize_floats(detail)
+    return json_response(detail)
 
 
 @app.get("/api/strategies")
@@ -3360,7 +3462,7 @@ def evaluate_strategies(symbol: str):
     results = strategy_registry.evaluate_all(sym, market_data)
     consensus = strategy_registry.consensus(sym, market_data)
 
-    return sanitize_floats({
+    return json_response({
         "symbol": sym,
         "strategies": results,
         "consensus": consensus,
@@ -3407,22 +3509,27 @@ def get_strategy_allocations(
 
 @app.get("/api/audit-trail")
 def get_audit_trail_endpoint(
+    request: Request,
     domain: Optional[str] = None,
     severity: Optional[str] = None,
     entity_type: Optional[str] = None,
     entity_id: Optional[int] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
     payload=Depends(require_auth),
 ):
-    """Get unified audit trail with optional filters."""
+    """Get unified audit trail with optional filters (keyset-paged via ``cursor``)."""
     from services.audit_trail import get_audit_trail
     user_id = int(payload.get("sub", 0))
+    limit = min(limit, 500)
     events = get_audit_trail(
         user_id=user_id, domain=domain, severity=severity,
         entity_type=entity_type, entity_id=entity_id,
-        limit=min(limit, 500),
+        limit=limit, cursor=cursor,
+    )
+    return stream_json_list(
+        request, events, key="events", count=len(events), next_cursor=next_cursor(events, limit),
     )
-    return {"events": events, "count": len(events)}
 
 
 @app.get("/api/audit-trail/summary")
@@ -3436,7 +3543,7 @@ def get_audit_summary_endpoint(payload=Depends(require_auth)):
 @app.get("/api/ai/signal/{symbol}")
 def get_trading_signal(symbol: str):
     """Επιστρέφει trading signal για οποιοδήποτε asset"""
-    return sanitize_floats(asset_predictor.get_trading_signal(symbol.upper()))
+    return json_response(asset_predictor.get_trading_signal(symbol.upper()))
 
 @app.get("/api/ai/signals")
 def get_all_signals(asset_type: Optional[str] = None):
@@ -3541,12 +3648,12 @@ def get_asset_info(symbol: str):
 @app.get("/api/ai/predict/metals/{symbol}")
 def get_metal_prediction(symbol: str, days: int = 7):
     """Legacy endpoint - Επιστρέφει AI prediction για ένα metal"""
-    return sanitize_floats(precious_metals_predictor.predict_price(symbol.upper(), days))
+    return json_response(precious_metals_predictor.predict_price(symbol.upper(), days))
 
 @app.get("/api/ai/predictions/metals")
 def get_metals_predictions(days: int = 7):
     """Legacy endpoint - Επιστρέφει predictions για όλα τα precious metals"""
-    return sanitize_floats(precious_metals_predictor.get_all_predictions(days))
+    return json_response(precious_metals_predictor.get_all_predictions(days))
 
 @app.get("/api/ai/status")
 def get_ai_status():
@@ -3788,6 +3895,7 @@ def get_ml_status():
     return {
         "models": model_manager.get_model_status(),
         "training": training_prep.get_training_status(),
+        "model_registry": asset_predictor.registry.get_status(),
         "platforms_supported": ["ios (MLX)", "android (ONNX)"],
         "timestamp": datetime.now().isoformat()
     }
@@ -4220,6 +4328,8 @@ def register_push_token(data: PushTokenRequest, payload=Depends(require_auth)):
             ), {"uid": user_id, "tok": data.token, "plat": data.platform})
         db.commit()
         db.close()
+        from services.push_notifications import invalidate_token_cache
+        invalidate_token_cache()
         return {"success": True, "message": "Push token registered"}
     except Exception as e:
         print(f"[!] Push token registration failed: {e}")
@@ -4333,6 +4443,8 @@ def update_user_password(data: ChangePasswordRequest, payload=Depends(require_au
         # Increment token_version to invalidate all existing tokens
         user.token_version = (user.token_version or 0) + 1
         db.commit()
+        from auth.revocation import publish_token_version
+        publish_token_version(user.id, user.token_version)
         from services.auth_audit import log_auth_event
         log_auth_event("PASSWORD_CHANGE", "SUCCESS", user_id=user.id, email=user.email)
         return {"success": True, "message": "Password updated"}
@@ -4355,6 +4467,8 @@ def logout_all_devices(payload=Depends(require_auth)):
     try:
         user.token_version = (user.token_version or 0) + 1
         db.commit()
+        from auth.revocation import publish_token_version
+        publish_token_version(user.id, user.token_version)
         from services.auth_audit import log_auth_event
         log_auth_event("LOGOUT_ALL", "SUCCESS", user_id=user.id, email=user.email)
         return {"success": True, "message": "All sessions invalidated"}
@@ -4457,6 +4571,8 @@ def delete_user_account(payload=Depends(require_auth)):
         user.is_active = False
         user.token_version = (user.token_version or 0) + 1
         db.commit()
+        from auth.revocation import publish_token_version
+        publish_token_version(user.id, user.token_version)
         return {"success": True}
     except Exception:
         db.rollback()
@@ -4481,7 +4597,7 @@ def get_user_achievements(payload=Depends(require_auth)):
         raise HTTPException(status_code=401, detail="Invalid user token")
 
     from services.achievements import get_achievements_overview
-    return sanitize_floats(get_achievements_overview(user_id))
+    return json_response(get_achievements_overview(user_id))
 
 
 @app.get("/api/reports/weekly")
@@ -4492,7 +4608,7 @@ def get_weekly_reports_endpoint(payload=Depends(require_auth)):
         raise HTTPException(status_code=401, detail="Invalid user token")
 
     from services.weekly_report import get_weekly_reports
-    return sanitize_floats(get_weekly_reports(user_id, limit=4))
+    return json_response(get_weekly_reports(user_id, limit=4))
 
 
 @app.get("/api/reports/weekly/latest")
@@ -4503,7 +4619,7 @@ def get_latest_weekly_report_endpoint(payload=Depends(require_auth)):
         raise HTTPException(status_code=401, detail="Invalid user token")
 
     from services.weekly_report import get_latest_weekly_report
-    return sanitize_floats(get_latest_weekly_report(user_id))
+    return json_response(get_latest_weekly_report(user_id))
 
 
 class SubscriptionUpgradeRequest(BaseModel):
@@ -4515,15 +4631,15 @@ class ReferralApplyRequest(BaseModel):
 
 
 @app.get("/api/subscription/status")
-def get_subscription_status_endpoint(payload=Depends(require_auth)):
+async def get_subscription_status_endpoint(payload=Depends(require_auth)):
     """Return current user's subscription tier and feature access."""
     user_id = _extract_user_id(payload)
     if user_id is None:
         raise HTTPException(status_code=401, detail="Invalid user token")
 
-    from services.subscription_service import get_subscription_status
+    from database.async_repository import fetch_subscription_status
 
-    return sanitize_floats(get_subscription_status(user_id))
+    return json_response(await fetch_subscription_status(user_id))
 
 
 @app.post("/api/subscription/upgrade")
@@ -4535,7 +4651,7 @@ def upgrade_subscription_endpoint(data: SubscriptionUpgradeRequest, payload=Depe
 
     from services.subscription_service import upgrade_subscription
 
-    return sanitize_floats(upgrade_subscription(user_id, data.tier))
+    return json_response(upgrade_subscription(user_id, data.tier))
 
 
 @app.get("/api/v1/dashboard/performance")
@@ -4551,7 +4667,7 @@ def get_dashboard_performance_endpoint(payload=Depends(require_auth)):
 
     db = SessionLocal()
     try:
-        return sanitize_floats(get_performance_dashboard(user_id=user_id, db=db))
+        return json_response(get_performance_dashboard(user_id=user_id, db=db))
     finally:
         db.close()
 
@@ -4585,7 +4701,7 @@ def get_dashboard_leaderboard_endpoint(payload=Depends(require_auth)):
                     FROM leaderboard_snapshots
                     WHERE period = 'alltime'
                   )
-                ORDER BY paper_pnl_pct DESC
+                ORDER BY position ASC
                 LIMIT 10
                 """
             )
@@ -4605,7 +4721,7 @@ def get_dashboard_leaderboard_endpoint(payload=Depends(require_auth)):
             for idx, row in enumerate(rows)
         ]
 
-        return sanitize_floats({"leaderboard": rankings, "count": len(rankings)})
+        return json_response({"leaderboard": rankings, "count": len(rankings)})
     finally:
         db.close()
 
@@ -4614,16 +4730,20 @@ def get_dashboard_leaderboard_endpoint(payload=Depends(require_auth)):
 def get_leaderboard_endpoint(
     period: str = Query("weekly", pattern="^(weekly|monthly|alltime)$"),
     limit: int = Query(50, ge=1, le=200),
+    after: Optional[int] = Query(None, ge=0),
     payload=Depends(require_auth),
 ):
-    """Leaderboard rankings for paper trading performance (anonymized display names only)."""
+    """Leaderboard rankings for paper trading performance (anonymized display names only).
+
+    Pass the previous page's ``next_cursor`` as ``after`` to fetch the next page.
+    """
     user_id = _extract_user_id(payload)
     if user_id is None:
         raise HTTPException(status_code=401, detail="Invalid user token")
 
     from services.social_service import social_service
 
-    return sanitize_floats(social_service.get_leaderboard(user_id=user_id, period=period, limit=limit))
+    return json_response(social_service.get_leaderboard(user_id=user_id, period=period, limit=limit, after=after))
 
 
 @app.get("/api/referral/stats")
@@ -4635,7 +4755,7 @@ def get_referral_stats_endpoint(payload=Depends(require_auth)):
 
     from services.social_service import social_service
 
-    return sanitize_floats(social_service.get_referral_stats(user_id=user_id))
+    return json_response(social_service.get_referral_stats(user_id=user_id))
 
 
 @app.post("/api/referral/apply")
@@ -4651,7 +4771,7 @@ def apply_referral_endpoint(data: ReferralApplyRequest, payload=Depends(require_
     status = 200 if result.get("success") else 400
     if status != 200:
         raise HTTPException(status_code=status, detail=result.get("message", "Failed to apply referral code."))
-    return sanitize_floats(result)
+    return json_response(result)
 
 
 # ── Live Trading Endpoints ───────────────────────────────────────────
@@ -4786,7 +4906,7 @@ def get_live_trading_history(limit: int = 50, payload=Depends(require_auth)):
                 "timestamp": r[6].isoformat() if r[6] else None,
                 "source": r[8],
             })
-        return sanitize_floats({"trades": trades, "total": len(trades)})
+        return json_response({"trades": trades, "total": len(trades)})
     except Exception as e:
         print(f"[!] Live history query failed: {e}")
         return {"trades": [], "total": 0, "error": str(e)}
@@ -4847,7 +4967,7 @@ def close_live_position(data: ClosePositionRequest, _user=Depends(require_auth))
     except Exception:
         earned = []
 
-    return sanitize_floats({
+    return json_response({
         "success": True,
         "symbol": sym,
         "quantity": qty,
@@ -5027,7 +5147,7 @@ def get_futures_balance(_user=Depends(require_auth)):
     account = broker.futures_account()
     if "error" in account:
         raise HTTPException(status_code=400, detail=account["error"])
-    return sanitize_floats({
+    return json_response({
         "totalWalletBalance": account.get("totalWalletBalance"),
         "totalUnrealizedProfit": account.get("totalUnrealizedProfit"),
         "totalMarginBalance": account.get("totalMarginBalance"),
@@ -5042,7 +5162,7 @@ def get_futures_positions(_user=Depends(require_auth)):
     user_id = _extract_user_id(_user)
     broker = _get_live_broker(user_id=user_id)
     positions = broker.futures_positions()
-    return sanitize_floats({"positions": positions, "count": len(positions)})
+    return json_response({"positions": positions, "count": len(positions)})
 
 
 @app.post("/api/futures/order")
@@ -5103,7 +5223,7 @@ def place_futures_order(order: FuturesOrderRequest, _user=Depends(require_auth))
         parsed = _parse_binance_error(result)
         raise HTTPException(status_code=400, detail=parsed)
 
-    return sanitize_floats({
+    return json_response({
         "order_id": str(result.get("orderId", "")),
         "symbol": result.get("symbol"),
         "side": binance_side,
@@ -5158,7 +5278,7 @@ def get_bybit_balance(_user=Depends(require_auth)):
     result = broker.get_balance()
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
-    return sanitize_floats(result)
+    return json_response(result)
 
 
 @app.get("/api/bybit/positions")
@@ -5167,7 +5287,7 @@ def get_bybit_positions(_user=Depends(require_auth)):
     user_id = _extract_user_id(_user)
     broker = _get_bybit_broker(user_id=user_id)
     positions = broker.get_positions()
-    return sanitize_floats({"positions": positions, "count": len(positions)})
+    return json_response({"positions": positions, "count": len(positions)})
 
 
 @app.post("/api/bybit/order")
@@ -5216,7 +5336,7 @@ def place_bybit_order(order: BybitOrderRequest, _user=Depends(require_auth)):
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
 
-    return sanitize_floats({
+    return json_response({
         "order_id": result.get("order_id"),
         "symbol": order.symbol.upper(),
         "side": side,
@@ -5435,7 +5555,7 @@ def get_dca_orders(payload=Depends(require_auth)):
 
     from services.dca_engine import get_user_dca_orders
 
-    return sanitize_floats(get_user_dca_orders(user_id))
+    return json_response(get_user_dca_orders(user_id))
 
 
 @app.post("/api/dca/enable")
@@ -5635,7 +5755,7 @@ def get_trading_circuit_breaker_status(payload=Depends(require_auth)):
         db.close()
 
     state = circuit_breaker_service.get_state(user_id)
-    return sanitize_floats({
+    return json_response({
         "user_id": user_id,
         "tripped": bool(eval_result.get("tripped", False)),
         "reason": eval_result.get("reason"),
@@ -5665,7 +5785,7 @@ def reset_trading_circuit_breaker(
         db.close()
 
     state = circuit_breaker_service.get_state(int(user_id))
-    return sanitize_floats({
+    return json_response({
         "success": bool(result.get("success", True)),
         "target_user_id": int(user_id),
         "reset_by": int(requester_id),
@@ -5721,7 +5841,7 @@ def transfer_train_symbol(symbol: str, _user=Depends(require_auth)):
         db.close()
 
     asset_predictor._load_models()
-    return sanitize_floats(result)
+    return json_response(result)
 
 
 @app.post("/api/v1/models/transfer-train/all")
@@ -5775,7 +5895,7 @@ def transfer_train_all_low_accuracy(_user=Depends(require_auth)):
 
     succeeded = [r for r in results if "accuracy" in r]
     failed = [r for r in results if "error" in r]
-    return sanitize_floats(
+    return json_response(
         {
             "threshold": MIN_ACCURACY,
             "total_targets": len(target_symbols),
@@ -6187,7 +6307,7 @@ def get_backtest_compare(symbols: str = "", days: int = 365):
             continue
         out.append({k: v for k, v in res.items() if k != "equity_curve"})
 
-    return sanitize_floats({
+    return json_response({
         "compare": out,
         "count": len(out),
         "days": int(days),
@@ -6205,7 +6325,7 @@ def get_backtest_summary_for_symbol(symbol: str, days: int = 365):
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
     payload = {k: v for k, v in result.items() if k != "equity_curve"}
-    return sanitize_floats(payload)
+    return json_response(payload)
 
 
 @app.get("/api/v1/backtest/equity-curve/{symbol}")
@@ -6218,7 +6338,7 @@ def get_backtest_equity_curve(symbol: str, days: int = 365):
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
     curve = result.get("equity_curve") or {"dates": [], "equity": [], "drawdown": []}
-    return sanitize_floats({
+    return json_response({
         "symbol": sym,
         "days": int(days),
         "dates": curve.get("dates", []),
@@ -6662,7 +6782,7 @@ def get_rl_batch_predictions():
                 }
 
         db.close()
-        return sanitize_floats({
+        return json_response({
             "predictions": predictions,
             "trained_symbols": trained_symbols,
             "pending_symbols": [s for s in all_symbols if s not in trained_symbols],
@@ -6686,7 +6806,7 @@ def get_active_market_anomalies():
         symbols = sorted(list(ALLOWED_AUTO_TRADE_SYMBOLS))
         active = get_active_anomalies(redis_client, symbols)
 
-        return sanitize_floats({
+        return json_response({
             "active_count": len(active),
             "symbols_checked": len(symbols),
             "active": active,
@@ -6725,7 +6845,7 @@ def get_correlation_risk_check(
             total_portfolio_usd=float(total_portfolio_usd or 0.0),
         )
 
-        return sanitize_floats({
+        return json_response({
             "symbol": symbol.upper(),
             "proposed_size_usd": float(proposed_size_usd),
             "total_portfolio_usd": float(total_portfolio_usd),
@@ -6750,7 +6870,7 @@ def get_model_validation(symbol: str):
 
         redis_client = get_redis()
         result = get_validation_history(symbol.upper(), redis_client)
-        return sanitize_floats(result)
+        return json_response(result)
     except Exception as e:
         return {"symbol": symbol.upper(), "deploy": None, "error": str(e)}
 
@@ -6778,7 +6898,7 @@ def get_system_intelligence_overview():
                     "message": v.get("message"),
                 }
 
-        return sanitize_floats({
+        return json_response({
             "timestamp": datetime.utcnow().isoformat(),
             "auto_trading_enabled": bool(auto_trader.config.get("enabled", False)),
             "open_positions": len(auto_trader.open_positions),
@@ -6814,7 +6934,7 @@ def get_sentiment_for_symbol(symbol: str):
         return {"enabled": False, "message": "Sentiment data layer not active"}
 
     from services.sentiment_scheduler import get_cached_sentiment
-    return sanitize_floats(get_cached_sentiment(symbol.upper()))
+    return json_response(get_cached_sentiment(symbol.upper()))
 
 
 @app.get("/api/v1/sentiment")
@@ -6836,7 +6956,7 @@ def get_sentiment_shadow_report():
         return {"enabled": False, "message": "Sentiment shadow mode not active"}
 
     from services.sentiment_shadow import run_shadow_on_predictions
-    predictions = get_all_predictions(days=7)
+    predictions = _collect_all_predictions(None, days=7)
     if not isinstance(predictions, list):
         return {"shadow_results": [], "error": "Could not load predictions"}
 
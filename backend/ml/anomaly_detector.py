@@ -1,111 +1,328 @@
 """
 Detects abnormal market conditions that should pause auto-trading.
 Flash crashes, manipulation, extreme volatility spikes.
+
+``StreamingAnomalyDetector`` subscribes to the realtime tick stream
+(``services.websocket_feed``) and keeps, per symbol, an exponentially
+weighted mean/variance of tick log-returns plus a fixed-size ring of recent
+prices, so every tick is checked in O(1) without touching Redis. A tick is
+anomalous when it extends a run of same-direction outlier returns against
+the running volatility (z-score) or when price has moved more than
+``price_spike_pct`` within the jump window. Requiring a run keeps isolated
+fat-tail prints from pausing trading; a flash crash is a run by nature.
+Active anomalies live in memory; Redis only holds a single hash
+(``anomaly:active``) written with one pipelined round-trip when an anomaly
+fires and re-read at most every ``ACTIVE_SYNC_SECONDS`` by readers, so pauses
+raised by other workers (or before a restart) are seen within that interval.
 """
 
 import json
+import logging
+import math
+import threading
+import time
+from collections import deque
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
 
 ANOMALY_THRESHOLDS = {
     "price_spike_pct": 0.05,
     "volume_spike_multiplier": 5,
     "spread_spike_pct": 0.02,
     "vix_spike": 10,
+    # Consecutive same-sign tick returns this many EW standard deviations
+    # from the EW mean...
+    "return_zscore": 5.0,
+    "zscore_confirm_ticks": 2,
+    # ...that together move at least this much, so tick-size noise in a
+    # quiet market is not flagged.
+    "min_zscore_move_pct": 0.005,
 }
 
+ACTIVE_ANOMALIES_KEY = "anomaly:active"
+ANOMALY_TTL_SECONDS = 1800
+ACTIVE_SYNC_SECONDS = 5     # how often readers re-read the shared hash
+JUMP_WINDOW_SECONDS = 300
+EWMA_ALPHA = 0.01          # ~100-tick memory
+WARMUP_TICKS = 30          # z-scores are not trusted before this many returns
+RING_SIZE = 512
+# A symbol whose last stream tick is older than this is fed by callers instead.
+STREAM_STALE_SECONDS = 60
 
-def _store_price(redis_client, symbol: str, price: float):
-    """Store price snapshot in Redis rolling window."""
-    if redis_client is None or not symbol:
-        return
 
-    key = f"price_history:{symbol}"
-    redis_client.lpush(
-        key,
-        json.dumps({"price": float(price), "ts": datetime.utcnow().isoformat()}),
-    )
-    redis_client.ltrim(key, 0, 59)
-    redis_client.expire(key, 3600)
+class _SymbolState:
+    """Running return statistics and the recent price ring for one symbol."""
 
+    __slots__ = ("mean", "var", "count", "streak", "streak_move", "last_price", "last_ts_ms",
+                 "ring", "last_result")
 
-def detect_price_anomaly(symbol: str, current_price: float, redis_client, window_minutes: int = 5) -> dict:
-    """Detect sudden price spikes using Redis price history."""
-    symbol_u = (symbol or "").upper()
-    key = f"price_history:{symbol_u}"
+    def __init__(self):
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+        self.streak = 0             # signed run length of outlier returns
+        self.streak_move = 0.0      # summed log-return over that run
+        self.last_price = 0.0
+        self.last_ts_ms = 0
+        self.ring: deque = deque(maxlen=RING_SIZE)
+        self.last_result: Optional[dict] = None
 
-    try:
-        if redis_client is None or current_price <= 0:
-            return {"anomaly": False, "symbol": symbol_u}
 
-        raw = redis_client.lrange(key, 0, window_minutes)
-        if len(raw) < 2:
-            _store_price(redis_client, symbol_u, current_price)
-            return {"anomaly": False, "symbol": symbol_u}
+class StreamingAnomalyDetector:
+    """Per-symbol streaming z-score and jump detector fed at tick rate."""
+
+    def __init__(
+        self,
+        alpha: float = EWMA_ALPHA,
+        zscore: float = ANOMALY_THRESHOLDS["return_zscore"],
+        confirm_ticks: int = ANOMALY_THRESHOLDS["zscore_confirm_ticks"],
+        min_move_pct: float = ANOMALY_THRESHOLDS["min_zscore_move_pct"],
+        jump_pct: float = ANOMALY_THRESHOLDS["price_spike_pct"],
+        jump_window_seconds: float = JUMP_WINDOW_SECONDS,
+        warmup_ticks: int = WARMUP_TICKS,
+        ttl_seconds: float = ANOMALY_TTL_SECONDS,
+    ):
+        self.alpha = float(alpha)
+        self.zscore = float(zscore)
+        self.confirm_ticks = max(1, int(confirm_ticks))
+        self.min_move = math.log1p(float(min_move_pct))
+        self.jump_pct = float(jump_pct)
+        self.jump_window_ms = int(jump_window_seconds * 1000)
+        self.warmup_ticks = int(warmup_ticks)
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self._lock = threading.Lock()
+        self._states: Dict[str, _SymbolState] = {}
+        # symbol -> anomaly result (carries ``expires_at_ms``)
+        self._active: Dict[str, dict] = {}
+        self._redis = None
+        self._synced_at = float("-inf")
+        self._streaming = False
+        self.stats = {"ticks": 0, "anomalies": 0, "redis_writes": 0}
+
+    # ── Wiring ────────────────────────────────────────────────────────────
+
+    def start(self, redis_client=None) -> None:
+        """Load persisted anomalies and subscribe to the realtime tick stream."""
+        from services.websocket_feed import add_tick_listener
+
+        self.hydrate(redis_client)
+        self._streaming = True
+        add_tick_listener(self.on_tick)
+        logger.info("[ANOMALY] subscribed to realtime tick stream")
 
-        prices = []
-        for r in raw:
-            if isinstance(r, bytes):
-                r = r.decode("utf-8")
-            prices.append(float(json.loads(r).get("price", 0.0)))
+    def stop(self) -> None:
+        from services.websocket_feed import remove_tick_listener
 
-        oldest_price = float(prices[-1]) if prices else 0.0
-        if oldest_price <= 0:
-            _store_price(redis_client, symbol_u, current_price)
+        remove_tick_listener(self.on_tick)
+        self._streaming = False
+
+    def hydrate(self, redis_client) -> None:
+        """Merge unexpired anomalies from the Redis hash (one ``HGETALL`` per ``ACTIVE_SYNC_SECONDS``)."""
+        if redis_client is None:
+            return
+        self._redis = redis_client
+        now = time.time()
+        if now - self._synced_at < ACTIVE_SYNC_SECONDS:
+            return
+        self._synced_at = now
+        try:
+            raw = redis_client.hgetall(ACTIVE_ANOMALIES_KEY) or {}
+        except Exception as e:
+            logger.debug("[ANOMALY] could not load active anomalies: %s", e)
+            return
+        now_ms = int(now * 1000)
+        with self._lock:
+            for field, value in raw.items():
+                try:
+                    symbol = field.decode("utf-8") if isinstance(field, bytes) else str(field)
+                    record = json.loads(value.decode("utf-8") if isinstance(value, bytes) else value)
+                except Exception:
+                    continue
+                expires = int(record.get("expires_at_ms") or 0)
+                current = self._active.get(symbol)
+                if expires > now_ms and (current is None or expires > int(current["expires_at_ms"])):
+                    self._active[symbol] = record
+
+    # ── Tick path ─────────────────────────────────────────────────────────
+
+    def on_tick(self, symbol: str, price: float, ts_ms: Optional[int] = None) -> dict:
+        """Update ``symbol`` with a trade price and return the check result."""
+        symbol_u = str(symbol or "").upper()
+        px = float(price or 0.0)
+        if not symbol_u or px <= 0 or not math.isfinite(px):
             return {"anomaly": False, "symbol": symbol_u}
+        ts = int(ts_ms) if ts_ms is not None else int(time.time() * 1000)
+
+        with self._lock:
+            self.stats["ticks"] += 1
+            state = self._states.get(symbol_u)
+            if state is None:
+                state = self._states[symbol_u] = _SymbolState()
+            result = self._update(symbol_u, state, px, ts)
+            fresh = result["anomaly"] and self._activate(symbol_u, result, ts)
+        if fresh:
+            logger.warning(
+                "[ANOMALY] %s: %s %.1f%% move (z=%s) - PAUSING TRADING",
+                symbol_u, result["kind"], result["price_change_pct"] * 100, result["zscore"],
+            )
+            self._persist(symbol_u, result, ts)
+        return result
 
-        price_change_pct = abs(float(current_price) - oldest_price) / oldest_price
-        is_anomaly = price_change_pct > ANOMALY_THRESHOLDS["price_spike_pct"]
+    def _update(self, symbol: str, state: _SymbolState, px: float, ts: int) -> dict:
+        ring = state.ring
+        while ring and ts - ring[0][0] > self.jump_window_ms:
+            ring.popleft()
+        reference = ring[0][1] if ring else px
+        change = (px - reference) / reference
+        kind = None
+        z = 0.0
 
-        _store_price(redis_client, symbol_u, current_price)
+        if state.last_price > 0:
+            r = math.log(px / state.last_price)
+            if state.count >= self.warmup_ticks and state.var > 0:
+                z = (r - state.mean) / math.sqrt(state.var)
+            if abs(z) > self.zscore:
+                step = 1 if z > 0 else -1
+                if state.streak * step > 0:
+                    state.streak += step
+                    state.streak_move += r
+                else:
+                    state.streak, state.streak_move = step, r
+                if abs(state.streak) >= self.confirm_ticks and abs(state.streak_move) >= self.min_move:
+                    kind = "zscore"
+            else:
+                state.streak, state.streak_move = 0, 0.0
+            # Checked before the update so the outlier cannot mask itself.
+            diff = r - state.mean
+            incr = self.alpha * diff
+            state.mean += incr
+            state.var = (1.0 - self.alpha) * (state.var + diff * incr)
+            state.count += 1
+
+        if kind is None and abs(change) > self.jump_pct:
+            kind = "jump"
+
+        state.last_price = px
+        state.last_ts_ms = ts
+        ring.append((ts, px))
 
         result = {
-            "anomaly": bool(is_anomaly),
-            "symbol": symbol_u,
-            "price_change_pct": round(float(price_change_pct), 4),
-            "current_price": float(current_price),
-            "reference_price": float(oldest_price),
-            "threshold": float(ANOMALY_THRESHOLDS["price_spike_pct"]),
-            "detected_at": datetime.utcnow().isoformat(),
+            "anomaly": kind is not None,
+            "symbol": symbol,
+            "price_change_pct": round(abs(change), 4),
+            "current_price": px,
+            "reference_price": reference,
+            "zscore": round(z, 2),
+            "threshold": self.jump_pct,
         }
+        if kind is not None:
+            result["kind"] = kind
+            result["detected_at"] = datetime.utcfromtimestamp(ts / 1000).isoformat()
+        state.last_result = result
+        return result
 
-        if is_anomaly:
-            redis_client.setex(f"anomaly:active:{symbol_u}", 1800, json.dumps(result))
-            print(f"[ANOMALY] {symbol_u}: {price_change_pct:.1%} spike detected - PAUSING TRADING")
+    def _activate(self, symbol: str, result: dict, ts: int) -> bool:
+        """Record ``result`` as active; False if ``symbol`` was already paused."""
+        current = self._active.get(symbol)
+        if current is not None and int(current["expires_at_ms"]) > ts:
+            return False
+        result["expires_at_ms"] = ts + self.ttl_ms
+        self._active[symbol] = result
+        self.stats["anomalies"] += 1
+        return True
 
-        return result
+    def _persist(self, symbol: str, result: dict, ts: int) -> None:
+        client = self._redis
+        if client is None:
+            return
+        with self._lock:
+            expired = [s for s, r in self._active.items() if int(r["expires_at_ms"]) <= ts]
+            for s in expired:
+                self._active.pop(s, None)
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(ACTIVE_ANOMALIES_KEY, symbol, json.dumps(result))
+            if expired:
+                pipe.hdel(ACTIVE_ANOMALIES_KEY, *expired)
+            pipe.expire(ACTIVE_ANOMALIES_KEY, int(self.ttl_ms / 1000))
+            pipe.execute()
+            self.stats["redis_writes"] += 1
+        except Exception as e:
+            logger.debug("[ANOMALY] Redis write failed for %s: %s", symbol, e)
+
+    # ── Reads (memory, refreshed by ``hydrate``) ──────────────────────────
+
+    def is_streaming(self, symbol: str, now_ms: Optional[int] = None) -> bool:
+        """True while the tick stream is feeding ``symbol``."""
+        if not self._streaming:
+            return False
+        state = self._states.get(str(symbol or "").upper())
+        now = int(time.time() * 1000) if now_ms is None else int(now_ms)
+        return state is not None and now - state.last_ts_ms <= STREAM_STALE_SECONDS * 1000
+
+    def latest(self, symbol: str) -> Optional[dict]:
+        state = self._states.get(str(symbol or "").upper())
+        return state.last_result if state is not None else None
+
+    def is_paused(self, symbol: str, now_ms: Optional[int] = None) -> bool:
+        record = self._active.get(str(symbol or "").upper())
+        now = int(time.time() * 1000) if now_ms is None else int(now_ms)
+        return record is not None and int(record["expires_at_ms"]) > now
+
+    def active(self, symbols: Optional[List[str]] = None, now_ms: Optional[int] = None) -> List[dict]:
+        now = int(time.time() * 1000) if now_ms is None else int(now_ms)
+        with self._lock:
+            records = dict(self._active)
+        wanted = records.keys() if symbols is None else [str(s or "").upper() for s in symbols]
+        return [records[s] for s in wanted if s in records and int(records[s]["expires_at_ms"]) > now]
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {
+                "streaming": self._streaming,
+                "tracked_symbols": len(self._states),
+                "active_anomalies": len(self._active),
+                **self.stats,
+            }
+
+
+anomaly_detector = StreamingAnomalyDetector()
+
+
+def detect_price_anomaly(symbol: str, current_price: float, redis_client, window_minutes: int = 5) -> dict:
+    """Check ``symbol`` for a price anomaly.
+
+    Symbols fed by the tick stream return the stream's latest result; others
+    (feed down, non-streamed assets) are fed ``current_price`` here.
+    ``window_minutes`` is kept for callers; the jump window is
+    ``JUMP_WINDOW_SECONDS``.
+    """
+    symbol_u = (symbol or "").upper()
+    try:
+        anomaly_detector.hydrate(redis_client)
+        if anomaly_detector.is_streaming(symbol_u):
+            return dict(anomaly_detector.latest(symbol_u) or {"anomaly": False, "symbol": symbol_u})
+        return anomaly_detector.on_tick(symbol_u, current_price)
     except Exception as e:
         print(f"[ANOMALY] Error for {symbol_u}: {e}")
         return {"anomaly": False, "symbol": symbol_u, "error": str(e)}
 
 
-def is_trading_paused(symbol: str, redis_client) -> bool:
+def is_trading_paused(symbol: str, redis_client=None) -> bool:
     """Check if trading is paused due to active anomaly."""
-    symbol_u = (symbol or "").upper()
     try:
-        if redis_client is None or not symbol_u:
-            return False
-        return int(redis_client.exists(f"anomaly:active:{symbol_u}")) > 0
+        anomaly_detector.hydrate(redis_client)
+        return anomaly_detector.is_paused(symbol)
     except Exception:
         return False
 
 
 def get_active_anomalies(redis_client, symbols: List[str]) -> list:
     """Get all currently active anomalies."""
-    active = []
-    if redis_client is None:
-        return active
-
-    for symbol in symbols:
-        symbol_u = (symbol or "").upper()
-        try:
-            raw = redis_client.get(f"anomaly:active:{symbol_u}")
-            if not raw:
-                continue
-            if isinstance(raw, bytes):
-                raw = raw.decode("utf-8")
-            active.append(json.loads(raw))
-        except Exception:
-            continue
-
-    return active
+    try:
+        anomaly_detector.hydrate(redis_client)
+        return anomaly_detector.active(symbols)
+    except Exception:
+        return []
@@ -659,6 +659,11 @@ def train_symbol(symbol: str, days: int = 730) -> Optional[Dict]:
     latest_path = os.path.join(MODELS_DIR, f"{symbol}_xgboost_latest.pkl")
     with open(latest_path, "wb") as f:
         pickle.dump(model_data, f)
+    try:
+        from ml.model_registry import model_registry
+        model_registry.invalidate(symbol)
+    except Exception:
+        pass
 
     logger.info(f"[trainer] Saved {model_filename}")
 
@@ -911,16 +916,27 @@ def _weekly_report_generation():
         logger.error(f"[scheduler] Weekly report generation failed: {e}")
 
 
-def _daily_leaderboard_snapshot():
-    """Daily social leaderboard snapshot job (00:00 UTC)."""
-    logger.info("[scheduler] Starting daily leaderboard snapshot...")
+def _leaderboard_refresh():
+    """Social leaderboard snapshot refresh (every 15 minutes)."""
+    logger.info("[scheduler] Starting leaderboard snapshot refresh...")
     try:
         from services.social_service import social_service
 
         result = social_service.update_leaderboard()
-        logger.info("[scheduler] Daily leaderboard snapshot done: %s", result)
+        logger.info("[scheduler] Leaderboard snapshot refresh done: %s", result)
+    except Exception as e:
+        logger.error(f"[scheduler] Leaderboard snapshot refresh failed: {e}")
+
+
+def _portfolio_points_prune():
+    """Prune raw portfolio equity points past retention (daily); rollups keep history."""
+    try:
+        from services.portfolio_persistence import prune_equity_points
+
+        deleted = prune_equity_points()
+        logger.info("[scheduler] Pruned %d portfolio equity points", deleted)
     except Exception as e:
-        logger.error(f"[scheduler] Daily leaderboard snapshot failed: {e}")
+        logger.error(f"[scheduler] Portfolio equity point prune failed: {e}")
 
 
 def _fear_greed_update_job():
@@ -1051,12 +1067,21 @@ def setup_weekly_retraining():
             replace_existing=True,
         )
 
-        # Daily leaderboard snapshots — 00:00 UTC
+        # Leaderboard snapshots (one set-based rebuild) — every 15 minutes
+        scheduler.add_job(
+            _leaderboard_refresh,
+            trigger=CronTrigger(minute="*/15"),
+            id="leaderboard_refresh",
+            name="Leaderboard snapshots (every 15min)",
+            replace_existing=True,
+        )
+
+        # Raw equity point retention — 03:20 UTC
         scheduler.add_job(
-            _daily_leaderboard_snapshot,
-            trigger=CronTrigger(hour=0, minute=0),
-            id="daily_leaderboard_snapshot",
-            name="Daily leaderboard snapshots",
+            _portfolio_points_prune,
+            trigger=CronTrigger(hour=3, minute=20),
+            id="portfolio_points_prune",
+            name="Portfolio equity point prune",
             replace_existing=True,
         )
 
@@ -1112,7 +1137,7 @@ def setup_weekly_retraining():
         )
 
         scheduler.start()
-        logger.info("[trainer] Scheduled jobs: fear_greed (daily 00:30), news_fetch (daily 06:00), daily retrain (02:00 UTC), weekly LSTM (Sun 01:00), monthly RL retrain (day 1 @ 02:00), daily leaderboard (00:00), daily XGBoost (06:00), morning briefing push (06:00), weekly report generation (Sun 23:00), weekly report push (Mon 06:30), daily predictions (06:05), prediction outcomes eval (06:10), sentiment (*/30min), paper snapshots (*/15min)")
+        logger.info("[trainer] Scheduled jobs: fear_greed (daily 00:30), news_fetch (daily 06:00), daily retrain (02:00 UTC), weekly LSTM (Sun 01:00), monthly RL retrain (day 1 @ 02:00), leaderboard (*/15min), daily XGBoost (06:00), morning briefing push (06:00), weekly report generation (Sun 23:00), weekly report push (Mon 06:30), daily predictions (06:05), prediction outcomes eval (06:10), sentiment (*/30min), paper snapshots (*/15min)")
         return scheduler
     except ImportError:
         logger.warning("[trainer] APScheduler not installed, scheduled jobs disabled")
@@ -8,6 +8,9 @@ import os
 import sys
 import pickle
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
@@ -17,6 +20,8 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 
+from ml.training_executor import TrainingExecutor, in_worker, worker_threads
+
 logger = logging.getLogger(__name__)
 
 MODELS_DIR = os.environ.get("AURA_MODELS_DIR", os.path.join(os.path.dirname(__file__), "..", "models"))
@@ -34,6 +39,12 @@ MIN_TRAINING_SAMPLES = 200
 
 MAX_RETRAIN_ATTEMPTS = 3
 
+# Per-symbol feature matrices, reused across retries and repeat runs until
+# the underlying TrainingFeature rows change.
+FEATURE_CACHE_SIZE = int(os.environ.get("TRAINING_FEATURE_CACHE_SIZE", "32"))
+_feature_cache: "OrderedDict[str, Tuple[tuple, List[str], np.ndarray, np.ndarray]]" = OrderedDict()
+_feature_cache_lock = threading.Lock()
+
 
 class _EnsembleModel:
     """Thin wrapper exposing ``.predict`` over the XGB+RF ensemble.
@@ -104,7 +115,8 @@ def evaluate_model_against_benchmarks(model, X_val, y_val) -> Dict:
     }
 
 
-def _fit_ensemble(X_train, y_train, X_test, y_test, attempt: int = 0) -> _EnsembleModel:
+def _fit_ensemble(X_train, y_train, X_test, y_test, attempt: int = 0,
+                  n_jobs: Optional[int] = None) -> _EnsembleModel:
     """Fit an XGB+RF ensemble, scaling capacity with ``attempt`` for retries.
 
     Attempt 0 uses the baseline hyperparameters that existed before the
@@ -112,9 +124,15 @@ def _fit_ensemble(X_train, y_train, X_test, y_test, attempt: int = 0) -> _Ensemb
     level of depth, and shifts ``random_state`` so the retry explores a
     different neighbourhood of the hypothesis space rather than fitting the
     exact same model again.
+
+    ``n_jobs`` defaults to the executor's per-worker thread share (all cores
+    when called outside a :class:`TrainingExecutor`).
     """
     import xgboost as xgb
 
+    if n_jobs is None:
+        n_jobs = worker_threads()
+
     xgb_estimators = 500 + attempt * 50
     rf_estimators = 200 + attempt * 50
     xgb_depth = 6 + attempt
@@ -124,13 +142,13 @@ def _fit_ensemble(X_train, y_train, X_test, y_test, attempt: int = 0) -> _Ensemb
     xgb_model = xgb.XGBClassifier(
         n_estimators=xgb_estimators, max_depth=xgb_depth, learning_rate=0.01,
         subsample=0.8, colsample_bytree=0.8,
-        eval_metric="logloss", verbosity=0, n_jobs=-1,
+        eval_metric="logloss", verbosity=0, n_jobs=n_jobs,
         early_stopping_rounds=50, random_state=seed,
     )
     xgb_model.fit(X_train, y_train, eval_set=[(X_test, y_test)], verbose=False)
 
     rf_model = RandomForestClassifier(
-        n_estimators=rf_estimators, max_depth=rf_depth, random_state=seed, n_jobs=-1
+        n_estimators=rf_estimators, max_depth=rf_depth, random_state=seed, n_jobs=n_jobs
     )
     rf_model.fit(X_train, y_train)
 
@@ -162,62 +180,121 @@ def load_features(db_session, symbol: str) -> Optional[pd.DataFrame]:
     return df
 
 
+def _feature_fingerprint(db_session, symbol: str) -> tuple:
+    from sqlalchemy import func
+    from database.models import TrainingFeature
+
+    row = db_session.query(
+        func.count(TrainingFeature.id),
+        func.max(TrainingFeature.id),
+        func.max(TrainingFeature.date),
+        func.max(TrainingFeature.created_at),
+    ).filter(TrainingFeature.symbol == symbol).one()
+    return tuple(str(v) for v in row)
+
+
+def load_feature_matrix(db_session, symbol: str) -> Optional[Tuple[List[str], np.ndarray, np.ndarray]]:
+    """Return ``(feature_cols, X, y)`` for ``symbol``, cached until its rows change.
+
+    The cache key is the row count plus the newest id, date and
+    ``created_at``, so re-engineered or appended features invalidate the
+    entry without an explicit hook.
+    """
+    fingerprint = _feature_fingerprint(db_session, symbol)
+    with _feature_cache_lock:
+        cached = _feature_cache.get(symbol)
+        if cached is not None and cached[0] == fingerprint:
+            _feature_cache.move_to_end(symbol)
+            return cached[1], cached[2], cached[3]
+
+    df = load_features(db_session, symbol)
+    if df is None:
+        return None
+    feature_cols = [c for c in df.columns if not c.startswith("_")]
+    if not feature_cols:
+        return None
+
+    X = df[feature_cols].fillna(0).values
+    y = (df["_target_direction"] == "up").astype(int).values
+    X.setflags(write=False)
+    y.setflags(write=False)
+
+    with _feature_cache_lock:
+        _feature_cache[symbol] = (fingerprint, feature_cols, X, y)
+        _feature_cache.move_to_end(symbol)
+        while len(_feature_cache) > FEATURE_CACHE_SIZE:
+            _feature_cache.popitem(last=False)
+    return feature_cols, X, y
+
+
+def _walk_forward_fold(X_train: np.ndarray, y_train: np.ndarray,
+                       X_test: np.ndarray, y_test: np.ndarray, window_start: int,
+                       n_jobs: Optional[int] = None) -> Dict:
+    """Fit and score one walk-forward window. Module-level so it can run in a worker process."""
+    started = time.perf_counter()
+    scaler = StandardScaler()
+    X_train_s = scaler.fit_transform(X_train)
+    X_test_s = scaler.transform(X_test)
+
+    # Ensemble: 60% XGB + 40% RF, baseline hyperparameters.
+    model = _fit_ensemble(X_train_s, y_train, X_test_s, y_test, attempt=0, n_jobs=n_jobs)
+    acc = accuracy_score(y_test, model.predict(X_test_s))
+    return {
+        "window_start": window_start,
+        "accuracy": float(acc),
+        "test_size": len(y_test),
+        "fit_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
 def walk_forward_validate(X: np.ndarray, y: np.ndarray,
                           train_size: int = 500, test_size: int = 30,
-                          step: int = 30) -> List[Dict]:
-    """Walk-forward validation: train on past, test on next window, slide forward."""
-    results = []
+                          step: int = 30,
+                          executor: Optional[TrainingExecutor] = None,
+                          n_jobs: Optional[int] = None) -> List[Dict]:
+    """Walk-forward validation: train on past, test on next window, slide forward.
+
+    Folds are independent, so they run on a :class:`TrainingExecutor` sized
+    to the fold count. Inside a worker that is already training a symbol the
+    folds run serially on that worker's thread share (``n_jobs``) instead of
+    nesting pools. Each result carries the fold's ``fit_seconds``.
+    """
     n = len(X)
+    windows = list(range(train_size, n - test_size + 1, step)) if train_size > 0 else []
+    if not windows:
+        return []
 
-    i = train_size
-    while i + test_size <= n:
-        X_train, y_train = X[:i], y[:i]
-        X_test, y_test = X[i:i+test_size], y[i:i+test_size]
-
-        try:
-            import xgboost as xgb
-
-            scaler = StandardScaler()
-            X_train_s = scaler.fit_transform(X_train)
-            X_test_s = scaler.transform(X_test)
-
-            # XGBoost
-            xgb_model = xgb.XGBClassifier(
-                n_estimators=500, max_depth=6, learning_rate=0.01,
-                subsample=0.8, colsample_bytree=0.8,
-                eval_metric="logloss", verbosity=0, n_jobs=-1,
-                early_stopping_rounds=50, random_state=42,
-            )
-            xgb_model.fit(X_train_s, y_train,
-                         eval_set=[(X_test_s, y_test)], verbose=False)
-            xgb_proba = xgb_model.predict_proba(X_test_s)[:, 1]
-
-            # RandomForest
-            rf_model = RandomForestClassifier(
-                n_estimators=200, max_depth=8, random_state=42, n_jobs=-1
-            )
-            rf_model.fit(X_train_s, y_train)
-            rf_proba = rf_model.predict_proba(X_test_s)[:, 1]
-
-            # Ensemble: 60% XGB + 40% RF
-            ensemble_proba = 0.6 * xgb_proba + 0.4 * rf_proba
-            ensemble_pred = (ensemble_proba >= 0.5).astype(int)
-
-            acc = accuracy_score(y_test, ensemble_pred)
-            results.append({
-                "window_start": i,
-                "accuracy": float(acc),
-                "test_size": test_size,
-            })
-        except Exception as e:
-            logger.debug(f"Walk-forward window {i} failed: {e}")
-
-        i += step
+    tasks = [(X[:i], y[:i], X[i:i + test_size], y[i:i + test_size], i) for i in windows]
+    if executor is None:
+        if n_jobs is not None:
+            executor = TrainingExecutor(1, budget=n_jobs)
+        else:
+            executor = TrainingExecutor(1 if in_worker() else len(tasks))
 
+    results = []
+    for idx, result, _ in executor.run(_walk_forward_fold, tasks, threads_arg="n_jobs"):
+        if isinstance(result, Exception):
+            logger.debug(f"Walk-forward window {windows[idx]} failed: {result}")
+            continue
+        results.append(result)
+    results.sort(key=lambda r: r["window_start"])
     return results
 
 
-def train_symbol_enhanced(db_session, symbol: str, job_id: str = "manual") -> Optional[Dict]:
+def summarize_fold_timings(wf_results: List[Dict]) -> Dict:
+    times = [r["fit_seconds"] for r in wf_results if "fit_seconds" in r]
+    if not times:
+        return {"folds": 0, "total_seconds": 0.0, "mean_seconds": 0.0, "max_seconds": 0.0}
+    return {
+        "folds": len(times),
+        "total_seconds": round(float(sum(times)), 3),
+        "mean_seconds": round(float(np.mean(times)), 3),
+        "max_seconds": round(float(max(times)), 3),
+    }
+
+
+def train_symbol_enhanced(db_session, symbol: str, job_id: str = "manual",
+                          n_jobs: Optional[int] = None) -> Optional[Dict]:
     """Train enhanced ensemble model for a single symbol.
 
     After each training attempt the model is scored against the module-level
@@ -236,17 +313,11 @@ def train_symbol_enhanced(db_session, symbol: str, job_id: str = "manual") -> Op
 
     from database.models import ModelRegistry
 
-    df = load_features(db_session, symbol)
-    if df is None:
-        return None
-
-    # Prepare features
-    feature_cols = [c for c in df.columns if not c.startswith("_")]
-    if not feature_cols:
+    started = time.perf_counter()
+    matrix = load_feature_matrix(db_session, symbol)
+    if matrix is None:
         return None
-
-    X = df[feature_cols].fillna(0).values
-    y = (df["_target_direction"] == "up").astype(int).values
+    feature_cols, X, y = matrix
 
     if len(X) < MIN_TRAINING_SAMPLES:
         logger.warning(
@@ -259,13 +330,17 @@ def train_symbol_enhanced(db_session, symbol: str, job_id: str = "manual") -> Op
         }
 
     # Walk-forward validation (diagnostic only — does not gate promotion).
-    wf_results = walk_forward_validate(X, y, train_size=min(500, len(X) - 60), test_size=30)
+    wf_results = walk_forward_validate(X, y, train_size=min(500, len(X) - 60), test_size=30, n_jobs=n_jobs)
     avg_accuracy = float(np.mean([r["accuracy"] for r in wf_results])) if wf_results else 0.0
+    fold_timings = summarize_fold_timings(wf_results)
 
-    # Final model: train on all data with a fresh scaler per attempt.
+    # Final model: the split never changes between attempts, so scale once
+    # and let every retry reuse the same matrices.
     split = int(len(X) * 0.8)
-    X_train_raw, X_test_raw = X[:split], X[split:]
     y_train, y_test = y[:split], y[split:]
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[:split])
+    X_test = scaler.transform(X[split:])
 
     best_eval: Optional[Dict] = None
     best_model: Optional[_EnsembleModel] = None
@@ -274,11 +349,7 @@ def train_symbol_enhanced(db_session, symbol: str, job_id: str = "manual") -> Op
     passed = False
 
     for attempt in range(MAX_RETRAIN_ATTEMPTS):
-        scaler = StandardScaler()
-        X_train = scaler.fit_transform(X_train_raw)
-        X_test = scaler.transform(X_test_raw)
-
-        model = _fit_ensemble(X_train, y_train, X_test, y_test, attempt=attempt)
+        model = _fit_ensemble(X_train, y_train, X_test, y_test, attempt=attempt, n_jobs=n_jobs)
         eval_result = evaluate_model_against_benchmarks(model, X_test, y_test)
 
         logger.info(
@@ -340,6 +411,7 @@ def train_symbol_enhanced(db_session, symbol: str, job_id: str = "manual") -> Op
             "passed_benchmarks": passed,
             "failures": best_eval["failures"],
             "retrain_attempts": best_attempt_index + 1,
+            "walk_forward_timings": fold_timings,
         },
         "trained_at": datetime.utcnow().isoformat(),
     }
@@ -353,6 +425,11 @@ def train_symbol_enhanced(db_session, symbol: str, job_id: str = "manual") -> Op
         latest_path = os.path.join(MODELS_DIR, f"{symbol}_ensemble_latest.pkl")
         with open(latest_path, "wb") as f:
             pickle.dump(model_data, f)
+        try:
+            from ml.model_registry import model_registry
+            model_registry.invalidate(symbol)
+        except Exception:
+            pass
 
     # Update model registry: deactivate old rows, insert the new one with the
     # appropriate is_active flag.
@@ -387,11 +464,30 @@ def train_symbol_enhanced(db_session, symbol: str, job_id: str = "manual") -> Op
         "failures": best_eval["failures"],
         "features": len(feature_cols),
         "samples": len(X),
+        "walk_forward_timings": fold_timings,
+        "training_seconds": round(time.perf_counter() - started, 3),
     }
 
 
+def _train_symbol_job(symbol: str, job_id: str, n_jobs: Optional[int] = None) -> Optional[Dict]:
+    """Executor task: train one symbol on its own DB session with ``n_jobs`` threads."""
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+    from database.connection import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return train_symbol_enhanced(db, symbol, job_id, n_jobs=n_jobs)
+    finally:
+        db.close()
+
+
 def retrain_all(job_id: str = "manual"):
-    """Retrain all symbols with enhanced ensemble models."""
+    """Retrain all symbols with enhanced ensemble models.
+
+    Symbols train in parallel on a :class:`TrainingExecutor`; each worker
+    opens its own session and fits with its share of the CPU budget.
+    Progress rows are still written from this process as symbols finish.
+    """
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
     from database.connection import SessionLocal
     from database.models import TrainingFeature, TrainingLog
@@ -408,21 +504,26 @@ def retrain_all(job_id: str = "manual"):
         ))
         db.commit()
 
+        executor = TrainingExecutor(total)
+        logger.info(f"[Phase4] Training executor: {executor.describe()}")
+
         results = []
-        for i, symbol in enumerate(symbols):
-            try:
-                result = train_symbol_enhanced(db, symbol, job_id)
-                if result:
-                    results.append(result)
-            except Exception as e:
-                logger.error(f"[Phase4] {symbol} failed: {e}")
-                results.append({"symbol": symbol, "error": str(e)})
-
-            progress = (i + 1) / total * 100
-            if (i + 1) % 3 == 0:
+        done = 0
+        for idx, result, seconds in executor.run(_train_symbol_job, [(s, job_id) for s in symbols], threads_arg="n_jobs"):
+            symbol = symbols[idx]
+            if isinstance(result, Exception):
+                logger.error(f"[Phase4] {symbol} failed: {result}")
+                results.append({"symbol": symbol, "error": str(result)})
+            elif result:
+                results.append(result)
+            logger.info(f"[Phase4] {symbol} finished in {seconds:.1f}s")
+
+            done += 1
+            progress = done / total * 100
+            if done % 3 == 0:
                 db.add(TrainingLog(
                     job_id=job_id, phase="retrain",
-                    status="running", message=f"Trained {i+1}/{total}", progress=progress
+                    status="running", message=f"Trained {done}/{total}", progress=progress
                 ))
                 db.commit()
 
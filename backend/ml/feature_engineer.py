@@ -12,6 +12,7 @@ from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
+from sqlalchemy import JSON, Date, DateTime, bindparam, text
 
 logger = logging.getLogger(__name__)
 
@@ -112,20 +113,9 @@ def build_price_features(df: pd.DataFrame) -> Dict[str, float]:
     return features
 
 
-def build_sentiment_features(db_session, symbol: str, target_date, lookback_days: int = 5) -> Dict[str, float]:
-    """Build sentiment features from financial_news table."""
-    from database.models import FinancialNews
-
-    features = {
-        "sentiment_daily": 0.0,
-        "sentiment_3d": 0.0,
-        "sentiment_count": 0.0,
-        "sentiment_momentum": 0.0,
-        "sentiment_score": 0.0,
-        "sentiment_trend": 0.0,
-    }
-
-    # Live sentiment context from Redis (used during retrain/prediction refresh flows).
+def _live_sentiment_context(symbol: str) -> Dict[str, float]:
+    """Redis-backed score/momentum/trend for ``symbol``; zeros when unavailable."""
+    context = {"sentiment_score": 0.0, "sentiment_momentum": 0.0, "sentiment_trend": 0.0}
     try:
         from cache.connection import cache_get, get_redis
         from ml.sentiment_labeler import get_sentiment_momentum as _get_sentiment_momentum
@@ -134,16 +124,34 @@ def build_sentiment_features(db_session, symbol: str, target_date, lookback_days
         if isinstance(cached, dict):
             cached_score = float(cached.get("score", 50.0))
             # Cache score is 0..100; normalize to -1..1
-            features["sentiment_score"] = max(-1.0, min(1.0, (cached_score - 50.0) / 50.0))
+            context["sentiment_score"] = max(-1.0, min(1.0, (cached_score - 50.0) / 50.0))
 
         redis_client = get_redis()
         momentum_data = _get_sentiment_momentum(redis_client, symbol)
-        features["sentiment_momentum"] = float(momentum_data.get("momentum", 0.0))
+        context["sentiment_momentum"] = float(momentum_data.get("momentum", 0.0))
 
         trend_raw = str(momentum_data.get("trend", "neutral")).lower()
-        features["sentiment_trend"] = 1.0 if trend_raw == "bullish" else -1.0 if trend_raw == "bearish" else 0.0
+        context["sentiment_trend"] = 1.0 if trend_raw == "bullish" else -1.0 if trend_raw == "bearish" else 0.0
     except Exception as e:
         logger.debug(f"Redis sentiment features unavailable for {symbol}: {e}")
+    return context
+
+
+def build_sentiment_features(db_session, symbol: str, target_date, lookback_days: int = 5) -> Dict[str, float]:
+    """Build sentiment features from financial_news table."""
+    from database.models import FinancialNews
+
+    features = {
+        "sentiment_daily": 0.0,
+        "sentiment_3d": 0.0,
+        "sentiment_count": 0.0,
+        "sentiment_momentum": 0.0,
+        "sentiment_score": 0.0,
+        "sentiment_trend": 0.0,
+    }
+
+    # Live sentiment context from Redis (used during retrain/prediction refresh flows).
+    features.update(_live_sentiment_context(symbol))
 
     try:
         start_date = target_date - timedelta(days=lookback_days)
@@ -238,94 +246,244 @@ def build_cross_asset_features(db_session, target_date) -> Dict[str, float]:
     return features
 
 
+# ── Point-in-time batch builder ─────────────────────────────────
+# Every feature for date D depends only on rows dated <= D, so the whole
+# history can be computed in one pass per source instead of re-running the
+# per-date builders above on a growing window.
+
+WARMUP_BARS = 64  # first feature row needs the 60-day SMA plus a few bars
+NEWS_LOOKBACK_DAYS = 5
+UPSERT_BATCH_ROWS = 500
+
+# (symbol, feature name, default when no prior observation)
+MACRO_SERIES = (
+    ("^VIX", "vix_level", 20.0),
+    ("^TNX", "treasury_10y", 4.0),
+    ("^IRX", "treasury_3m", 5.0),
+    ("EURUSD=X", "eurusd", None),
+)
+
+_UPSERT_TRAINING_FEATURE_SQL = text("""
+    INSERT INTO training_features (symbol, date, features, target_return, target_direction, created_at)
+    VALUES (:symbol, :date, :features, :target_return, :target_direction, :created_at)
+    ON CONFLICT (symbol, date) DO UPDATE SET
+        features = EXCLUDED.features,
+        target_return = EXCLUDED.target_return,
+        target_direction = EXCLUDED.target_direction
+""").bindparams(
+    bindparam("date", type_=Date()),
+    bindparam("features", type_=JSON()),
+    bindparam("created_at", type_=DateTime()),
+)
+
+
+def build_price_feature_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """:func:`build_price_features` for every row of ``df`` at once.
+
+    Rolling windows and the adjust=False EWMs only look backwards, so row i
+    equals ``build_price_features(df.iloc[:i + 1])``. SMA ratios that the
+    per-date builder omits are NaN here.
+    """
+    close, high, low, volume = df["close"], df["high"], df["low"], df["volume"]
+    out = pd.DataFrame(index=df.index)
+
+    out["return_1d"] = close.pct_change(1)
+    out["return_5d"] = close.pct_change(5)
+    out["return_20d"] = close.pct_change(20)
+
+    for w in [5, 20, 60]:
+        sma = close.rolling(w).mean()
+        out[f"price_sma{w}_ratio"] = (close / sma).where(sma.notna() & (sma != 0))
+
+    out["rsi_14"] = compute_rsi(close, 14).fillna(50.0)
+    out["macd_histogram"] = compute_macd(close).fillna(0.0)
+    out["bb_position"] = compute_bollinger_position(close).fillna(0.5)
+
+    vol_sma = volume.rolling(20).mean()
+    out["volume_ratio"] = (volume / vol_sma).where(vol_sma.notna() & (vol_sma > 0), 1.0)
+    out["hl_range_pct"] = ((high - low) / close).where(close > 0, 0.0)
+    out["volatility_20d"] = close.pct_change().rolling(20).std()
+    return out
+
+
+def _load_symbol_news(db_session, symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """Scored news mentioning ``symbol`` in [start, end], oldest first."""
+    from database.models import FinancialNews
+
+    rows = db_session.query(FinancialNews.published_at, FinancialNews.sentiment_score).filter(
+        FinancialNews.published_at >= start,
+        FinancialNews.published_at <= end,
+        FinancialNews.sentiment_score.isnot(None),
+        FinancialNews.symbols.contains(symbol),
+    ).all()
+    news = pd.DataFrame(rows, columns=["published_at", "sentiment_score"])
+    news["published_at"] = pd.to_datetime(news["published_at"])
+    return news.sort_values("published_at", kind="stable").reset_index(drop=True)
+
+
+def build_sentiment_feature_frame(
+    news: pd.DataFrame,
+    targets: pd.DatetimeIndex,
+    live: Dict[str, float],
+    lookback_days: int = NEWS_LOOKBACK_DAYS,
+) -> pd.DataFrame:
+    """:func:`build_sentiment_features` for every target timestamp.
+
+    Window sums come from one cumulative sum over the sorted news; each
+    closed window [T - n days, T] is a pair of ``searchsorted`` bounds.
+    """
+    published = news["published_at"].to_numpy(dtype="datetime64[ns]")
+    scores = news["sentiment_score"].to_numpy(dtype=np.float64)
+    csum = np.concatenate(([0.0], np.cumsum(scores)))
+    t = targets.to_numpy(dtype="datetime64[ns]")
+
+    hi = np.searchsorted(published, t, side="right")
+
+    def window(lo):
+        n = hi - lo
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = (csum[hi] - csum[lo]) / n
+        return n, mean
+
+    n5, mean5 = window(np.searchsorted(published, t - np.timedelta64(lookback_days, "D"), side="left"))
+    n3, mean3 = window(np.searchsorted(published, t - np.timedelta64(3, "D"), side="left"))
+    # "Today" is published_at.date() == T.date() with published_at <= T (T is midnight).
+    n0, mean0 = window(np.searchsorted(published, t, side="left"))
+
+    has_news, has_today, has_recent = n5 > 0, n0 > 0, n3 > 0
+    daily = np.where(has_news & has_today, mean0, 0.0)
+
+    momentum = np.full(len(t), live["sentiment_momentum"])
+    if abs(live["sentiment_momentum"]) < 1e-9:
+        momentum = np.where(has_news & has_today, daily - mean5, momentum)
+
+    score = np.full(len(t), live["sentiment_score"])
+    if abs(live["sentiment_score"]) < 1e-9:
+        score = np.where(has_news & has_recent, np.clip(mean3, -1.0, 1.0), score)
+
+    trend = np.full(len(t), live["sentiment_trend"])
+    if abs(live["sentiment_trend"]) < 1e-9:
+        derived = np.where(momentum > 0.1, 1.0, np.where(momentum < -0.1, -1.0, 0.0))
+        trend = np.where(has_news, derived, trend)
+
+    return pd.DataFrame({
+        "sentiment_daily": daily,
+        "sentiment_3d": np.where(has_news & has_recent, mean3, 0.0),
+        "sentiment_count": np.where(has_news, n0, 0).astype(float),
+        "sentiment_momentum": momentum,
+        "sentiment_score": score,
+        "sentiment_trend": trend,
+    }, index=targets)
+
+
+def build_cross_asset_feature_frame(db_session, dates: pd.DatetimeIndex) -> pd.DataFrame:
+    """:func:`build_cross_asset_features` for every date via as-of joins."""
+    from database.models import HistoricalPrice
+
+    rows = db_session.query(HistoricalPrice.symbol, HistoricalPrice.date, HistoricalPrice.close).filter(
+        HistoricalPrice.symbol.in_([sym for sym, _, _ in MACRO_SERIES]),
+        HistoricalPrice.date <= dates.max().date(),
+    ).all()
+    macro = pd.DataFrame(rows, columns=["symbol", "date", "close"])
+    macro["date"] = pd.to_datetime(macro["date"])
+
+    left = pd.DataFrame({"date": dates}).sort_values("date")
+    out = pd.DataFrame(index=left.index)
+    for sym, name, _ in MACRO_SERIES:
+        series = macro.loc[macro["symbol"] == sym, ["date", "close"]].sort_values("date")
+        out[name] = pd.merge_asof(left, series, on="date", direction="backward")["close"].to_numpy()
+
+    features = pd.DataFrame(index=dates)
+    for _, name, default in MACRO_SERIES:
+        if default is not None:
+            features[name] = out[name].fillna(default).to_numpy()
+    features["yield_curve"] = features["treasury_10y"] - features["treasury_3m"]
+    eur = out["eurusd"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features["dxy_proxy"] = np.where(eur > 0, 1 / eur, 1.0)
+    return features
+
+
+def _feature_records(*frames: pd.DataFrame) -> List[Dict[str, float]]:
+    """Row dicts across ``frames``, dropping the NaN SMA ratios the per-date builder omits."""
+    columns = [c for f in frames for c in f.columns]
+    values = np.column_stack([f.to_numpy(dtype=np.float64) for f in frames])
+    optional = {i for i, c in enumerate(columns) if c.startswith("price_sma")}
+    return [
+        {c: float(v) for i, (c, v) in enumerate(zip(columns, row)) if not (i in optional and np.isnan(v))}
+        for row in values
+    ]
+
+
 def engineer_features_for_symbol(db_session, symbol: str, job_id: str = "manual"):
-    """Engineer features for a single symbol across all available dates."""
-    from database.models import HistoricalPrice, TrainingFeature
+    """Engineer features for a single symbol across all available dates.
+
+    Prices, news and macro series are each loaded once and every date's
+    features are computed point-in-time in one vectorized pass, then
+    bulk-upserted into ``training_features``.
+    """
+    from database.models import HistoricalPrice
 
-    # Load all price data for this symbol
-    prices = db_session.query(HistoricalPrice).filter(
-        HistoricalPrice.symbol == symbol
-    ).order_by(HistoricalPrice.date).all()
+    prices = db_session.query(
+        HistoricalPrice.date, HistoricalPrice.open, HistoricalPrice.high,
+        HistoricalPrice.low, HistoricalPrice.close, HistoricalPrice.volume,
+    ).filter(HistoricalPrice.symbol == symbol).order_by(HistoricalPrice.date).all()
 
     if len(prices) < 65:
         logger.warning(f"[Phase3] {symbol}: only {len(prices)} rows, need 65+")
         return 0
 
-    # Convert to DataFrame
-    df = pd.DataFrame([{
-        "date": p.date, "open": p.open, "high": p.high,
-        "low": p.low, "close": p.close, "volume": p.volume
-    } for p in prices])
+    df = pd.DataFrame(prices, columns=["date", "open", "high", "low", "close", "volume"])
     df = df.set_index("date").sort_index()
 
     # Legacy binary-like direction label (up/down) plus threshold label.
     df["label"] = np.where((df["close"].shift(-1) / df["close"] - 1) > 0, 1, -1)
     df["label_threshold"] = compute_threshold_labels(df, forward_days=1)
 
-    count = 0
-    dates = df.index[64:]  # start after 60-day lookback window
-
-    for i, target_date in enumerate(dates):
-        # Slice data up to target_date
-        window = df.loc[:target_date]
-
-        # Price features
-        price_feats = build_price_features(window)
-        if not price_feats:
-            continue
-
-        # Sentiment features
-        sent_feats = build_sentiment_features(db_session, symbol, datetime.combine(target_date, datetime.min.time()))
-
-        # Cross-asset features
-        cross_feats = build_cross_asset_features(db_session, target_date)
-
-        # Combine all features
-        all_features = {**price_feats, **sent_feats, **cross_feats}
-
-        # Target: next day's return
-        next_idx = list(df.index).index(target_date)
-        if next_idx + 1 >= len(df):
-            continue
-        next_close = df.iloc[next_idx + 1]["close"]
-        curr_close = df.iloc[next_idx]["close"]
-        if curr_close == 0:
-            continue
-
-        target_return = (next_close - curr_close) / curr_close
-        target_direction = "up" if target_return > 0 else "down"
+    close = df["close"]
+    target_return = (close.shift(-1) - close) / close
+    # Start after the 60-day lookback; the last date has no next close.
+    keep = np.zeros(len(df), dtype=bool)
+    keep[WARMUP_BARS:len(df) - 1] = True
+    keep &= (close != 0).to_numpy()
+    if not keep.any():
+        return 0
 
+    price_frame = build_price_feature_frame(df)[keep]
+    dates = df.index[keep]
+    targets = pd.DatetimeIndex(pd.to_datetime(dates))
+
+    news = _load_symbol_news(
+        db_session, symbol, targets[0].to_pydatetime() - timedelta(days=NEWS_LOOKBACK_DAYS),
+        targets[-1].to_pydatetime(),
+    )
+    sent_frame = build_sentiment_feature_frame(news, targets, _live_sentiment_context(symbol))
+    cross_frame = build_cross_asset_feature_frame(db_session, targets)
+
+    records = _feature_records(price_frame, sent_frame, cross_frame)
+    returns = target_return[keep].to_numpy(dtype=np.float64)
+    labels = df["label"][keep].to_numpy()
+    threshold_labels = df["label_threshold"][keep].to_numpy()
+    now = datetime.utcnow()
+
+    params = []
+    for date, features, ret, label, threshold_label in zip(dates, records, returns, labels, threshold_labels):
         # Keep both labels for backward compatibility.
-        raw_label = int(df.loc[target_date, "label"]) if target_date in df.index else (1 if target_return > 0 else -1)
-        threshold_label = int(df.loc[target_date, "label_threshold"]) if target_date in df.index else (1 if target_return > THRESHOLD else (-1 if target_return < -THRESHOLD else 0))
-        all_features["label"] = raw_label
-        all_features["label_threshold"] = threshold_label
-
-        # Upsert
-        existing = db_session.query(TrainingFeature).filter(
-            TrainingFeature.symbol == symbol,
-            TrainingFeature.date == target_date
-        ).first()
-
-        if existing:
-            existing.features = all_features
-            existing.target_return = float(target_return)
-            existing.target_direction = target_direction
-        else:
-            db_session.add(TrainingFeature(
-                symbol=symbol,
-                date=target_date,
-                features=all_features,
-                target_return=float(target_return),
-                target_direction=target_direction,
-            ))
-
-        count += 1
-        if count % 200 == 0:
-            db_session.commit()
-
-    db_session.commit()
-    return count
+        features["label"] = int(label)
+        features["label_threshold"] = int(threshold_label)
+        params.append({
+            "symbol": symbol,
+            "date": date,
+            "features": features,
+            "target_return": float(ret),
+            "target_direction": "up" if ret > 0 else "down",
+            "created_at": now,
+        })
+
+    for i in range(0, len(params), UPSERT_BATCH_ROWS):
+        db_session.execute(_UPSERT_TRAINING_FEATURE_SQL, params[i:i + UPSERT_BATCH_ROWS])
+        db_session.commit()
+    return len(params)
 
 
 def engineer_all_features(job_id: str = "manual"):
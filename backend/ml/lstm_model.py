@@ -4,16 +4,19 @@ import json
 import logging
 import os
 import importlib
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 logger = logging.getLogger(__name__)
 
 MODELS_DIR = os.environ.get("AURA_MODELS_DIR", os.path.join(os.path.dirname(__file__), "..", "models"))
 LSTM_SEQUENCE_LENGTH = 60
 LSTM_FEATURE_COUNT = 20
+LSTM_BATCH_SIZE = 32
+LSTM_VALIDATION_SPLIT = 0.2
 
 LSTM_SYMBOLS = [
     "BTCUSDC", "ETHUSDC", "BNBUSDC", "SOLUSDC",
@@ -23,6 +26,8 @@ LSTM_SYMBOLS = [
 
 _LSTM_CACHE: Dict[str, object] = {}
 _LSTM_METADATA_CACHE: Dict[str, Dict] = {}
+# id(model) -> (model, inference fn); the model is held so the id stays valid.
+_LSTM_INFER_CACHE: Dict[int, Tuple[object, object]] = {}
 
 
 def _bundle_paths(symbol: str) -> Tuple[str, str]:
@@ -80,18 +85,58 @@ def _build_feature_matrix(ohlcv_data: pd.DataFrame, feature_cols: Optional[List[
     return matrix.values, selected_cols, labels
 
 
+def sequence_windows(data, seq_len: int = LSTM_SEQUENCE_LENGTH) -> np.ndarray:
+    """Read-only (n - seq_len, seq_len, n_features) view; window i is data[i:i + seq_len].
+
+    Windows share ``data``'s memory, so building them costs nothing
+    regardless of history length.
+    """
+    data = np.asarray(data, dtype=np.float32)
+    # (n - seq_len + 1, n_features, seq_len) -> (.., seq_len, n_features); drop the
+    # final window, which ends on the last row and has no label after it.
+    return sliding_window_view(data, seq_len, axis=0).transpose(0, 2, 1)[:-1]
+
+
 def prepare_sequences(data, seq_len: int = LSTM_SEQUENCE_LENGTH, labels=None):
-    X, y = [], []
+    """Windows ending before row i paired with labels[i], for i >= seq_len.
+
+    ``X`` is a zero-copy view (see :func:`sequence_windows`); copy it before
+    writing to it.
+    """
     if data is None or len(data) <= seq_len:
-        return np.array(X), np.array(y)
+        return np.array([]), np.array([])
 
     if labels is None:
         labels = np.zeros(len(data), dtype=np.float32)
 
-    for i in range(seq_len, len(data)):
-        X.append(data[i - seq_len:i])
-        y.append(labels[i])
-    return np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
+    return sequence_windows(data, seq_len), np.asarray(labels[seq_len:], dtype=np.float32)
+
+
+def iter_sequence_batches(
+    windows: np.ndarray,
+    labels: np.ndarray,
+    batch_size: int = LSTM_BATCH_SIZE,
+    shuffle: bool = True,
+    seed: int = 0,
+    repeat: bool = True,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield contiguous (X, y) batches gathered from a window view.
+
+    Only one batch is materialized at a time. Shuffling is reshuffled every
+    pass with a seeded generator; ``repeat`` cycles forever for Keras
+    ``steps_per_epoch`` training.
+    """
+    n = len(windows)
+    if n == 0:
+        return
+    rng = np.random.default_rng(seed)
+    while True:
+        order = rng.permutation(n) if shuffle else np.arange(n)
+        for start in range(0, n, batch_size):
+            idx = order[start:start + batch_size]
+            yield windows[idx], labels[idx]
+        if not repeat:
+            return
 
 
 def save_lstm_model(symbol: str, model, feature_cols: List[str], sequence_length: int = LSTM_SEQUENCE_LENGTH) -> None:
@@ -100,6 +145,9 @@ def save_lstm_model(symbol: str, model, feature_cols: List[str], sequence_length
     model.save(model_path, overwrite=True)
     with open(meta_path, "w", encoding="utf-8") as f:
         json.dump({"feature_cols": feature_cols, "sequence_length": sequence_length}, f)
+    previous = _LSTM_CACHE.get(symbol)
+    if previous is not None and previous is not model:
+        _LSTM_INFER_CACHE.pop(id(previous), None)
     _LSTM_CACHE[symbol] = model
     _LSTM_METADATA_CACHE[symbol] = {"feature_cols": feature_cols, "sequence_length": sequence_length}
 
@@ -165,25 +213,85 @@ def train_lstm(symbol: str, ohlcv_data: pd.DataFrame):
         print(f"[LSTM] Not enough data for {symbol}")
         return None
 
-    model.fit(X, y, epochs=30, batch_size=32, validation_split=0.2, verbose=0)
+    # Same chronological 80/20 split as validation_split, but batches are
+    # gathered from the window view on demand instead of materializing every
+    # (60 x 20) window up front.
+    split = int(len(X) * (1 - LSTM_VALIDATION_SPLIT))
+    train_steps = -(-split // LSTM_BATCH_SIZE)
+    val_steps = -(-(len(X) - split) // LSTM_BATCH_SIZE)
+    model.fit(
+        iter_sequence_batches(X[:split], y[:split], LSTM_BATCH_SIZE, shuffle=True),
+        steps_per_epoch=train_steps,
+        validation_data=iter_sequence_batches(X[split:], y[split:], LSTM_BATCH_SIZE, shuffle=False),
+        validation_steps=val_steps,
+        epochs=30,
+        verbose=0,
+    )
     save_lstm_model(symbol, model, feature_cols)
     print(f"[LSTM] Trained {symbol}")
     return model
 
 
-def predict_lstm(symbol: str, recent_data: pd.DataFrame):
+def _inference_fn(model):
+    """Callable running ``model`` forward without ``predict``'s per-call setup.
+
+    With TensorFlow this is a ``tf.function`` traced once per model and
+    input shape and then reused from ``_LSTM_INFER_CACHE``.
+    """
+    cached = _LSTM_INFER_CACHE.get(id(model))
+    if cached is not None and cached[0] is model:
+        return cached[1]
+    try:
+        tf = importlib.import_module("tensorflow")
+        fn = tf.function(lambda x: model(x, training=False), reduce_retracing=True)
+    except ImportError:
+        fn = lambda x: model(x, training=False)
+    _LSTM_INFER_CACHE[id(model)] = (model, fn)
+    return fn
+
+
+def _latest_window(symbol: str, recent_data: pd.DataFrame) -> Tuple[Optional[object], Optional[np.ndarray]]:
+    """(model, last seq_len feature rows) for ``symbol``; (None, None) when unavailable."""
     model, metadata = _load_lstm_bundle(symbol)
     if model is None or metadata is None or recent_data is None or recent_data.empty:
-        return None
+        return None, None
 
     matrix, feature_cols, _ = _build_feature_matrix(recent_data, metadata.get("feature_cols"))
     if matrix is None or feature_cols != metadata.get("feature_cols"):
-        return None
+        return None, None
 
     seq_len = int(metadata.get("sequence_length", LSTM_SEQUENCE_LENGTH))
     if len(matrix) < seq_len:
-        return None
+        return None, None
+    return model, matrix[-seq_len:]
+
+
+def predict_lstm_batch(recent_data: Dict[str, pd.DataFrame]) -> Dict[str, Optional[float]]:
+    """Up-probabilities for many symbols.
 
-    X = np.array([matrix[-seq_len:]], dtype=np.float32)
-    prob = float(model.predict(X, verbose=0)[0][0])
-    return max(0.0, min(1.0, prob))
+    Symbols whose bundles resolve to the same cached model and window shape
+    share one forward pass; every model runs through its cached inference
+    function. Symbols without a usable model or enough data map to None.
+    """
+    results: Dict[str, Optional[float]] = {symbol: None for symbol in recent_data}
+    groups: Dict[Tuple[int, Tuple[int, ...]], List[Tuple[str, object, np.ndarray]]] = {}
+    for symbol, frame in recent_data.items():
+        model, window = _latest_window(symbol, frame)
+        if model is not None:
+            groups.setdefault((id(model), window.shape), []).append((symbol, model, window))
+
+    for members in groups.values():
+        model = members[0][1]
+        X = np.stack([window for _, _, window in members]).astype(np.float32, copy=False)
+        try:
+            probs = np.asarray(_inference_fn(model)(X)).reshape(len(members), -1)[:, 0]
+        except Exception as exc:
+            logger.warning("[LSTM] Batch inference failed for %s: %s", [m[0] for m in members], exc)
+            continue
+        for (symbol, _, _), prob in zip(members, probs):
+            results[symbol] = max(0.0, min(1.0, float(prob)))
+    return results
+
+
+def predict_lstm(symbol: str, recent_data: pd.DataFrame):
+    return predict_lstm_batch({symbol: recent_data}).get(symbol)
@@ -0,0 +1,360 @@
+"""Lazy, memory-accounted registry of on-disk model artifacts.
+
+``AssetPredictor`` used to unpickle every XGBoost, Random Forest and ensemble
+artifact (and preload every LSTM sidecar) at import time. The registry instead
+indexes the models directory from file metadata only, loads an artifact the
+first time a symbol is asked for, evicts least-recently-used artifacts once the
+configured memory budget is exceeded, and hot-swaps an artifact when a newer
+file lands (written by ``auto_trainer``, ``cron_tasks`` or ``enhanced_trainer``,
+in this process or another one).
+
+Memory accounting uses the artifact's file size as its footprint: pickled
+sklearn / XGBoost models unpickle to roughly their serialized size, which is
+good enough to keep workers inside a budget without walking object graphs.
+"""
+
+import glob
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KIND_XGBOOST = "xgboost"
+KIND_RANDOM_FOREST = "random_forest"
+KIND_ENSEMBLE = "ensemble"
+KIND_LSTM = "lstm"
+
+# Budget for loaded pickled artifacts (LSTM sidecars are cached by ml.lstm_model).
+MEMORY_BUDGET_BYTES = int(float(os.getenv("AURA_MODEL_MEMORY_MB", "512")) * 1024 * 1024)
+# How often the directory is re-globbed for new symbols / versions.
+RESCAN_INTERVAL_SECONDS = float(os.getenv("AURA_MODEL_RESCAN_SECONDS", "60"))
+# How often a loaded artifact's file is re-stat'ed to detect a newer version.
+STAT_INTERVAL_SECONDS = 5.0
+
+_RF_TS_RE = re.compile(r"_random_forest_(\d{8}_\d{6})\.pkl$")
+
+
+class ArtifactInfo:
+    """File metadata for one indexed artifact."""
+
+    __slots__ = ("symbol", "kind", "path", "mtime_ns", "size", "version")
+
+    def __init__(self, symbol: str, kind: str, path: str, mtime_ns: int, size: int, version: str):
+        self.symbol = symbol
+        self.kind = kind
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.version = version
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "kind": self.kind,
+            "file": os.path.basename(self.path),
+            "version": self.version,
+            "size_bytes": self.size,
+            "modified_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(self.mtime_ns / 1e9)),
+        }
+
+
+class _Loaded:
+    __slots__ = ("info", "payload", "checked_at")
+
+    def __init__(self, info: ArtifactInfo, payload: Any):
+        self.info = info
+        self.payload = payload
+        self.checked_at = time.monotonic()
+
+
+def _stat(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+class ModelArtifactRegistry:
+    """Indexes model artifacts by symbol and kind; loads, evicts and hot-swaps them."""
+
+    def __init__(self, models_dir: Optional[str] = None, memory_budget_bytes: int = MEMORY_BUDGET_BYTES):
+        self._models_dir = models_dir
+        self.memory_budget_bytes = int(memory_budget_bytes)
+        self._lock = threading.RLock()
+        self._index: Dict[Tuple[str, str], ArtifactInfo] = {}
+        self._loaded: "OrderedDict[Tuple[str, str], _Loaded]" = OrderedDict()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._hits: Dict[str, int] = {}
+        self._scanned_at = 0.0
+        self._seeded = False
+        self.stats = {"loads": 0, "reloads": 0, "evictions": 0, "load_errors": 0}
+
+    # ── Index ────────────────────────────────────────────────────────────
+
+    @property
+    def models_dir(self) -> str:
+        if self._models_dir:
+            return self._models_dir
+        try:
+            from ml.model_storage import get_models_dir
+            return get_models_dir()
+        except Exception:
+            return os.path.join(os.path.dirname(__file__), "..", "models")
+
+    def scan(self) -> int:
+        """Re-index the models directory from file metadata. Loads nothing."""
+        if not self._seeded:
+            self._seeded = True
+            try:
+                from ml.model_storage import seed_models_dir
+                seed_models_dir()  # first-boot copy of bundled models into the volume
+            except Exception as e:
+                logger.debug("[MODEL_REGISTRY] seed skipped: %s", e)
+
+        models_dir = self.models_dir
+        index: Dict[Tuple[str, str], ArtifactInfo] = {}
+        if os.path.isdir(models_dir):
+            for path in glob.glob(os.path.join(models_dir, "*_xgboost_latest.pkl")):
+                symbol = os.path.basename(path).split("_xgboost")[0]
+                self._index_file(index, symbol, KIND_XGBOOST, path)
+            for path in glob.glob(os.path.join(models_dir, "*_random_forest_*.pkl")):
+                name = os.path.basename(path)
+                if "scaler" in name:
+                    continue
+                match = _RF_TS_RE.search(name)
+                self._index_file(index, name.split("_")[0], KIND_RANDOM_FOREST, path, match.group(1) if match else None)
+            for path in glob.glob(os.path.join(models_dir, "*_ensemble_latest.pkl")):
+                symbol = os.path.basename(path).split("_ensemble")[0]
+                self._index_file(index, symbol, KIND_ENSEMBLE, path)
+            for path in glob.glob(os.path.join(models_dir, "*_lstm_latest.keras")):
+                symbol = os.path.basename(path).split("_lstm")[0]
+                if os.path.exists(path[: -len(".keras")] + ".json"):
+                    self._index_file(index, symbol, KIND_LSTM, path)
+        else:
+            logger.warning("[MODEL_REGISTRY] models directory not found: %s", models_dir)
+
+        with self._lock:
+            self._index = index
+            self._scanned_at = time.monotonic()
+            # Drop loaded artifacts whose file vanished or changed; they reload lazily.
+            for key in list(self._loaded):
+                info = index.get(key)
+                if info is None or info.path != self._loaded[key].info.path or info.mtime_ns != self._loaded[key].info.mtime_ns:
+                    self._loaded.pop(key, None)
+        return len(index)
+
+    @staticmethod
+    def _index_file(index: Dict, symbol: str, kind: str, path: str, version: Optional[str] = None) -> None:
+        st = _stat(path)
+        if st is None or not symbol:
+            return
+        info = ArtifactInfo(symbol, kind, path, st.st_mtime_ns, st.st_size, version or str(st.st_mtime_ns))
+        current = index.get((symbol, kind))
+        # Several versioned RF files can exist per symbol; keep the newest.
+        if current is None or (info.version, info.mtime_ns) > (current.version, current.mtime_ns):
+            index[(symbol, kind)] = info
+
+    def _maybe_rescan(self) -> None:
+        if time.monotonic() - self._scanned_at >= RESCAN_INTERVAL_SECONDS:
+            self.scan()
+
+    def has(self, symbol: str, kind: str) -> bool:
+        self._maybe_rescan()
+        return (symbol, kind) in self._index
+
+    def symbols(self, kind: str) -> List[str]:
+        self._maybe_rescan()
+        return sorted(sym for (sym, k) in self._index if k == kind)
+
+    def primary_kind(self, symbol: str) -> Optional[str]:
+        """XGBoost is preferred; Random Forest is the fallback."""
+        if self.has(symbol, KIND_XGBOOST):
+            return KIND_XGBOOST
+        if self.has(symbol, KIND_RANDOM_FOREST):
+            return KIND_RANDOM_FOREST
+        return None
+
+    def info(self, symbol: str, kind: str) -> Optional[ArtifactInfo]:
+        self._maybe_rescan()
+        return self._index.get((symbol, kind))
+
+    # ── Loading ──────────────────────────────────────────────────────────
+
+    def get(self, symbol: str, kind: str) -> Optional[Any]:
+        """Return the unpickled artifact, loading or hot-swapping it if needed."""
+        key = (symbol, kind)
+        self._maybe_rescan()
+        with self._lock:
+            self._hits[symbol] = self._hits.get(symbol, 0) + 1
+            loaded = self._loaded.get(key)
+            if loaded is not None:
+                self._loaded.move_to_end(key)
+                if time.monotonic() - loaded.checked_at < STAT_INTERVAL_SECONDS:
+                    return loaded.payload
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                loaded = self._loaded.get(key)
+            if loaded is not None:
+                st = _stat(loaded.info.path)
+                if st is not None and st.st_mtime_ns == loaded.info.mtime_ns:
+                    loaded.checked_at = time.monotonic()
+                    return loaded.payload
+                # File replaced on disk by a retrain: pick up the new index entry.
+                self.scan()
+            info = self.info(symbol, kind)
+            if info is None:
+                return None
+            payload = self._load_file(info)
+            if payload is None:
+                # Keep serving the previous version if the new file is unreadable.
+                return loaded.payload if loaded is not None else None
+            with self._lock:
+                if loaded is not None:
+                    self.stats["reloads"] += 1
+                self._loaded[key] = _Loaded(info, payload)
+                self._loaded.move_to_end(key)
+                self._evict_over_budget(keep=key)
+            return payload
+
+    def _load_file(self, info: ArtifactInfo) -> Optional[Any]:
+        if info.kind == KIND_LSTM:
+            return None  # loaded and cached by ml.lstm_model
+        try:
+            with open(info.path, "rb") as f:
+                payload = pickle.load(f)
+            st = _stat(info.path)
+            if st is not None:
+                info.size = st.st_size
+            self.stats["loads"] += 1
+            logger.info("[MODEL_REGISTRY] loaded %s %s (%s)", info.kind, info.symbol, os.path.basename(info.path))
+            return payload
+        except Exception as e:
+            self.stats["load_errors"] += 1
+            logger.warning("[MODEL_REGISTRY] failed loading %s: %s", info.path, e)
+            return None
+
+    def _evict_over_budget(self, keep: Optional[Tuple[str, str]] = None) -> None:
+        while self.loaded_bytes() > self.memory_budget_bytes and len(self._loaded) > 1:
+            key = next(iter(self._loaded))
+            if key == keep:
+                self._loaded.move_to_end(key)
+                key = next(iter(self._loaded))
+                if key == keep:
+                    break
+            evicted = self._loaded.pop(key)
+            self.stats["evictions"] += 1
+            logger.debug("[MODEL_REGISTRY] evicted %s %s (%s bytes)", evicted.info.kind, key[0], evicted.info.size)
+
+    def loaded_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.info.size for entry in self._loaded.values())
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Forget loaded artifacts (all, or one symbol's) and re-index the directory."""
+        with self._lock:
+            for key in list(self._loaded):
+                if symbol is None or key[0] == symbol:
+                    self._loaded.pop(key, None)
+        self.scan()
+
+    # ── Warm-up ──────────────────────────────────────────────────────────
+
+    def hot_symbols(self, limit: int = 20) -> List[str]:
+        with self._lock:
+            ranked = sorted(self._hits.items(), key=lambda kv: kv[1], reverse=True)
+        return [sym for sym, _ in ranked[:limit]]
+
+    def warm_up(self, symbols: Iterable[str], background: bool = True) -> Optional[threading.Thread]:
+        """Load the primary and ensemble artifacts for ``symbols`` ahead of first use."""
+        targets = list(dict.fromkeys(symbols))
+
+        def _run():
+            for sym in targets:
+                kind = self.primary_kind(sym)
+                if kind is not None:
+                    self.get(sym, kind)
+                if self.has(sym, KIND_ENSEMBLE):
+                    self.get(sym, KIND_ENSEMBLE)
+                if self.loaded_bytes() >= self.memory_budget_bytes:
+                    break
+
+        if not background:
+            _run()
+            return None
+        thread = threading.Thread(target=_run, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            loaded = [
+                {**entry.info.to_dict(), "loaded": True}
+                for entry in self._loaded.values()
+            ]
+            return {
+                "models_dir": self.models_dir,
+                "indexed": len(self._index),
+                "loaded": len(self._loaded),
+                "loaded_bytes": sum(entry.info.size for entry in self._loaded.values()),
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "loaded_artifacts": loaded,
+                **self.stats,
+            }
+
+
+class ArtifactView(Mapping):
+    """Read-only dict-like view over one field of the registry's artifacts.
+
+    Keeps ``AssetPredictor.models`` / ``scalers`` / ``model_features`` /
+    ``ensemble_models`` working for existing callers: membership tests hit the
+    file index only, item access loads the artifact on demand.
+    """
+
+    def __init__(self, registry: ModelArtifactRegistry, field: str, kinds: Tuple[str, ...] = (KIND_XGBOOST, KIND_RANDOM_FOREST)):
+        self._registry = registry
+        self._field = field
+        self._kinds = kinds
+
+    def _kind_for(self, symbol: str) -> Optional[str]:
+        for kind in self._kinds:
+            if self._registry.has(symbol, kind):
+                return kind
+        return None
+
+    def __contains__(self, symbol: object) -> bool:
+        return isinstance(symbol, str) and self._kind_for(symbol) is not None
+
+    def __getitem__(self, symbol: str) -> Any:
+        kind = self._kind_for(symbol)
+        if kind is None:
+            raise KeyError(symbol)
+        payload = self._registry.get(symbol, kind)
+        if payload is None:
+            raise KeyError(symbol)
+        if self._field is None:
+            return payload
+        if self._field == "feature_cols":
+            return payload.get("feature_cols", [])
+        return payload[self._field]
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set()
+        for kind in self._kinds:
+            for sym in self._registry.symbols(kind):
+                if sym not in seen:
+                    seen.add(sym)
+                    yield sym
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+model_registry = ModelArtifactRegistry()
@@ -6,16 +6,123 @@ Deep learning models using PyTorch
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import DataLoader, Sampler, TensorDataset
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 import os
 import pickle
 
+_TORCH_THREADS: Optional[Tuple[int, int]] = None
 
-class PricePredictionDataset(Dataset):
+
+def configure_torch_threads(budget: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Size torch's intra-op and inter-op pools from the training CPU budget
+    (see ml.training_executor). Returns ``(intra_op, inter_op)``.
+    """
+    global _TORCH_THREADS
+    from ml.training_executor import plan_torch_threads
+
+    intra, interop = plan_torch_threads(budget)
+    torch.set_num_threads(intra)
+    if _TORCH_THREADS is None:
+        try:
+            torch.set_num_interop_threads(interop)
+        except RuntimeError:
+            # Only settable before the process runs any inter-op parallel work.
+            interop = torch.get_num_interop_threads()
+    else:
+        interop = _TORCH_THREADS[1]
+    _TORCH_THREADS = (intra, interop)
+    return _TORCH_THREADS
+
+
+def materialize_tensors(
+    *arrays,
+    pin_memory: Optional[bool] = None,
+    share_memory: bool = False,
+) -> Tuple[torch.Tensor, ...]:
+    """
+    Contiguous float32 tensors for ``arrays``, built once per training run.
+
+    float32 C-contiguous NumPy input is wrapped without a copy. ``pin_memory``
+    (default: when CUDA is available) speeds host-to-device copies;
+    ``share_memory`` lets worker processes read the tensors without pickling.
+    """
+    if pin_memory is None:
+        pin_memory = torch.cuda.is_available()
+    out = []
+    for array in arrays:
+        if isinstance(array, torch.Tensor):
+            tensor = array.to(torch.float32).contiguous()
+        else:
+            tensor = torch.from_numpy(np.ascontiguousarray(array, dtype=np.float32))
+        if share_memory:
+            tensor.share_memory_()
+        elif pin_memory:
+            tensor = tensor.pin_memory()
+        out.append(tensor)
+    return tuple(out)
+
+
+class EpochBatchSampler(Sampler):
+    """
+    Yields index batches over ``n`` rows. The shuffle order is drawn from
+    ``seed + epoch``, so a resumed run replays exactly the batches it would
+    have seen.
+    """
+
+    def __init__(self, n: int, batch_size: int = 32, shuffle: bool = True, seed: int = 0, drop_last: bool = False):
+        self.n = n
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.drop_last = drop_last
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __iter__(self) -> Iterator[torch.Tensor]:
+        if self.shuffle:
+            generator = torch.Generator()
+            generator.manual_seed(self.seed + self.epoch)
+            order = torch.randperm(self.n, generator=generator)
+        else:
+            order = torch.arange(self.n)
+        for start in range(0, self.n, self.batch_size):
+            batch = order[start:start + self.batch_size]
+            if self.drop_last and len(batch) < self.batch_size:
+                return
+            yield batch
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return self.n // self.batch_size
+        return -(-self.n // self.batch_size)
+
+
+def make_loader(
+    features,
+    targets,
+    batch_size: int = 32,
+    shuffle: bool = True,
+    seed: int = 0,
+    pin_memory: Optional[bool] = None,
+    share_memory: bool = False,
+) -> DataLoader:
+    """
+    DataLoader over in-memory tensors that gathers each batch with a single
+    index operation instead of collating ``batch_size`` single-row samples.
+    """
+    dataset = TensorDataset(*materialize_tensors(features, targets, pin_memory=pin_memory, share_memory=share_memory))
+    sampler = EpochBatchSampler(len(dataset), batch_size=batch_size, shuffle=shuffle, seed=seed)
+    return DataLoader(dataset, sampler=sampler, batch_size=None)
+
+
+class PricePredictionDataset(TensorDataset):
     """
     Dataset για price prediction training
     """
@@ -26,14 +133,8 @@ class PricePredictionDataset(Dataset):
             features: Input features (N, feature_dim)
             targets: Target prices (N,)
         """
-        self.features = torch.FloatTensor(features)
-        self.targets = torch.FloatTensor(targets)
-    
-    def __len__(self):
-        return len(self.features)
-    
-    def __getitem__(self, idx):
-        return self.features[idx], self.targets[idx]
+        self.features, self.targets = materialize_tensors(features, targets, pin_memory=False)
+        super().__init__(self.features, self.targets)
 
 
 class PricePredictionNN(nn.Module):
@@ -136,7 +237,8 @@ class PyTorchTrainer:
         self.models_dir = models_dir
         os.makedirs(models_dir, exist_ok=True)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        print(f"[*] Using device: {self.device}")
+        intra, interop = configure_torch_threads()
+        print(f"[*] Using device: {self.device} ({intra} intra-op / {interop} inter-op threads)")
     
     def train_model(
         self,
@@ -145,7 +247,11 @@ class PyTorchTrainer:
         val_loader: Optional[DataLoader] = None,
         epochs: int = 100,
         learning_rate: float = 0.001,
-        model_name: str = "pytorch_model"
+        model_name: str = "pytorch_model",
+        patience: Optional[int] = None,
+        min_delta: float = 0.0,
+        restore_best: bool = True,
+        checkpoint_path: Optional[str] = None
     ) -> Dict:
         """
         Train PyTorch model
@@ -157,6 +263,12 @@ class PyTorchTrainer:
             epochs: Number of training epochs
             learning_rate: Learning rate
             model_name: Model name for saving
+            patience: Stop after this many epochs without a val-loss improvement
+                larger than ``min_delta`` (needs ``val_loader``)
+            min_delta: Minimum val-loss decrease that counts as an improvement
+            restore_best: Load the best-val-loss weights into ``model`` at the end
+            checkpoint_path: Write a resumable checkpoint here after every epoch;
+                an existing checkpoint is resumed and removed once training finishes
             
         Returns:
             Training history
@@ -175,10 +287,33 @@ class PyTorchTrainer:
         }
         
         best_val_loss = float('inf')
+        best_state = None
+        best_epoch = None
+        stale_epochs = 0
+        start_epoch = 0
+        stopped_early = False
+        
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            checkpoint = torch.load(checkpoint_path, map_location=self.device, weights_only=False)
+            model.load_state_dict(checkpoint['model_state_dict'])
+            optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
+            scheduler.load_state_dict(checkpoint['scheduler_state_dict'])
+            torch.set_rng_state(checkpoint['torch_rng_state'])
+            history = checkpoint['history']
+            best_val_loss = checkpoint['best_val_loss']
+            best_state = checkpoint['best_state']
+            best_epoch = checkpoint['best_epoch']
+            stale_epochs = checkpoint['stale_epochs']
+            start_epoch = checkpoint['epoch'] + 1
+            print(f"[*] Resuming {model_name} from epoch {start_epoch + 1}")
         
         print(f"[*] Starting training for {epochs} epochs...")
         
-        for epoch in range(epochs):
+        for epoch in range(start_epoch, epochs):
+            set_epoch = getattr(train_loader.sampler, "set_epoch", None)
+            if set_epoch is not None:
+                set_epoch(epoch)
+            
             # Training phase
             model.train()
             train_loss = 0.0
@@ -226,9 +361,14 @@ class PyTorchTrainer:
                 scheduler.step(avg_val_loss)
                 
                 # Save best model
-                if avg_val_loss < best_val_loss:
+                if avg_val_loss < best_val_loss - min_delta:
                     best_val_loss = avg_val_loss
+                    best_epoch = epoch + 1
+                    best_state = {k: v.detach().to("cpu", copy=True) for k, v in model.state_dict().items()}
+                    stale_epochs = 0
                     self._save_model(model, model_name, epoch, avg_val_loss)
+                else:
+                    stale_epochs += 1
                 
                 if (epoch + 1) % 10 == 0:
                     print(f"Epoch {epoch+1}/{epochs} - Train Loss: {avg_train_loss:.4f}, Val Loss: {avg_val_loss:.4f}")
@@ -237,11 +377,47 @@ class PyTorchTrainer:
                     print(f"Epoch {epoch+1}/{epochs} - Train Loss: {avg_train_loss:.4f}")
             
             history["epochs"].append(epoch + 1)
+            
+            if checkpoint_path:
+                self._write_checkpoint(checkpoint_path, {
+                    'model_state_dict': model.state_dict(),
+                    'optimizer_state_dict': optimizer.state_dict(),
+                    'scheduler_state_dict': scheduler.state_dict(),
+                    'torch_rng_state': torch.get_rng_state(),
+                    'history': history,
+                    'best_val_loss': best_val_loss,
+                    'best_state': best_state,
+                    'best_epoch': best_epoch,
+                    'stale_epochs': stale_epochs,
+                    'epoch': epoch,
+                })
+            
+            if val_loader and patience is not None and stale_epochs >= patience:
+                stopped_early = True
+                print(f"[*] Early stopping at epoch {epoch+1} (best epoch {best_epoch})")
+                break
         
+        if restore_best and best_state is not None:
+            model.load_state_dict(best_state)
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        
+        history["best_epoch"] = best_epoch
+        history["stopped_early"] = stopped_early
         print(f"[+] Training completed! Best Val Loss: {best_val_loss:.4f}")
         
         return history
     
+    @staticmethod
+    def _write_checkpoint(path: str, state: Dict):
+        """Atomically replace the resume checkpoint at ``path``"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, path)
+    
     def _save_model(
         self,
         model: nn.Module,
@@ -311,12 +487,8 @@ class PyTorchTrainer:
         """
         model.eval()
         
-        if len(features.shape) == 2:
-            # For MLP: (N, features)
-            features_tensor = torch.FloatTensor(features).to(self.device)
-        else:
-            # For LSTM: (N, seq_len, features)
-            features_tensor = torch.FloatTensor(features).to(self.device)
+        # (N, features) for MLP or (N, seq_len, features) for LSTM
+        features_tensor = materialize_tensors(features, pin_memory=False)[0].to(self.device)
         
         with torch.no_grad():
             predictions = model(features_tensor)
@@ -349,12 +521,9 @@ def create_example_model():
         X_scaled, y_scaled, test_size=0.2, random_state=42
     )
     
-    # Create datasets
-    train_dataset = PricePredictionDataset(X_train, y_train)
-    test_dataset = PricePredictionDataset(X_test, y_test)
-    
-    train_loader = DataLoader(train_dataset, batch_size=32, shuffle=True)
-    test_loader = DataLoader(test_dataset, batch_size=32, shuffle=False)
+    # Create in-memory loaders
+    train_loader = make_loader(X_train, y_train, batch_size=32, shuffle=True, seed=42)
+    test_loader = make_loader(X_test, y_test, batch_size=32, shuffle=False)
     
     # Create model
     model = PricePredictionNN(
@@ -374,7 +543,8 @@ def create_example_model():
         val_loader=test_loader,
         epochs=50,
         learning_rate=0.001,
-        model_name="pytorch_price_predictor"
+        model_name="pytorch_price_predictor",
+        patience=15
     )
     
     # Make predictions (unscale)
@@ -292,6 +292,7 @@ def label_all_news(job_id: str = "manual"):
         db.commit()
 
         from cache.connection import get_redis
+        from services.news_impact import index_news
         redis_client = get_redis()
 
         for i, news in enumerate(unlabeled):
@@ -313,6 +314,7 @@ def label_all_news(job_id: str = "manual"):
                         logger.debug("[sentiment] snapshot store failed for %s: %s", sym, snap_err)
 
             if (i + 1) % 100 == 0:
+                index_news(db, unlabeled[i - 99:i + 1])
                 db.commit()
                 progress = (i + 1) / total * 100
                 db.add(TrainingLog(
@@ -321,6 +323,7 @@ def label_all_news(job_id: str = "manual"):
                 ))
                 db.commit()
 
+        index_news(db, unlabeled[total - total % 100:])
         db.commit()
 
         db.add(TrainingLog(
@@ -0,0 +1,181 @@
+"""CPU-budgeted process pool for model training.
+
+XGBoost, scikit-learn RandomForest and the BLAS behind NumPy each default to
+"use every core". Running several fits side by side in a process pool with
+those defaults oversubscribes the host many times over. This module splits an
+explicit CPU budget into ``workers x threads_per_worker`` and pins every worker
+process (and every estimator it builds) to its share.
+
+Environment:
+  TRAINING_CPU_BUDGET          cores training may use in total (default: all)
+  TRAINING_THREADS_PER_WORKER  threads per fit (default: 2, capped by budget)
+  TRAINING_MP_START            multiprocessing start method (default: spawn;
+                               training is started from API worker threads,
+                               where ``fork`` can inherit held locks)
+  TORCH_INTEROP_THREADS        PyTorch inter-op threads (default: 1)
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+
+def get_cpu_budget() -> int:
+    """Total cores training may use in this process tree."""
+    available = os.cpu_count() or 1
+    try:
+        budget = int(os.getenv("TRAINING_CPU_BUDGET", str(available)))
+    except ValueError:
+        budget = available
+    return max(1, min(budget, available))
+
+
+def get_threads_per_worker(budget: Optional[int] = None) -> int:
+    budget = budget or get_cpu_budget()
+    try:
+        threads = int(os.getenv("TRAINING_THREADS_PER_WORKER", "2"))
+    except ValueError:
+        threads = 2
+    return max(1, min(threads, budget))
+
+
+def plan_workers(n_tasks: int, budget: Optional[int] = None, threads_per_worker: Optional[int] = None) -> Tuple[int, int]:
+    """Return ``(workers, threads_per_worker)`` so that their product fits the budget.
+
+    With fewer tasks than worker slots the spare cores go to each task's
+    threads instead of sitting idle.
+    """
+    budget = budget or get_cpu_budget()
+    threads = min(threads_per_worker or get_threads_per_worker(budget), budget)
+    workers = max(1, min(max(1, n_tasks), budget // threads))
+    threads = max(threads, budget // workers)
+    return workers, threads
+
+
+def plan_torch_threads(budget: Optional[int] = None) -> Tuple[int, int]:
+    """``(intra_op, inter_op)`` thread counts for PyTorch in this process.
+
+    Inside a pool worker torch takes the worker's share; elsewhere it gets
+    one worker's share of the budget, so a standalone fit leaves the rest
+    of the host to XGBoost, the RF sidecar and the API workers.
+    """
+    budget = budget or get_cpu_budget()
+    intra = min(worker_threads(default=get_threads_per_worker(budget)), budget)
+    try:
+        interop = int(os.getenv("TORCH_INTEROP_THREADS", "1"))
+    except ValueError:
+        interop = 1
+    return max(1, intra), max(1, min(interop, intra))
+
+
+def _init_worker(threads: int) -> None:
+    """Pool initializer: cap native thread pools and drop inherited DB connections."""
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    os.environ["TRAINING_WORKER_THREADS"] = str(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=threads)
+    except Exception:
+        pass
+    try:
+        from database.connection import sync_engine
+        if sync_engine is not None:
+            # Forked children must not reuse the parent's pooled sockets.
+            sync_engine.dispose(close=False)
+    except Exception:
+        pass
+
+
+def in_worker() -> bool:
+    """True inside a :class:`TrainingExecutor` pool worker process (nested pools are not started)."""
+    return "TRAINING_WORKER_THREADS" in os.environ
+
+
+def worker_threads(default: int = -1) -> int:
+    """Thread count estimators should use: the worker's share, or ``default`` outside a pool."""
+    try:
+        return int(os.environ["TRAINING_WORKER_THREADS"])
+    except (KeyError, ValueError):
+        return default
+
+
+class TrainingExecutor:
+    """Runs independent training tasks in a CPU-budgeted process pool.
+
+    ``workers == 1`` runs tasks inline in the calling process, which keeps
+    small jobs and environments without ``fork`` on the simple path.
+    """
+
+    def __init__(self, n_tasks: int, budget: Optional[int] = None, threads_per_worker: Optional[int] = None):
+        self.workers, self.threads = plan_workers(n_tasks, budget, threads_per_worker)
+
+    def run(self, fn: Callable[..., Any], tasks: Iterable[Tuple],
+            threads_arg: Optional[str] = None) -> Iterator[Tuple[int, Any, float]]:
+        """Yield ``(task_index, result, seconds)`` as tasks finish.
+
+        With ``threads_arg`` each task is called with its thread share as
+        that keyword argument. Inline tasks only learn their share this way:
+        the process environment is shared by every request thread, so it is
+        left alone.
+
+        Exceptions raised by a task are yielded as the result so one bad
+        symbol or fold does not abort the batch.
+        """
+        tasks = list(tasks)
+        kwargs = {threads_arg: self.threads} if threads_arg else {}
+        if self.workers <= 1 or len(tasks) <= 1:
+            for i, args in enumerate(tasks):
+                started = time.perf_counter()
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    result = e
+                yield i, result, time.perf_counter() - started
+            return
+
+        logger.info("[TRAIN_EXEC] %s tasks on %s workers x %s threads", len(tasks), self.workers, self.threads)
+        ctx = multiprocessing.get_context(os.getenv("TRAINING_MP_START", "spawn"))
+        with ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=ctx,
+            initializer=_init_worker, initargs=(self.threads,),
+        ) as pool:
+            futures = {pool.submit(_timed, fn, args, kwargs): i for i, args in enumerate(tasks)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    result, seconds = e, 0.0
+                yield i, result, seconds
+
+    def map(self, fn: Callable[..., Any], tasks: Iterable[Tuple],
+            threads_arg: Optional[str] = None) -> List[Tuple[Any, float]]:
+        """Like :meth:`run` but returns ``(result, seconds)`` in task order."""
+        tasks = list(tasks)
+        out: List[Optional[Tuple[Any, float]]] = [None] * len(tasks)
+        for i, result, seconds in self.run(fn, tasks, threads_arg):
+            out[i] = (result, seconds)
+        return out  # type: ignore[return-value]
+
+    def describe(self) -> Dict[str, int]:
+        return {"workers": self.workers, "threads_per_worker": self.threads, "cpu_budget": get_cpu_budget()}
+
+
+def _timed(fn: Callable[..., Any], args: Tuple, kwargs: Dict[str, Any]) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
@@ -16,6 +16,7 @@ from sqlalchemy import text
 
 from cache.connection import cache_set
 from database.connection import SessionLocal
+from database.schema_registry import ensure_schema, register_schema
 from ml.auto_trainer import (
     CRYPTO_SYMBOLS,
     MODELS_DIR,
@@ -37,48 +38,37 @@ def _db_available() -> bool:
     return SessionLocal is not None
 
 
+register_schema("cron_aux", (
+    """
+    CREATE TABLE IF NOT EXISTS cron_runs (
+        id SERIAL PRIMARY KEY,
+        task_name VARCHAR(50) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        started_at TIMESTAMP DEFAULT NOW(),
+        finished_at TIMESTAMP,
+        details TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sentiment_scores (
+        id SERIAL PRIMARY KEY,
+        symbol VARCHAR(20) NOT NULL,
+        score FLOAT,
+        label VARCHAR(20),
+        article_count INTEGER DEFAULT 0,
+        source_breakdown JSONB,
+        updated_at TIMESTAMP DEFAULT NOW(),
+        UNIQUE(symbol)
+    )
+    """,
+))
+
+
 def _ensure_aux_tables() -> None:
     if not _db_available():
         return
-
-    db = SessionLocal()
-    try:
-        db.execute(
-            text(
-                """
-                CREATE TABLE IF NOT EXISTS cron_runs (
-                    id SERIAL PRIMARY KEY,
-                    task_name VARCHAR(50) NOT NULL,
-                    status VARCHAR(20) NOT NULL,
-                    started_at TIMESTAMP DEFAULT NOW(),
-                    finished_at TIMESTAMP,
-                    details TEXT
-                )
-                """
-            )
-        )
-        db.execute(
-            text(
-                """
-                CREATE TABLE IF NOT EXISTS sentiment_scores (
-                    id SERIAL PRIMARY KEY,
-                    symbol VARCHAR(20) NOT NULL,
-                    score FLOAT,
-                    label VARCHAR(20),
-                    article_count INTEGER DEFAULT 0,
-                    source_breakdown JSONB,
-                    updated_at TIMESTAMP DEFAULT NOW(),
-                    UNIQUE(symbol)
-                )
-                """
-            )
-        )
-        db.commit()
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+    if not ensure_schema("cron_aux"):
+        raise RuntimeError("cron auxiliary tables unavailable")
 
 
 def _start_run(task_name: str) -> Optional[int]:
@@ -454,6 +444,11 @@ def _train_incremental_ensemble(symbol: str) -> Dict[str, Any]:
     if should_deploy:
         with open(latest_path, "wb") as f:
             pickle.dump(model_data, f)
+        try:
+            from ml.model_registry import model_registry
+            model_registry.invalidate(symbol)
+        except Exception:
+            pass
         _record_model_registry(symbol, new_acc, len(X_train), feature_cols)
 
     return {
@@ -487,6 +482,12 @@ async def task_fetch_news():
             store_sentiment_snapshot = None
             logger.debug("[CRON_NEWS] snapshot importer unavailable: %s", import_err)
 
+        # Single ingestion pass; the per-symbol reads below hit its cache.
+        try:
+            await asyncio.to_thread(news_fetcher.get_all_sentiment, NEWS_SYMBOLS)
+        except Exception as e:
+            logger.warning("[CRON_NEWS] ingestion pass failed: %s", e)
+
         for symbol in NEWS_SYMBOLS:
             try:
                 sentiment = await asyncio.to_thread(news_fetcher.get_symbol_sentiment, symbol)
@@ -0,0 +1,113 @@
+"""
+LSTM sidecar benchmark: training-window memory and per-symbol inference latency.
+
+Memory compares the old copied-window construction with the strided view
+plus one streamed pass of training batches (numpy allocations are traced
+with tracemalloc). Latency compares one ``model.predict`` per symbol with
+``predict_lstm_batch`` over the same symbols and needs TensorFlow.
+
+Usage:
+    python scripts/bench_lstm.py --rows 8760 --symbols 10 --repeats 20
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+
+from ml import lstm_model as lstm
+
+
+def _copied_windows(data, seq_len, labels):
+    """The previous prepare_sequences: one copied window per row."""
+    X = [data[i - seq_len:i] for i in range(seq_len, len(data))]
+    y = [labels[i] for i in range(seq_len, len(data))]
+    return np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
+
+
+def _peak_mib(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def bench_memory(rows: int) -> None:
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(rows, lstm.LSTM_FEATURE_COUNT)).astype(np.float32)
+    labels = (rng.random(rows) > 0.5).astype(np.float32)
+
+    def streamed():
+        X, y = lstm.prepare_sequences(data, labels=labels)
+        for _ in lstm.iter_sequence_batches(X, y, repeat=False):
+            pass
+
+    before = _peak_mib(lambda: _copied_windows(data, lstm.LSTM_SEQUENCE_LENGTH, labels))
+    after = _peak_mib(streamed)
+    print(f"training windows for {rows} rows x {lstm.LSTM_FEATURE_COUNT} features")
+    print(f"  copied windows (before): {before:9.1f} MiB peak")
+    print(f"  view + batches (after):  {after:9.1f} MiB peak")
+
+
+def bench_inference(n_symbols: int, repeats: int, shared_model: bool) -> None:
+    """Per-symbol models by default (as deployed); ``shared_model`` shows the grouped-pass case."""
+    model = lstm.build_lstm()
+    if model is None:
+        print("inference: skipped (TensorFlow not installed)")
+        return
+
+    cols = [f"f{i}" for i in range(lstm.LSTM_FEATURE_COUNT)]
+    rng = np.random.default_rng(1)
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    frames = {s: pd.DataFrame(rng.normal(size=(200, len(cols))), columns=cols) for s in symbols}
+    meta = {"feature_cols": cols, "sequence_length": lstm.LSTM_SEQUENCE_LENGTH}
+    models = {s: model if shared_model or i == 0 else lstm.build_lstm() for i, s in enumerate(symbols)}
+    for s in symbols:
+        lstm._LSTM_CACHE[s] = models[s]
+        lstm._LSTM_METADATA_CACHE[s] = meta
+    # Feature engineering is identical in both paths; time only the model.
+    lstm._build_feature_matrix = lambda df, feature_cols=None: (df[cols].to_numpy(np.float32), cols, None)
+
+    windows = {s: frames[s].to_numpy(np.float32)[-lstm.LSTM_SEQUENCE_LENGTH:][None] for s in symbols}
+    for s in symbols:
+        models[s].predict(windows[s], verbose=0)
+    lstm.predict_lstm_batch(frames)  # trace once
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for s in symbols:
+            models[s].predict(windows[s], verbose=0)
+    before = (time.perf_counter() - started) / (repeats * n_symbols) * 1000
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        lstm.predict_lstm_batch(frames)
+    after = (time.perf_counter() - started) / (repeats * n_symbols) * 1000
+
+    print(f"inference over {n_symbols} symbols ({'one shared model' if shared_model else 'one model each'}), {repeats} repeats")
+    print(f"  model.predict per symbol (before): {before:8.2f} ms/symbol")
+    print(f"  predict_lstm_batch (after):        {after:8.2f} ms/symbol")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LSTM sidecar benchmark")
+    parser.add_argument("--rows", type=int, default=24 * 365, help="feature rows (hourly year by default)")
+    parser.add_argument("--symbols", type=int, default=len(lstm.LSTM_SYMBOLS))
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--shared-model", action="store_true", help="serve every symbol from one model")
+    args = parser.parse_args()
+
+    bench_memory(args.rows)
+    bench_inference(args.symbols, args.repeats, args.shared_model)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+PyTorchTrainer data-pipeline benchmark: epoch time and peak RSS, before and after.
+
+"before" is the previous setup: a Dataset that copies the features into
+new tensors and a DataLoader collating one row at a time, with torch's
+default thread pools. "after" uses make_loader (one gather per batch over
+the in-memory float32 tensors) with threads sized by configure_torch_threads.
+Each variant runs in a fresh interpreter so peak RSS is not shared.
+
+Usage:
+    TRAINING_CPU_BUDGET=4 python scripts/bench_pytorch.py --rows 200000 --epochs 3
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024 if sys.platform != "darwin" else peak / 2**20
+
+
+def run_variant(variant: str, rows: int, features: int, epochs: int, batch_size: int) -> dict:
+    import numpy as np
+    import torch
+    from torch.utils.data import DataLoader, Dataset
+
+    from ml.pytorch_model import PricePredictionNN, configure_torch_threads, make_loader
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(rows, features)).astype(np.float32)
+    y = (X @ rng.normal(size=features)).astype(np.float32)
+
+    if variant == "before":
+        class _CopiedDataset(Dataset):
+            def __init__(self, features, targets):
+                self.features = torch.FloatTensor(features)
+                self.targets = torch.FloatTensor(targets)
+
+            def __len__(self):
+                return len(self.features)
+
+            def __getitem__(self, idx):
+                return self.features[idx], self.targets[idx]
+
+        loader = DataLoader(_CopiedDataset(X, y), batch_size=batch_size, shuffle=True)
+        threads = (torch.get_num_threads(), torch.get_num_interop_threads())
+    else:
+        threads = configure_torch_threads()
+        loader = make_loader(X, y, batch_size=batch_size, seed=0, pin_memory=False)
+
+    torch.manual_seed(0)
+    model = PricePredictionNN(input_size=features, hidden_sizes=[64, 128, 64])
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+    criterion = torch.nn.MSELoss()
+
+    epoch_seconds = []
+    for epoch in range(epochs):
+        if hasattr(loader.sampler, "set_epoch"):
+            loader.sampler.set_epoch(epoch)
+        started = time.perf_counter()
+        model.train()
+        for xb, yb in loader:
+            optimizer.zero_grad()
+            loss = criterion(model(xb), yb)
+            loss.backward()
+            optimizer.step()
+        epoch_seconds.append(time.perf_counter() - started)
+
+    return {
+        "variant": variant,
+        "threads": list(threads),
+        "epoch_seconds": sum(epoch_seconds) / len(epoch_seconds),
+        "peak_rss_mib": _peak_rss_mib(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyTorchTrainer data-pipeline benchmark")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--variant", choices=("before", "after"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.rows, args.features, args.epochs, args.batch_size)))
+        return
+
+    try:
+        import torch  # noqa: F401
+    except ImportError:
+        print("skipped: PyTorch not installed")
+        return
+
+    print(f"{args.rows} rows x {args.features} features, batch {args.batch_size}, {args.epochs} epochs")
+    print(f"{'variant':<8} {'threads':>10} {'s/epoch':>9} {'peak RSS MiB':>13}")
+    for variant in ("before", "after"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--variant", variant, "--rows", str(args.rows),
+             "--features", str(args.features), "--epochs", str(args.epochs),
+             "--batch-size", str(args.batch_size)],
+            check=True, capture_output=True, text=True,
+        ).stdout.strip().splitlines()[-1]
+        r = json.loads(out)
+        threads = f"{r['threads'][0]}/{r['threads'][1]}"
+        print(f"{r['variant']:<8} {threads:>10} {r['epoch_seconds']:>9.2f} {r['peak_rss_mib']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,11 @@ def build_missing(force: bool = False) -> list:
             bundle = {"rf_model": rf, "scaler": scaler, "feature_cols": feature_cols}
             with open(path, 'wb') as f:
                 pickle.dump(bundle, f)
+            try:
+                from ml.model_registry import model_registry
+                model_registry.invalidate(sym)
+            except Exception:
+                pass
             built.append(sym)
             logger.info("[rf_ensemble] %s: built -> %s", sym, path)
         except Exception as e:
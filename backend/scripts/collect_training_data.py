@@ -80,6 +80,31 @@ def collect_ohlcv(db_session, log_fn=None):
                 db_session.rollback()
 
 
+def _label_and_index(db_session, articles: List) -> None:
+    """Score, symbol-map and index freshly added articles once, at ingest."""
+    if not articles:
+        return
+    from cache.connection import get_redis
+    from ml.sentiment_labeler import analyze_sentiment, map_news_to_symbols, store_sentiment_snapshot
+    from services.news_impact import index_news
+
+    # Scored rows are skipped by label_all_news, so feed the momentum series here.
+    redis_client = get_redis()
+    db_session.flush()
+    for news in articles:
+        score, label = analyze_sentiment(f"{news.headline} {news.summary or ''}")
+        news.sentiment_score = score
+        news.sentiment_label = label
+        if not news.symbols:
+            news.symbols = map_news_to_symbols(news.headline, news.summary or "")
+        for sym in [s.strip() for s in (news.symbols or "").split(",") if s.strip()]:
+            try:
+                store_sentiment_snapshot(redis_client, sym, score)
+            except Exception as snap_err:
+                logger.debug("[collect] snapshot store failed for %s: %s", sym, snap_err)
+    index_news(db_session, articles)
+
+
 def collect_news(db_session, log_fn=None):
     """Collect financial news from yfinance ticker.news + RSS feeds."""
     from database.models import FinancialNews
@@ -90,6 +115,7 @@ def collect_news(db_session, log_fn=None):
     # 1) yfinance ticker news (recent articles)
     news_symbols = ["AAPL", "MSFT", "NVDA", "BTC-USD", "ETH-USD", "GC=F", "^VIX"]
     for symbol in news_symbols:
+        added = []
         try:
             ticker = yf.Ticker(symbol)
             news_items = getattr(ticker, "news", None)
@@ -110,14 +136,17 @@ def collect_news(db_session, log_fn=None):
                 if exists:
                     continue
 
-                db_session.add(FinancialNews(
+                news = FinancialNews(
                     headline=headline,
                     summary=item.get("summary", ""),
                     source=item.get("publisher", "Yahoo Finance"),
                     url=item.get("link", ""),
                     published_at=pub_dt,
                     symbols=symbol,
-                ))
+                )
+                db_session.add(news)
+                added.append(news)
+            _label_and_index(db_session, added)
             db_session.commit()
         except Exception as e:
             logger.debug(f"[news] yfinance news for {symbol}: {e}")
@@ -128,6 +157,7 @@ def collect_news(db_session, log_fn=None):
         log_fn("Collecting news from RSS feeds...", 70)
 
     for feed_name, feed_url in RSS_FEEDS:
+        added = []
         try:
             with httpx.Client(timeout=15.0) as client:
                 resp = client.get(feed_url, headers={"User-Agent": "AURA/1.0"})
@@ -149,14 +179,17 @@ def collect_news(db_session, log_fn=None):
                 if exists:
                     continue
 
-                db_session.add(FinancialNews(
+                news = FinancialNews(
                     headline=headline,
                     summary=summary,
                     source=feed_name,
                     url=entry.get("link", ""),
                     published_at=pub_dt,
                     symbols="",
-                ))
+                )
+                db_session.add(news)
+                added.append(news)
+            _label_and_index(db_session, added)
             db_session.commit()
         except Exception as e:
             logger.debug(f"[news] RSS {feed_name}: {e}")
@@ -167,6 +200,7 @@ def collect_news(db_session, log_fn=None):
     if news_api_key:
         if log_fn:
             log_fn("Collecting from NewsAPI...", 80)
+        added = []
         try:
             with httpx.Client(timeout=15.0) as client:
                 resp = client.get(
@@ -192,14 +226,17 @@ def collect_news(db_session, log_fn=None):
                 except Exception:
                     pub_dt = datetime.utcnow()
 
-                db_session.add(FinancialNews(
+                news = FinancialNews(
                     headline=headline,
                     summary=article.get("description", ""),
                     source=article.get("source", {}).get("name", "NewsAPI"),
                     url=article.get("url", ""),
                     published_at=pub_dt,
                     symbols="",
-                ))
+                )
+                db_session.add(news)
+                added.append(news)
+            _label_and_index(db_session, added)
             db_session.commit()
         except Exception as e:
             logger.debug(f"[news] NewsAPI: {e}")
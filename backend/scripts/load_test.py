@@ -0,0 +1,135 @@
+"""
+Concurrent-request load test for the AURA API.
+
+Fires a fixed number of requests at each endpoint with a bounded number in
+flight and reports throughput and latency percentiles. Run it against a
+single uvicorn worker so req/s is per worker; pass --compare to load a
+second server (e.g. the previous build) with the same mix and print the
+throughput ratio.
+
+Usage:
+    uvicorn main:app --workers 1 --port 8000
+    AURA_LOAD_TOKEN=<access token> python scripts/load_test.py \\
+        --base-url http://localhost:8000 --concurrency 64 --requests 2000
+
+    # before/after on one worker each
+    python scripts/load_test.py --base-url http://localhost:8000 --compare http://localhost:8001
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+# The routes served from database.async_repository.
+DEFAULT_ENDPOINTS = (
+    "/api/subscription/status",
+    "/api/feed/v2?limit=50",
+    "/api/feed/v2/unread",
+    "/api/portfolio/history?limit=30",
+    "/api/portfolio/equity-chart?days=90",
+    "/api/ai/accuracy",
+)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient, path: str, total: int, concurrency: int,
+) -> Dict:
+    """Issue ``total`` GETs to ``path`` with at most ``concurrency`` in flight."""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                resp = await client.get(path)
+                await resp.aread()
+                ok = resp.status_code < 400
+                label = str(resp.status_code)
+            except httpx.HTTPError as e:
+                ok, label = False, type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors[label] = errors.get(label, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": total,
+        "errors": errors,
+        "seconds": elapsed,
+        "rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+async def run(base_url: str, endpoints, total: int, concurrency: int, token: Optional[str]) -> List[Dict]:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30.0) as client:
+        # Warm connections, caches and lazily created tables before timing.
+        for path in endpoints:
+            await run_endpoint(client, path, min(total, concurrency), concurrency)
+        return [await run_endpoint(client, path, total, concurrency) for path in endpoints]
+
+
+def print_report(base_url: str, results: List[Dict]) -> None:
+    print(f"\n{base_url}")
+    print(f"{'endpoint':<40} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  errors")
+    for r in results:
+        errors = ", ".join(f"{k}x{v}" for k, v in sorted(r["errors"].items())) or "-"
+        print(f"{r['path']:<40} {r['rps']:>9.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}  {errors}")
+    total_requests = sum(r["requests"] for r in results)
+    total_seconds = sum(r["seconds"] for r in results)
+    print(f"{'overall':<40} {total_requests / total_seconds if total_seconds else 0.0:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AURA API concurrent load test")
+    parser.add_argument("--base-url", default=os.getenv("AURA_LOAD_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--compare", default=None, help="second server to load with the same mix")
+    parser.add_argument("--token", default=os.getenv("AURA_LOAD_TOKEN"), help="bearer access token")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help="path to load (repeatable); defaults to the async-repository routes")
+    args = parser.parse_args()
+
+    endpoints = args.endpoints or list(DEFAULT_ENDPOINTS)
+    if not args.token:
+        print("[!] No token given (--token / AURA_LOAD_TOKEN); authenticated routes will return 401/403")
+
+    results = asyncio.run(run(args.base_url, endpoints, args.requests, args.concurrency, args.token))
+    print_report(args.base_url, results)
+
+    if args.compare:
+        baseline = asyncio.run(run(args.compare, endpoints, args.requests, args.concurrency, args.token))
+        print_report(args.compare, baseline)
+        print(f"\nthroughput {args.base_url} vs {args.compare}")
+        for new, old in zip(results, baseline):
+            ratio = new["rps"] / old["rps"] if old["rps"] else float("inf")
+            print(f"{new['path']:<40} {ratio:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
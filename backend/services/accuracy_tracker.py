@@ -1,45 +1,184 @@
 """
 Accuracy Tracking Service
 Track prediction accuracy for ML models
+
+Predictions and trade outcomes live in indexed tables (database.embedded_store)
+instead of one JSON document rewritten on every call. Per-asset totals and
+per-day counters are updated in the same transaction as each write, so reads
+aggregate counters rather than scanning history. The legacy
+accuracy_data.json is imported once, on first use.
 """
 
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from collections import defaultdict
 import json
 import os
 
+from sqlalchemy import case, func, select, text
+
+from database.embedded_store import claim_once, get_store_engine, read_conn, write_tx
+from database.models import (
+    AccuracyAssetStats,
+    AccuracyDailyStats,
+    AccuracyPrediction,
+    AccuracyTradeOutcome,
+)
+
+MAX_OUTCOMES_PER_ASSET = 100
+
+_predictions = AccuracyPrediction.__table__
+_outcomes = AccuracyTradeOutcome.__table__
+_asset_stats = AccuracyAssetStats.__table__
+_daily_stats = AccuracyDailyStats.__table__
+
+_ENSURE_ASSET_SQL = text(
+    """
+    INSERT INTO accuracy_asset_stats
+        (asset_id, total_predictions, evaluated_predictions, accuracy_sum, error_pct_sum, outcome_count)
+    VALUES (:asset_id, 0, 0, 0, 0, 0)
+    ON CONFLICT (asset_id) DO NOTHING
+    """
+)
+
+_BUMP_ASSET_SQL = text(
+    """
+    UPDATE accuracy_asset_stats SET
+        total_predictions = total_predictions + :total,
+        evaluated_predictions = evaluated_predictions + :evaluated,
+        accuracy_sum = accuracy_sum + :accuracy,
+        error_pct_sum = error_pct_sum + :error_pct,
+        outcome_count = outcome_count + :outcomes
+    WHERE asset_id = :asset_id
+    """
+)
+
+_BUMP_DAY_SQL = text(
+    """
+    INSERT INTO accuracy_daily_stats (asset_id, day, evaluated, accuracy_sum, outcomes, correct)
+    VALUES (:asset_id, :day, :evaluated, :accuracy, :outcomes, :correct)
+    ON CONFLICT (asset_id, day) DO UPDATE SET
+        evaluated = accuracy_daily_stats.evaluated + EXCLUDED.evaluated,
+        accuracy_sum = accuracy_daily_stats.accuracy_sum + EXCLUDED.accuracy_sum,
+        outcomes = accuracy_daily_stats.outcomes + EXCLUDED.outcomes,
+        correct = accuracy_daily_stats.correct + EXCLUDED.correct
+    """
+)
+
+
+def _bump_asset(conn, asset_id: str, total=0, evaluated=0, accuracy=0.0, error_pct=0.0, outcomes=0):
+    conn.execute(_BUMP_ASSET_SQL, {
+        "asset_id": asset_id, "total": total, "evaluated": evaluated,
+        "accuracy": accuracy, "error_pct": error_pct, "outcomes": outcomes,
+    })
+
+
+def _bump_day(conn, asset_id: str, day: str, evaluated=0, accuracy=0.0, outcomes=0, correct=0):
+    conn.execute(_BUMP_DAY_SQL, {
+        "asset_id": asset_id, "day": day, "evaluated": evaluated,
+        "accuracy": accuracy, "outcomes": outcomes, "correct": correct,
+    })
+
+
+def _evaluate(predicted_price: float, actual_price: float) -> Dict:
+    error = abs(predicted_price - actual_price)
+    error_pct = (error / actual_price * 100) if actual_price > 0 else 0
+    return {"error": error, "error_pct": error_pct, "accuracy": max(0, 100 - error_pct)}
+
+
+def _prediction_dict(row) -> Dict:
+    pred = {
+        "predicted_price": row.predicted_price,
+        "predicted_date": row.predicted_date.isoformat(),
+        "confidence": row.confidence,
+        "recorded_at": row.recorded_at.isoformat(),
+    }
+    if row.actual_price is not None:
+        pred.update({
+            "actual_price": row.actual_price,
+            "actual_date": row.actual_date.isoformat() if row.actual_date else None,
+            "error": row.error,
+            "error_pct": row.error_pct,
+            "accuracy": row.accuracy,
+        })
+    return pred
+
 
 class AccuracyTracker:
     """
     Track prediction accuracy for assets
     """
-    
-    def __init__(self):
-        self.accuracy_file = os.path.join(
+
+    def __init__(self, store_path: Optional[str] = None, legacy_file: Optional[str] = None):
+        self.accuracy_file = legacy_file or os.path.join(
             os.path.dirname(__file__), "..", "accuracy_data.json"
         )
-        self.accuracy_data = self._load_accuracy_data()
-    
-    def _load_accuracy_data(self) -> Dict:
-        """Load accuracy data from file"""
-        if os.path.exists(self.accuracy_file):
-            try:
-                with open(self.accuracy_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading accuracy data: {e}")
-                return {}
-        return {}
-    
-    def _save_accuracy_data(self):
-        """Save accuracy data to file"""
+        self._store_path = store_path
+        self._engine = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = get_store_engine(self._store_path)
+            self._import_legacy_json()
+        return self._engine
+
+    def _import_legacy_json(self):
+        """Copy accuracy_data.json into the store once per store."""
+        if not os.path.exists(self.accuracy_file):
+            return
+        try:
+            with open(self.accuracy_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            print(f"Error loading accuracy data: {e}")
+            return
         try:
-            with open(self.accuracy_file, 'w', encoding='utf-8') as f:
-                json.dump(self.accuracy_data, f, indent=2, ensure_ascii=False)
+            with write_tx(self._engine) as conn:
+                if not claim_once(conn, "import:accuracy_data.json"):
+                    return
+                for asset_id, asset_data in (legacy or {}).items():
+                    self._import_asset(conn, asset_id, asset_data or {})
+            print(f"[accuracy] Imported {len(legacy or {})} assets from {self.accuracy_file}")
         except Exception as e:
-            print(f"Error saving accuracy data: {e}")
-    
+            print(f"Error importing accuracy data: {e}")
+
+    @staticmethod
+    def _import_asset(conn, asset_id: str, asset_data: Dict):
+        conn.execute(_ENSURE_ASSET_SQL, {"asset_id": asset_id})
+        preds = asset_data.get("predictions", [])
+        for p in preds:
+            recorded_at = datetime.fromisoformat(p["recorded_at"])
+            evaluated = "actual_price" in p
+            conn.execute(_predictions.insert().values(
+                asset_id=asset_id,
+                predicted_price=p["predicted_price"],
+                predicted_date=datetime.fromisoformat(p["predicted_date"]),
+                confidence=p.get("confidence"),
+                recorded_at=recorded_at,
+                actual_price=p.get("actual_price"),
+                actual_date=datetime.fromisoformat(p["actual_date"]) if p.get("actual_date") else None,
+                error=p.get("error"),
+                error_pct=p.get("error_pct"),
+                accuracy=p.get("accuracy"),
+            ))
+            if evaluated:
+                _bump_asset(conn, asset_id, evaluated=1, accuracy=p.get("accuracy", 0),
+                            error_pct=p.get("error_pct", 0))
+                _bump_day(conn, asset_id, recorded_at.date().isoformat(), evaluated=1,
+                          accuracy=p.get("accuracy", 50))
+        outcomes = asset_data.get("trade_outcomes", [])[-MAX_OUTCOMES_PER_ASSET:]
+        for o in outcomes:
+            closed_at = str(o.get("closed_at") or "")
+            correct = bool(o.get("correct_direction", False))
+            conn.execute(_outcomes.insert().values(
+                asset_id=asset_id, side=o.get("side", ""), entry_price=o.get("entry_price", 0.0),
+                exit_price=o.get("exit_price", 0.0), profit=o.get("profit"), correct_direction=correct,
+                opened_at=o.get("opened_at"), closed_at=closed_at,
+                recorded_at=datetime.fromisoformat(o["recorded_at"]) if o.get("recorded_at") else datetime.now(),
+            ))
+            _bump_day(conn, asset_id, closed_at[:10], outcomes=1, correct=int(correct))
+        _bump_asset(conn, asset_id, total=len(preds), outcomes=len(outcomes))
+
     def record_prediction(
         self,
         asset_id: str,
@@ -49,28 +188,24 @@ class AccuracyTracker:
     ):
         """
         Record a prediction for later accuracy calculation
-        
+
         Args:
             asset_id: Asset symbol
             predicted_price: Predicted price
             predicted_date: Date of prediction
             confidence: Prediction confidence
         """
-        if asset_id not in self.accuracy_data:
-            self.accuracy_data[asset_id] = {
-                "predictions": [],
-                "accuracy_history": []
-            }
-        
-        self.accuracy_data[asset_id]["predictions"].append({
-            "predicted_price": predicted_price,
-            "predicted_date": predicted_date.isoformat(),
-            "confidence": confidence,
-            "recorded_at": datetime.now().isoformat()
-        })
-        
-        self._save_accuracy_data()
-    
+        with write_tx(self.engine) as conn:
+            conn.execute(_ENSURE_ASSET_SQL, {"asset_id": asset_id})
+            conn.execute(_predictions.insert().values(
+                asset_id=asset_id,
+                predicted_price=predicted_price,
+                predicted_date=predicted_date,
+                confidence=confidence,
+                recorded_at=datetime.now(),
+            ))
+            _bump_asset(conn, asset_id, total=1)
+
     def record_actual_price(
         self,
         asset_id: str,
@@ -79,34 +214,40 @@ class AccuracyTracker:
     ):
         """
         Record actual price to compare with predictions
-        
+
         Args:
             asset_id: Asset symbol
             actual_price: Actual price
             date: Date of actual price
         """
-        if asset_id not in self.accuracy_data:
-            return
-        
-        # Find matching predictions
-        predictions = self.accuracy_data[asset_id]["predictions"]
-        for pred in predictions:
-            pred_date = datetime.fromisoformat(pred["predicted_date"])
-            # Match predictions within 1 day
-            if abs((date - pred_date).days) <= 1:
-                if "actual_price" not in pred:
-                    pred["actual_price"] = actual_price
-                    pred["actual_date"] = date.isoformat()
-                    
-                    # Calculate accuracy
-                    error = abs(pred["predicted_price"] - actual_price)
-                    error_pct = (error / actual_price * 100) if actual_price > 0 else 0
-                    pred["error"] = error
-                    pred["error_pct"] = error_pct
-                    pred["accuracy"] = max(0, 100 - error_pct)
-        
-        self._save_accuracy_data()
-    
+        with write_tx(self.engine) as conn:
+            # Match predictions within 1 day: abs(timedelta.days) <= 1 holds for
+            # date - 2 days < predicted_date <= date + 1 day.
+            candidates = conn.execute(
+                select(_predictions.c.id, _predictions.c.predicted_price,
+                       _predictions.c.predicted_date, _predictions.c.recorded_at)
+                .where(_predictions.c.asset_id == asset_id,
+                       _predictions.c.predicted_date > date - timedelta(days=2),
+                       _predictions.c.predicted_date <= date + timedelta(days=1),
+                       _predictions.c.actual_price.is_(None))
+                .order_by(_predictions.c.id)
+            ).all()
+            for pred in candidates:
+                if abs((date - pred.predicted_date).days) > 1:
+                    continue
+                scored = _evaluate(pred.predicted_price, actual_price)
+                updated = conn.execute(
+                    _predictions.update()
+                    .where(_predictions.c.id == pred.id, _predictions.c.actual_price.is_(None))
+                    .values(actual_price=actual_price, actual_date=date, **scored)
+                ).rowcount
+                if not updated:
+                    continue
+                _bump_asset(conn, asset_id, evaluated=1, accuracy=scored["accuracy"],
+                            error_pct=scored["error_pct"])
+                _bump_day(conn, asset_id, pred.recorded_at.date().isoformat(), evaluated=1,
+                          accuracy=scored["accuracy"])
+
     def record_outcome(self, asset_id: str, trade_side: str,
                        entry_price: float, exit_price: float,
                        profit: float, opened_at: str, closed_at: str):
@@ -114,36 +255,36 @@ class AccuracyTracker:
         Record trade outcome for feedback loop.
         Called when a trade closes (profit or loss).
         """
-        if asset_id not in self.accuracy_data:
-            self.accuracy_data[asset_id] = {
-                "predictions": [],
-                "accuracy_history": [],
-                "trade_outcomes": [],
-            }
-
-        if "trade_outcomes" not in self.accuracy_data[asset_id]:
-            self.accuracy_data[asset_id]["trade_outcomes"] = []
-
         correct = (trade_side == "BUY" and exit_price > entry_price) or \
                   (trade_side == "SELL" and exit_price < entry_price)
+        closed_at = str(closed_at or "")
 
-        self.accuracy_data[asset_id]["trade_outcomes"].append({
-            "side": trade_side,
-            "entry_price": entry_price,
-            "exit_price": exit_price,
-            "profit": profit,
-            "correct_direction": correct,
-            "opened_at": opened_at,
-            "closed_at": closed_at,
-            "recorded_at": datetime.now().isoformat(),
-        })
-
-        # Keep only last 100 outcomes per symbol
-        outcomes = self.accuracy_data[asset_id]["trade_outcomes"]
-        if len(outcomes) > 100:
-            self.accuracy_data[asset_id]["trade_outcomes"] = outcomes[-100:]
+        with write_tx(self.engine) as conn:
+            conn.execute(_ENSURE_ASSET_SQL, {"asset_id": asset_id})
+            conn.execute(_outcomes.insert().values(
+                asset_id=asset_id, side=trade_side, entry_price=entry_price, exit_price=exit_price,
+                profit=profit, correct_direction=correct, opened_at=opened_at, closed_at=closed_at,
+                recorded_at=datetime.now(),
+            ))
+            _bump_asset(conn, asset_id, outcomes=1)
+            _bump_day(conn, asset_id, closed_at[:10], outcomes=1, correct=int(correct))
 
-        self._save_accuracy_data()
+            # Keep only last 100 outcomes per symbol
+            count = conn.execute(
+                select(_asset_stats.c.outcome_count).where(_asset_stats.c.asset_id == asset_id)
+            ).scalar_one()
+            if count > MAX_OUTCOMES_PER_ASSET:
+                stale_ids = select(_outcomes.c.id).where(_outcomes.c.asset_id == asset_id) \
+                    .order_by(_outcomes.c.id).limit(count - MAX_OUTCOMES_PER_ASSET)
+                stale = conn.execute(
+                    _outcomes.delete()
+                    .where(_outcomes.c.id.in_(stale_ids.scalar_subquery()))
+                    .returning(_outcomes.c.closed_at, _outcomes.c.correct_direction)
+                ).all()
+                for o in stale:
+                    _bump_day(conn, asset_id, (o.closed_at or "")[:10], outcomes=-1,
+                              correct=-int(bool(o.correct_direction)))
+                _bump_asset(conn, asset_id, outcomes=-len(stale))
 
     def get_rolling_accuracy(self, asset_id: str, days: int = 30) -> float:
         """
@@ -151,115 +292,128 @@ class AccuracyTracker:
         Returns 0.0-1.0 (e.g. 0.7 = 70% correct).
         Used by Smart Score to weight ML prediction signal.
         """
-        if asset_id not in self.accuracy_data:
-            return 0.5  # no data, assume 50%
-
-        outcomes = self.accuracy_data[asset_id].get("trade_outcomes", [])
-        if not outcomes:
-            # Fall back to prediction accuracy
-            preds = self.accuracy_data[asset_id].get("predictions", [])
-            evaluated = [p for p in preds if "actual_price" in p]
-            if not evaluated:
-                return 0.5
+        cutoff_dt = datetime.now() - timedelta(days=days)
+        cutoff = cutoff_dt.isoformat()
+        cutoff_day = cutoff[:10]
+        next_day = (cutoff_dt.date() + timedelta(days=1)).isoformat()
 
-            cutoff = (datetime.now() - timedelta(days=days)).isoformat()
-            recent = [p for p in evaluated if p.get("recorded_at", "") >= cutoff]
-            if not recent:
-                return 0.5
+        with read_conn(self.engine) as conn:
+            stats = conn.execute(
+                select(_asset_stats).where(_asset_stats.c.asset_id == asset_id)
+            ).first()
+            if stats is None:
+                return 0.5  # no data, assume 50%
 
-            avg_acc = sum(p.get("accuracy", 50) for p in recent) / len(recent)
-            return min(1.0, avg_acc / 100.0)
+            # Whole days after the cutoff come from the daily counters; only
+            # the cutoff day itself is read row by row.
+            days_after = conn.execute(
+                select(func.coalesce(func.sum(_daily_stats.c.evaluated), 0),
+                       func.coalesce(func.sum(_daily_stats.c.accuracy_sum), 0.0),
+                       func.coalesce(func.sum(_daily_stats.c.outcomes), 0),
+                       func.coalesce(func.sum(_daily_stats.c.correct), 0))
+                .where(_daily_stats.c.asset_id == asset_id, _daily_stats.c.day > cutoff_day)
+            ).one()
 
-        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
-        recent = [o for o in outcomes if o.get("closed_at", "") >= cutoff]
-        if not recent:
-            return 0.5
+            if not stats.outcome_count:
+                # Fall back to prediction accuracy
+                if not stats.evaluated_predictions:
+                    return 0.5
+                edge = conn.execute(
+                    select(func.count(), func.coalesce(func.sum(_predictions.c.accuracy), 0.0))
+                    .where(_predictions.c.asset_id == asset_id,
+                           _predictions.c.recorded_at >= cutoff_dt,
+                           _predictions.c.recorded_at < datetime.fromisoformat(next_day),
+                           _predictions.c.actual_price.is_not(None))
+                ).one()
+                n = days_after[0] + edge[0]
+                if not n:
+                    return 0.5
+                avg_acc = (days_after[1] + edge[1]) / n
+                return min(1.0, avg_acc / 100.0)
+
+            edge = conn.execute(
+                select(func.count(),
+                       func.coalesce(func.sum(case((_outcomes.c.correct_direction, 1), else_=0)), 0))
+                .where(_outcomes.c.asset_id == asset_id,
+                       _outcomes.c.closed_at >= cutoff,
+                       _outcomes.c.closed_at < next_day)
+            ).one()
+            n = days_after[2] + edge[0]
+            if not n:
+                return 0.5
+            return (days_after[3] + edge[1]) / n
 
-        correct = sum(1 for o in recent if o.get("correct_direction", False))
-        return correct / len(recent)
+    def _recent_evaluated(self, conn, asset_id: str, limit: int = 10) -> List[Dict]:
+        rows = conn.execute(
+            select(_predictions)
+            .where(_predictions.c.asset_id == asset_id, _predictions.c.actual_price.is_not(None))
+            .order_by(_predictions.c.id.desc())
+            .limit(limit)
+        ).all()
+        return [_prediction_dict(r) for r in reversed(rows)]
 
     def get_accuracy(self, asset_id: Optional[str] = None) -> Dict:
         """
         Get accuracy statistics
-        
+
         Args:
             asset_id: Optional asset ID to filter
-        
+
         Returns:
             Accuracy statistics
         """
-        if asset_id:
-            if asset_id not in self.accuracy_data:
-                return {
-                    "asset_id": asset_id,
-                    "total_predictions": 0,
-                    "evaluated_predictions": 0,
-                    "average_accuracy": 0.0,
-                    "average_error_pct": 0.0
-                }
-            
-            asset_data = self.accuracy_data[asset_id]
-            predictions = asset_data["predictions"]
-            evaluated = [p for p in predictions if "actual_price" in p]
-            
-            if not evaluated:
+        with read_conn(self.engine) as conn:
+            if asset_id:
+                stats = conn.execute(
+                    select(_asset_stats).where(_asset_stats.c.asset_id == asset_id)
+                ).first()
+                if stats is None or not stats.evaluated_predictions:
+                    return {
+                        "asset_id": asset_id,
+                        "total_predictions": stats.total_predictions if stats else 0,
+                        "evaluated_predictions": 0,
+                        "average_accuracy": 0.0,
+                        "average_error_pct": 0.0
+                    }
+
+                n = stats.evaluated_predictions
                 return {
                     "asset_id": asset_id,
-                    "total_predictions": len(predictions),
-                    "evaluated_predictions": 0,
-                    "average_accuracy": 0.0,
-                    "average_error_pct": 0.0
+                    "total_predictions": stats.total_predictions,
+                    "evaluated_predictions": n,
+                    "average_accuracy": round(stats.accuracy_sum / n, 2),
+                    "average_error_pct": round(stats.error_pct_sum / n, 2),
+                    "recent_predictions": self._recent_evaluated(conn, asset_id)  # Last 10
                 }
-            
-            avg_accuracy = sum(p.get("accuracy", 0) for p in evaluated) / len(evaluated)
-            avg_error_pct = sum(p.get("error_pct", 0) for p in evaluated) / len(evaluated)
-            
-            return {
-                "asset_id": asset_id,
-                "total_predictions": len(predictions),
-                "evaluated_predictions": len(evaluated),
-                "average_accuracy": round(avg_accuracy, 2),
-                "average_error_pct": round(avg_error_pct, 2),
-                "recent_predictions": evaluated[-10:]  # Last 10
-            }
-        
-        # Overall accuracy
-        all_evaluated = []
-        for asset_data in self.accuracy_data.values():
-            evaluated = [p for p in asset_data["predictions"] if "actual_price" in p]
-            all_evaluated.extend(evaluated)
-        
-        if not all_evaluated:
+
+            # Overall accuracy
+            all_stats = conn.execute(select(_asset_stats).order_by(_asset_stats.c.asset_id)).all()
+
+        total_predictions = sum(s.total_predictions for s in all_stats)
+        evaluated = sum(s.evaluated_predictions for s in all_stats)
+        if not evaluated:
             return {
-                "total_predictions": sum(len(d["predictions"]) for d in self.accuracy_data.values()),
+                "total_predictions": total_predictions,
                 "evaluated_predictions": 0,
                 "average_accuracy": 0.0,
                 "average_error_pct": 0.0,
                 "by_asset": {}
             }
-        
-        avg_accuracy = sum(p.get("accuracy", 0) for p in all_evaluated) / len(all_evaluated)
-        avg_error_pct = sum(p.get("error_pct", 0) for p in all_evaluated) / len(all_evaluated)
-        
-        # By asset
-        by_asset = {}
-        for asset_id, asset_data in self.accuracy_data.items():
-            evaluated = [p for p in asset_data["predictions"] if "actual_price" in p]
-            if evaluated:
-                by_asset[asset_id] = {
-                    "evaluated": len(evaluated),
-                    "avg_accuracy": sum(p.get("accuracy", 0) for p in evaluated) / len(evaluated)
-                }
-        
+
         return {
-            "total_predictions": sum(len(d["predictions"]) for d in self.accuracy_data.values()),
-            "evaluated_predictions": len(all_evaluated),
-            "average_accuracy": round(avg_accuracy, 2),
-            "average_error_pct": round(avg_error_pct, 2),
-            "by_asset": by_asset
+            "total_predictions": total_predictions,
+            "evaluated_predictions": evaluated,
+            "average_accuracy": round(sum(s.accuracy_sum for s in all_stats) / evaluated, 2),
+            "average_error_pct": round(sum(s.error_pct_sum for s in all_stats) / evaluated, 2),
+            "by_asset": {
+                s.asset_id: {
+                    "evaluated": s.evaluated_predictions,
+                    "avg_accuracy": s.accuracy_sum / s.evaluated_predictions,
+                }
+                for s in all_stats if s.evaluated_predictions
+            }
         }
 
 
 # Global instance
 accuracy_tracker = AccuracyTracker()
-
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import text
 
@@ -81,6 +81,8 @@ ACHIEVEMENTS: List[Dict] = [
 
 _ACHIEVEMENT_MAP = {a["id"]: a for a in ACHIEVEMENTS}
 
+PREDICTIONS_VIEWED_THRESHOLD = 50
+
 
 def get_achievement(achievement_id: str) -> Optional[Dict]:
     return _ACHIEVEMENT_MAP.get(achievement_id)
@@ -230,6 +232,19 @@ def _increment_predictions_view_count(user_id: int, increment: int = 1) -> int:
         db.close()
 
 
+def _count_prediction_views(user_id: int, increment: int = 1) -> Tuple[int, int]:
+    """(before, after) view counts; Redis counter when available, else the profile blob."""
+    from services.usage_counters import usage_counters
+
+    try:
+        if usage_counters.available():
+            return usage_counters.add_views(user_id, increment)
+    except Exception:
+        pass
+    # The DB path re-checks the threshold every time, as before.
+    return 0, _increment_predictions_view_count(user_id, increment)
+
+
 def check_and_award(user_id: int, event_type: str, data: Optional[Dict] = None) -> List[Dict]:
     """
     Called after significant events.
@@ -259,8 +274,8 @@ def check_and_award(user_id: int, event_type: str, data: Optional[Dict] = None)
         _award_if_new(user_id, "auto_first", earned)
 
     if event_type == "predictions_viewed":
-        seen = _increment_predictions_view_count(user_id, int(payload.get("count", 1) or 1))
-        if seen >= 50:
+        before, seen = _count_prediction_views(user_id, int(payload.get("count", 1) or 1))
+        if before < PREDICTIONS_VIEWED_THRESHOLD <= seen:
             _award_if_new(user_id, "predictions_50", earned)
 
     if event_type == "daily_login":
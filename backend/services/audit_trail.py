@@ -26,6 +26,10 @@ Usage:
 import logging
 from typing import Dict, List, Optional
 
+from sqlalchemy import text
+
+from database.keyset import decode_cursor, keyset_before
+
 logger = logging.getLogger(__name__)
 
 VALID_DOMAINS = {
@@ -35,6 +39,14 @@ VALID_DOMAINS = {
 
 VALID_SEVERITIES = {"info", "warning", "critical"}
 
+# user_id 0 holds events emitted without a user.
+_BUMP_ROLLUP_SQL = text("""
+    INSERT INTO audit_event_rollups (user_id, event_domain, severity, event_count)
+    VALUES (:user_id, :domain, :severity, 1)
+    ON CONFLICT (user_id, event_domain, severity)
+    DO UPDATE SET event_count = audit_event_rollups.event_count + 1
+""")
+
 
 def emit_audit(
     domain: str,
@@ -71,6 +83,7 @@ def emit_audit(
             payload_json=payload or {},
         )
         db.add(row)
+        db.execute(_BUMP_ROLLUP_SQL, {"user_id": user_id or 0, "domain": domain, "severity": severity})
         db.commit()
         row_id = row.id
         db.close()
@@ -88,8 +101,14 @@ def get_audit_trail(
     entity_type: Optional[str] = None,
     entity_id: Optional[int] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
 ) -> List[Dict]:
-    """Query the unified audit trail with optional filters."""
+    """Query the unified audit trail with optional filters, newest first.
+
+    ``cursor`` (from database.keyset.next_cursor) continues after the last
+    row of the previous page.
+    """
+    position = decode_cursor(cursor)
     try:
         from database.connection import SessionLocal
         from database.models import AuditEvent
@@ -107,10 +126,12 @@ def get_audit_trail(
             query = query.filter(AuditEvent.entity_type == entity_type)
             if entity_id is not None:
                 query = query.filter(AuditEvent.entity_id == entity_id)
+        if position is not None:
+            query = query.filter(keyset_before(AuditEvent.created_at, AuditEvent.id, position))
 
         rows = (
             query
-            .order_by(AuditEvent.created_at.desc())
+            .order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc())
             .limit(min(limit, 500))
             .all()
         )
@@ -140,24 +161,24 @@ def get_audit_trail(
 def get_audit_summary(
     user_id: Optional[int] = None,
 ) -> Dict:
-    """Get aggregated audit event counts by domain and severity."""
+    """Get aggregated audit event counts by domain and severity (from audit_event_rollups)."""
     try:
         from database.connection import SessionLocal
-        from database.models import AuditEvent
+        from database.models import AuditEventRollup
         from sqlalchemy import func
 
         db = SessionLocal()
         query = db.query(
-            AuditEvent.event_domain,
-            AuditEvent.severity,
-            func.count(AuditEvent.id).label("count"),
+            AuditEventRollup.event_domain,
+            AuditEventRollup.severity,
+            func.sum(AuditEventRollup.event_count).label("count"),
         )
         if user_id is not None:
-            query = query.filter(AuditEvent.user_id == user_id)
+            query = query.filter(AuditEventRollup.user_id == user_id)
 
         rows = (
             query
-            .group_by(AuditEvent.event_domain, AuditEvent.severity)
+            .group_by(AuditEventRollup.event_domain, AuditEventRollup.severity)
             .all()
         )
         db.close()
@@ -166,9 +187,10 @@ def get_audit_summary(
         by_severity = {}
         total = 0
         for r in rows:
-            by_domain[r.event_domain] = by_domain.get(r.event_domain, 0) + r.count
-            by_severity[r.severity] = by_severity.get(r.severity, 0) + r.count
-            total += r.count
+            count = int(r.count or 0)
+            by_domain[r.event_domain] = by_domain.get(r.event_domain, 0) + count
+            by_severity[r.severity] = by_severity.get(r.severity, 0) + count
+            total += count
 
         return {"total": total, "by_domain": by_domain, "by_severity": by_severity}
 
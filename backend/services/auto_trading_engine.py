@@ -105,6 +105,9 @@ class AutoTradingEngine:
         self.trade_log: List[dict] = []
         self.user_runtime: Dict[int, dict] = {}
         self._last_dca_check_by_user: Dict[int, datetime] = {}
+        # Serialises per-user context swaps between the scan loop and tick-driven exits.
+        self._context_lock = asyncio.Lock()
+        self._broker_factory: Optional[Callable] = None
 
     def _ensure_user_runtime(self, user_id: int) -> dict:
         if user_id not in self.user_runtime:
@@ -136,6 +139,11 @@ class AutoTradingEngine:
             "total_auto_trades": int(self.total_auto_trades),
             "last_run": self.last_run,
         }
+        try:
+            from services.exit_engine import exit_engine
+            exit_engine.sync_user(user_id, self.open_positions, float(self.config.get("trail_pct", 2.0)))
+        except Exception as e:
+            logger.debug(f"[auto-trader] exit engine sync failed for user={user_id}: {e}")
 
     def get_user_status(self, user_id: int) -> dict:
         ctx = self._ensure_user_runtime(user_id)
@@ -507,6 +515,31 @@ class AutoTradingEngine:
             if trailing_stop_service.should_stop(position, current_price=current_price):
                 self._close_position(symbol, current_price=current_price, user_id=user_id, reason="trailing_stop")
 
+    async def close_position_on_tick(self, user_id: int, symbol: str, price: float, reason: str = "trailing_stop") -> Optional[dict]:
+        """Close a user's position from the realtime tick stream once its stop is crossed."""
+        from services.trailing_stop import trailing_stop_service
+
+        uid = int(user_id)
+        async with self._context_lock:
+            if self._broker_factory is None:
+                return None
+            self._load_user_context(uid)
+            try:
+                position = self.open_positions.get(symbol)
+                if not position or not trailing_stop_service.should_stop(position, current_price=price):
+                    return None
+                broker = self._broker_factory(uid)
+                if not broker:
+                    return None
+                self.broker = broker
+                self._log_event("TICK_EXIT", f"{symbol}: stop crossed at ${float(price):.4f}")
+                # DB and broker I/O: keep it off the event loop (the context stays locked).
+                return await asyncio.to_thread(
+                    self._close_position, symbol, current_price=price, user_id=uid, reason=reason,
+                )
+            finally:
+                self._save_user_context(uid)
+
     def _check_circuit_breaker_pause(self, user_id: Optional[int]) -> bool:
         if user_id is None:
             return False
@@ -1144,6 +1177,105 @@ class AutoTradingEngine:
         self.is_running = False
         self._log_event("ENGINE_STOP", "Auto trading engine stopped")
 
+    async def _run_user_cycle(
+        self,
+        uid: int,
+        get_predictions_func: Callable,
+        get_broker_for_user_func: Callable,
+        get_user_config_func: Optional[Callable] = None,
+    ):
+        """Run one autopilot scan for a single user.
+
+        ``_context_lock`` is held only while this user's context is loaded;
+        the slow prediction fetch runs without it so tick-driven exits for
+        this and other users are not held up behind it.
+        """
+        async with self._context_lock:
+            broker = self._prepare_user_cycle(uid, get_broker_for_user_func, get_user_config_func)
+        if broker is None:
+            return
+
+        predictions = await get_predictions_func(uid)
+
+        async with self._context_lock:
+            self._load_user_context(uid)
+            self.broker = broker
+            try:
+                # Pre-filter at the lowest possible dynamic threshold (LOW regime).
+                # Per-symbol volatility-adjusted gating happens in place_auto_order.
+                high_conf = [
+                    p for p in predictions
+                    if p.get("confidence", 0) >= 0.60
+                ]
+
+                for prediction in high_conf:
+                    result = await asyncio.to_thread(self.place_auto_order, prediction, user_id=uid)
+                    if result:
+                        self.total_auto_trades += 1
+                        self._evaluate_circuit_breaker(uid)
+            finally:
+                self._save_user_context(uid)
+
+    def _prepare_user_cycle(
+        self,
+        uid: int,
+        get_broker_for_user_func: Callable,
+        get_user_config_func: Optional[Callable] = None,
+    ):
+        """Pre-scan upkeep for one user. Returns the broker to trade with, or None to skip. Caller holds ``_context_lock``."""
+        self._load_user_context(uid)
+        try:
+            # Refresh config from persistent user settings if provided.
+            if get_user_config_func:
+                cfg = get_user_config_func(uid) or {}
+                self.config.update(cfg)
+
+            broker = get_broker_for_user_func(uid)
+            if not broker:
+                self._log_event("SKIP", f"user={uid}: no connected broker")
+                return None
+
+            self.broker = broker
+            self.last_run = datetime.utcnow().isoformat()
+
+            if not self.config.get("enabled", False):
+                return None
+
+            last_dca = self._last_dca_check_by_user.get(uid)
+            now = datetime.utcnow()
+            if not last_dca or (now - last_dca).total_seconds() >= 60:
+                try:
+                    executed_dca = check_pending_dca_orders(uid, broker)
+                    for item in executed_dca:
+                        sym = item.get("symbol")
+                        if sym in self.open_positions:
+                            pos = dict(self.open_positions[sym])
+                            old_qty = float(pos.get("quantity") or 0.0)
+                            old_price = float(pos.get("entry_price") or 0.0)
+                            add_qty = float(item.get("quantity") or 0.0)
+                            add_price = float(item.get("executed_price") or 0.0)
+                            if add_qty > 0:
+                                total_qty = old_qty + add_qty
+                                if total_qty > 0:
+                                    pos["entry_price"] = ((old_qty * old_price) + (add_qty * add_price)) / total_qty
+                                    pos["quantity"] = total_qty
+                                    self.open_positions[sym] = pos
+                        self._log_event("DCA_EXECUTED", f"{sym}: BUY @ ${float(item.get('executed_price') or 0):.4f}", item)
+                except Exception as e:
+                    self._log_event("DCA_CHECK_ERROR", f"user={uid}: {type(e).__name__}: {e}")
+                self._last_dca_check_by_user[uid] = now
+
+            # Always maintain trailing stops on each scan before opening new positions.
+            self._update_trailing_stops(uid)
+            self._evaluate_circuit_breaker(uid)
+
+            # Circuit breaker pause prevents opening new auto-trades.
+            if self._check_circuit_breaker_pause(uid):
+                return None
+            return broker
+        finally:
+            self._save_user_context(uid)
+
     async def run_per_user(
         self,
         get_predictions_func: Callable,
@@ -1153,6 +1285,7 @@ class AutoTradingEngine:
     ):
         """Run isolated auto-trading cycles for all users with enabled autopilot."""
         self.is_running = True
+        self._broker_factory = get_broker_for_user_func
         self._log_event("ENGINE_START", "Per-user auto trading engine started")
         logger.info("[auto-trader] Per-user engine started")
 
@@ -1166,74 +1299,12 @@ class AutoTradingEngine:
                     except Exception:
                         continue
 
-                    self._load_user_context(uid)
-
-                    # Refresh config from persistent user settings if provided.
-                    if get_user_config_func:
-                        cfg = get_user_config_func(uid) or {}
-                        self.config.update(cfg)
-
-                    broker = get_broker_for_user_func(uid)
-                    if not broker:
-                        self._log_event("SKIP", f"user={uid}: no connected broker")
-                        self._save_user_context(uid)
-                        continue
-
-                    self.broker = broker
-                    self.last_run = datetime.utcnow().isoformat()
-
-                    if not self.config.get("enabled", False):
-                        self._save_user_context(uid)
-                        continue
-
-                    last_dca = self._last_dca_check_by_user.get(uid)
-                    now = datetime.utcnow()
-                    if not last_dca or (now - last_dca).total_seconds() >= 60:
-                        try:
-                            executed_dca = check_pending_dca_orders(uid, broker)
-                            for item in executed_dca:
-                                sym = item.get("symbol")
-                                if sym in self.open_positions:
-                                    pos = dict(self.open_positions[sym])
-                                    old_qty = float(pos.get("quantity") or 0.0)
-                                    old_price = float(pos.get("entry_price") or 0.0)
-                                    add_qty = float(item.get("quantity") or 0.0)
-                                    add_price = float(item.get("executed_price") or 0.0)
-                                    if add_qty > 0:
-                                        total_qty = old_qty + add_qty
-                                        if total_qty > 0:
-                                            pos["entry_price"] = ((old_qty * old_price) + (add_qty * add_price)) / total_qty
-                                            pos["quantity"] = total_qty
-                                            self.open_positions[sym] = pos
-                                self._log_event("DCA_EXECUTED", f"{sym}: BUY @ ${float(item.get('executed_price') or 0):.4f}", item)
-                        except Exception as e:
-                            self._log_event("DCA_CHECK_ERROR", f"user={uid}: {type(e).__name__}: {e}")
-                        self._last_dca_check_by_user[uid] = now
-
-                    # Always maintain trailing stops on each scan before opening new positions.
-                    self._update_trailing_stops(uid)
-                    self._evaluate_circuit_breaker(uid)
-
-                    # Circuit breaker pause prevents opening new auto-trades.
-                    if self._check_circuit_breaker_pause(uid):
-                        self._save_user_context(uid)
-                        continue
-
-                    predictions = await get_predictions_func(uid)
-                    # Pre-filter at the lowest possible dynamic threshold (LOW regime).
-                    # Per-symbol volatility-adjusted gating happens in place_auto_order.
-                    high_conf = [
-                        p for p in predictions
-                        if p.get("confidence", 0) >= 0.60
-                    ]
-
-                    for prediction in high_conf:
-                        result = await asyncio.to_thread(self.place_auto_order, prediction, user_id=uid)
-                        if result:
-                            self.total_auto_trades += 1
-                            self._evaluate_circuit_breaker(uid)
-
-                    self._save_user_context(uid)
+                    await self._run_user_cycle(
+                        uid,
+                        get_predictions_func,
+                        get_broker_for_user_func,
+                        get_user_config_func,
+                    )
 
             except Exception as e:
                 logger.error(f"[auto-trader] Per-user loop error: {e}")
@@ -6,6 +6,7 @@ from typing import Dict, List, Optional
 from sqlalchemy import text
 
 from database.connection import SessionLocal
+from database.schema_registry import ensure_schema, register_schema
 
 
 def calculate_dca_plan(symbol, total_amount, current_price, num_entries=3):
@@ -39,27 +40,25 @@ def calculate_dca_plan(symbol, total_amount, current_price, num_entries=3):
     ][: max(1, int(num_entries or 3))]
 
 
+register_schema("dca_orders", (
+    """
+    CREATE TABLE IF NOT EXISTS dca_orders (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER REFERENCES users(id),
+        symbol VARCHAR NOT NULL,
+        target_price FLOAT NOT NULL,
+        size_usd FLOAT NOT NULL,
+        status VARCHAR DEFAULT 'pending',
+        executed_at TIMESTAMP,
+        created_at TIMESTAMP DEFAULT NOW()
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_dca_orders_user_status ON dca_orders (user_id, status, created_at DESC)",
+))
+
+
 def _ensure_table() -> None:
-    db = SessionLocal()
-    try:
-        db.execute(text("""
-            CREATE TABLE IF NOT EXISTS dca_orders (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER REFERENCES users(id),
-                symbol VARCHAR NOT NULL,
-                target_price FLOAT NOT NULL,
-                size_usd FLOAT NOT NULL,
-                status VARCHAR DEFAULT 'pending',
-                executed_at TIMESTAMP,
-                created_at TIMESTAMP DEFAULT NOW()
-            )
-        """))
-        db.execute(text("CREATE INDEX IF NOT EXISTS ix_dca_orders_user_status ON dca_orders (user_id, status, created_at DESC)"))
-        db.commit()
-    except Exception:
-        db.rollback()
-    finally:
-        db.close()
+    ensure_schema("dca_orders")
 
 
 def _size_to_quantity(broker, symbol: str, size_usd: float, price: float) -> float:
@@ -4,11 +4,17 @@ Saves AI decision explanations to the relational explainability schema:
   - ai_decision_events       (append-only fact table)
   - ai_decision_reason_codes (append-only, FK to event, queryable by code)
   - ai_decision_counterfactuals (append-only, FK to event)
+  - ai_decision_reason_code_rollups (running counts per symbol/code)
 """
 
 import logging
+from collections import Counter, defaultdict
 from typing import Dict, List, Optional
 
+from sqlalchemy import text
+
+from database.keyset import decode_cursor, keyset_before
+
 logger = logging.getLogger(__name__)
 
 # ── Reason code → category mapping ────────────────────────────
@@ -56,6 +62,14 @@ def _classify_code(code: str) -> str:
     return CODE_CATEGORIES.get(code, "context")
 
 
+_BUMP_ROLLUP_SQL = text("""
+    INSERT INTO ai_decision_reason_code_rollups (symbol, code, category, event_count)
+    VALUES (:symbol, :code, :category, :n)
+    ON CONFLICT (symbol, code, category)
+    DO UPDATE SET event_count = ai_decision_reason_code_rollups.event_count + EXCLUDED.event_count
+""")
+
+
 def save_decision_event(
     explanation,
     user_id: Optional[int] = None,
@@ -100,7 +114,9 @@ def save_decision_event(
         db.flush()  # get event.id for FK inserts
 
         # ── 2. Insert reason codes (relational, not JSON) ──
+        rollup = Counter()
         for code in explanation.reason_codes:
+            rollup[(code, _classify_code(code))] += 1
             db.add(AIDecisionReasonCode(
                 decision_event_id=event.id,
                 code=code,
@@ -110,6 +126,7 @@ def save_decision_event(
 
         # Blocked-by codes as risk-category reason codes
         for blocked in explanation.blocked_by:
+            rollup[("RISK_BLOCK", "risk")] += 1
             db.add(AIDecisionReasonCode(
                 decision_event_id=event.id,
                 code="RISK_BLOCK",
@@ -119,6 +136,7 @@ def save_decision_event(
 
         # Sizing adjustments as sizing-category reason codes
         for adj in explanation.sizing_adjustments:
+            rollup[("SIZE_ADJUSTED", "sizing")] += 1
             db.add(AIDecisionReasonCode(
                 decision_event_id=event.id,
                 code="SIZE_ADJUSTED",
@@ -126,6 +144,12 @@ def save_decision_event(
                 detail_text=adj,
             ))
 
+        if rollup:
+            db.execute(_BUMP_ROLLUP_SQL, [
+                {"symbol": event.symbol, "code": code, "category": category, "n": n}
+                for (code, category), n in rollup.items()
+            ])
+
         # ── 3. Insert counterfactuals ──
         for item in explanation.why_not_opposite:
             db.add(AIDecisionCounterfactual(
@@ -194,11 +218,13 @@ def get_decision_history(
     user_id: Optional[int] = None,
     symbol: Optional[str] = None,
     limit: int = 20,
+    cursor: Optional[str] = None,
 ) -> List[Dict]:
     """
     Query decision history with reason codes and counterfactuals.
-    Filter by user_id and/or symbol.
+    Filter by user_id and/or symbol; ``cursor`` continues after the previous page.
     """
+    position = decode_cursor(cursor)
     try:
         from database.connection import SessionLocal
         from database.models import (
@@ -212,28 +238,40 @@ def get_decision_history(
             query = query.filter(AIDecisionEvent.user_id == user_id)
         if symbol:
             query = query.filter(AIDecisionEvent.symbol == symbol.upper())
+        if position is not None:
+            query = query.filter(keyset_before(AIDecisionEvent.created_at, AIDecisionEvent.id, position))
 
         events = (
             query
-            .order_by(AIDecisionEvent.created_at.desc())
+            .order_by(AIDecisionEvent.created_at.desc(), AIDecisionEvent.id.desc())
             .limit(limit)
             .all()
         )
 
-        results = []
-        for ev in events:
-            # Fetch reason codes for this event
-            codes = (
+        # Batch-fetch child rows for the whole page
+        event_ids = [ev.id for ev in events]
+        codes_by_event = defaultdict(list)
+        cfs_by_event = defaultdict(list)
+        if event_ids:
+            for rc in (
                 db.query(AIDecisionReasonCode)
-                .filter(AIDecisionReasonCode.decision_event_id == ev.id)
+                .filter(AIDecisionReasonCode.decision_event_id.in_(event_ids))
+                .order_by(AIDecisionReasonCode.id)
                 .all()
-            )
-            # Fetch counterfactuals for this event
-            cfs = (
+            ):
+                codes_by_event[rc.decision_event_id].append(rc)
+            for cf in (
                 db.query(AIDecisionCounterfactual)
-                .filter(AIDecisionCounterfactual.decision_event_id == ev.id)
+                .filter(AIDecisionCounterfactual.decision_event_id.in_(event_ids))
+                .order_by(AIDecisionCounterfactual.id)
                 .all()
-            )
+            ):
+                cfs_by_event[cf.decision_event_id].append(cf)
+
+        results = []
+        for ev in events:
+            codes = codes_by_event[ev.id]
+            cfs = cfs_by_event[ev.id]
 
             results.append({
                 "id": ev.id,
@@ -281,40 +319,35 @@ def get_reason_code_stats(
 ) -> List[Dict]:
     """
     Aggregate reason code frequency — useful for analytics.
-    Returns top N codes by occurrence count.
+    Returns top N codes by occurrence count, read from the per-symbol rollup.
     """
     try:
         from database.connection import SessionLocal
-        from database.models import AIDecisionReasonCode, AIDecisionEvent
+        from database.models import AIDecisionReasonCodeRollup
         from sqlalchemy import func
 
         db = SessionLocal()
-        query = (
-            db.query(
-                AIDecisionReasonCode.code,
-                AIDecisionReasonCode.category,
-                func.count(AIDecisionReasonCode.id).label("count"),
-            )
+        total = func.sum(AIDecisionReasonCodeRollup.event_count)
+        query = db.query(
+            AIDecisionReasonCodeRollup.code,
+            AIDecisionReasonCodeRollup.category,
+            total.label("count"),
         )
 
         if symbol:
-            query = (
-                query
-                .join(AIDecisionEvent, AIDecisionReasonCode.decision_event_id == AIDecisionEvent.id)
-                .filter(AIDecisionEvent.symbol == symbol.upper())
-            )
+            query = query.filter(AIDecisionReasonCodeRollup.symbol == symbol.upper())
 
         rows = (
             query
-            .group_by(AIDecisionReasonCode.code, AIDecisionReasonCode.category)
-            .order_by(func.count(AIDecisionReasonCode.id).desc())
+            .group_by(AIDecisionReasonCodeRollup.code, AIDecisionReasonCodeRollup.category)
+            .order_by(total.desc())
             .limit(limit)
             .all()
         )
 
         db.close()
         return [
-            {"code": r.code, "category": r.category, "count": r.count}
+            {"code": r.code, "category": r.category, "count": int(r.count or 0)}
             for r in rows
         ]
 
@@ -0,0 +1,267 @@
+"""Tick-driven trailing-stop and exit engine.
+
+The autopilot scan maintains trailing stops once per ``check_interval``. This
+engine subscribes to ``BinanceWebSocketFeed`` ticks instead and keeps, per
+symbol, heap indexes of every open position's stop level and of the price at
+which its trailing stop would ratchet. A tick only touches the positions whose
+thresholds it actually crosses, so the per-tick cost is proportional to the
+affected positions rather than to everything that is open.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from services.trailing_stop import trailing_stop_service
+
+logger = logging.getLogger(__name__)
+
+# Rebuild a symbol's heaps once lazily-deleted entries outnumber live ones by this factor.
+_COMPACT_FACTOR = 4
+_COMPACT_MIN_SIZE = 64
+
+_Key = Tuple[int, str]
+
+
+class _SymbolBook:
+    """Per-symbol stop and ratchet heaps for long and short positions.
+
+    Longs stop out when ``price <= stop`` (max-heap on stop) and ratchet when
+    ``price > stop / (1 - trail)`` (min-heap on that threshold). Shorts mirror
+    this. Entries carry the position version they were pushed for; entries
+    whose version no longer matches are discarded when popped.
+    """
+
+    __slots__ = ("long_stops", "long_ratchets", "short_stops", "short_ratchets", "keys")
+
+    def __init__(self):
+        self.long_stops: List[tuple] = []
+        self.long_ratchets: List[tuple] = []
+        self.short_stops: List[tuple] = []
+        self.short_ratchets: List[tuple] = []
+        self.keys: set = set()
+
+    def size(self) -> int:
+        return len(self.long_stops) + len(self.long_ratchets) + len(self.short_stops) + len(self.short_ratchets)
+
+
+class TickExitEngine:
+    """Indexes open autopilot positions by symbol and exits them on the crossing tick."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._books: Dict[str, _SymbolBook] = {}
+        # (user_id, symbol) -> (version, position, trail fraction, indexed stop)
+        self._entries: Dict[_Key, Tuple[int, dict, float, float]] = {}
+        self._user_symbols: Dict[int, set] = {}
+        self._pending_exits: set = set()
+        self._seq = itertools.count()
+        self._engine = None
+        self.stats = {"ticks": 0, "ratchets": 0, "exits_triggered": 0}
+
+    # ── Wiring ────────────────────────────────────────────────────────────
+
+    def start(self, engine) -> None:
+        """Attach to an ``AutoTradingEngine`` and subscribe to the realtime tick stream."""
+        from services.websocket_feed import add_tick_listener
+
+        self._engine = engine
+        add_tick_listener(self.on_tick)
+        logger.info("[EXIT_ENGINE] subscribed to realtime tick stream")
+
+    def stop(self) -> None:
+        from services.websocket_feed import remove_tick_listener
+
+        remove_tick_listener(self.on_tick)
+        self._engine = None
+
+    # ── Index maintenance ─────────────────────────────────────────────────
+
+    def sync_user(self, user_id: int, open_positions: Dict[str, dict], trail_pct: float = 2.0) -> None:
+        """Replace the indexed positions for ``user_id`` with ``open_positions``."""
+        uid = int(user_id)
+        trail = max(0.1, float(trail_pct)) / 100.0
+        with self._lock:
+            previous = self._user_symbols.get(uid, set())
+            current = set()
+            for symbol, position in (open_positions or {}).items():
+                sym = str(symbol or "").upper()
+                if not sym or float(position.get("quantity") or 0.0) <= 0:
+                    continue
+                current.add(sym)
+                if (uid, sym) not in self._pending_exits:
+                    self._index_position((uid, sym), position, trail)
+            for sym in previous - current:
+                self._drop((uid, sym))
+            if current:
+                self._user_symbols[uid] = current
+            else:
+                self._user_symbols.pop(uid, None)
+
+    def remove_position(self, user_id: int, symbol: str) -> None:
+        with self._lock:
+            key = (int(user_id), str(symbol or "").upper())
+            self._drop(key)
+            syms = self._user_symbols.get(key[0])
+            if syms is not None:
+                syms.discard(key[1])
+
+    def indexed_count(self) -> int:
+        return len(self._entries)
+
+    def _index_position(self, key: _Key, position: dict, trail: float) -> None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is position and entry[2] == trail and entry[3] == self._stop_of(position):
+            return
+        book = self._books.get(key[1])
+        if book is None:
+            book = self._books[key[1]] = _SymbolBook()
+        book.keys.add(key)
+        self._push(book, key, position, trail)
+        self._maybe_compact(key[1], book)
+
+    def _drop(self, key: _Key) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        book = self._books.get(key[1])
+        if book is not None:
+            book.keys.discard(key)
+            if not book.keys:
+                self._books.pop(key[1], None)
+
+    @staticmethod
+    def _stop_of(position: dict) -> float:
+        return float(position.get("trailing_stop") or position.get("stop_loss") or 0.0)
+
+    def _push(self, book: _SymbolBook, key: _Key, position: dict, trail: float) -> None:
+        version = next(self._seq)
+        stop = self._stop_of(position)
+        self._entries[key] = (version, position, trail, stop)
+        if str(position.get("side", "BUY")).upper() == "BUY":
+            if stop > 0:
+                heapq.heappush(book.long_stops, (-stop, version, key))
+            ratchet_at = stop / (1.0 - trail) if stop > 0 else 0.0
+            heapq.heappush(book.long_ratchets, (ratchet_at, version, key))
+        else:
+            if stop > 0:
+                heapq.heappush(book.short_stops, (stop, version, key))
+            # A short without a stop ratchets on the first tick.
+            ratchet_at = stop / (1.0 + trail) if stop > 0 else float("inf")
+            heapq.heappush(book.short_ratchets, (-ratchet_at, version, key))
+
+    def _maybe_compact(self, symbol: str, book: _SymbolBook) -> None:
+        if book.size() < max(_COMPACT_MIN_SIZE, _COMPACT_FACTOR * 2 * len(book.keys)):
+            return
+        fresh = _SymbolBook()
+        fresh.keys = set(book.keys)
+        for key in fresh.keys:
+            _, position, trail, _ = self._entries[key]
+            self._push(fresh, key, position, trail)
+        self._books[symbol] = fresh
+
+    def _is_current(self, version: int, key: _Key) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] == version
+
+    # ── Tick path ─────────────────────────────────────────────────────────
+
+    def on_tick(self, symbol: str, price: float, ts_ms: Optional[int] = None) -> List[_Key]:
+        """Ratchet stops and schedule exits for ``symbol`` at ``price``.
+
+        Returns the ``(user_id, symbol)`` keys whose stop was crossed.
+        """
+        sym = str(symbol or "").upper()
+        px = float(price or 0.0)
+        if px <= 0:
+            return []
+        with self._lock:
+            book = self._books.get(sym)
+            if book is None:
+                return []
+            self.stats["ticks"] += 1
+            self._ratchet(book, px)
+            crossed = self._collect_crossed(book, px)
+            if sym in self._books:
+                self._maybe_compact(sym, self._books[sym])
+        for key in crossed:
+            self._schedule_exit(key, px)
+        return crossed
+
+    def _ratchet(self, book: _SymbolBook, px: float) -> None:
+        moved: List[_Key] = []
+        while book.long_ratchets and book.long_ratchets[0][0] < px:
+            _, version, key = heapq.heappop(book.long_ratchets)
+            if self._is_current(version, key):
+                moved.append(key)
+        while book.short_ratchets and -book.short_ratchets[0][0] > px:
+            _, version, key = heapq.heappop(book.short_ratchets)
+            if self._is_current(version, key):
+                moved.append(key)
+
+        for key in moved:
+            _, position, trail, _ = self._entries[key]
+            new_stop, did_move, move_dir = trailing_stop_service.update_stop(
+                position, current_price=px, trail_pct=trail * 100.0
+            )
+            if did_move:
+                position["trailing_stop"] = new_stop
+                position["trailing_last_move"] = move_dir
+                position["trailing_move_count"] = int(position.get("trailing_move_count") or 0) + 1
+                self.stats["ratchets"] += 1
+            self._push(book, key, position, trail)
+
+    def _collect_crossed(self, book: _SymbolBook, px: float) -> List[_Key]:
+        crossed: List[_Key] = []
+        while book.long_stops and -book.long_stops[0][0] >= px:
+            _, version, key = heapq.heappop(book.long_stops)
+            if self._is_current(version, key):
+                crossed.append(key)
+        while book.short_stops and book.short_stops[0][0] <= px:
+            _, version, key = heapq.heappop(book.short_stops)
+            if self._is_current(version, key):
+                crossed.append(key)
+        for key in crossed:
+            self._drop(key)
+            self._pending_exits.add(key)
+        self.stats["exits_triggered"] += len(crossed)
+        return crossed
+
+    def _schedule_exit(self, key: _Key, px: float) -> None:
+        engine = self._engine
+        if engine is None:
+            self._pending_exits.discard(key)
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._pending_exits.discard(key)
+            logger.debug("[EXIT_ENGINE] no running loop; %s left for the next scan", key)
+            return
+        loop.create_task(self._run_exit(engine, key, px))
+
+    async def _run_exit(self, engine, key: _Key, px: float) -> None:
+        user_id, symbol = key
+        try:
+            await engine.close_position_on_tick(user_id, symbol, px, reason="trailing_stop")
+        except Exception as e:
+            logger.warning("[EXIT_ENGINE] exit failed for user=%s %s: %s", user_id, symbol, e)
+        finally:
+            self._pending_exits.discard(key)
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {
+                "attached": self._engine is not None,
+                "indexed_positions": len(self._entries),
+                "indexed_symbols": len(self._books),
+                "pending_exits": len(self._pending_exits),
+                **self.stats,
+            }
+
+
+exit_engine = TickExitEngine()
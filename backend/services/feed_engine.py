@@ -10,6 +10,8 @@ import logging
 from datetime import datetime, date
 from typing import Dict, List, Optional
 
+from database.keyset import decode_cursor
+
 logger = logging.getLogger(__name__)
 
 
@@ -98,10 +100,13 @@ def get_feed(
     event_type: Optional[str] = None,
     symbol: Optional[str] = None,
     severity: Optional[str] = None,
+    cursor: Optional[str] = None,
 ) -> List[Dict]:
     """
     Retrieve feed events, sorted newest first, deduplicated by design.
+    ``cursor`` continues after the last event of the previous page.
     """
+    position = decode_cursor(cursor)
     try:
         from database.connection import SessionLocal
         from sqlalchemy import text
@@ -118,6 +123,9 @@ def get_feed(
         if severity:
             conditions.append("severity = :sev")
             params["sev"] = severity
+        if position is not None:
+            conditions.append("(created_at, id) < (:cur_ts, :cur_id)")
+            params["cur_ts"], params["cur_id"] = position
 
         where = " AND ".join(conditions)
 
@@ -127,7 +135,7 @@ def get_feed(
                    reason_codes, metadata, created_at
             FROM feed_events
             WHERE {where}
-            ORDER BY created_at DESC
+            ORDER BY created_at DESC, id DESC
             LIMIT :lim
         """), params).fetchall()
         db.close()
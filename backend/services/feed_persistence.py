@@ -15,6 +15,8 @@ import logging
 from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional
 
+from database.keyset import decode_cursor, keyset_before
+
 logger = logging.getLogger(__name__)
 
 # ── Valid enums ──────────────────────────────────────────────────
@@ -139,6 +141,89 @@ def emit_feed_event(
         return None
 
 
+def _not_expired(now: datetime):
+    from database.models import PersistentFeedEvent
+
+    return (PersistentFeedEvent.expires_at.is_(None)) | (PersistentFeedEvent.expires_at > now)
+
+
+def _feed_statement(
+    user_id: int,
+    event_type: Optional[str],
+    priority: Optional[str],
+    symbol: Optional[str],
+    include_expired: bool,
+    limit: int,
+    position,
+):
+    """SELECT for one feed page; shared by the sync service and the async repository."""
+    from sqlalchemy import select
+    from database.models import PersistentFeedEvent
+
+    stmt = select(PersistentFeedEvent).where(PersistentFeedEvent.user_id == user_id)
+    if event_type:
+        stmt = stmt.where(PersistentFeedEvent.event_type == event_type)
+    if priority:
+        stmt = stmt.where(PersistentFeedEvent.priority == priority)
+    if symbol:
+        stmt = stmt.where(PersistentFeedEvent.related_symbol == symbol.upper())
+    if not include_expired:
+        stmt = stmt.where(_not_expired(datetime.utcnow()))
+    if position is not None:
+        stmt = stmt.where(keyset_before(PersistentFeedEvent.created_at, PersistentFeedEvent.id, position))
+    return (
+        stmt
+        .order_by(PersistentFeedEvent.created_at.desc(), PersistentFeedEvent.id.desc())
+        .limit(min(limit, 200))
+    )
+
+
+def _read_ids_statement(user_id: int, event_ids: List[int]):
+    from sqlalchemy import select
+    from database.models import FeedEventRead
+
+    return select(FeedEventRead.feed_event_id).where(
+        FeedEventRead.user_id == user_id,
+        FeedEventRead.feed_event_id.in_(event_ids),
+    )
+
+
+def _unread_statements(user_id: int):
+    """(total, read) count SELECTs over the user's non-expired events."""
+    from sqlalchemy import func, select
+    from database.models import PersistentFeedEvent, FeedEventRead
+
+    live = _not_expired(datetime.utcnow())
+    total = select(func.count(PersistentFeedEvent.id)).where(PersistentFeedEvent.user_id == user_id, live)
+    read = (
+        select(func.count(FeedEventRead.id))
+        .join(PersistentFeedEvent, FeedEventRead.feed_event_id == PersistentFeedEvent.id)
+        .where(FeedEventRead.user_id == user_id, PersistentFeedEvent.user_id == user_id, live)
+    )
+    return total, read
+
+
+def _feed_event_dict(e, read_ids: set) -> Dict:
+    return {
+        "id": e.id,
+        "source_type": e.source_type,
+        "event_type": e.event_type,
+        "priority": e.priority,
+        "title": e.title,
+        "short_summary": e.short_summary,
+        "full_explanation": e.full_explanation,
+        "related_symbol": e.related_symbol,
+        "confidence_score": e.confidence_score,
+        "risk_level": e.risk_level,
+        "action_suggestion": e.action_suggestion,
+        "source_reference_type": e.source_reference_type,
+        "source_reference_id": e.source_reference_id,
+        "is_read": e.id in read_ids,
+        "expires_at": e.expires_at.isoformat() if e.expires_at else None,
+        "created_at": e.created_at.isoformat() if e.created_at else None,
+    }
+
+
 def get_user_feed(
     user_id: int,
     event_type: Optional[str] = None,
@@ -146,81 +231,32 @@ def get_user_feed(
     symbol: Optional[str] = None,
     include_expired: bool = False,
     limit: int = 50,
+    cursor: Optional[str] = None,
 ) -> List[Dict]:
     """
     Get feed events for a user, newest first.
     Excludes expired events by default.
     Includes read/unread status per event.
+    ``cursor`` continues after the last event of the previous page.
     """
+    position = decode_cursor(cursor)
     try:
         from database.connection import SessionLocal
-        from database.models import PersistentFeedEvent, FeedEventRead
-        from sqlalchemy import and_
 
         db = SessionLocal()
-        query = db.query(PersistentFeedEvent).filter(
-            PersistentFeedEvent.user_id == user_id
-        )
-
-        if event_type:
-            query = query.filter(PersistentFeedEvent.event_type == event_type)
-        if priority:
-            query = query.filter(PersistentFeedEvent.priority == priority)
-        if symbol:
-            query = query.filter(PersistentFeedEvent.related_symbol == symbol.upper())
-        if not include_expired:
-            now = datetime.utcnow()
-            query = query.filter(
-                (PersistentFeedEvent.expires_at.is_(None)) |
-                (PersistentFeedEvent.expires_at > now)
-            )
-
-        events = (
-            query
-            .order_by(PersistentFeedEvent.created_at.desc())
-            .limit(min(limit, 200))
-            .all()
-        )
+        events = db.execute(
+            _feed_statement(user_id, event_type, priority, symbol, include_expired, limit, position)
+        ).scalars().all()
 
         # Batch-fetch read state for this user
         event_ids = [e.id for e in events]
         read_ids = set()
         if event_ids:
-            read_rows = (
-                db.query(FeedEventRead.feed_event_id)
-                .filter(
-                    and_(
-                        FeedEventRead.user_id == user_id,
-                        FeedEventRead.feed_event_id.in_(event_ids),
-                    )
-                )
-                .all()
-            )
-            read_ids = {r.feed_event_id for r in read_rows}
+            read_ids = set(db.execute(_read_ids_statement(user_id, event_ids)).scalars().all())
 
         db.close()
 
-        return [
-            {
-                "id": e.id,
-                "source_type": e.source_type,
-                "event_type": e.event_type,
-                "priority": e.priority,
-                "title": e.title,
-                "short_summary": e.short_summary,
-                "full_explanation": e.full_explanation,
-                "related_symbol": e.related_symbol,
-                "confidence_score": e.confidence_score,
-                "risk_level": e.risk_level,
-                "action_suggestion": e.action_suggestion,
-                "source_reference_type": e.source_reference_type,
-                "source_reference_id": e.source_reference_id,
-                "is_read": e.id in read_ids,
-                "expires_at": e.expires_at.isoformat() if e.expires_at else None,
-                "created_at": e.created_at.isoformat() if e.created_at else None,
-            }
-            for e in events
-        ]
+        return [_feed_event_dict(e, read_ids) for e in events]
 
     except Exception as e:
         logger.warning(f"[feed_persist] Failed to get feed: {e}")
@@ -231,33 +267,11 @@ def get_unread_count(user_id: int) -> int:
     """Count unread, non-expired feed events for a user."""
     try:
         from database.connection import SessionLocal
-        from database.models import PersistentFeedEvent, FeedEventRead
-        from sqlalchemy import func, and_
 
         db = SessionLocal()
-        now = datetime.utcnow()
-
-        total = (
-            db.query(func.count(PersistentFeedEvent.id))
-            .filter(
-                PersistentFeedEvent.user_id == user_id,
-                (PersistentFeedEvent.expires_at.is_(None)) |
-                (PersistentFeedEvent.expires_at > now),
-            )
-            .scalar()
-        ) or 0
-
-        read_count = (
-            db.query(func.count(FeedEventRead.id))
-            .join(PersistentFeedEvent, FeedEventRead.feed_event_id == PersistentFeedEvent.id)
-            .filter(
-                FeedEventRead.user_id == user_id,
-                PersistentFeedEvent.user_id == user_id,
-                (PersistentFeedEvent.expires_at.is_(None)) |
-                (PersistentFeedEvent.expires_at > now),
-            )
-            .scalar()
-        ) or 0
+        total_stmt, read_stmt = _unread_statements(user_id)
+        total = db.execute(total_stmt).scalar() or 0
+        read_count = db.execute(read_stmt).scalar() or 0
 
         db.close()
         return max(0, total - read_count)
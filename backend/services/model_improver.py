@@ -11,6 +11,7 @@ from sklearn.preprocessing import StandardScaler
 from sqlalchemy import text
 
 from database.connection import SessionLocal
+from database.schema_registry import ensure_schema, register_schema
 from ml.auto_trainer import (
     MODELS_DIR,
     TRAINING_SYMBOLS,
@@ -21,31 +22,29 @@ from ml.auto_trainer import (
 )
 
 
+register_schema("trade_feedback", (
+    """
+    CREATE TABLE IF NOT EXISTS trade_feedback (
+        id SERIAL PRIMARY KEY,
+        symbol VARCHAR NOT NULL,
+        action VARCHAR NOT NULL,
+        confidence_at_entry FLOAT,
+        entry_price FLOAT,
+        exit_price FLOAT,
+        pnl_pct FLOAT,
+        outcome VARCHAR,
+        features_snapshot JSONB,
+        created_at TIMESTAMP DEFAULT NOW()
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_trade_feedback_symbol_created ON trade_feedback (symbol, created_at DESC)",
+    "ALTER TABLE model_registry ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 1",
+    "ALTER TABLE model_registry ADD COLUMN IF NOT EXISTS improved_at TIMESTAMP",
+))
+
+
 def _ensure_schema() -> None:
-    db = SessionLocal()
-    try:
-        db.execute(text("""
-            CREATE TABLE IF NOT EXISTS trade_feedback (
-                id SERIAL PRIMARY KEY,
-                symbol VARCHAR NOT NULL,
-                action VARCHAR NOT NULL,
-                confidence_at_entry FLOAT,
-                entry_price FLOAT,
-                exit_price FLOAT,
-                pnl_pct FLOAT,
-                outcome VARCHAR,
-                features_snapshot JSONB,
-                created_at TIMESTAMP DEFAULT NOW()
-            )
-        """))
-        db.execute(text("CREATE INDEX IF NOT EXISTS ix_trade_feedback_symbol_created ON trade_feedback (symbol, created_at DESC)"))
-        db.execute(text("ALTER TABLE model_registry ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 1"))
-        db.execute(text("ALTER TABLE model_registry ADD COLUMN IF NOT EXISTS improved_at TIMESTAMP"))
-        db.commit()
-    except Exception:
-        db.rollback()
-    finally:
-        db.close()
+    ensure_schema("trade_feedback")
 
 
 def save_trade_feedback(
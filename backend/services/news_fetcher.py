@@ -2,18 +2,28 @@
 Real News Intelligence for AURA
 Fetches from 3 free sources, runs VADER sentiment analysis,
 produces per-symbol sentiment scores updated every 15 minutes.
+
+A refresh is a single ingestion pass: every source is fetched concurrently
+once, each unique article is scored once (memoized by content hash), and
+articles are mapped to symbols through one scan with a keyword automaton.
+Per-symbol sentiment is then assembled from that shared index, so scoring
+cost grows with articles rather than articles x symbols.
 """
 
 import logging
 import time
 import re
 import asyncio
-from typing import Dict, List, Optional
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Set
 from datetime import datetime
 
 import httpx
 
 from ml.news_fetcher import fetch_cryptopanic_news
+from utils.async_helpers import run_sync
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +58,81 @@ CRYPTO_NAMES = {
     "THETA": ["theta"],
 }
 
+COINDESK_RSS_URL = "https://www.coindesk.com/arc/outboundfeeds/rss/"
+COINTELEGRAPH_RSS_URL = "https://cointelegraph.com/rss"
+
+# Bounded memo of article text hash -> VADER compound.
+SCORE_MEMO_SIZE = 5000
+# Concurrent CryptoPanic requests; the anonymous endpoint rate-limits hard.
+CRYPTOPANIC_CONCURRENCY = 2
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over ``CRYPTO_NAMES`` keywords.
+
+    ``match(text)`` returns every base symbol with at least one keyword
+    occurring as a substring of ``text`` — the same semantics as checking
+    ``kw in text`` per keyword, but in a single pass over the text no matter
+    how many symbols are tracked.
+    """
+
+    def __init__(self, names: Dict[str, List[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[str]] = [set()]
+        for base, keywords in names.items():
+            for kw in keywords or [base.lower()]:
+                self._add(kw.lower(), base)
+        self._build()
+
+    def _add(self, keyword: str, base: str) -> None:
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(set())
+            state = nxt
+        self._out[state].add(base)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0) if self._goto[f].get(ch, 0) != nxt else 0
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def match(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+_automaton = KeywordAutomaton(CRYPTO_NAMES)
+
+
+def _base_symbol(symbol: str) -> str:
+    return symbol.replace("USDC", "").replace("USDT", "")
+
+
+def _article_text(article: dict) -> str:
+    return f"{article.get('title', '')} {article.get('summary', '')}"
+
 
 class NewsFetcher:
     """Fetches real crypto news from 3 free sources with VADER sentiment."""
@@ -57,6 +142,9 @@ class NewsFetcher:
         self._cache_ttl = 900  # 15 minutes
         self._articles_cache: Dict[str, dict] = {}
         self._sentiment_analyzer = None
+        self._score_memo: "OrderedDict[str, float]" = OrderedDict()
+        self._score_lock = threading.Lock()
+        self.stats = {"ingest_passes": 0, "articles_scored": 0, "score_memo_hits": 0}
 
     def _get_analyzer(self):
         """Lazy-load VADER to avoid import cost on startup."""
@@ -66,51 +154,60 @@ class NewsFetcher:
         return self._sentiment_analyzer
 
     # ── Source 1: CryptoPanic ────────────────────────────────
-
-    def _fetch_cryptopanic(self, symbol: str, base_symbol: str) -> List[dict]:
-        """Fetch articles from CryptoPanic free public API."""
-        try:
-            # Primary path: new async helper in ml/news_fetcher.py
-            target = symbol if symbol else f"{base_symbol}USDC"
-            try:
-                return asyncio.run(fetch_cryptopanic_news(target))
-            except RuntimeError:
-                # Fallback for environments with existing running loop.
-                loop = asyncio.new_event_loop()
-                try:
-                    return loop.run_until_complete(fetch_cryptopanic_news(target))
-                finally:
-                    loop.close()
-        except Exception as e:
-            logger.debug(f"CryptoPanic failed for {symbol}/{base_symbol}: {e}")
-            return []
+    # Fetched per symbol inside the shared ingestion loop (see _fetch_all).
 
     # ── Source 2: CoinDesk RSS ───────────────────────────────
 
     def _fetch_coindesk_rss(self) -> List[dict]:
         """Fetch articles from CoinDesk RSS feed."""
-        return self._parse_rss("https://www.coindesk.com/arc/outboundfeeds/rss/", "CoinDesk")
+        return self._parse_rss(COINDESK_RSS_URL, "CoinDesk")
 
     # ── Source 3: Cointelegraph RSS ──────────────────────────
 
     def _fetch_cointelegraph_rss(self) -> List[dict]:
         """Fetch articles from Cointelegraph RSS feed."""
-        return self._parse_rss("https://cointelegraph.com/rss", "Cointelegraph")
+        return self._parse_rss(COINTELEGRAPH_RSS_URL, "Cointelegraph")
 
-    def _parse_rss(self, url: str, source_name: str) -> List[dict]:
-        """Generic RSS parser."""
-        cache_key = f"rss:{source_name}"
-        cached = self._articles_cache.get(cache_key)
+    def _cached_rss(self, source_name: str) -> Optional[List[dict]]:
+        cached = self._articles_cache.get(f"rss:{source_name}")
         if cached and (time.time() - cached["fetched_at"]) < self._cache_ttl:
             return cached["articles"]
+        return None
 
-        try:
-            import feedparser
+    def _parse_rss(self, url: str, source_name: str) -> List[dict]:
+        """Generic RSS parser."""
+        cached = self._cached_rss(source_name)
+        if cached is not None:
+            return cached
 
+        try:
             with httpx.Client(timeout=15.0) as client:
                 resp = client.get(url, headers={"User-Agent": "AURA Trading Bot/1.0"})
                 resp.raise_for_status()
                 raw = resp.text
+            return self._store_rss(raw, source_name)
+        except Exception as e:
+            logger.debug(f"RSS fetch failed for {source_name}: {e}")
+            return []
+
+    async def _parse_rss_async(self, client: httpx.AsyncClient, url: str, source_name: str) -> List[dict]:
+        cached = self._cached_rss(source_name)
+        if cached is not None:
+            return cached
+
+        try:
+            resp = await client.get(url, headers={"User-Agent": "AURA Trading Bot/1.0"}, timeout=15.0)
+            resp.raise_for_status()
+            return self._store_rss(resp.text, source_name)
+        except Exception as e:
+            logger.debug(f"RSS fetch failed for {source_name}: {e}")
+            return []
+
+    def _store_rss(self, raw: str, source_name: str) -> List[dict]:
+        """Parse an RSS payload into article dicts and cache them."""
+        cache_key = f"rss:{source_name}"
+        try:
+            import feedparser
 
             feed = feedparser.parse(raw)
             articles = []
@@ -137,7 +234,7 @@ class NewsFetcher:
             logger.warning("feedparser not installed. Run: pip install feedparser")
             return []
         except Exception as e:
-            logger.debug(f"RSS fetch failed for {source_name}: {e}")
+            logger.debug(f"RSS parse failed for {source_name}: {e}")
             return []
 
     # ── Symbol matching ──────────────────────────────────────
@@ -152,50 +249,124 @@ class NewsFetcher:
                 matched.append(article)
         return matched
 
+    def _index_articles(self, articles: List[dict]) -> Dict[str, List[dict]]:
+        """Map base symbol -> articles mentioning it, in one automaton pass per article."""
+        index: Dict[str, List[dict]] = {}
+        for article in articles:
+            for base in _automaton.match(_article_text(article)):
+                index.setdefault(base, []).append(article)
+        return index
+
     # ── Sentiment scoring ────────────────────────────────────
 
+    def _score_article(self, article: dict) -> float:
+        """VADER compound for an article, memoized by a hash of its text."""
+        text = _article_text(article)
+        key = hashlib.sha1(text.encode("utf-8", "ignore")).hexdigest()
+        with self._score_lock:
+            if key in self._score_memo:
+                self._score_memo.move_to_end(key)
+                self.stats["score_memo_hits"] += 1
+                return self._score_memo[key]
+
+        compound = float(self._get_analyzer().analyze_text(text)["compound"])
+        with self._score_lock:
+            self._score_memo[key] = compound
+            self.stats["articles_scored"] += 1
+            while len(self._score_memo) > SCORE_MEMO_SIZE:
+                self._score_memo.popitem(last=False)
+        return compound
+
+    async def _fetch_all(self, symbols: List[str]) -> Dict:
+        """Fetch every source concurrently: CryptoPanic per symbol plus both RSS feeds."""
+        gate = asyncio.Semaphore(CRYPTOPANIC_CONCURRENCY)
+
+        async def _cryptopanic(symbol: str) -> List[dict]:
+            async with gate:
+                try:
+                    return await fetch_cryptopanic_news(symbol)
+                except Exception as e:
+                    logger.debug(f"CryptoPanic failed for {symbol}: {e}")
+                    return []
+
+        async with httpx.AsyncClient() as client:
+            results = await asyncio.gather(
+                self._parse_rss_async(client, COINDESK_RSS_URL, "CoinDesk"),
+                self._parse_rss_async(client, COINTELEGRAPH_RSS_URL, "Cointelegraph"),
+                *[_cryptopanic(s) for s in symbols],
+            )
+        return {
+            "coindesk": results[0],
+            "cointelegraph": results[1],
+            "cryptopanic": dict(zip(symbols, results[2:])),
+        }
+
+    def get_all_sentiment(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """Sentiment for many symbols from a single ingestion pass.
+
+        Symbols still fresh in the 15-minute cache are served from it; the
+        rest share one concurrent fetch, one scoring pass over unique
+        articles and one symbol index.
+        """
+        symbols = [s.upper() for s in symbols]
+        now = time.time()
+        out: Dict[str, Dict] = {}
+        stale: List[str] = []
+        for symbol in symbols:
+            cached = self._cache.get(f"sentiment:{symbol}")
+            if cached and (now - cached["fetched_at"]) < self._cache_ttl:
+                out[symbol] = cached["value"]
+            else:
+                stale.append(symbol)
+        if not stale:
+            return out
+
+        fetched = run_sync(self._fetch_all(stale))
+        self.stats["ingest_passes"] += 1
+        coindesk_index = self._index_articles(fetched["coindesk"])
+        cointelegraph_index = self._index_articles(fetched["cointelegraph"])
+
+        for symbol in stale:
+            base = _base_symbol(symbol)
+            result = self._build_sentiment(
+                symbol,
+                fetched["cryptopanic"].get(symbol, []),
+                self._rss_matches(coindesk_index, fetched["coindesk"], base),
+                self._rss_matches(cointelegraph_index, fetched["cointelegraph"], base),
+            )
+            self._cache[f"sentiment:{symbol}"] = {"value": result, "fetched_at": time.time()}
+            out[symbol] = result
+        return out
+
+    def _rss_matches(self, index: Dict[str, List[dict]], articles: List[dict], base: str) -> List[dict]:
+        if base in CRYPTO_NAMES:
+            return index.get(base, [])
+        # Symbols outside CRYPTO_NAMES fall back to the plain ticker keyword.
+        return self._match_articles_to_symbol(articles, base)
+
     def get_symbol_sentiment(self, symbol: str) -> Dict:
         """
         Get sentiment score for a trading symbol (e.g. BTCUSDC).
         Combines all 3 sources, runs VADER analysis.
         Returns dict with score 0-100 and details.
         """
-        cache_key = f"sentiment:{symbol}"
-        cached = self._cache.get(cache_key)
-        if cached and (time.time() - cached["fetched_at"]) < self._cache_ttl:
-            return cached["value"]
-
-        base = symbol.replace("USDC", "").replace("USDT", "")
-        analyzer = self._get_analyzer()
-
-        # Fetch from all 3 sources
-        cryptopanic_articles = self._fetch_cryptopanic(symbol, base)
-        coindesk_articles = self._fetch_coindesk_rss()
-        cointelegraph_articles = self._fetch_cointelegraph_rss()
-
-        # Match RSS articles to this symbol
-        coindesk_matched = self._match_articles_to_symbol(coindesk_articles, base)
-        cointelegraph_matched = self._match_articles_to_symbol(cointelegraph_articles, base)
+        return self.get_all_sentiment([symbol])[symbol.upper()]
 
+    def _build_sentiment(self, symbol: str, cryptopanic_articles: List[dict],
+                         coindesk_matched: List[dict], cointelegraph_matched: List[dict]) -> Dict:
         all_articles = cryptopanic_articles + coindesk_matched + cointelegraph_matched
 
         if not all_articles:
-            result = {
+            return {
                 "score": 50.0,
                 "label": "neutral",
                 "article_count": 0,
                 "sources": {},
                 "symbol": symbol,
             }
-            self._cache[cache_key] = {"value": result, "fetched_at": time.time()}
-            return result
 
-        # Run VADER on each article
-        sentiments = []
-        for article in all_articles:
-            text = f"{article.get('title', '')} {article.get('summary', '')}"
-            result = analyzer.analyze_text(text)
-            sentiments.append(result["compound"])
+        # VADER per article (memoized across symbols and cycles)
+        sentiments = [self._score_article(article) for article in all_articles]
 
         # Also factor in CryptoPanic vote data
         vote_adjustments = []
@@ -224,7 +395,7 @@ class NewsFetcher:
         else:
             label = "neutral"
 
-        result = {
+        return {
             "score": round(final_score, 1),
             "label": label,
             "article_count": len(all_articles),
@@ -238,9 +409,6 @@ class NewsFetcher:
             "symbol": symbol,
         }
 
-        self._cache[cache_key] = {"value": result, "fetched_at": time.time()}
-        return result
-
 
 # Singleton
 news_fetcher = NewsFetcher()
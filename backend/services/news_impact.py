@@ -1,36 +1,46 @@
 """News impact scoring.
 
 Aggregates the last 24h of FinancialNews for a symbol, reuses stored FinBERT
-sentiment scores (computing them on-the-fly when missing), and produces an
-impact_score / impact_level suitable for gating trading decisions.
+sentiment scores, and produces an impact_score / impact_level suitable for
+gating trading decisions.
+
+Articles are indexed into ``news_symbols`` when they are ingested: each row
+maps one article to one normalized symbol key and carries the article's
+sentiment score, computed once at that point. A cross-sectional refresh then
+computes every symbol's 24h and prior-24h aggregates in one grouped query
+and publishes the whole table to Redis, so per-symbol reads are cache hits.
 """
 
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
-from sqlalchemy import or_
+from sqlalchemy import case, func
 
 logger = logging.getLogger(__name__)
 
-_CACHE: Dict[str, Dict[str, Any]] = {}
+_CACHE: Dict[str, Any] = {"t": 0.0, "data": None}
 _CACHE_TTL = 300  # 5 minutes
+_REDIS_KEY = "news_impact:all"
 
+_SUFFIXES = ("USDC", "USDT", "-USD", "USD")
 
-def _base_tokens(symbol: str) -> List[str]:
-    """Candidate substrings to match against FinancialNews.symbols text."""
-    sym = symbol.upper()
-    tokens = {sym}
-    for suffix in ("USDC", "USDT", "-USD", "USD"):
-        if sym.endswith(suffix):
-            base = sym[: -len(suffix)]
-            if base:
-                tokens.add(base)
-    # Strip yfinance futures/index decorations
+
+def news_symbol_key(symbol: str) -> str:
+    """Normalize a tradable or news-side symbol to its base key.
+
+    ``BTCUSDC``, ``BTC-USD`` and ``btc`` all map to ``BTC``; yfinance
+    decorations (``=F``, ``=X``, ``^``) are stripped.
+    """
+    sym = (symbol or "").strip().upper()
     for extra in ("=F", "=X", "^"):
-        tokens.add(sym.replace(extra, ""))
-    return [t for t in tokens if t]
+        sym = sym.replace(extra, "")
+    for suffix in _SUFFIXES:
+        if sym.endswith(suffix) and len(sym) > len(suffix):
+            sym = sym[: -len(suffix)]
+            break
+    return sym[:20]
 
 
 def _ensure_score(headline: str, summary: Optional[str], stored_score: Optional[float]) -> float:
@@ -61,32 +71,78 @@ def _classify(impact_score: float) -> str:
     return "LOW"
 
 
-def _fetch_window(db, tokens: List[str], start: datetime, end: datetime):
-    from database.models import FinancialNews
-    filters = [FinancialNews.symbols.ilike(f"%{t}%") for t in tokens]
-    return (
-        db.query(FinancialNews)
-        .filter(FinancialNews.published_at >= start, FinancialNews.published_at < end)
-        .filter(or_(*filters))
-        .all()
+# ── Ingest-time indexing ────────────────────────────────────
+
+def index_news(db, news_rows: Iterable) -> int:
+    """Score (if needed) and map ``FinancialNews`` rows into ``news_symbols``.
+
+    Rows must already have an id (flush before calling). Existing mappings
+    for these articles are replaced, so re-labelling an article refreshes
+    its score and symbols. The caller commits.
+    """
+    from database.models import NewsSymbol
+
+    rows = [r for r in news_rows if getattr(r, "id", None) is not None]
+    if not rows:
+        return 0
+
+    mappings: List[Dict[str, Any]] = []
+    for r in rows:
+        keys = {news_symbol_key(part) for part in (r.symbols or "").split(",")}
+        keys.discard("")
+        if not keys or r.published_at is None:
+            continue
+        if r.sentiment_score is None:
+            r.sentiment_score = _ensure_score(r.headline, r.summary, None)
+        for key in keys:
+            mappings.append({
+                "news_id": r.id,
+                "symbol": key,
+                "published_at": r.published_at,
+                "sentiment_score": float(r.sentiment_score),
+            })
+
+    db.query(NewsSymbol).filter(NewsSymbol.news_id.in_([r.id for r in rows])).delete(synchronize_session=False)
+    if mappings:
+        db.bulk_insert_mappings(NewsSymbol, mappings)
+    return len(mappings)
+
+
+# ── Cross-sectional impact ──────────────────────────────────
+
+def _impact_from_aggregates(symbol: str, recent_count: int, recent_sum: float,
+                            prior_count: int, prior_sum: float) -> Dict[str, Any]:
+    if not recent_count:
+        return _default(symbol)
+
+    avg_sentiment = recent_sum / recent_count
+    prior_avg = (prior_sum / prior_count) if prior_count else 0.0
+    sentiment_momentum = avg_sentiment - prior_avg
+
+    # Impact components, each normalized to 0-1
+    volume_component = min(1.0, recent_count / 10.0)
+    magnitude_component = min(1.0, abs(avg_sentiment))
+    momentum_component = min(1.0, abs(sentiment_momentum) / 0.5)
+    impact_score = 100.0 * (
+        0.4 * volume_component + 0.4 * magnitude_component + 0.2 * momentum_component
     )
 
+    return {
+        "symbol": symbol,
+        "news_count": int(recent_count),
+        "avg_sentiment": round(float(avg_sentiment), 4),
+        "sentiment_momentum": round(float(sentiment_momentum), 4),
+        "impact_score": round(float(impact_score), 2),
+        "impact_level": _classify(impact_score),
+        "window_hours": 24,
+        "prior_window_count": int(prior_count),
+        "prior_avg_sentiment": round(float(prior_avg), 4),
+    }
 
-def compute_news_impact_score(symbol: str) -> Dict[str, Any]:
-    """Score the news impact on `symbol` over the last 24 hours.
 
-    Returns news_count, avg_sentiment (-1..1), sentiment_momentum
-    (24h avg − previous-24h avg), impact_score (0..100), and impact_level
-    (LOW / MEDIUM / HIGH / EXTREME). Results are cached for 5 minutes.
-    """
-    sym_u = symbol.upper()
-    now_ts = time.time()
-    cached = _CACHE.get(sym_u)
-    if cached and (now_ts - cached["t"]) < _CACHE_TTL:
-        return cached["data"]
-
-    default = {
-        "symbol": sym_u,
+def _default(symbol: str) -> Dict[str, Any]:
+    return {
+        "symbol": symbol,
         "news_count": 0,
         "avg_sentiment": 0.0,
         "sentiment_momentum": 0.0,
@@ -95,66 +151,97 @@ def compute_news_impact_score(symbol: str) -> Dict[str, Any]:
         "window_hours": 24,
     }
 
-    try:
-        from database.connection import SessionLocal
-    except Exception as e:
-        logger.debug(f"news_impact DB import failed: {e}")
-        return default
 
-    db = SessionLocal()
-    if not db:
-        return default
+def _aggregate_all(db, now: datetime) -> Dict[str, Dict[str, float]]:
+    """Every key's 24h and prior-24h count/sum in one grouped query."""
+    from database.models import NewsSymbol
+
+    mid = now - timedelta(hours=24)
+    start = now - timedelta(hours=48)
+    is_recent = NewsSymbol.published_at >= mid
+    score = func.coalesce(NewsSymbol.sentiment_score, 0.0)
+    rows = (
+        db.query(
+            NewsSymbol.symbol,
+            func.sum(case((is_recent, 1), else_=0)),
+            func.sum(case((is_recent, score), else_=0.0)),
+            func.sum(case((is_recent, 0), else_=1)),
+            func.sum(case((is_recent, 0.0), else_=score)),
+        )
+        .filter(NewsSymbol.published_at >= start, NewsSymbol.published_at < now)
+        .group_by(NewsSymbol.symbol)
+        .all()
+    )
+    return {
+        key: {
+            "recent_count": int(rc or 0), "recent_sum": float(rs or 0.0),
+            "prior_count": int(pc or 0), "prior_sum": float(ps or 0.0),
+        }
+        for key, rc, rs, pc, ps in rows
+    }
 
-    tokens = _base_tokens(sym_u)
-    now = datetime.utcnow()
+
+def refresh_news_impact(db=None) -> Dict[str, Dict[str, float]]:
+    """Recompute aggregates for every symbol key and publish them to the shared cache."""
+    own_session = db is None
+    if own_session:
+        from database.connection import SessionLocal
+        if SessionLocal is None:
+            return {}
+        db = SessionLocal()
     try:
-        recent = _fetch_window(db, tokens, now - timedelta(hours=24), now)
-        prior = _fetch_window(db, tokens, now - timedelta(hours=48), now - timedelta(hours=24))
-    except Exception as e:
-        logger.debug(f"news_impact query failed for {sym_u}: {e}")
-        db.close()
-        return default
+        aggregates = _aggregate_all(db, datetime.utcnow())
     finally:
-        try:
+        if own_session:
             db.close()
-        except Exception:
-            pass
 
-    if not recent:
-        _CACHE[sym_u] = {"t": now_ts, "data": default}
-        return default
+    _CACHE["t"] = time.time()
+    _CACHE["data"] = aggregates
+    try:
+        from cache.connection import cache_set
+        cache_set(_REDIS_KEY, aggregates, expire=_CACHE_TTL)
+    except Exception as e:
+        logger.debug(f"news_impact cache publish failed: {e}")
+    return aggregates
 
-    recent_scores = [
-        _ensure_score(r.headline, r.summary, r.sentiment_score) for r in recent
-    ]
-    prior_scores = [
-        _ensure_score(r.headline, r.summary, r.sentiment_score) for r in prior
-    ]
 
-    news_count = len(recent_scores)
-    avg_sentiment = sum(recent_scores) / news_count if news_count else 0.0
-    prior_avg = (sum(prior_scores) / len(prior_scores)) if prior_scores else 0.0
-    sentiment_momentum = avg_sentiment - prior_avg
+def _get_aggregates() -> Dict[str, Dict[str, float]]:
+    if _CACHE["data"] is not None and time.time() - _CACHE["t"] < _CACHE_TTL:
+        return _CACHE["data"]
+    try:
+        from cache.connection import cache_get
+        shared = cache_get(_REDIS_KEY)
+    except Exception:
+        shared = None
+    if isinstance(shared, dict):
+        _CACHE["t"] = time.time()
+        _CACHE["data"] = shared
+        return shared
+    return refresh_news_impact()
+
+
+def compute_news_impact_scores(symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """News impact for many symbols from the shared cross-sectional aggregates."""
+    try:
+        aggregates = _get_aggregates()
+    except Exception as e:
+        logger.debug(f"news_impact aggregate query failed: {e}")
+        aggregates = {}
 
-    # Impact components, each normalized to 0-1
-    volume_component = min(1.0, news_count / 10.0)
-    magnitude_component = min(1.0, abs(avg_sentiment))
-    momentum_component = min(1.0, abs(sentiment_momentum) / 0.5)
-    impact_score = 100.0 * (
-        0.4 * volume_component + 0.4 * magnitude_component + 0.2 * momentum_component
-    )
+    out: Dict[str, Dict[str, Any]] = {}
+    for symbol in symbols:
+        sym_u = symbol.upper()
+        agg = aggregates.get(news_symbol_key(sym_u))
+        out[symbol] = _impact_from_aggregates(sym_u, **agg) if agg else _default(sym_u)
+    return out
 
-    result = {
-        "symbol": sym_u,
-        "news_count": int(news_count),
-        "avg_sentiment": round(float(avg_sentiment), 4),
-        "sentiment_momentum": round(float(sentiment_momentum), 4),
-        "impact_score": round(float(impact_score), 2),
-        "impact_level": _classify(impact_score),
-        "window_hours": 24,
-        "prior_window_count": int(len(prior_scores)),
-        "prior_avg_sentiment": round(float(prior_avg), 4),
-    }
 
-    _CACHE[sym_u] = {"t": now_ts, "data": result}
-    return result
+def compute_news_impact_score(symbol: str) -> Dict[str, Any]:
+    """Score the news impact on `symbol` over the last 24 hours.
+
+    Returns news_count, avg_sentiment (-1..1), sentiment_momentum
+    (24h avg − previous-24h avg), impact_score (0..100), and impact_level
+    (LOW / MEDIUM / HIGH / EXTREME). Aggregates are shared and cached for
+    5 minutes.
+    """
+    return dict(compute_news_impact_scores([symbol])[symbol])
@@ -1,6 +1,11 @@
 """
 Notifications Service
 Manages trade alerts, price alerts, and system notifications
+
+Notifications are rows in an indexed table (database.embedded_store) with
+running total / unread / per-type / per-priority counters kept in the same
+transaction as every write. The legacy shared/cms/notifications.json is
+imported once, on first use.
 """
 
 from typing import Dict, List, Optional
@@ -8,6 +13,60 @@ from datetime import datetime, timedelta
 from enum import Enum
 import json
 import os
+import uuid
+
+from sqlalchemy import select, text
+
+from database.embedded_store import claim_once, get_store_engine, read_conn, write_tx
+from database.models import NotificationCounter, StoredNotification
+
+MAX_NOTIFICATIONS = 1000
+
+_notifications = StoredNotification.__table__
+_counters = NotificationCounter.__table__
+
+_BUMP_COUNTER_SQL = text(
+    """
+    INSERT INTO notification_counters (key, n) VALUES (:key, :delta)
+    ON CONFLICT (key) DO UPDATE SET n = notification_counters.n + EXCLUDED.n
+    """
+)
+
+
+def _bump_counter(conn, key: str, delta: int):
+    conn.execute(_BUMP_COUNTER_SQL, {"key": key, "delta": delta})
+
+
+def _bump_counters(conn, ntype: str, priority: str, read: bool, delta: int):
+    _bump_counter(conn, "total", delta)
+    _bump_counter(conn, "unread", 0 if read else delta)
+    _bump_counter(conn, f"type:{ntype}", delta)
+    _bump_counter(conn, f"priority:{priority}", delta)
+
+
+def _delete_where(conn, *criteria) -> int:
+    """Delete matching notifications and decrement counters by what was actually removed."""
+    deleted = conn.execute(
+        _notifications.delete().where(*criteria)
+        .returning(_notifications.c.type, _notifications.c.priority, _notifications.c.read)
+    ).all()
+    for row in deleted:
+        _bump_counters(conn, row.type, row.priority, bool(row.read), -1)
+    return len(deleted)
+
+
+def _notification_dict(row) -> Dict:
+    return {
+        "id": row.id,
+        "type": row.type,
+        "title": row.title,
+        "message": row.message,
+        "priority": row.priority,
+        "data": json.loads(row.data) if row.data else {},
+        "read": bool(row.read),
+        "created_at": row.created_at,
+        "read_at": row.read_at,
+    }
 
 
 class NotificationType(str, Enum):
@@ -33,40 +92,77 @@ class NotificationsService:
     Service for managing notifications
     Handles trade alerts, price alerts, and system notifications
     """
-    
-    def __init__(self):
-        self.notifications_file = os.path.join(
+
+    def __init__(self, store_path: Optional[str] = None, legacy_file: Optional[str] = None):
+        self.notifications_file = legacy_file or os.path.join(
             os.path.dirname(__file__),
             "..", "..", "shared", "cms", "notifications.json"
         )
-        self.notifications: List[Dict] = []
-        self._load_notifications()
-    
-    def _load_notifications(self):
-        """Load notifications from file"""
+        self._store_path = store_path
+        self._engine = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = get_store_engine(self._store_path)
+            self._import_legacy_json()
+        return self._engine
+
+    def _import_legacy_json(self):
+        """Copy notifications.json into the store once per store."""
+        if not os.path.exists(self.notifications_file):
+            return
         try:
-            if os.path.exists(self.notifications_file):
-                with open(self.notifications_file, 'r', encoding='utf-8') as f:
-                    self.notifications = json.load(f)
-            else:
-                self.notifications = []
+            with open(self.notifications_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f) or []
         except Exception as e:
             print(f"Error loading notifications: {e}")
-            self.notifications = []
-    
-    def _save_notifications(self):
-        """Save notifications to file"""
+            return
         try:
-            os.makedirs(os.path.dirname(self.notifications_file), exist_ok=True)
-            # Keep only last 1000 notifications
-            if len(self.notifications) > 1000:
-                self.notifications = self.notifications[-1000:]
-            
-            with open(self.notifications_file, 'w', encoding='utf-8') as f:
-                json.dump(self.notifications, f, ensure_ascii=False, indent=2)
+            with write_tx(self._engine) as conn:
+                if not claim_once(conn, "import:notifications.json"):
+                    return
+                # The file is newest-first; insert oldest first so seq keeps that order.
+                seen = set()
+                for n in reversed(legacy[:MAX_NOTIFICATIONS]):
+                    if n.get("id") and n["id"] not in seen:
+                        seen.add(n["id"])
+                        self._insert(conn, n)
+            print(f"[notifications] Imported {len(seen)} notifications from {self.notifications_file}")
         except Exception as e:
-            print(f"Error saving notifications: {e}")
-    
+            print(f"Error importing notifications: {e}")
+
+    @staticmethod
+    def _insert(conn, notification: Dict):
+        conn.execute(_notifications.insert().values(
+            id=notification["id"],
+            type=notification.get("type", "unknown"),
+            title=notification.get("title", ""),
+            message=notification.get("message", ""),
+            priority=notification.get("priority", "medium"),
+            data=json.dumps(notification.get("data") or {}, ensure_ascii=False),
+            read=bool(notification.get("read", False)),
+            created_at=notification.get("created_at") or datetime.now().isoformat(),
+            read_at=notification.get("read_at"),
+        ))
+        _bump_counters(conn, notification.get("type", "unknown"), notification.get("priority", "medium"),
+                       bool(notification.get("read", False)), 1)
+
+    @staticmethod
+    def _trim(conn):
+        """Keep only the newest MAX_NOTIFICATIONS."""
+        total = conn.execute(
+            select(_counters.c.n).where(_counters.c.key == "total")
+        ).scalar() or 0
+        if total <= MAX_NOTIFICATIONS:
+            return
+        cutoff = conn.execute(
+            select(_notifications.c.seq).order_by(_notifications.c.seq.desc())
+            .offset(MAX_NOTIFICATIONS - 1).limit(1)
+        ).scalar()
+        if cutoff is not None:
+            _delete_where(conn, _notifications.c.seq < cutoff)
+
     def create_notification(
         self,
         notification_type: NotificationType,
@@ -78,7 +174,7 @@ class NotificationsService:
     ) -> Dict:
         """
         Create a new notification
-        
+
         Args:
             notification_type: Type of notification
             title: Notification title
@@ -86,12 +182,13 @@ class NotificationsService:
             priority: Notification priority
             data: Additional data
             read: Whether notification is read
-            
+
         Returns:
             Created notification
         """
-        notification_id = f"notif_{int(datetime.now().timestamp() * 1000)}"
-        
+        # The suffix keeps ids unique across workers creating in the same millisecond.
+        notification_id = f"notif_{int(datetime.now().timestamp() * 1000)}_{uuid.uuid4().hex[:6]}"
+
         notification = {
             "id": notification_id,
             "type": notification_type.value,
@@ -103,12 +200,13 @@ class NotificationsService:
             "created_at": datetime.now().isoformat(),
             "read_at": None
         }
-        
-        self.notifications.insert(0, notification)  # Add to beginning
-        self._save_notifications()
-        
+
+        with write_tx(self.engine) as conn:
+            self._insert(conn, notification)
+            self._trim(conn)
+
         return notification
-    
+
     def get_notifications(
         self,
         unread_only: bool = False,
@@ -116,89 +214,83 @@ class NotificationsService:
         limit: int = 50
     ) -> List[Dict]:
         """Get notifications with filters"""
-        filtered = self.notifications
-        
+        query = select(_notifications).order_by(_notifications.c.seq.desc()).limit(limit)
+
         if unread_only:
-            filtered = [n for n in filtered if not n.get("read", False)]
-        
+            query = query.where(_notifications.c.read.is_(False))
+
         if notification_type:
-            filtered = [n for n in filtered if n.get("type") == notification_type.value]
-        
-        return filtered[:limit]
-    
+            query = query.where(_notifications.c.type == notification_type.value)
+
+        with read_conn(self.engine) as conn:
+            return [_notification_dict(r) for r in conn.execute(query)]
+
     def get_notification(self, notification_id: str) -> Optional[Dict]:
         """Get notification by ID"""
-        for notification in self.notifications:
-            if notification.get("id") == notification_id:
-                return notification
-        return None
-    
+        with read_conn(self.engine) as conn:
+            row = conn.execute(
+                select(_notifications).where(_notifications.c.id == notification_id)
+            ).first()
+        return _notification_dict(row) if row is not None else None
+
     def mark_as_read(self, notification_id: str) -> bool:
         """Mark notification as read"""
-        notification = self.get_notification(notification_id)
-        if not notification:
-            return False
-        
-        notification["read"] = True
-        notification["read_at"] = datetime.now().isoformat()
-        self._save_notifications()
-        return True
-    
+        now = datetime.now().isoformat()
+        with write_tx(self.engine) as conn:
+            flipped = conn.execute(
+                _notifications.update()
+                .where(_notifications.c.id == notification_id, _notifications.c.read.is_(False))
+                .values(read=True, read_at=now)
+            ).rowcount
+            if flipped:
+                _bump_counter(conn, "unread", -1)
+                return True
+            # Already read (or missing): refresh read_at like before.
+            return conn.execute(
+                _notifications.update().where(_notifications.c.id == notification_id).values(read_at=now)
+            ).rowcount > 0
+
     def mark_all_as_read(self) -> int:
         """Mark all notifications as read"""
-        count = 0
-        for notification in self.notifications:
-            if not notification.get("read", False):
-                notification["read"] = True
-                notification["read_at"] = datetime.now().isoformat()
-                count += 1
-        
-        if count > 0:
-            self._save_notifications()
-        
+        with write_tx(self.engine) as conn:
+            count = conn.execute(
+                _notifications.update()
+                .where(_notifications.c.read.is_(False))
+                .values(read=True, read_at=datetime.now().isoformat())
+            ).rowcount
+            if count > 0:
+                _bump_counter(conn, "unread", -count)
         return count
-    
+
     def delete_notification(self, notification_id: str) -> bool:
         """Delete notification"""
-        original_count = len(self.notifications)
-        self.notifications = [n for n in self.notifications if n.get("id") != notification_id]
-        
-        if len(self.notifications) < original_count:
-            self._save_notifications()
-            return True
-        return False
-    
+        with write_tx(self.engine) as conn:
+            return _delete_where(conn, _notifications.c.id == notification_id) > 0
+
     def delete_all_read(self) -> int:
         """Delete all read notifications"""
-        original_count = len(self.notifications)
-        self.notifications = [n for n in self.notifications if not n.get("read", False)]
-        
-        deleted = original_count - len(self.notifications)
-        if deleted > 0:
-            self._save_notifications()
-        
-        return deleted
-    
+        with write_tx(self.engine) as conn:
+            return _delete_where(conn, _notifications.c.read.is_(True))
+
     def get_unread_count(self) -> int:
         """Get count of unread notifications"""
-        return len([n for n in self.notifications if not n.get("read", False)])
-    
+        with read_conn(self.engine) as conn:
+            return conn.execute(
+                select(_counters.c.n).where(_counters.c.key == "unread")
+            ).scalar() or 0
+
     def get_notification_stats(self) -> Dict:
         """Get notification statistics"""
-        total = len(self.notifications)
-        unread = self.get_unread_count()
+        with read_conn(self.engine) as conn:
+            counters = {r.key: r.n for r in conn.execute(select(_counters))}
+
+        total = counters.get("total", 0)
+        unread = counters.get("unread", 0)
         read = total - unread
-        
-        by_type = {}
-        for notification in self.notifications:
-            ntype = notification.get("type", "unknown")
-            by_type[ntype] = by_type.get(ntype, 0) + 1
-        
-        by_priority = {}
-        for notification in self.notifications:
-            priority = notification.get("priority", "medium")
-            by_priority[priority] = by_priority.get(priority, 0) + 1
-        
+
+        by_type = {k[len("type:"):]: n for k, n in counters.items() if k.startswith("type:") and n > 0}
+        by_priority = {k[len("priority:"):]: n for k, n in counters.items() if k.startswith("priority:") and n > 0}
+
         return {
             "total": total,
             "unread": unread,
@@ -207,7 +299,7 @@ class NotificationsService:
             "by_priority": by_priority,
             "timestamp": datetime.now().isoformat()
         }
-    
+
     # Convenience methods for specific notification types
     def notify_trade_executed(self, symbol: str, side: str, quantity: float, price: float) -> Dict:
         """Create trade executed notification"""
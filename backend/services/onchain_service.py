@@ -1,17 +1,29 @@
-"""Free on-chain and market structure signals for crypto assets."""
+"""Free on-chain and market structure signals for crypto assets.
+
+Signals for many symbols are collected in one round of concurrent requests
+on a shared client: funding comes from the bulk premium-index endpoint,
+open interest and long/short ratio fan out per symbol, and fear & greed is
+fetched once per cycle. All snapshots are then written to the cache and
+``onchain_signal_history`` in one batch.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set
 
 import httpx
 from sqlalchemy import text
 
-from cache.connection import cache_get, cache_set
+from cache.connection import cache_get, cache_set, cache_mget, cache_mset
 from database.connection import SessionLocal
+from database.schema_registry import ensure_schema, register_schema
 from services.morning_briefing import get_fear_greed_index
+from utils.async_helpers import run_sync
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +31,12 @@ TTL_SECONDS = 300
 SUPPORTED_SYMBOLS_TTL_SECONDS = 3600
 BINANCE_FAPI_BASE = "https://fapi.binance.com"
 SUPPORTED_QUOTES = ("USDC", "USDT")
+MAX_CONCURRENT_REQUESTS = 16
+
+# In-process copy of the last collection so a cold or absent Redis still
+# serves per-symbol reads from the batch.
+_local_signals: Dict[str, tuple] = {}
+_local_lock = threading.Lock()
 
 
 def _normalize_symbol(symbol: str) -> str:
@@ -32,45 +50,54 @@ def _futures_symbol(symbol: str) -> str:
     return normalized
 
 
-def _ensure_table() -> None:
-    if SessionLocal is None:
-        return
+register_schema("onchain_signal_history", (
+    """
+    CREATE TABLE IF NOT EXISTS onchain_signal_history (
+        id SERIAL PRIMARY KEY,
+        symbol VARCHAR(20) NOT NULL,
+        futures_symbol VARCHAR(20) NOT NULL,
+        onchain_score FLOAT NOT NULL,
+        onchain_sentiment VARCHAR(12) NOT NULL,
+        funding_rate FLOAT,
+        open_interest FLOAT,
+        long_short_ratio FLOAT,
+        fear_greed INTEGER,
+        funding_bearish BOOLEAN,
+        extreme_fear BOOLEAN,
+        extreme_greed BOOLEAN,
+        overleveraged_longs BOOLEAN,
+        created_at TIMESTAMP DEFAULT NOW()
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_onchain_history_symbol_ts ON onchain_signal_history (symbol, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_onchain_history_sentiment_ts ON onchain_signal_history (onchain_sentiment, created_at DESC)",
+))
 
-    db = SessionLocal()
-    try:
-        db.execute(text("""
-            CREATE TABLE IF NOT EXISTS onchain_signal_history (
-                id SERIAL PRIMARY KEY,
-                symbol VARCHAR(20) NOT NULL,
-                futures_symbol VARCHAR(20) NOT NULL,
-                onchain_score FLOAT NOT NULL,
-                onchain_sentiment VARCHAR(12) NOT NULL,
-                funding_rate FLOAT,
-                open_interest FLOAT,
-                long_short_ratio FLOAT,
-                fear_greed INTEGER,
-                funding_bearish BOOLEAN,
-                extreme_fear BOOLEAN,
-                extreme_greed BOOLEAN,
-                overleveraged_longs BOOLEAN,
-                created_at TIMESTAMP DEFAULT NOW()
-            )
-        """))
-        db.execute(text(
-            "CREATE INDEX IF NOT EXISTS ix_onchain_history_symbol_ts ON onchain_signal_history (symbol, created_at DESC)"
-        ))
-        db.execute(text(
-            "CREATE INDEX IF NOT EXISTS ix_onchain_history_sentiment_ts ON onchain_signal_history (onchain_sentiment, created_at DESC)"
-        ))
-        db.commit()
-    except Exception:
-        db.rollback()
-    finally:
-        db.close()
+
+def _ensure_table() -> None:
+    ensure_schema("onchain_signal_history")
+
+
+def _snapshot_row(signals: Dict) -> Dict:
+    return {
+        "symbol": _normalize_symbol(signals.get("symbol")),
+        "futures_symbol": _normalize_symbol(signals.get("futures_symbol")),
+        "onchain_score": float(signals.get("onchain_score", 0.5) or 0.5),
+        "onchain_sentiment": str(signals.get("onchain_sentiment", "neutral") or "neutral"),
+        "funding_rate": signals.get("funding_rate"),
+        "open_interest": signals.get("open_interest"),
+        "long_short_ratio": signals.get("long_short_ratio"),
+        "fear_greed": signals.get("fear_greed"),
+        "funding_bearish": bool(signals.get("funding_bearish", False)),
+        "extreme_fear": bool(signals.get("extreme_fear", False)),
+        "extreme_greed": bool(signals.get("extreme_greed", False)),
+        "overleveraged_longs": bool(signals.get("overleveraged_longs", False)),
+    }
 
 
-def _persist_snapshot(signals: Dict) -> None:
-    if SessionLocal is None:
+def _persist_snapshots(snapshots: List[Dict]) -> None:
+    """Insert every snapshot of a collection cycle in one executemany."""
+    if SessionLocal is None or not snapshots:
         return
 
     _ensure_table()
@@ -88,20 +115,7 @@ def _persist_snapshot(signals: Dict) -> None:
                     :funding_bearish, :extreme_fear, :extreme_greed, :overleveraged_longs
                 )
             """),
-            {
-                "symbol": _normalize_symbol(signals.get("symbol")),
-                "futures_symbol": _normalize_symbol(signals.get("futures_symbol")),
-                "onchain_score": float(signals.get("onchain_score", 0.5) or 0.5),
-                "onchain_sentiment": str(signals.get("onchain_sentiment", "neutral") or "neutral"),
-                "funding_rate": signals.get("funding_rate"),
-                "open_interest": signals.get("open_interest"),
-                "long_short_ratio": signals.get("long_short_ratio"),
-                "fear_greed": signals.get("fear_greed"),
-                "funding_bearish": bool(signals.get("funding_bearish", False)),
-                "extreme_fear": bool(signals.get("extreme_fear", False)),
-                "extreme_greed": bool(signals.get("extreme_greed", False)),
-                "overleveraged_longs": bool(signals.get("overleveraged_longs", False)),
-            },
+            [_snapshot_row(signals) for signals in snapshots],
         )
         db.commit()
     except Exception as e:
@@ -111,6 +125,10 @@ def _persist_snapshot(signals: Dict) -> None:
         db.close()
 
 
+def _persist_snapshot(signals: Dict) -> None:
+    _persist_snapshots([signals])
+
+
 def get_supported_futures_symbols() -> Set[str]:
     cache_key = "onchain:supported_futures_symbols"
     cached = cache_get(cache_key)
@@ -152,82 +170,23 @@ def get_supported_onchain_symbols(candidate_symbols: Optional[List[str]] = None)
     return [sym for sym in symbols if is_onchain_supported(sym)]
 
 
-def get_binance_funding_rate(symbol: str) -> float:
-    fut_symbol = _futures_symbol(symbol)
-    with httpx.Client(timeout=5.0) as client:
-        response = client.get(
-            f"{BINANCE_FAPI_BASE}/fapi/v1/fundingRate",
-            params={"symbol": fut_symbol, "limit": 1},
-        )
-        response.raise_for_status()
-        data = response.json()
-    return float(data[0].get("fundingRate", 0.0)) if data else 0.0
-
-
-def get_binance_open_interest(symbol: str) -> float:
-    fut_symbol = _futures_symbol(symbol)
-    with httpx.Client(timeout=5.0) as client:
-        response = client.get(
-            f"{BINANCE_FAPI_BASE}/fapi/v1/openInterest",
-            params={"symbol": fut_symbol},
-        )
-        response.raise_for_status()
-        data = response.json()
-    return float(data.get("openInterest", 0.0)) if isinstance(data, dict) else 0.0
-
-
-def get_binance_ls_ratio(symbol: str) -> float:
-    fut_symbol = _futures_symbol(symbol)
-    with httpx.Client(timeout=5.0) as client:
-        response = client.get(
-            f"{BINANCE_FAPI_BASE}/futures/data/globalLongShortAccountRatio",
-            params={"symbol": fut_symbol, "period": "1h", "limit": 1},
-        )
-        response.raise_for_status()
-        data = response.json()
-    return float(data[0].get("longShortRatio", 1.0)) if data else 1.0
-
-
-def get_onchain_signals(symbol: str) -> Dict:
-    """Collect free on-chain proxies and return a normalized sentiment bundle."""
-    symbol = _normalize_symbol(symbol)
-    if not is_onchain_supported(symbol):
-        raise ValueError(f"On-chain signals not supported for {symbol}")
-
-    cache_key = f"onchain:{symbol}"
-    cached = cache_get(cache_key)
-    if isinstance(cached, dict):
-        return cached
-
+def _build_signals(symbol: str, funding: Optional[float], open_interest: Optional[float],
+                   fear_greed: Optional[int], ls_ratio: Optional[float]) -> Dict:
+    """Turn raw market-structure readings into the normalized sentiment bundle."""
     signals: Dict = {"symbol": symbol, "futures_symbol": _futures_symbol(symbol)}
 
-    try:
-        funding = get_binance_funding_rate(symbol)
+    if funding is not None:
         signals["funding_rate"] = funding
         signals["funding_bearish"] = funding > 0.01
-    except Exception as e:
-        logger.debug("[ONCHAIN] Funding rate failed for %s: %s", symbol, e)
-
-    try:
-        oi = get_binance_open_interest(symbol)
-        signals["open_interest"] = oi
-    except Exception as e:
-        logger.debug("[ONCHAIN] Open interest failed for %s: %s", symbol, e)
-
-    try:
-        fg = int(get_fear_greed_index())
-        signals["fear_greed"] = fg
-        signals["extreme_fear"] = fg < 20
-        signals["extreme_greed"] = fg > 80
-    except Exception as e:
-        logger.debug("[ONCHAIN] Fear & Greed failed for %s: %s", symbol, e)
-
-    try:
-        ls_ratio = get_binance_ls_ratio(symbol)
+    if open_interest is not None:
+        signals["open_interest"] = open_interest
+    if fear_greed is not None:
+        signals["fear_greed"] = fear_greed
+        signals["extreme_fear"] = fear_greed < 20
+        signals["extreme_greed"] = fear_greed > 80
+    if ls_ratio is not None:
         signals["long_short_ratio"] = ls_ratio
         signals["overleveraged_longs"] = ls_ratio > 2.0
-    except Exception as e:
-        logger.debug("[ONCHAIN] L/S ratio failed for %s: %s", symbol, e)
 
     bullish_count = sum([
         not signals.get("funding_bearish", False),
@@ -243,12 +202,126 @@ def get_onchain_signals(symbol: str) -> Dict:
         else "neutral"
     )
     signals["recorded_at"] = datetime.utcnow().isoformat()
-
-    cache_set(cache_key, signals, expire=TTL_SECONDS)
-    _persist_snapshot(signals)
     return signals
 
 
+async def _get_json(client: httpx.AsyncClient, gate: asyncio.Semaphore, url: str, params: Optional[Dict] = None):
+    async with gate:
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+
+async def _fetch_market_structure(symbols: List[str]) -> Dict[str, Dict]:
+    """One round of concurrent requests for every symbol's readings."""
+    gate = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    fut_symbols = [_futures_symbol(sym) for sym in symbols]
+
+    async with httpx.AsyncClient(timeout=8.0) as client:
+        # Bulk premium index covers every perpetual in one call; a single
+        # symbol asks for just its own row.
+        premium_params = {"symbol": fut_symbols[0]} if len(fut_symbols) == 1 else None
+        tasks = [
+            _get_json(client, gate, f"{BINANCE_FAPI_BASE}/fapi/v1/premiumIndex", premium_params),
+            asyncio.to_thread(get_fear_greed_index),
+        ]
+        for fut in fut_symbols:
+            tasks.append(_get_json(client, gate, f"{BINANCE_FAPI_BASE}/fapi/v1/openInterest", {"symbol": fut}))
+            tasks.append(_get_json(
+                client, gate, f"{BINANCE_FAPI_BASE}/futures/data/globalLongShortAccountRatio",
+                {"symbol": fut, "period": "1h", "limit": 1},
+            ))
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    premium, fear_greed = results[0], results[1]
+    funding_by_symbol: Dict[str, float] = {}
+    if isinstance(premium, Exception):
+        logger.debug("[ONCHAIN] Premium index failed: %s", premium)
+    else:
+        for row in premium if isinstance(premium, list) else [premium]:
+            try:
+                funding_by_symbol[str(row.get("symbol", "")).upper()] = float(row.get("lastFundingRate", 0.0))
+            except (TypeError, ValueError, AttributeError):
+                continue
+    if isinstance(fear_greed, Exception):
+        logger.debug("[ONCHAIN] Fear & Greed failed: %s", fear_greed)
+        fear_greed = None
+
+    readings: Dict[str, Dict] = {}
+    for i, (symbol, fut) in enumerate(zip(symbols, fut_symbols)):
+        oi_raw, ls_raw = results[2 + 2 * i], results[3 + 2 * i]
+        open_interest = ls_ratio = None
+        if isinstance(oi_raw, dict):
+            open_interest = float(oi_raw.get("openInterest", 0.0))
+        elif isinstance(oi_raw, Exception):
+            logger.debug("[ONCHAIN] Open interest failed for %s: %s", symbol, oi_raw)
+        if isinstance(ls_raw, list):
+            ls_ratio = float(ls_raw[0].get("longShortRatio", 1.0)) if ls_raw else 1.0
+        elif isinstance(ls_raw, Exception):
+            logger.debug("[ONCHAIN] L/S ratio failed for %s: %s", symbol, ls_raw)
+        readings[symbol] = {
+            "funding": funding_by_symbol.get(fut),
+            "open_interest": open_interest,
+            "fear_greed": int(fear_greed) if fear_greed is not None else None,
+            "ls_ratio": ls_ratio,
+        }
+    return readings
+
+
+def collect_onchain_signals(symbols: Iterable[str]) -> Dict[str, Dict]:
+    """Signals for every supported symbol, refreshing all stale ones in one batch.
+
+    Unsupported symbols are skipped. Fresh snapshots come from the local copy
+    or one Redis MGET; the rest are collected with a single round of
+    concurrent requests and written back to Redis and history together.
+    """
+    supported = []
+    for sym in dict.fromkeys(_normalize_symbol(s) for s in symbols if s):
+        if is_onchain_supported(sym):
+            supported.append(sym)
+    if not supported:
+        return {}
+
+    now = time.time()
+    out: Dict[str, Dict] = {}
+    with _local_lock:
+        for sym in supported:
+            entry = _local_signals.get(sym)
+            if entry and now - entry[0] < TTL_SECONDS:
+                out[sym] = entry[1]
+    remaining = [sym for sym in supported if sym not in out]
+    if remaining:
+        cached = cache_mget([f"onchain:{sym}" for sym in remaining])
+        for sym in remaining:
+            value = cached.get(f"onchain:{sym}")
+            if isinstance(value, dict):
+                out[sym] = value
+    stale = [sym for sym in supported if sym not in out]
+    if not stale:
+        return out
+
+    readings = run_sync(_fetch_market_structure(stale))
+    fresh = {sym: _build_signals(sym, **readings[sym]) for sym in stale}
+
+    cache_mset({f"onchain:{sym}": signals for sym, signals in fresh.items()}, expire=TTL_SECONDS)
+    with _local_lock:
+        for sym, signals in fresh.items():
+            _local_signals[sym] = (now, signals)
+    _persist_snapshots(list(fresh.values()))
+
+    out.update(fresh)
+    return out
+
+
+def get_onchain_signals(symbol: str) -> Dict:
+    """Collect free on-chain proxies and return a normalized sentiment bundle."""
+    symbol = _normalize_symbol(symbol)
+    if not is_onchain_supported(symbol):
+        raise ValueError(f"On-chain signals not supported for {symbol}")
+
+    return collect_onchain_signals([symbol])[symbol]
+
+
 def get_onchain_history(symbol: str, days: int = 30, limit: int = 120) -> Dict:
     normalized = _normalize_symbol(symbol)
     if SessionLocal is None:
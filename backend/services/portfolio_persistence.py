@@ -1,22 +1,126 @@
 """
 Portfolio Persistence Service for AURA.
-Stores portfolio state snapshots with relational symbol and cluster exposures.
-
-All tables are append-only — each snapshot is a point-in-time record.
-
-Retention note:
-  At 1 snapshot per decision (roughly per symbol check), a user checking
-  33 symbols once a day produces ~33 rows/day + ~33*N child rows.
-  At scale, consider partitioning by snapshot_timestamp or periodic
-  aggregation (daily rollups) with raw row pruning after 90 days.
+Stores portfolio state as a compact equity time series plus periodic
+full snapshots with relational symbol and cluster exposures.
+
+Every assessment writes one portfolio_equity_points row and upserts the
+hourly / daily / weekly OHLC buckets in portfolio_equity_rollups. A full
+portfolio_state_snapshots row (with exposure children and metadata) is only
+written as a keyframe: when the user's last one is older than
+SNAPSHOT_KEYFRAME_SECONDS or the set of held symbols changed. Charts read
+the rollups, so their cost depends on the requested range, not on history
+length; raw points older than POINT_RETENTION_DAYS can be pruned.
 """
 
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, bindparam, text
 
 logger = logging.getLogger(__name__)
 
+SNAPSHOT_KEYFRAME_SECONDS = 3600
+POINT_RETENTION_DAYS = 30
+
+# (resolution, bucket width in seconds), finest first
+RESOLUTIONS: Tuple[Tuple[str, int], ...] = (("1h", 3600), ("1d", 86400), ("1w", 7 * 86400))
+CHART_MAX_BUCKETS = 500  # rows read per chart, whatever the range
+CHART_DEFAULT_POINTS = 120
+
+_UPSERT_ROLLUP_SQL = text("""
+    INSERT INTO portfolio_equity_rollups
+        (user_id, resolution, bucket_start, open, high, low, close,
+         first_ts, last_ts, samples, risk_score, total_exposure)
+    VALUES
+        (:user_id, :resolution, :bucket_start, :equity, :equity, :equity, :equity,
+         :ts, :ts, 1, :risk_score, :total_exposure)
+    ON CONFLICT (user_id, resolution, bucket_start) DO UPDATE SET
+        open = CASE WHEN EXCLUDED.first_ts < portfolio_equity_rollups.first_ts
+                    THEN EXCLUDED.open ELSE portfolio_equity_rollups.open END,
+        first_ts = CASE WHEN EXCLUDED.first_ts < portfolio_equity_rollups.first_ts
+                        THEN EXCLUDED.first_ts ELSE portfolio_equity_rollups.first_ts END,
+        high = CASE WHEN EXCLUDED.high > portfolio_equity_rollups.high
+                    THEN EXCLUDED.high ELSE portfolio_equity_rollups.high END,
+        low = CASE WHEN EXCLUDED.low < portfolio_equity_rollups.low
+                   THEN EXCLUDED.low ELSE portfolio_equity_rollups.low END,
+        close = CASE WHEN EXCLUDED.last_ts >= portfolio_equity_rollups.last_ts
+                     THEN EXCLUDED.close ELSE portfolio_equity_rollups.close END,
+        risk_score = CASE WHEN EXCLUDED.last_ts >= portfolio_equity_rollups.last_ts
+                          THEN EXCLUDED.risk_score ELSE portfolio_equity_rollups.risk_score END,
+        total_exposure = CASE WHEN EXCLUDED.last_ts >= portfolio_equity_rollups.last_ts
+                              THEN EXCLUDED.total_exposure ELSE portfolio_equity_rollups.total_exposure END,
+        last_ts = CASE WHEN EXCLUDED.last_ts >= portfolio_equity_rollups.last_ts
+                       THEN EXCLUDED.last_ts ELSE portfolio_equity_rollups.last_ts END,
+        samples = portfolio_equity_rollups.samples + 1
+""").bindparams(
+    bindparam("bucket_start", type_=DateTime()),
+    bindparam("ts", type_=DateTime()),
+)
+
+
+def bucket_start(ts: datetime, resolution: str) -> datetime:
+    """Start of the UTC bucket containing ``ts`` (weeks start on Monday)."""
+    if resolution == "1h":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == "1d":
+        return day
+    if resolution == "1w":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def _record_equity_point(
+    db, user_id: int, ts: datetime, total_equity: float, available_cash: float,
+    total_exposure: float, risk_score: Optional[float], drawdown_pct: Optional[float],
+) -> None:
+    """Append the compact point and fold it into every rollup resolution."""
+    from database.models import PortfolioEquityPoint
+
+    db.add(PortfolioEquityPoint(
+        user_id=user_id,
+        ts=ts,
+        total_equity=float(total_equity),
+        available_cash=float(available_cash) if available_cash is not None else None,
+        total_exposure=float(total_exposure) if total_exposure is not None else None,
+        risk_score=risk_score,
+        drawdown_pct=drawdown_pct,
+    ))
+    db.execute(_UPSERT_ROLLUP_SQL, [
+        {
+            "user_id": user_id,
+            "resolution": resolution,
+            "bucket_start": bucket_start(ts, resolution),
+            "equity": float(total_equity),
+            "ts": ts,
+            "risk_score": risk_score,
+            "total_exposure": float(total_exposure) if total_exposure is not None else None,
+        }
+        for resolution, _ in RESOLUTIONS
+    ])
+
+
+def _needs_keyframe(db, user_id: int, ts: datetime, symbols: set) -> bool:
+    """True when the last full snapshot is stale or held a different symbol set."""
+    from database.models import PortfolioStateSnapshot, PortfolioSymbolExposure
+
+    last = (
+        db.query(PortfolioStateSnapshot.id, PortfolioStateSnapshot.snapshot_timestamp)
+        .filter(PortfolioStateSnapshot.user_id == user_id)
+        .order_by(PortfolioStateSnapshot.snapshot_timestamp.desc())
+        .first()
+    )
+    if last is None or last.snapshot_timestamp is None:
+        return True
+    if (ts - last.snapshot_timestamp).total_seconds() >= SNAPSHOT_KEYFRAME_SECONDS:
+        return True
+    held = {
+        r.symbol for r in db.query(PortfolioSymbolExposure.symbol)
+        .filter(PortfolioSymbolExposure.portfolio_snapshot_id == last.id)
+    }
+    return held != symbols
+
 
 def save_portfolio_snapshot(
     user_id: int,
@@ -29,10 +133,13 @@ def save_portfolio_snapshot(
     diversification_score: Optional[float] = None,
     drawdown_pct: Optional[float] = None,
     metadata: Optional[dict] = None,
+    timestamp: Optional[datetime] = None,
 ) -> Optional[int]:
     """
-    Save a portfolio snapshot with relational symbol and cluster exposures.
-    Returns the snapshot ID or None on failure.
+    Record a portfolio assessment: always an equity point + rollups, and a
+    full snapshot with relational symbol and cluster exposures when a
+    keyframe is due. Returns the new snapshot ID, or None when only the
+    equity point was recorded or on failure.
 
     positions: list of dicts with at minimum:
         {symbol, quantity, market_value, exposure_pct}
@@ -47,6 +154,7 @@ def save_portfolio_snapshot(
         )
 
         db = SessionLocal()
+        ts = timestamp or datetime.utcnow()
 
         # Compute aggregates
         total_exposure = sum(p.get("market_value", 0) for p in positions)
@@ -63,10 +171,20 @@ def save_portfolio_snapshot(
         gross_exposure = long_exposure + short_exposure
         net_exposure = long_exposure - short_exposure
 
-        # ── 1. Insert snapshot ──
+        # ── 1. Equity point + OHLC rollups ──
+        _record_equity_point(
+            db, user_id, ts, total_equity, available_cash,
+            total_exposure, risk_score, drawdown_pct,
+        )
+        if not _needs_keyframe(db, user_id, ts, {p.get("symbol", "") for p in positions}):
+            db.commit()
+            db.close()
+            return None
+
+        # ── 2. Keyframe snapshot ──
         snapshot = PortfolioStateSnapshot(
             user_id=user_id,
-            snapshot_timestamp=datetime.utcnow(),
+            snapshot_timestamp=ts,
             total_equity=total_equity,
             available_cash=available_cash,
             total_exposure=total_exposure,
@@ -81,7 +199,7 @@ def save_portfolio_snapshot(
         db.add(snapshot)
         db.flush()  # get snapshot.id
 
-        # ── 2. Insert symbol exposures ──
+        # ── 3. Insert symbol exposures ──
         for p in positions:
             db.add(PortfolioSymbolExposure(
                 portfolio_snapshot_id=snapshot.id,
@@ -95,7 +213,7 @@ def save_portfolio_snapshot(
                 metadata_json=p.get("metadata") or {},
             ))
 
-        # ── 3. Insert cluster exposures ──
+        # ── 4. Insert cluster exposures ──
         for cluster_name, gross_val in correlated_exposure.items():
             cluster_pct = (gross_val / total_equity * 100) if total_equity > 0 else 0
             db.add(PortfolioClusterExposure(
@@ -123,6 +241,34 @@ def save_portfolio_snapshot(
         return None
 
 
+def _snapshot_history_statement(user_id: int, limit: int):
+    from sqlalchemy import select
+    from database.models import PortfolioStateSnapshot
+
+    return (
+        select(PortfolioStateSnapshot)
+        .where(PortfolioStateSnapshot.user_id == user_id)
+        .order_by(PortfolioStateSnapshot.snapshot_timestamp.desc())
+        .limit(min(limit, 200))
+    )
+
+
+def _snapshot_summary(r) -> Dict:
+    return {
+        "id": r.id,
+        "snapshot_timestamp": r.snapshot_timestamp.isoformat() if r.snapshot_timestamp else None,
+        "total_equity": float(r.total_equity) if r.total_equity is not None else None,
+        "available_cash": float(r.available_cash) if r.available_cash is not None else None,
+        "total_exposure": float(r.total_exposure) if r.total_exposure is not None else None,
+        "net_exposure": float(r.net_exposure) if r.net_exposure is not None else None,
+        "gross_exposure": float(r.gross_exposure) if r.gross_exposure is not None else None,
+        "drawdown_pct": r.drawdown_pct,
+        "concentration_score": r.concentration_score,
+        "diversification_score": r.diversification_score,
+        "risk_score": r.risk_score,
+    }
+
+
 def get_snapshot_history(
     user_id: int,
     limit: int = 30,
@@ -133,34 +279,12 @@ def get_snapshot_history(
     """
     try:
         from database.connection import SessionLocal
-        from database.models import PortfolioStateSnapshot
 
         db = SessionLocal()
-        rows = (
-            db.query(PortfolioStateSnapshot)
-            .filter(PortfolioStateSnapshot.user_id == user_id)
-            .order_by(PortfolioStateSnapshot.snapshot_timestamp.desc())
-            .limit(min(limit, 200))
-            .all()
-        )
+        rows = db.execute(_snapshot_history_statement(user_id, limit)).scalars().all()
         db.close()
 
-        return [
-            {
-                "id": r.id,
-                "snapshot_timestamp": r.snapshot_timestamp.isoformat() if r.snapshot_timestamp else None,
-                "total_equity": float(r.total_equity) if r.total_equity is not None else None,
-                "available_cash": float(r.available_cash) if r.available_cash is not None else None,
-                "total_exposure": float(r.total_exposure) if r.total_exposure is not None else None,
-                "net_exposure": float(r.net_exposure) if r.net_exposure is not None else None,
-                "gross_exposure": float(r.gross_exposure) if r.gross_exposure is not None else None,
-                "drawdown_pct": r.drawdown_pct,
-                "concentration_score": r.concentration_score,
-                "diversification_score": r.diversification_score,
-                "risk_score": r.risk_score,
-            }
-            for r in rows
-        ]
+        return [_snapshot_summary(r) for r in rows]
 
     except Exception as e:
         logger.warning(f"[portfolio_persist] Failed to load history: {e}")
@@ -243,23 +367,23 @@ def get_snapshot_detail(snapshot_id: int) -> Optional[Dict]:
 
 def get_equity_timeseries(user_id: int, limit: int = 90) -> List[Dict]:
     """
-    Get equity over time for charting.
-    Returns (timestamp, total_equity, risk_score) tuples.
+    Latest raw equity points for a user, in chronological order.
+    Returns (timestamp, total_equity, risk_score, total_exposure) dicts.
     """
     try:
         from database.connection import SessionLocal
-        from database.models import PortfolioStateSnapshot
+        from database.models import PortfolioEquityPoint
 
         db = SessionLocal()
         rows = (
             db.query(
-                PortfolioStateSnapshot.snapshot_timestamp,
-                PortfolioStateSnapshot.total_equity,
-                PortfolioStateSnapshot.risk_score,
-                PortfolioStateSnapshot.total_exposure,
+                PortfolioEquityPoint.ts,
+                PortfolioEquityPoint.total_equity,
+                PortfolioEquityPoint.risk_score,
+                PortfolioEquityPoint.total_exposure,
             )
-            .filter(PortfolioStateSnapshot.user_id == user_id)
-            .order_by(PortfolioStateSnapshot.snapshot_timestamp.desc())
+            .filter(PortfolioEquityPoint.user_id == user_id)
+            .order_by(PortfolioEquityPoint.ts.desc())
             .limit(min(limit, 365))
             .all()
         )
@@ -267,10 +391,10 @@ def get_equity_timeseries(user_id: int, limit: int = 90) -> List[Dict]:
 
         return [
             {
-                "timestamp": r.snapshot_timestamp.isoformat() if r.snapshot_timestamp else None,
-                "total_equity": float(r.total_equity) if r.total_equity is not None else None,
+                "timestamp": r.ts.isoformat() if r.ts else None,
+                "total_equity": r.total_equity,
                 "risk_score": r.risk_score,
-                "total_exposure": float(r.total_exposure) if r.total_exposure is not None else None,
+                "total_exposure": r.total_exposure,
             }
             for r in reversed(rows)  # chronological order for charts
         ]
@@ -278,3 +402,133 @@ def get_equity_timeseries(user_id: int, limit: int = 90) -> List[Dict]:
     except Exception as e:
         logger.warning(f"[portfolio_persist] Failed to load timeseries: {e}")
         return []
+
+
+def pick_resolution(days: float) -> str:
+    """Finest rollup resolution that covers ``days`` within CHART_MAX_BUCKETS rows."""
+    span = max(days, 0) * 86400
+    for resolution, seconds in RESOLUTIONS:
+        if span / seconds <= CHART_MAX_BUCKETS:
+            return resolution
+    return RESOLUTIONS[-1][0]
+
+
+def _downsample(buckets: List[Dict], start: datetime, end: datetime, points: int) -> List[Dict]:
+    """Merge chronological OHLC buckets into at most ``points`` equal-width bins."""
+    if len(buckets) <= points:
+        return buckets
+    width = max((end - start).total_seconds() / points, 1.0)
+    out: List[Dict] = []
+    for b in buckets:
+        idx = min(int((b["bucket_start"] - start).total_seconds() // width), points - 1)
+        if out and out[-1]["_bin"] == idx:
+            merged = out[-1]
+            merged["high"] = max(merged["high"], b["high"])
+            merged["low"] = min(merged["low"], b["low"])
+            merged["close"] = b["close"]
+            merged["risk_score"] = b["risk_score"]
+            merged["total_exposure"] = b["total_exposure"]
+            merged["samples"] += b["samples"]
+        else:
+            out.append({**b, "_bin": idx})
+    for b in out:
+        del b["_bin"]
+    return out
+
+
+def _equity_chart_statement(user_id: int, resolution: str, since: datetime):
+    from sqlalchemy import select
+    from database.models import PortfolioEquityRollup
+
+    return (
+        select(PortfolioEquityRollup)
+        .where(
+            PortfolioEquityRollup.user_id == user_id,
+            PortfolioEquityRollup.resolution == resolution,
+            PortfolioEquityRollup.bucket_start >= since,
+        )
+        .order_by(PortfolioEquityRollup.bucket_start)
+        .limit(CHART_MAX_BUCKETS + 1)
+    )
+
+
+def _chart_window(days: int, now: Optional[datetime]) -> Tuple[str, datetime, datetime]:
+    """(resolution, first bucket start, end) for a chart over the last ``days``."""
+    end = now or datetime.utcnow()
+    resolution = pick_resolution(days)
+    return resolution, bucket_start(end - timedelta(days=days), resolution), end
+
+
+def _chart_payload(rows, resolution: str, days: int, start: datetime, end: datetime, points: int) -> Dict:
+    buckets = [
+        {
+            "bucket_start": r.bucket_start,
+            "open": r.open, "high": r.high, "low": r.low, "close": r.close,
+            "samples": r.samples,
+            "risk_score": r.risk_score,
+            "total_exposure": r.total_exposure,
+        }
+        for r in rows
+    ]
+    series = [
+        {
+            "timestamp": b["bucket_start"].isoformat(),
+            "open": b["open"],
+            "high": b["high"],
+            "low": b["low"],
+            "close": b["close"],
+            "total_equity": b["close"],
+            "risk_score": b["risk_score"],
+            "total_exposure": b["total_exposure"],
+            "samples": b["samples"],
+        }
+        for b in _downsample(buckets, start, end, max(1, points))
+    ]
+    return {"resolution": resolution, "days": days, "series": series, "count": len(series)}
+
+
+def get_equity_chart(
+    user_id: int,
+    days: int = 90,
+    points: int = CHART_DEFAULT_POINTS,
+    now: Optional[datetime] = None,
+) -> Dict:
+    """
+    Equity OHLC for the last ``days``, at the resolution that fits the range,
+    merged down to at most ``points`` chronological points.
+    """
+    resolution, start, end = _chart_window(days, now)
+    try:
+        from database.connection import SessionLocal
+
+        db = SessionLocal()
+        rows = db.execute(_equity_chart_statement(user_id, resolution, start)).scalars().all()
+        db.close()
+
+        return _chart_payload(rows, resolution, days, start, end, points)
+
+    except Exception as e:
+        logger.warning(f"[portfolio_persist] Failed to load equity chart: {e}")
+        return {"resolution": resolution, "days": days, "series": [], "count": 0}
+
+
+def prune_equity_points(retain_days: int = POINT_RETENTION_DAYS) -> int:
+    """Delete raw equity points older than ``retain_days``; rollups keep the history."""
+    try:
+        from database.connection import SessionLocal
+        from database.models import PortfolioEquityPoint
+
+        db = SessionLocal()
+        cutoff = datetime.utcnow() - timedelta(days=retain_days)
+        deleted = (
+            db.query(PortfolioEquityPoint)
+            .filter(PortfolioEquityPoint.ts < cutoff)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        db.close()
+        return int(deleted or 0)
+
+    except Exception as e:
+        logger.warning(f"[portfolio_persist] Failed to prune equity points: {e}")
+        return 0
@@ -1,48 +1,188 @@
 """Prediction tracking and evaluation service."""
 
+import logging
+import math
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import text
 
 from database.connection import SessionLocal
-
-
-class PredictionOutcomesService:
-    def _ensure_table(self):
-        if not callable(SessionLocal):
+from database.schema_registry import ensure_schema, register_schema
+
+logger = logging.getLogger(__name__)
+
+TRACK_DEDUPE_WINDOW_SECONDS = 900  # identical (symbol, action, price bucket) within 15 min is one record
+TRACK_PRICE_BUCKET_PCT = 0.5  # prices within ~0.5% share a bucket
+TRACK_FLUSH_INTERVAL_SECONDS = 2.0
+TRACK_BATCH_SIZE = 500
+TRACK_MAX_RETRIES = 3  # a failing batch is retried this many times before it is dropped
+TRACK_RETRY_BACKOFF_SECONDS = 1.0  # doubled after each consecutive failure
+
+_INSERT_COLUMNS = (
+    "symbol", "action", "confidence", "price_at_prediction", "onchain_score", "onchain_sentiment", "created_at",
+)
+
+
+def _price_bucket(price: float) -> int:
+    if price <= 0:
+        return 0
+    return int(round(math.log(price) / math.log1p(TRACK_PRICE_BUCKET_PCT / 100.0)))
+
+
+def _insert_batch(db, records: List[Dict[str, Any]]) -> None:
+    """One multi-row INSERT per TRACK_BATCH_SIZE records."""
+    for start in range(0, len(records), TRACK_BATCH_SIZE):
+        chunk = records[start:start + TRACK_BATCH_SIZE]
+        params: Dict[str, Any] = {}
+        values = []
+        for i, record in enumerate(chunk):
+            values.append("(" + ", ".join(f":{col}_{i}" for col in _INSERT_COLUMNS) + ")")
+            for col in _INSERT_COLUMNS:
+                params[f"{col}_{i}"] = record[col]
+        db.execute(
+            text(f"INSERT INTO prediction_outcomes ({', '.join(_INSERT_COLUMNS)}) VALUES {', '.join(values)}"),
+            params,
+        )
+
+
+register_schema("prediction_outcomes", (
+    """
+    CREATE TABLE IF NOT EXISTS prediction_outcomes (
+        id SERIAL PRIMARY KEY,
+        symbol VARCHAR NOT NULL,
+        action VARCHAR NOT NULL,
+        confidence FLOAT NOT NULL,
+        price_at_prediction FLOAT NOT NULL,
+        onchain_score FLOAT,
+        onchain_sentiment VARCHAR,
+        price_7d_later FLOAT,
+        price_30d_later FLOAT,
+        was_correct_7d BOOLEAN,
+        was_correct_30d BOOLEAN,
+        pnl_7d_pct FLOAT,
+        created_at TIMESTAMP DEFAULT NOW(),
+        evaluated_at TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_prediction_outcomes_symbol ON prediction_outcomes (symbol)",
+    "CREATE INDEX IF NOT EXISTS ix_prediction_outcomes_created_at ON prediction_outcomes (created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS ix_prediction_outcomes_eval_7d ON prediction_outcomes (was_correct_7d, created_at)",
+    "ALTER TABLE prediction_outcomes ADD COLUMN IF NOT EXISTS onchain_score FLOAT",
+    "ALTER TABLE prediction_outcomes ADD COLUMN IF NOT EXISTS onchain_sentiment VARCHAR",
+))
+
+
+class PredictionTracker:
+    """Buffers tracked predictions and writes them in batches from a background thread.
+
+    Duplicate (symbol, action, price bucket) records inside the dedupe window
+    are dropped at enqueue time, so rebuilding the prediction board on every
+    request does not multiply rows. ``track`` never touches the database.
+    A failed write goes back to the front of the queue and is retried with
+    exponential backoff, up to ``TRACK_MAX_RETRIES`` times.
+    """
+
+    def __init__(self, writer=None):
+        self._pending: List[Dict[str, Any]] = []
+        self._recent: Dict[Tuple[str, str, int], float] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread: Optional[threading.Thread] = None
+        self._writer = writer  # (records) -> None; defaults to a multi-row INSERT
+        self.stats = {"tracked": 0, "deduped": 0, "written": 0, "batches": 0, "retried": 0, "failed": 0}
+
+    def track(self, record: Dict[str, Any]) -> bool:
+        now = time.time()
+        key = (record["symbol"], record["action"], _price_bucket(record["price_at_prediction"]))
+        with self._lock:
+            seen_at = self._recent.get(key)
+            if seen_at is not None and now - seen_at < TRACK_DEDUPE_WINDOW_SECONDS:
+                self.stats["deduped"] += 1
+                return False
+            self._recent[key] = now
+            if len(self._recent) > 10 * TRACK_BATCH_SIZE:
+                cutoff = now - TRACK_DEDUPE_WINDOW_SECONDS
+                self._recent = {k: t for k, t in self._recent.items() if t >= cutoff}
+            self._pending.append(record)
+            self.stats["tracked"] += 1
+            self._idle.clear()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="prediction-tracker", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= TRACK_BATCH_SIZE:
+                self._wakeup.set()
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything tracked so far has been written."""
+        self._wakeup.set()
+        return self._idle.wait(timeout)
+
+    def _run(self) -> None:
+        failures = 0
+        retry_at = 0.0
+        while True:
+            delay = retry_at - time.time() if failures else TRACK_FLUSH_INTERVAL_SECONDS
+            self._wakeup.wait(max(0.0, delay))
+            self._wakeup.clear()
+            if failures and time.time() < retry_at:
+                continue  # woken early; keep backing off
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if batch:
+                try:
+                    self._write(batch)
+                    self.stats["written"] += len(batch)
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    if failures > TRACK_MAX_RETRIES:
+                        self.stats["failed"] += len(batch)
+                        failures = 0
+                        logger.warning(
+                            f"[prediction_outcomes] Dropping {len(batch)} records after "
+                            f"{TRACK_MAX_RETRIES} retries: {e}"
+                        )
+                    else:
+                        backoff = TRACK_RETRY_BACKOFF_SECONDS * 2 ** (failures - 1)
+                        retry_at = time.time() + backoff
+                        self.stats["retried"] += len(batch)
+                        with self._lock:
+                            self._pending = batch + self._pending
+                        logger.warning(
+                            f"[prediction_outcomes] Batch write of {len(batch)} records failed, "
+                            f"retrying in {backoff:.1f}s: {e}"
+                        )
+                self.stats["batches"] += 1
+            with self._lock:
+                if not self._pending:
+                    self._idle.set()
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        if self._writer is not None:
+            self._writer(records)
             return
+        prediction_outcomes_service._ensure_table()
         db = SessionLocal()
         try:
-            db.execute(text("""
-                CREATE TABLE IF NOT EXISTS prediction_outcomes (
-                    id SERIAL PRIMARY KEY,
-                    symbol VARCHAR NOT NULL,
-                    action VARCHAR NOT NULL,
-                    confidence FLOAT NOT NULL,
-                    price_at_prediction FLOAT NOT NULL,
-                    onchain_score FLOAT,
-                    onchain_sentiment VARCHAR,
-                    price_7d_later FLOAT,
-                    price_30d_later FLOAT,
-                    was_correct_7d BOOLEAN,
-                    was_correct_30d BOOLEAN,
-                    pnl_7d_pct FLOAT,
-                    created_at TIMESTAMP DEFAULT NOW(),
-                    evaluated_at TIMESTAMP
-                )
-            """))
-            db.execute(text("CREATE INDEX IF NOT EXISTS ix_prediction_outcomes_symbol ON prediction_outcomes (symbol)"))
-            db.execute(text("CREATE INDEX IF NOT EXISTS ix_prediction_outcomes_created_at ON prediction_outcomes (created_at DESC)"))
-            db.execute(text("CREATE INDEX IF NOT EXISTS ix_prediction_outcomes_eval_7d ON prediction_outcomes (was_correct_7d, created_at)"))
-            db.execute(text("ALTER TABLE prediction_outcomes ADD COLUMN IF NOT EXISTS onchain_score FLOAT"))
-            db.execute(text("ALTER TABLE prediction_outcomes ADD COLUMN IF NOT EXISTS onchain_sentiment VARCHAR"))
+            _insert_batch(db, records)
             db.commit()
         except Exception:
             db.rollback()
+            raise
         finally:
             db.close()
 
+
+class PredictionOutcomesService:
+    def _ensure_table(self):
+        ensure_schema("prediction_outcomes")
+
     def _normalize_conf_pct(self, confidence: float) -> float:
         c = float(confidence or 0.0)
         if c <= 1.0:
@@ -63,35 +203,19 @@ class PredictionOutcomesService:
         confidence: float,
         price_at_prediction: float,
         onchain: Optional[Dict[str, Any]] = None,
-    ):
-        self._ensure_table()
-        db = SessionLocal()
-        try:
-            db.execute(
-                text(
-                    """
-                    INSERT INTO prediction_outcomes (
-                        symbol, action, confidence, price_at_prediction, onchain_score, onchain_sentiment
-                    )
-                    VALUES (
-                        :symbol, :action, :confidence, :price_at_prediction, :onchain_score, :onchain_sentiment
-                    )
-                    """
-                ),
-                {
-                    "symbol": str(symbol or "").upper(),
-                    "action": str(action or "HOLD").upper(),
-                    "confidence": float(confidence or 0.0),
-                    "price_at_prediction": float(price_at_prediction or 0.0),
-                    "onchain_score": float((onchain or {}).get("score") or 0.0) if onchain else None,
-                    "onchain_sentiment": str((onchain or {}).get("sentiment") or "") if onchain else None,
-                },
-            )
-            db.commit()
-        except Exception:
-            db.rollback()
-        finally:
-            db.close()
+    ) -> bool:
+        """Queue a prediction for batched persistence; returns False if deduped."""
+        if not callable(SessionLocal):
+            return False
+        return prediction_tracker.track({
+            "symbol": str(symbol or "").upper(),
+            "action": str(action or "HOLD").upper(),
+            "confidence": float(confidence or 0.0),
+            "price_at_prediction": float(price_at_prediction or 0.0),
+            "onchain_score": float((onchain or {}).get("score") or 0.0) if onchain else None,
+            "onchain_sentiment": str((onchain or {}).get("sentiment") or "") if onchain else None,
+            "created_at": datetime.utcnow(),
+        })
 
     def _compute_correctness(self, action: str, price_then: float, price_now: float) -> Optional[bool]:
         a = (action or "").upper()
@@ -222,119 +346,114 @@ class PredictionOutcomesService:
         finally:
             db.close()
 
+    @staticmethod
+    def _empty_accuracy(symbol: Optional[str] = None) -> Dict:
+        return {
+            "overall_accuracy_7d": 0.0,
+            "total_evaluated": 0,
+            "by_confidence_band": {
+                "90-100": {"accuracy": 0.0, "count": 0},
+                "80-90": {"accuracy": 0.0, "count": 0},
+                "70-80": {"accuracy": 0.0, "count": 0},
+            },
+            "best_assets": [],
+            "worst_assets": [],
+            "per_symbol_accuracy": {},
+            "symbol": symbol.upper() if symbol else None,
+        }
+
+    @staticmethod
+    def _accuracy_query(symbol: Optional[str] = None):
+        """(statement, params) for the evaluated outcomes behind get_accuracy."""
+        params = {}
+        where = "WHERE was_correct_7d IS NOT NULL"
+        if symbol:
+            where += " AND symbol = :symbol"
+            params["symbol"] = symbol.upper()
+        return text(
+            f"""
+            SELECT symbol, confidence, was_correct_7d
+            FROM prediction_outcomes
+            {where}
+            """
+        ), params
+
+    def _summarize_accuracy(self, rows, symbol: Optional[str] = None) -> Dict:
+        total = len(rows)
+        correct = sum(1 for r in rows if bool(r["was_correct_7d"]))
+        overall = round((correct / total) * 100.0, 2) if total else 0.0
+
+        bands = {
+            "90-100": {"count": 0, "correct": 0},
+            "80-90": {"count": 0, "correct": 0},
+            "70-80": {"count": 0, "correct": 0},
+        }
+
+        by_symbol_counts: Dict[str, Dict[str, int]] = {}
+        for r in rows:
+            sym = str(r["symbol"])
+            conf_pct = self._normalize_conf_pct(float(r["confidence"] or 0.0))
+            ok = bool(r["was_correct_7d"])
+
+            if sym not in by_symbol_counts:
+                by_symbol_counts[sym] = {"count": 0, "correct": 0}
+            by_symbol_counts[sym]["count"] += 1
+            by_symbol_counts[sym]["correct"] += 1 if ok else 0
+
+            if 90 <= conf_pct <= 100:
+                band = "90-100"
+            elif 80 <= conf_pct < 90:
+                band = "80-90"
+            elif 70 <= conf_pct < 80:
+                band = "70-80"
+            else:
+                band = None
+
+            if band:
+                bands[band]["count"] += 1
+                bands[band]["correct"] += 1 if ok else 0
+
+        by_confidence_band = {}
+        for k, v in bands.items():
+            acc = round((v["correct"] / v["count"]) * 100.0, 2) if v["count"] else 0.0
+            by_confidence_band[k] = {"accuracy": acc, "count": v["count"]}
+
+        symbol_accuracy_items = []
+        for sym, v in by_symbol_counts.items():
+            if v["count"] <= 0:
+                continue
+            acc = round((v["correct"] / v["count"]) * 100.0, 2)
+            symbol_accuracy_items.append({"symbol": sym, "accuracy": acc, "count": v["count"]})
+        symbol_accuracy_items.sort(key=lambda x: x["accuracy"], reverse=True)
+
+        best_assets = [x["symbol"] for x in symbol_accuracy_items[:2]]
+        worst_assets = [x["symbol"] for x in sorted(symbol_accuracy_items, key=lambda x: x["accuracy"])[:2]]
+
+        per_symbol_accuracy = {x["symbol"]: x["accuracy"] for x in symbol_accuracy_items}
+
+        response = {
+            "overall_accuracy_7d": overall,
+            "total_evaluated": total,
+            "by_confidence_band": by_confidence_band,
+            "best_assets": best_assets,
+            "worst_assets": worst_assets,
+            "per_symbol_accuracy": per_symbol_accuracy,
+        }
+        if symbol:
+            response["symbol"] = symbol.upper()
+        return response
+
     def get_accuracy(self, symbol: Optional[str] = None) -> Dict:
         if not callable(SessionLocal):
-            return {
-                "overall_accuracy_7d": 0.0,
-                "total_evaluated": 0,
-                "by_confidence_band": {
-                    "90-100": {"accuracy": 0.0, "count": 0},
-                    "80-90": {"accuracy": 0.0, "count": 0},
-                    "70-80": {"accuracy": 0.0, "count": 0},
-                },
-                "best_assets": [],
-                "worst_assets": [],
-                "per_symbol_accuracy": {},
-                "symbol": symbol.upper() if symbol else None,
-                "database_available": False,
-            }
+            return {**self._empty_accuracy(symbol), "database_available": False}
         self._ensure_table()
         db = SessionLocal()
         try:
-            params = {}
-            where = "WHERE was_correct_7d IS NOT NULL"
-            if symbol:
-                where += " AND symbol = :symbol"
-                params["symbol"] = symbol.upper()
-
-            rows = db.execute(
-                text(
-                    f"""
-                    SELECT symbol, confidence, was_correct_7d
-                    FROM prediction_outcomes
-                    {where}
-                    """
-                ),
-                params,
-            ).mappings().all()
-
-            total = len(rows)
-            correct = sum(1 for r in rows if bool(r["was_correct_7d"]))
-            overall = round((correct / total) * 100.0, 2) if total else 0.0
-
-            bands = {
-                "90-100": {"count": 0, "correct": 0},
-                "80-90": {"count": 0, "correct": 0},
-                "70-80": {"count": 0, "correct": 0},
-            }
-
-            by_symbol_counts: Dict[str, Dict[str, int]] = {}
-            for r in rows:
-                sym = str(r["symbol"])
-                conf_pct = self._normalize_conf_pct(float(r["confidence"] or 0.0))
-                ok = bool(r["was_correct_7d"])
-
-                if sym not in by_symbol_counts:
-                    by_symbol_counts[sym] = {"count": 0, "correct": 0}
-                by_symbol_counts[sym]["count"] += 1
-                by_symbol_counts[sym]["correct"] += 1 if ok else 0
-
-                if 90 <= conf_pct <= 100:
-                    band = "90-100"
-                elif 80 <= conf_pct < 90:
-                    band = "80-90"
-                elif 70 <= conf_pct < 80:
-                    band = "70-80"
-                else:
-                    band = None
-
-                if band:
-                    bands[band]["count"] += 1
-                    bands[band]["correct"] += 1 if ok else 0
-
-            by_confidence_band = {}
-            for k, v in bands.items():
-                acc = round((v["correct"] / v["count"]) * 100.0, 2) if v["count"] else 0.0
-                by_confidence_band[k] = {"accuracy": acc, "count": v["count"]}
-
-            symbol_accuracy_items = []
-            for sym, v in by_symbol_counts.items():
-                if v["count"] <= 0:
-                    continue
-                acc = round((v["correct"] / v["count"]) * 100.0, 2)
-                symbol_accuracy_items.append({"symbol": sym, "accuracy": acc, "count": v["count"]})
-            symbol_accuracy_items.sort(key=lambda x: x["accuracy"], reverse=True)
-
-            best_assets = [x["symbol"] for x in symbol_accuracy_items[:2]]
-            worst_assets = [x["symbol"] for x in sorted(symbol_accuracy_items, key=lambda x: x["accuracy"])[:2]]
-
-            per_symbol_accuracy = {x["symbol"]: x["accuracy"] for x in symbol_accuracy_items}
-
-            response = {
-                "overall_accuracy_7d": overall,
-                "total_evaluated": total,
-                "by_confidence_band": by_confidence_band,
-                "best_assets": best_assets,
-                "worst_assets": worst_assets,
-                "per_symbol_accuracy": per_symbol_accuracy,
-            }
-            if symbol:
-                response["symbol"] = symbol.upper()
-            return response
+            statement, params = self._accuracy_query(symbol)
+            rows = db.execute(statement, params).mappings().all()
+            return self._summarize_accuracy(rows, symbol)
         except Exception:
-            return {
-                "overall_accuracy_7d": 0.0,
-                "total_evaluated": 0,
-                "by_confidence_band": {
-                    "90-100": {"accuracy": 0.0, "count": 0},
-                    "80-90": {"accuracy": 0.0, "count": 0},
-                    "70-80": {"accuracy": 0.0, "count": 0},
-                },
-                "best_assets": [],
-                "worst_assets": [],
-                "per_symbol_accuracy": {},
-                "symbol": symbol.upper() if symbol else None,
-            }
+            return self._empty_accuracy(symbol)
         finally:
             db.close()
 
@@ -459,3 +578,4 @@ class PredictionOutcomesService:
 
 
 prediction_outcomes_service = PredictionOutcomesService()
+prediction_tracker = PredictionTracker()
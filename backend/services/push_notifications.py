@@ -1,29 +1,61 @@
 """
 Push Notification Service for AURA
 Sends notifications via Expo Push API (no FCM keys needed).
+
+Sends are queued and delivered by a background dispatcher: messages are
+chunked to Expo's 100-per-request limit and posted concurrently on one
+pooled client. Tokens come from a cached directory that is invalidated
+whenever a token is registered or moved; the invalidation bumps a version
+key in Redis so every worker reloads on its next read. Tokens Expo reports as
+``DeviceNotRegistered`` (in tickets or later receipts) are deactivated in
+bulk.
 """
 
 import logging
-from typing import Optional, List
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
 
 import httpx
 
+from cache.connection import get_redis
+
 logger = logging.getLogger(__name__)
 
 EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+EXPO_RECEIPTS_URL = "https://exp.host/--/api/v2/push/getReceipts"
+EXPO_BATCH_LIMIT = 100
+EXPO_RECEIPT_BATCH_LIMIT = 1000
+SEND_CONCURRENCY = 4
+TOKEN_DIRECTORY_TTL = 300
+TOKEN_DIRECTORY_VERSION_KEY = "push:token_directory:version"
+# Expo recommends waiting before polling receipts; they are kept for a day.
+RECEIPT_DELAY_SECONDS = 15 * 60
+COALESCE_SECONDS = 0.2
 
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
 
-def send_push_notification(
-    token: str,
-    title: str,
-    body: str,
-    data: Optional[dict] = None,
-) -> bool:
-    """Send a push notification via Expo Push API."""
-    if not token or not token.startswith("ExponentPushToken"):
-        logger.debug(f"[push] Invalid token, skipping: {token[:20] if token else 'None'}...")
-        return False
 
+def _get_client() -> httpx.Client:
+    """Shared pooled client; httpx.Client is safe to use across threads."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=SEND_CONCURRENCY * 2, max_keepalive_connections=SEND_CONCURRENCY),
+            )
+        return _client
+
+
+def _is_valid_token(token: Optional[str]) -> bool:
+    return bool(token) and token.startswith("ExponentPushToken")
+
+
+def _build_message(token: str, title: str, body: str, data: Optional[dict]) -> dict:
     payload = {
         "to": token,
         "title": title,
@@ -32,70 +64,297 @@ def send_push_notification(
     }
     if data:
         payload["data"] = data
+    return payload
+
+
+def send_push_notification(
+    token: str,
+    title: str,
+    body: str,
+    data: Optional[dict] = None,
+) -> bool:
+    """Send a push notification via Expo Push API."""
+    if not _is_valid_token(token):
+        logger.debug(f"[push] Invalid token, skipping: {token[:20] if token else 'None'}...")
+        return False
 
     try:
-        with httpx.Client(timeout=10.0) as client:
-            resp = client.post(EXPO_PUSH_URL, json=payload)
-            resp.raise_for_status()
-            result = resp.json()
-            logger.info(f"[push] Sent to {token[:30]}...: {title}")
-            return True
+        resp = _get_client().post(EXPO_PUSH_URL, json=_build_message(token, title, body, data))
+        resp.raise_for_status()
+        logger.info(f"[push] Sent to {token[:30]}...: {title}")
+        return True
     except Exception as e:
         logger.error(f"[push] Failed: {e}")
         return False
 
 
+# ── Token directory ─────────────────────────────────────────
+
+class _TokenDirectory:
+    """Active tokens by user, loaded with one query and cached until invalidated.
+
+    Invalidation is shared through a Redis version counter checked on every
+    read; without Redis each worker falls back to the TTL alone.
+    """
+
+    def __init__(self, ttl: float = TOKEN_DIRECTORY_TTL, client_factory: Callable = get_redis):
+        self._ttl = ttl
+        self._client_factory = client_factory
+        self._lock = threading.Lock()
+        self._by_user: Dict[Optional[int], List[str]] = {}
+        self._loaded_at = 0.0
+        self._version: Optional[str] = None
+
+    def _shared_version(self) -> Optional[str]:
+        client = self._client_factory()
+        if client is None:
+            return None
+        try:
+            return client.get(TOKEN_DIRECTORY_VERSION_KEY)
+        except Exception as e:
+            logger.debug(f"[push] Token directory version read failed: {e}")
+            return None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = 0.0
+        client = self._client_factory()
+        if client is None:
+            return
+        try:
+            client.incr(TOKEN_DIRECTORY_VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"[push] Token directory invalidation not shared: {e}")
+
+    def _load(self) -> Dict[Optional[int], List[str]]:
+        from database.connection import SessionLocal
+        from sqlalchemy import text
+        db = SessionLocal()
+        try:
+            rows = db.execute(text("SELECT user_id, token FROM push_tokens WHERE is_active = true")).fetchall()
+        finally:
+            db.close()
+        by_user: Dict[Optional[int], List[str]] = {}
+        for user_id, token in rows:
+            if token:
+                by_user.setdefault(int(user_id) if user_id is not None else None, []).append(token)
+        return by_user
+
+    def _snapshot(self) -> Dict[Optional[int], List[str]]:
+        # Read the version before loading, so a bump during the load triggers another.
+        version = self._shared_version()
+        with self._lock:
+            if version == self._version and time.time() - self._loaded_at < self._ttl:
+                return self._by_user
+        by_user = self._load()
+        with self._lock:
+            self._by_user = by_user
+            self._loaded_at = time.time()
+            self._version = version
+        return by_user
+
+    def all_tokens(self) -> List[str]:
+        return [t for tokens in self._snapshot().values() for t in tokens]
+
+    def tokens_for_user(self, user_id: int) -> List[str]:
+        return list(self._snapshot().get(int(user_id), []))
+
+
+token_directory = _TokenDirectory()
+
+
+def invalidate_token_cache() -> None:
+    """Call after a push token is registered or changed."""
+    token_directory.invalidate()
+
+
+def _deactivate_tokens(tokens: List[str]) -> int:
+    """Mark every token in ``tokens`` inactive with a single UPDATE."""
+    tokens = sorted(set(t for t in tokens if t))
+    if not tokens:
+        return 0
+    try:
+        from database.connection import SessionLocal
+        from sqlalchemy import bindparam, text
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                text(
+                    "UPDATE push_tokens SET is_active = false, updated_at = NOW() WHERE token IN :tokens"
+                ).bindparams(bindparam("tokens", expanding=True)),
+                {"tokens": tokens},
+            )
+            db.commit()
+        finally:
+            db.close()
+        token_directory.invalidate()
+        logger.info(f"[push] Deactivated {len(tokens)} unregistered tokens")
+        return int(result.rowcount or 0)
+    except Exception as e:
+        logger.error(f"[push] Failed to deactivate tokens: {e}")
+        return 0
+
+
+# ── Dispatcher ──────────────────────────────────────────────
+
+class PushDispatcher:
+    """Background queue that delivers Expo messages in concurrent 100-message batches."""
+
+    def __init__(self, post=None):
+        self._queue: "queue.Queue[dict]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._post = post  # (url, json) -> parsed response; defaults to the pooled client
+        self._pool = ThreadPoolExecutor(max_workers=SEND_CONCURRENCY, thread_name_prefix="push-send")
+        self._pending_receipts: Dict[str, str] = {}  # receipt id -> token
+        self._receipts_due_at = 0.0
+        self._idle = threading.Event()
+        self._idle.set()
+        self.stats = {"queued": 0, "sent": 0, "failed": 0, "batches": 0, "deactivated": 0}
+
+    def _http_post(self, url: str, payload) -> dict:
+        if self._post is not None:
+            return self._post(url, payload)
+        resp = _get_client().post(url, json=payload)
+        resp.raise_for_status()
+        return resp.json()
+
+    def enqueue(self, messages: List[dict]) -> int:
+        if not messages:
+            return 0
+        self._ensure_started()
+        self._idle.clear()
+        for message in messages:
+            self._queue.put(message)
+        self.stats["queued"] += len(messages)
+        return len(messages)
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="push-dispatcher", daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything queued so far has been posted."""
+        return self._idle.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=30.0)
+            except queue.Empty:
+                self._poll_receipts()
+                continue
+            # Give concurrent producers a moment to add to the same batch.
+            time.sleep(COALESCE_SECONDS)
+            batch = [first]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                logger.error(f"[push] Dispatch failed: {e}")
+            finally:
+                if self._queue.empty():
+                    self._idle.set()
+            self._poll_receipts()
+
+    def _deliver(self, messages: List[dict]) -> None:
+        chunks = [messages[i:i + EXPO_BATCH_LIMIT] for i in range(0, len(messages), EXPO_BATCH_LIMIT)]
+        results = list(self._pool.map(self._send_chunk, chunks))
+        dead: List[str] = []
+        for chunk, tickets in zip(chunks, results):
+            self.stats["batches"] += 1
+            if tickets is None:
+                self.stats["failed"] += len(chunk)
+                continue
+            for message, ticket in zip(chunk, tickets):
+                if ticket.get("status") == "ok":
+                    self.stats["sent"] += 1
+                    if ticket.get("id"):
+                        self._pending_receipts[ticket["id"]] = message["to"]
+                else:
+                    self.stats["failed"] += 1
+                    if (ticket.get("details") or {}).get("error") == "DeviceNotRegistered":
+                        dead.append(message["to"])
+        if self._pending_receipts and not self._receipts_due_at:
+            self._receipts_due_at = time.time() + RECEIPT_DELAY_SECONDS
+        if dead:
+            self.stats["deactivated"] += _deactivate_tokens(dead)
+        logger.info(f"[push] Delivered {len(messages)} messages in {len(chunks)} batches")
+
+    def _send_chunk(self, chunk: List[dict]) -> Optional[List[dict]]:
+        try:
+            return list(self._http_post(EXPO_PUSH_URL, chunk).get("data") or [])
+        except Exception as e:
+            logger.error(f"[push] Batch of {len(chunk)} failed: {e}")
+            return None
+
+    def _poll_receipts(self, force: bool = False) -> None:
+        if not self._pending_receipts or (not force and time.time() < self._receipts_due_at):
+            return
+        pending, self._pending_receipts = self._pending_receipts, {}
+        self._receipts_due_at = 0.0
+        ids = list(pending)
+        dead: List[str] = []
+        for i in range(0, len(ids), EXPO_RECEIPT_BATCH_LIMIT):
+            chunk = ids[i:i + EXPO_RECEIPT_BATCH_LIMIT]
+            try:
+                receipts = self._http_post(EXPO_RECEIPTS_URL, {"ids": chunk}).get("data") or {}
+            except Exception as e:
+                logger.debug(f"[push] Receipt poll failed: {e}")
+                continue
+            for receipt_id, receipt in receipts.items():
+                if receipt.get("status") == "error" and (receipt.get("details") or {}).get("error") == "DeviceNotRegistered":
+                    dead.append(pending.get(receipt_id))
+        if dead:
+            self.stats["deactivated"] += _deactivate_tokens(dead)
+
+
+push_dispatcher = PushDispatcher()
+
+
+def _enqueue_to_tokens(tokens: List[str], title: str, body: str, data: Optional[dict]) -> int:
+    messages = [_build_message(t, title, body, data) for t in tokens if _is_valid_token(t)]
+    return push_dispatcher.enqueue(messages)
+
+
 def send_push_to_all_users(title: str, body: str, data: Optional[dict] = None):
-    """Send push notification to all registered tokens."""
+    """Queue a push notification to all registered tokens; returns the number queued."""
     tokens = _get_all_tokens()
-    sent = 0
-    for token in tokens:
-        if send_push_notification(token, title, body, data):
-            sent += 1
-    logger.info(f"[push] Sent to {sent}/{len(tokens)} devices")
-    return sent
+    queued = _enqueue_to_tokens(tokens, title, body, data)
+    logger.info(f"[push] Queued for {queued}/{len(tokens)} devices")
+    return queued
 
 
 def _get_all_tokens() -> List[str]:
-    """Get all registered push tokens from DB."""
+    """Get all registered push tokens (cached directory)."""
     try:
-        from database.connection import SessionLocal
-        from sqlalchemy import text
-        db = SessionLocal()
-        rows = db.execute(text("SELECT token FROM push_tokens WHERE is_active = true")).fetchall()
-        db.close()
-        return [r[0] for r in rows if r[0]]
+        return token_directory.all_tokens()
     except Exception as e:
         logger.error(f"[push] Failed to get tokens: {e}")
         return []
 
 
 def _get_tokens_for_user(user_id: int) -> List[str]:
-    """Get active push tokens for a single user."""
+    """Get active push tokens for a single user (cached directory)."""
     try:
-        from database.connection import SessionLocal
-        from sqlalchemy import text
-        db = SessionLocal()
-        rows = db.execute(
-            text("SELECT token FROM push_tokens WHERE is_active = true AND user_id = :user_id"),
-            {"user_id": int(user_id)},
-        ).fetchall()
-        db.close()
-        return [r[0] for r in rows if r[0]]
+        return token_directory.tokens_for_user(user_id)
     except Exception as e:
         logger.error(f"[push] Failed to get user tokens (user_id={user_id}): {e}")
         return []
 
 
 def send_push_to_user_id(user_id: int, title: str, body: str, data: Optional[dict] = None) -> int:
-    """Send push notification only to a specific user."""
+    """Queue a push notification for a specific user; returns the number queued."""
     tokens = _get_tokens_for_user(user_id)
-    sent = 0
-    for token in tokens:
-        if send_push_notification(token, title=title, body=body, data=data):
-            sent += 1
-    logger.info(f"[push] Sent user notification to {sent}/{len(tokens)} devices (user_id={user_id})")
-    return sent
+    queued = _enqueue_to_tokens(tokens, title, body, data)
+    logger.info(f"[push] Queued user notification for {queued}/{len(tokens)} devices (user_id={user_id})")
+    return queued
 
 
 # ── Event helpers (called from order/prediction code) ───────
@@ -14,6 +14,10 @@ All rows are append-only (immutable audit trail).
 import logging
 from typing import Dict, List, Optional
 
+from sqlalchemy import text
+
+from database.keyset import decode_cursor, keyset_before
+
 logger = logging.getLogger(__name__)
 
 # ── Valid enum values ─────────────────────────────────────────
@@ -28,6 +32,14 @@ VALID_EVENT_TYPES = {
 
 VALID_SEVERITIES = {"info", "warning", "critical"}
 
+# user_id 0 / symbol '' hold events without a user or symbol.
+_BUMP_ROLLUP_SQL = text("""
+    INSERT INTO persistent_risk_event_rollups (user_id, symbol, event_type, severity, event_count)
+    VALUES (:user_id, :symbol, :event_type, :severity, 1)
+    ON CONFLICT (user_id, symbol, event_type, severity)
+    DO UPDATE SET event_count = persistent_risk_event_rollups.event_count + 1
+""")
+
 
 def emit_risk_event(
     event_type: str,
@@ -88,6 +100,12 @@ def emit_risk_event(
             portfolio_risk_score=portfolio_risk_score,
         )
         db.add(row)
+        db.execute(_BUMP_ROLLUP_SQL, {
+            "user_id": user_id or 0,
+            "symbol": symbol.upper() if symbol else "",
+            "event_type": event_type,
+            "severity": severity,
+        })
         db.commit()
         row_id = row.id
         db.close()
@@ -126,11 +144,13 @@ def get_risk_event_history(
     event_type: Optional[str] = None,
     severity: Optional[str] = None,
     limit: int = 50,
+    cursor: Optional[str] = None,
 ) -> List[Dict]:
     """
     Query risk event history with optional filters.
-    Returns most recent events first.
+    Returns most recent events first; ``cursor`` continues after the previous page.
     """
+    position = decode_cursor(cursor)
     try:
         from database.connection import SessionLocal
         from database.models import PersistentRiskEvent
@@ -146,10 +166,12 @@ def get_risk_event_history(
             query = query.filter(PersistentRiskEvent.event_type == event_type)
         if severity:
             query = query.filter(PersistentRiskEvent.severity == severity)
+        if position is not None:
+            query = query.filter(keyset_before(PersistentRiskEvent.created_at, PersistentRiskEvent.id, position))
 
         rows = (
             query
-            .order_by(PersistentRiskEvent.created_at.desc())
+            .order_by(PersistentRiskEvent.created_at.desc(), PersistentRiskEvent.id.desc())
             .limit(min(limit, 200))
             .all()
         )
@@ -189,27 +211,28 @@ def get_risk_event_summary(
     """
     Aggregate risk event counts by type and severity.
     Useful for dashboard cards and risk health overview.
+    Reads persistent_risk_event_rollups, not the event table.
     """
     try:
         from database.connection import SessionLocal
-        from database.models import PersistentRiskEvent
+        from database.models import PersistentRiskEventRollup
         from sqlalchemy import func
 
         db = SessionLocal()
         query = db.query(
-            PersistentRiskEvent.event_type,
-            PersistentRiskEvent.severity,
-            func.count(PersistentRiskEvent.id).label("count"),
+            PersistentRiskEventRollup.event_type,
+            PersistentRiskEventRollup.severity,
+            func.sum(PersistentRiskEventRollup.event_count).label("count"),
         )
 
         if user_id is not None:
-            query = query.filter(PersistentRiskEvent.user_id == user_id)
+            query = query.filter(PersistentRiskEventRollup.user_id == user_id)
         if symbol:
-            query = query.filter(PersistentRiskEvent.symbol == symbol.upper())
+            query = query.filter(PersistentRiskEventRollup.symbol == symbol.upper())
 
         rows = (
             query
-            .group_by(PersistentRiskEvent.event_type, PersistentRiskEvent.severity)
+            .group_by(PersistentRiskEventRollup.event_type, PersistentRiskEventRollup.severity)
             .all()
         )
 
@@ -219,9 +242,10 @@ def get_risk_event_summary(
         by_severity = {}
         total = 0
         for r in rows:
-            by_type[r.event_type] = by_type.get(r.event_type, 0) + r.count
-            by_severity[r.severity] = by_severity.get(r.severity, 0) + r.count
-            total += r.count
+            count = int(r.count or 0)
+            by_type[r.event_type] = by_type.get(r.event_type, 0) + count
+            by_severity[r.severity] = by_severity.get(r.severity, 0) + count
+            total += count
 
         return {
             "total": total,
@@ -4,11 +4,18 @@ Gated behind ENABLE_SENTIMENT_DATA flag.
 
 Fetches news from existing news_fetcher, scores via VADER,
 persists to financial_news table, caches in Redis.
+
+Reads never fetch news inline: they are served from an in-process snapshot
+loaded from Redis with one MGET, return neutral defaults on a miss, and
+queue missing symbols for a background refresh.
 """
 
 import logging
+import threading
+import time
 import traceback
 from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +25,19 @@ SENTIMENT_SYMBOLS = [
     "ADAUSDC", "AVAXUSDC", "DOTUSDC", "LINKUSDC",
 ]
 
+SENTIMENT_CACHE_TTL = 1200  # Redis TTL for sentiment:{symbol}
+SNAPSHOT_TTL_SECONDS = 30   # how long the local snapshot is trusted before re-MGET
+
+_snapshot: Dict[str, dict] = {}
+_snapshot_at: Dict[str, float] = {}  # when each entry was last seen in Redis
+_snapshot_loaded_at = 0.0
+_snapshot_lock = threading.Lock()
+
+_refresh_pending: set = set()
+_refresh_lock = threading.Lock()
+_refresh_wakeup = threading.Event()
+_refresh_thread: Optional[threading.Thread] = None
+
 
 def fetch_and_persist_sentiment():
     """
@@ -38,13 +58,25 @@ def fetch_and_persist_sentiment():
 
     results = {}
     redis_client = get_redis()
+
+    # One ingestion pass for every symbol: sources fetched once, each
+    # article scored once.
+    try:
+        fetched = news_fetcher.get_all_sentiment(SENTIMENT_SYMBOLS)
+    except Exception as e:
+        logger.error(f"[sentiment] Ingestion pass failed: {e}")
+        fetched = {}
+
     for symbol in SENTIMENT_SYMBOLS:
         try:
-            sentiment = news_fetcher.get_symbol_sentiment(symbol)
+            sentiment = fetched.get(symbol)
+            if sentiment is None:
+                raise RuntimeError("no sentiment produced")
             results[symbol] = sentiment
 
             # Cache in Redis with 20-min TTL
-            cache_set(f"sentiment:{symbol}", sentiment, expire=1200)
+            cache_set(f"sentiment:{symbol}", sentiment, expire=SENTIMENT_CACHE_TTL)
+            _remember(symbol, sentiment)
 
             # Snapshot score normalized to -1..1 for 24h momentum.
             score_0_100 = float(sentiment.get("score", 50.0))
@@ -58,6 +90,13 @@ def fetch_and_persist_sentiment():
     # Persist aggregated snapshot to DB
     _persist_to_db(results)
 
+    # Republish cross-sectional news impact for every symbol in one query.
+    try:
+        from services.news_impact import refresh_news_impact
+        refresh_news_impact()
+    except Exception as e:
+        logger.debug(f"[sentiment] News impact refresh failed: {e}")
+
     succeeded = len([v for v in results.values() if "error" not in v])
     logger.info(f"[sentiment] Fetch complete: {succeeded}/{len(SENTIMENT_SYMBOLS)} symbols scored")
     return results
@@ -104,25 +143,113 @@ def _persist_to_db(results: dict):
         traceback.print_exc()
 
 
-def get_cached_sentiment(symbol: str) -> dict:
-    """Get cached sentiment for a symbol. Returns neutral if not cached."""
-    from cache.connection import cache_get
+def _neutral(symbol: str) -> dict:
+    return {"score": 50.0, "label": "neutral", "symbol": symbol, "article_count": 0, "pending_refresh": True}
 
-    cached = cache_get(f"sentiment:{symbol}")
-    if cached and isinstance(cached, dict):
-        return cached
 
-    # Fallback: try live fetch (but don't block)
-    try:
-        from services.news_fetcher import news_fetcher
-        return news_fetcher.get_symbol_sentiment(symbol)
-    except Exception:
-        return {"score": 50.0, "label": "neutral", "symbol": symbol, "article_count": 0}
+def _remember(symbol: str, sentiment: dict) -> None:
+    with _snapshot_lock:
+        _snapshot[symbol] = sentiment
+        _snapshot_at[symbol] = time.time()
+
+
+def _load_snapshot(extra: Iterable[str] = ()) -> None:
+    """Reload the local snapshot from Redis with a single MGET when it is stale."""
+    global _snapshot_loaded_at
+    extra = [s for s in extra if s]
+    now = time.time()
+    with _snapshot_lock:
+        fresh = now - _snapshot_loaded_at < SNAPSHOT_TTL_SECONDS
+        if fresh and all(s in _snapshot for s in extra):
+            return
+
+    from cache.connection import cache_mget
+
+    symbols = list(dict.fromkeys(list(SENTIMENT_SYMBOLS) + extra))
+    found = cache_mget([f"sentiment:{s}" for s in symbols])
+    with _snapshot_lock:
+        for symbol in symbols:
+            value = found.get(f"sentiment:{symbol}")
+            if isinstance(value, dict):
+                _snapshot[symbol] = value
+                _snapshot_at[symbol] = now
+            else:  # expired (or evicted) in Redis: stop serving it
+                _snapshot.pop(symbol, None)
+                _snapshot_at.pop(symbol, None)
+        # Entries not part of this MGET are dropped once Redis would have expired them.
+        for symbol in [s for s, at in _snapshot_at.items() if now - at >= SENTIMENT_CACHE_TTL]:
+            _snapshot.pop(symbol, None)
+            _snapshot_at.pop(symbol, None)
+        if not fresh:
+            _snapshot_loaded_at = now
+
+
+def _refresh_worker() -> None:
+    from cache.connection import cache_set
+    from services.news_fetcher import news_fetcher
+
+    while True:
+        _refresh_wakeup.wait()
+        with _refresh_lock:
+            symbols = sorted(_refresh_pending)
+            _refresh_wakeup.clear()
+        if not symbols:
+            continue
+        try:
+            fetched = news_fetcher.get_all_sentiment(symbols)
+            for symbol, sentiment in fetched.items():
+                cache_set(f"sentiment:{symbol}", sentiment, expire=SENTIMENT_CACHE_TTL)
+                _remember(symbol, sentiment)
+        except Exception as e:
+            logger.warning(f"[sentiment] Background refresh failed for {symbols}: {e}")
+        finally:
+            with _refresh_lock:
+                _refresh_pending.difference_update(symbols)
+
+
+def _enqueue_refresh(symbols: Iterable[str]) -> None:
+    """Queue symbols for a background news fetch; duplicates are coalesced."""
+    global _refresh_thread
+    with _refresh_lock:
+        new = [s for s in symbols if s and s not in _refresh_pending]
+        if not new:
+            return
+        _refresh_pending.update(new)
+        if _refresh_thread is None or not _refresh_thread.is_alive():
+            _refresh_thread = threading.Thread(target=_refresh_worker, name="sentiment-refresh", daemon=True)
+            _refresh_thread.start()
+    _refresh_wakeup.set()
+
+
+def get_cached_sentiments(symbols: Iterable[str]) -> Dict[str, dict]:
+    """Cached sentiment for many symbols without blocking on news sources.
+
+    Misses get a neutral default immediately and are refreshed in the
+    background, so the cost is at most one Redis MGET per call.
+    """
+    symbols = list(dict.fromkeys(s for s in symbols if s))
+    _load_snapshot(symbols)
+    out: Dict[str, dict] = {}
+    missing = []
+    with _snapshot_lock:
+        for symbol in symbols:
+            cached = _snapshot.get(symbol)
+            if isinstance(cached, dict):
+                out[symbol] = cached
+            else:
+                missing.append(symbol)
+    for symbol in missing:
+        out[symbol] = _neutral(symbol)
+    if missing:
+        _enqueue_refresh(missing)
+    return out
+
+
+def get_cached_sentiment(symbol: str) -> dict:
+    """Get cached sentiment for a symbol. Returns neutral (and refreshes in the background) if not cached."""
+    return get_cached_sentiments([symbol]).get(symbol) or _neutral(symbol)
 
 
 def get_all_sentiment() -> dict:
     """Get cached sentiment for all tracked symbols."""
-    results = {}
-    for symbol in SENTIMENT_SYMBOLS:
-        results[symbol] = get_cached_sentiment(symbol)
-    return results
+    return get_cached_sentiments(SENTIMENT_SYMBOLS)
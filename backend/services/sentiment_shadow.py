@@ -74,15 +74,16 @@ def run_shadow_on_predictions(predictions: list) -> list:
     Returns list of shadow results for logging/analysis.
     Requires ENABLE_SENTIMENT_SHADOW flag — caller must check.
     """
-    from services.sentiment_scheduler import get_cached_sentiment
+    from services.sentiment_scheduler import get_cached_sentiments
 
+    sentiments = get_cached_sentiments(pred.get("symbol", "") for pred in predictions)
     shadow_results = []
     for pred in predictions:
         symbol = pred.get("symbol", "")
         action = pred.get("action", "hold")
         confidence = pred.get("confidence", 0.5)
 
-        sentiment = get_cached_sentiment(symbol)
+        sentiment = sentiments.get(symbol) or {}
         score = sentiment.get("score", 50.0)
         label = sentiment.get("label", "neutral")
 
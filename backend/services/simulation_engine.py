@@ -9,8 +9,12 @@ Market conditions, slippage, fees, and execution differ in live trading.
 
 import logging
 import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 try:
     import numpy as np
@@ -46,6 +50,21 @@ STRATEGIES = {
 }
 
 
+# ── Monte Carlo settings ────────────────────────────────────────
+MC_DEFAULT_PATHS = 2000
+MC_MAX_PATHS = 20000
+MC_PATH_MODELS = ("bootstrap", "gbm")
+MC_LOOKBACK_DAYS = 730
+MC_MIN_RETURNS = 30
+MC_RETURNS_CACHE_TTL = 3600
+# Below this many simulated price cells the process-pool hop costs more than it saves.
+MC_PARALLEL_MIN_CELLS = 2_000_000
+MC_WORKERS = max(1, int(os.getenv("SIM_MC_WORKERS", str(min(4, os.cpu_count() or 1)))))
+
+_returns_cache: Dict[str, Tuple[float, "np.ndarray"]] = {}
+_mc_pool: Optional[ProcessPoolExecutor] = None
+
+
 def calculate_sharpe(returns: List[float], risk_free: float = 0.02) -> float:
     """Calculate annualized Sharpe ratio from periodic returns."""
     if len(returns) < 2:
@@ -96,12 +115,36 @@ def run_simulation(
     take_profit_pct: float = 0.05,
     max_positions: int = 3,
     position_size_pct: float = 5.0,
+    mode: str = "deterministic",
+    n_paths: int = MC_DEFAULT_PATHS,
+    path_model: str = "bootstrap",
+    seed: Optional[int] = None,
 ) -> Dict:
     """
     Run a strategy simulation.
 
     Returns PnL, drawdown, trade list, risk metrics, and disclaimer.
+    With ``mode="monte_carlo"`` the strategy is replayed over ``n_paths``
+    simulated price paths per symbol instead (see ``run_monte_carlo_simulation``).
     """
+    if mode == "monte_carlo":
+        return run_monte_carlo_simulation(
+            strategy=strategy,
+            symbols=symbols,
+            timeframe_days=timeframe_days,
+            initial_capital=initial_capital,
+            confidence_threshold=confidence_threshold,
+            stop_loss_pct=stop_loss_pct,
+            take_profit_pct=take_profit_pct,
+            max_positions=max_positions,
+            position_size_pct=position_size_pct,
+            n_paths=n_paths,
+            path_model=path_model,
+            seed=seed,
+        )
+    if mode != "deterministic":
+        return {"error": "Unknown mode. Available: ['deterministic', 'monte_carlo']"}
+
     if strategy not in STRATEGIES:
         return {"error": f"Unknown strategy. Available: {list(STRATEGIES.keys())}"}
 
@@ -356,3 +399,335 @@ def run_simulation(
         "disclaimer": DISCLAIMER,
         "simulated_at": datetime.utcnow().isoformat(),
     }
+
+
+# ── Monte Carlo mode ────────────────────────────────────────────
+
+def _load_log_returns(symbol: str, lookback_days: int = MC_LOOKBACK_DAYS) -> Optional["np.ndarray"]:
+    """Daily log returns for ``symbol`` from stored historical prices, cached per process."""
+    cached = _returns_cache.get(symbol)
+    if cached is not None and time.time() - cached[0] < MC_RETURNS_CACHE_TTL:
+        return cached[1]
+
+    returns = None
+    try:
+        from database.connection import SessionLocal
+        from database.models import HistoricalPrice
+        from ml.backtester import _aliases
+
+        if SessionLocal is not None:
+            db = SessionLocal()
+            try:
+                for alias in _aliases(symbol):
+                    rows = (
+                        db.query(HistoricalPrice.close)
+                        .filter(HistoricalPrice.symbol == alias)
+                        .order_by(HistoricalPrice.date.desc())
+                        .limit(lookback_days + 1)
+                        .all()
+                    )
+                    closes = np.array([r[0] for r in reversed(rows) if r[0]], dtype=float)
+                    closes = closes[closes > 0]
+                    if len(closes) > MC_MIN_RETURNS:
+                        returns = np.diff(np.log(closes))
+                        break
+            finally:
+                db.close()
+    except Exception as e:
+        logger.debug("[SIM_MC] historical returns unavailable for %s: %s", symbol, e)
+
+    if returns is not None:
+        _returns_cache[symbol] = (time.time(), returns)
+    return returns
+
+
+def _align_returns(series: List["np.ndarray"]) -> "np.ndarray":
+    """Stack per-symbol daily log returns into ``(days, symbols)`` over their common recent window."""
+    common = min(len(r) for r in series)
+    return np.column_stack([r[-common:] for r in series])
+
+
+def _draw_relative_paths(rng, returns, n_paths: int, horizon: int, path_model: str):
+    """
+    Price paths relative to today's price, shape ``(n_paths, horizon + 1, symbols)``.
+
+    ``returns`` is the aligned ``(days, symbols)`` matrix. Each simulated day
+    draws one historical day (or one correlated GBM shock) for all symbols at
+    once, so cross-asset correlation carries into the paths.
+    """
+    if path_model == "gbm":
+        mean = returns.mean(axis=0)
+        cov = np.atleast_2d(np.cov(returns, rowvar=False))
+        steps = rng.multivariate_normal(mean, cov, size=(n_paths, horizon), method="cholesky")
+    else:
+        steps = returns[rng.integers(0, len(returns), size=(n_paths, horizon))]
+    paths = np.empty((n_paths, horizon + 1, returns.shape[1]), dtype=float)
+    paths[:, 0] = 1.0
+    np.exp(np.cumsum(steps, axis=1), out=paths[:, 1:])
+    return paths
+
+
+def _simulate_paths_chunk(task: Dict) -> Dict:
+    """
+    Apply the strategy legs to one chunk of paths. Runs in a pool worker.
+
+    All legs are opened together at D+1, each sized from the starting capital,
+    and marked to market daily until their stop, take-profit or the horizon
+    closes them; drawdown is measured on the resulting portfolio equity curve.
+    """
+    rng = np.random.default_rng(task["seed"])
+    n = int(task["n_paths"])
+    horizon = int(task["horizon"])
+    initial = float(task["initial_capital"])
+    alloc = initial * float(task["position_size_pct"]) / 100.0
+    all_paths = _draw_relative_paths(rng, task["returns"], n, horizon, task["path_model"])
+    pnl_curve = np.zeros((n, horizon + 1))
+    wins = np.zeros(n, dtype=np.int32)
+    legs_out = []
+
+    for i, leg in enumerate(task["legs"]):
+        paths = all_paths[:, :, i]
+        # Entry is strictly next day to avoid same-bar execution bias.
+        entry = paths[:, 1]
+        marks = paths.copy()
+        stop_hit = np.zeros(n, dtype=bool)
+        take_hit = np.zeros(n, dtype=bool)
+
+        if leg["use_stops"] and horizon >= 2:
+            future = paths[:, 2:]
+            if leg["side"] == "BUY":
+                stop_px = entry * (1 - task["stop_loss_pct"])
+                take_px = entry * (1 + task["take_profit_pct"])
+                stop_mask = future <= stop_px[:, None]
+                take_mask = future >= take_px[:, None]
+            else:
+                stop_px = entry * (1 + task["stop_loss_pct"])
+                take_px = entry * (1 - task["take_profit_pct"])
+                stop_mask = future >= stop_px[:, None]
+                take_mask = future <= take_px[:, None]
+            never = future.shape[1]
+            first_stop = np.where(stop_mask.any(axis=1), stop_mask.argmax(axis=1), never)
+            first_take = np.where(take_mask.any(axis=1), take_mask.argmax(axis=1), never)
+            # Stop is checked before take on the same candle, as in the deterministic loop.
+            stop_hit = (first_stop < never) & (first_stop <= first_take)
+            take_hit = (first_take < never) & (first_take < first_stop)
+            exit_day = np.where(stop_hit, first_stop + 2, np.where(take_hit, first_take + 2, horizon))
+            exit_px = np.where(stop_hit, stop_px, np.where(take_hit, take_px, paths[:, -1]))
+            # Once closed, the leg holds its realised exit price for the rest of the horizon.
+            closed = np.arange(horizon + 1)[None, :] >= exit_day[:, None]
+            marks = np.where(closed, exit_px[:, None], marks)
+
+        move = marks / entry[:, None] - 1.0
+        leg_curve = alloc * (move if leg["side"] == "BUY" else -move)
+        leg_curve[:, 0] = 0.0
+        if alloc < 1:
+            leg_curve[:] = 0.0
+        pnl_curve += leg_curve
+        pnl = leg_curve[:, -1]
+        wins += (pnl > 0).astype(np.int32)
+        legs_out.append({
+            "pnl": pnl,
+            "stop_hits": int(stop_hit.sum()),
+            "take_hits": int(take_hit.sum()),
+        })
+
+    curve = initial + pnl_curve
+    peak = np.maximum.accumulate(curve, axis=1)
+    drawdown = np.max(np.where(peak > 0, (peak - curve) / peak, 0.0), axis=1)
+    return {"final": curve[:, -1], "max_dd": drawdown, "wins": wins, "legs": legs_out}
+
+
+def _get_mc_pool() -> Optional[ProcessPoolExecutor]:
+    global _mc_pool
+    if MC_WORKERS <= 1:
+        return None
+    if _mc_pool is None:
+        # spawn, not fork: this runs on API worker threads, where a forked
+        # child can inherit locks held by other threads.
+        _mc_pool = ProcessPoolExecutor(max_workers=MC_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _mc_pool
+
+
+def _run_mc_chunks(base_task: Dict, n_paths: int, seed: Optional[int]) -> List[Dict]:
+    cells = n_paths * int(base_task["horizon"]) * max(1, len(base_task["legs"]))
+    n_chunks = MC_WORKERS if cells >= MC_PARALLEL_MIN_CELLS else 1
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    sizes = [n_paths // n_chunks + (1 if i < n_paths % n_chunks else 0) for i in range(n_chunks)]
+    tasks = [dict(base_task, n_paths=size, seed=sq) for size, sq in zip(sizes, seeds) if size > 0]
+
+    pool = _get_mc_pool() if len(tasks) > 1 else None
+    if pool is not None:
+        try:
+            return list(pool.map(_simulate_paths_chunk, tasks))
+        except Exception as e:
+            global _mc_pool
+            logger.warning("[SIM_MC] process pool failed, running in-process: %s", e)
+            _mc_pool = None
+    return [_simulate_paths_chunk(t) for t in tasks]
+
+
+def _percentiles(values, points=(5, 25, 50, 75, 95)) -> Dict[str, float]:
+    qs = np.percentile(values, points)
+    return {f"p{p}": round(float(q), 2) for p, q in zip(points, qs)}
+
+
+def run_monte_carlo_simulation(
+    strategy: str,
+    symbols: List[str],
+    timeframe_days: int = 30,
+    initial_capital: float = 10000.0,
+    confidence_threshold: Optional[float] = None,
+    stop_loss_pct: float = 0.03,
+    take_profit_pct: float = 0.05,
+    max_positions: int = 3,
+    position_size_pct: float = 5.0,
+    n_paths: int = MC_DEFAULT_PATHS,
+    path_model: str = "bootstrap",
+    seed: Optional[int] = None,
+    returns_by_symbol: Optional[Dict[str, "np.ndarray"]] = None,
+    predictions: Optional[Dict[str, Dict]] = None,
+) -> Dict:
+    """
+    Run a strategy over many simulated price paths for all symbols jointly.
+
+    Paths are bootstrapped from (or GBM-fitted to) stored daily log returns,
+    drawing the same historical days for every symbol so their correlation holds.
+    Entry, stop-loss, take-profit and position sizing follow ``run_simulation``
+    but are evaluated for all paths at once; the result reports the PnL and
+    drawdown distributions rather than a single trade list.
+    """
+    if np is None:
+        return {"error": "Monte Carlo mode requires numpy"}
+    if strategy not in STRATEGIES:
+        return {"error": f"Unknown strategy. Available: {list(STRATEGIES.keys())}"}
+    if not symbols:
+        return {"error": "At least one symbol required"}
+    if initial_capital <= 0:
+        return {"error": "Initial capital must be positive"}
+    if timeframe_days < 2 or timeframe_days > 365:
+        return {"error": "Timeframe must be 2-365 days for Monte Carlo mode"}
+    if path_model not in MC_PATH_MODELS:
+        return {"error": f"Unknown path model. Available: {list(MC_PATH_MODELS)}"}
+    n_paths = max(100, min(int(n_paths), MC_MAX_PATHS))
+
+    started = time.perf_counter()
+    strat_def = STRATEGIES[strategy]
+    conf_threshold = confidence_threshold if confidence_threshold is not None else strat_def["default_confidence"]
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+
+    # Signals are only needed for the AI strategies; fetch them concurrently.
+    if predictions is None and strategy != "buy_and_hold":
+        try:
+            from ai.asset_predictor import asset_predictor
+        except ImportError:
+            return {"error": "Asset predictor not available"}
+        with ThreadPoolExecutor(max_workers=min(8, len(symbols))) as ex:
+            fetched = dict(zip(symbols, ex.map(lambda s: asset_predictor.predict_price(s, days=min(timeframe_days, 7)), symbols)))
+        predictions = {s: p for s, p in fetched.items() if "error" not in p}
+    predictions = predictions or {}
+
+    legs = []
+    plan = []
+    for sym in symbols:
+        if len(legs) >= max_positions:
+            break
+        log_returns = (returns_by_symbol or {}).get(sym)
+        if log_returns is None:
+            log_returns = _load_log_returns(sym)
+        if log_returns is None or len(log_returns) < MC_MIN_RETURNS:
+            plan.append({"symbol": sym, "side": "SKIP", "reason": "Insufficient price history"})
+            continue
+        log_returns = np.asarray(log_returns, dtype=float)
+
+        if strategy == "buy_and_hold":
+            legs.append({"symbol": sym, "side": "BUY", "use_stops": False, "log_returns": log_returns})
+            plan.append({"symbol": sym, "side": "BUY", "reason": "Buy at D+1 and exit at horizon end"})
+            continue
+
+        pred = predictions.get(sym)
+        if not pred:
+            plan.append({"symbol": sym, "side": "SKIP", "reason": "No valid prediction"})
+            continue
+        action = pred.get("recommendation", "HOLD")
+        confidence = pred.get("confidence", 0) / 100
+        trend_score = pred.get("trend_score", 0)
+        if confidence < conf_threshold:
+            plan.append({"symbol": sym, "side": "SKIP", "confidence": round(confidence, 3),
+                         "reason": f"Confidence {confidence:.0%} < threshold {conf_threshold:.0%}"})
+            continue
+        if action not in ("BUY", "SELL"):
+            plan.append({"symbol": sym, "side": "HOLD", "confidence": round(confidence, 3),
+                         "reason": "No directional signal"})
+            continue
+        if strategy == "conservative_ai" and abs(trend_score) < 0.3:
+            plan.append({"symbol": sym, "side": "SKIP", "confidence": round(confidence, 3),
+                         "reason": f"Trend too weak ({trend_score:+.2f}) for conservative strategy"})
+            continue
+        legs.append({"symbol": sym, "side": action, "use_stops": True, "log_returns": log_returns})
+        plan.append({"symbol": sym, "side": action, "confidence": round(confidence, 3),
+                     "reason": "Stop loss / take profit over simulated paths"})
+
+    if not legs:
+        return {"error": "No tradable symbols with enough price history", "plan": plan}
+
+    base_task = {
+        "legs": [{k: leg[k] for k in ("side", "use_stops")} for leg in legs],
+        "returns": _align_returns([leg["log_returns"] for leg in legs]),
+        "horizon": int(timeframe_days),
+        "path_model": path_model,
+        "initial_capital": float(initial_capital),
+        "position_size_pct": float(position_size_pct),
+        "stop_loss_pct": float(stop_loss_pct),
+        "take_profit_pct": float(take_profit_pct),
+    }
+    chunks = _run_mc_chunks(base_task, n_paths, seed)
+
+    final = np.concatenate([c["final"] for c in chunks])
+    max_dd = np.concatenate([c["max_dd"] for c in chunks]) * 100
+    pnl = final - initial_capital
+    pnl_pct = pnl / initial_capital * 100
+    losses = pnl[pnl < np.percentile(pnl, 5)]
+
+    per_symbol = []
+    for i, leg in enumerate(legs):
+        leg_pnl = np.concatenate([c["legs"][i]["pnl"] for c in chunks])
+        per_symbol.append({
+            "symbol": leg["symbol"],
+            "side": leg["side"],
+            "mean_pnl": round(float(leg_pnl.mean()), 2),
+            "win_rate_pct": round(float((leg_pnl > 0).mean() * 100), 1),
+            "stop_loss_hit_pct": round(sum(c["legs"][i]["stop_hits"] for c in chunks) / len(final) * 100, 1),
+            "take_profit_hit_pct": round(sum(c["legs"][i]["take_hits"] for c in chunks) / len(final) * 100, 1),
+        })
+
+    return {
+        "strategy": strategy,
+        "strategy_label": strat_def["label"],
+        "mode": "monte_carlo",
+        "path_model": path_model,
+        "n_paths": int(len(final)),
+        "timeframe_days": timeframe_days,
+        "initial_capital": initial_capital,
+        "final_capital": round(float(np.median(final)), 2),
+        "pnl": round(float(np.median(pnl)), 2),
+        "pnl_pct": round(float(np.median(pnl_pct)), 2),
+        "mean_pnl": round(float(pnl.mean()), 2),
+        "pnl_percentiles": _percentiles(pnl),
+        "pnl_pct_percentiles": _percentiles(pnl_pct),
+        "probability_of_loss": round(float((pnl < 0).mean()), 4),
+        "value_at_risk_95": round(float(-np.percentile(pnl, 5)), 2),
+        "expected_shortfall_95": round(float(-losses.mean()), 2) if len(losses) else 0.0,
+        "max_drawdown_pct": round(float(np.median(max_dd)), 2),
+        "drawdown_percentiles": _percentiles(max_dd, points=(50, 75, 95, 99)),
+        "win_rate_pct": round(float(sum(int(c["wins"].sum()) for c in chunks) / (len(final) * len(legs)) * 100), 1),
+        "total_trades": len(legs),
+        "per_symbol": per_symbol,
+        "plan": plan,
+        "confidence_threshold": conf_threshold,
+        "stop_loss_pct": stop_loss_pct * 100,
+        "take_profit_pct": take_profit_pct * 100,
+        "trades": [],
+        "compute_ms": round((time.perf_counter() - started) * 1000, 1),
+        "disclaimer": DISCLAIMER,
+        "simulated_at": datetime.utcnow().isoformat(),
+    }
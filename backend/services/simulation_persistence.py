@@ -20,7 +20,7 @@ from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
-VALID_RUN_TYPES = {"backtest", "paper_simulation", "what_if"}
+VALID_RUN_TYPES = {"backtest", "paper_simulation", "what_if", "monte_carlo"}
 VALID_STATUSES = {"queued", "running", "completed", "failed"}
 
 
@@ -43,7 +43,7 @@ def save_simulation_run(
     Args:
         user_id: user who ran the simulation
         strategy_id: strategy name (ai_follow, conservative_ai, etc.)
-        run_type: backtest / paper_simulation / what_if
+        run_type: backtest / paper_simulation / what_if / monte_carlo
         symbols: list of symbols used
         initial_capital: starting capital
         config: full input params for reproducibility
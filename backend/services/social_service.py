@@ -3,176 +3,225 @@
 from __future__ import annotations
 
 import hashlib
+import logging
+import threading
 from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional
 
 from sqlalchemy import text
 
 from database.connection import SessionLocal
+from database.schema_registry import ensure_schema, register_schema
 from services.paper_trading import paper_trading_service
 from services.push_notifications import send_push_to_user_id
 
+logger = logging.getLogger(__name__)
+
 LEADERBOARD_PERIODS = ("weekly", "monthly", "alltime")
 
+_NAME_ADJECTIVES = ("Swift", "Bold", "Sharp", "Smart", "Quick", "Wise")
+_NAME_NOUNS = ("Trader", "Hawk", "Eagle", "Wolf", "Bull", "Bear")
+
+# Paper stats for every active user, mirroring PaperTradingService.get_statistics:
+# value = balance + open positions at cost, trades = history length,
+# win rate = profitable SELLs / SELLs. Ranks are materialized per period;
+# ``position`` is a gap-free tiebroken ordinal used as the pagination key.
+_REFRESH_SQL = """
+    WITH profiles AS (
+        SELECT
+            u.id AS user_id,
+            COALESCE(p.paper_balance, :initial_balance) AS balance,
+            CASE WHEN json_typeof(p.paper_positions) = 'array'
+                 THEN p.paper_positions ELSE '[]'::json END AS positions,
+            CASE WHEN json_typeof(p.paper_trade_history) = 'array'
+                 THEN p.paper_trade_history ELSE '[]'::json END AS history
+        FROM users u
+        LEFT JOIN user_profiles p ON p.user_id = u.id
+        WHERE COALESCE(u.is_active, true) = true
+    ),
+    stats AS (
+        SELECT
+            pr.user_id,
+            (pr.balance + COALESCE(pos.position_value, 0) - :initial_balance)
+                / :initial_balance * 100 AS pnl_pct,
+            json_array_length(pr.history) AS trades,
+            CASE WHEN h.sells > 0 THEN ROUND(h.wins * 100.0 / h.sells, 1) ELSE 0 END AS win_rate
+        FROM profiles pr
+        LEFT JOIN LATERAL (
+            SELECT SUM((e->>'quantity')::float * (e->>'avg_price')::float) AS position_value
+            FROM json_array_elements(pr.positions) e
+            WHERE COALESCE((e->>'quantity')::float, 0) > 0
+        ) pos ON true
+        LEFT JOIN LATERAL (
+            SELECT
+                COUNT(*) FILTER (WHERE e->>'side' = 'SELL') AS sells,
+                COUNT(*) FILTER (WHERE e->>'side' = 'SELL' AND COALESCE((e->>'pnl')::float, 0) > 0) AS wins
+            FROM json_array_elements(pr.history) e
+        ) h ON true
+    )
+    INSERT INTO leaderboard_snapshots (
+        user_id, display_name, paper_pnl_pct, paper_trades, win_rate,
+        period, snapshot_date, rank, position
+    )
+    SELECT
+        s.user_id,
+        (CAST(:adjectives AS VARCHAR[]))[s.user_id % cardinality(CAST(:adjectives AS VARCHAR[])) + 1]
+            || (CAST(:nouns AS VARCHAR[]))[
+                (s.user_id / cardinality(CAST(:adjectives AS VARCHAR[]))) % cardinality(CAST(:nouns AS VARCHAR[])) + 1]
+            || LPAD((s.user_id % 100)::text, 2, '0'),
+        s.pnl_pct,
+        s.trades,
+        s.win_rate,
+        periods.period,
+        :snapshot_date,
+        RANK() OVER (
+            PARTITION BY periods.period
+            ORDER BY s.pnl_pct DESC, s.win_rate DESC, s.trades DESC
+        ),
+        ROW_NUMBER() OVER (
+            PARTITION BY periods.period
+            ORDER BY s.pnl_pct DESC, s.win_rate DESC, s.trades DESC, s.user_id ASC
+        )
+    FROM stats s
+    CROSS JOIN unnest(CAST(:periods AS VARCHAR[])) AS periods(period)
+"""
+
+
+register_schema("social", (
+    """
+    CREATE TABLE IF NOT EXISTS leaderboard_snapshots (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER REFERENCES users(id),
+        display_name VARCHAR NOT NULL,
+        paper_pnl_pct FLOAT DEFAULT 0,
+        paper_trades INTEGER DEFAULT 0,
+        win_rate FLOAT DEFAULT 0,
+        period VARCHAR NOT NULL,
+        snapshot_date DATE DEFAULT CURRENT_DATE,
+        UNIQUE(user_id, period, snapshot_date)
+    )
+    """,
+    "ALTER TABLE leaderboard_snapshots ADD COLUMN IF NOT EXISTS rank INTEGER",
+    "ALTER TABLE leaderboard_snapshots ADD COLUMN IF NOT EXISTS position INTEGER",
+    """
+    CREATE INDEX IF NOT EXISTS ix_leaderboard_period_date_position
+    ON leaderboard_snapshots (period, snapshot_date, position)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS referrals (
+        id SERIAL PRIMARY KEY,
+        referrer_id INTEGER REFERENCES users(id),
+        referred_id INTEGER REFERENCES users(id),
+        referral_code VARCHAR UNIQUE NOT NULL,
+        reward_given BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT NOW()
+    )
+    """,
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS referral_code VARCHAR UNIQUE",
+    """
+    UPDATE users
+    SET referral_code = UPPER(SUBSTRING(MD5(id::text), 1, 8))
+    WHERE referral_code IS NULL
+    """,
+))
+
 
 class SocialService:
+    def __init__(self) -> None:
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
     def get_display_name(self, user_id: int) -> str:
         """Anonymized deterministic username for leaderboard rows."""
-        adjectives = ["Swift", "Bold", "Sharp", "Smart", "Quick", "Wise"]
-        nouns = ["Trader", "Hawk", "Eagle", "Wolf", "Bull", "Bear"]
-
         uid = int(user_id or 0)
-        adj = adjectives[uid % len(adjectives)]
-        noun = nouns[(uid // len(adjectives)) % len(nouns)]
+        adj = _NAME_ADJECTIVES[uid % len(_NAME_ADJECTIVES)]
+        noun = _NAME_NOUNS[(uid // len(_NAME_ADJECTIVES)) % len(_NAME_NOUNS)]
         return f"{adj}{noun}{uid % 100:02d}"
 
     def _db_available(self) -> bool:
         return callable(SessionLocal)
 
     def _ensure_schema(self) -> None:
-        if not self._db_available():
-            return
-        db = SessionLocal()
-        try:
-            db.execute(text("""
-                CREATE TABLE IF NOT EXISTS leaderboard_snapshots (
-                    id SERIAL PRIMARY KEY,
-                    user_id INTEGER REFERENCES users(id),
-                    display_name VARCHAR NOT NULL,
-                    paper_pnl_pct FLOAT DEFAULT 0,
-                    paper_trades INTEGER DEFAULT 0,
-                    win_rate FLOAT DEFAULT 0,
-                    period VARCHAR NOT NULL,
-                    snapshot_date DATE DEFAULT CURRENT_DATE,
-                    UNIQUE(user_id, period, snapshot_date)
-                )
-            """))
-            db.execute(text("""
-                CREATE TABLE IF NOT EXISTS referrals (
-                    id SERIAL PRIMARY KEY,
-                    referrer_id INTEGER REFERENCES users(id),
-                    referred_id INTEGER REFERENCES users(id),
-                    referral_code VARCHAR UNIQUE NOT NULL,
-                    reward_given BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT NOW()
-                )
-            """))
-            db.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS referral_code VARCHAR UNIQUE"))
-            db.execute(text("""
-                UPDATE users
-                SET referral_code = UPPER(SUBSTRING(MD5(id::text), 1, 8))
-                WHERE referral_code IS NULL
-            """))
-            db.commit()
-        except Exception:
-            db.rollback()
-        finally:
-            db.close()
-
-    def _get_active_users(self) -> List[int]:
-        if not self._db_available():
-            return []
-        db = SessionLocal()
-        try:
-            rows = db.execute(text("""
-                SELECT id
-                FROM users
-                WHERE COALESCE(is_active, true) = true
-                ORDER BY id ASC
-            """)).fetchall()
-            return [int(r[0]) for r in rows if r and r[0] is not None]
-        except Exception:
-            return []
-        finally:
-            db.close()
+        ensure_schema("social")
+
+    def _refresh_in_background(self) -> bool:
+        """Start one background snapshot rebuild; concurrent callers coalesce."""
+        with self._refresh_lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return False
+            self._refresh_thread = threading.Thread(
+                target=self._background_refresh, name="leaderboard-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+            return True
 
-    def _paper_stats(self, user_id: int) -> Dict:
+    def _background_refresh(self) -> None:
         try:
-            stats = paper_trading_service.get_statistics(user_id=user_id)
-            return {
-                "pnl_pct": float(stats.get("total_pnl_percent", 0.0) or 0.0),
-                "total_trades": int(stats.get("total_trades", 0) or 0),
-                "win_rate": float(stats.get("win_rate", 0.0) or 0.0),
-            }
-        except Exception:
-            return {"pnl_pct": 0.0, "total_trades": 0, "win_rate": 0.0}
-
-    def _upsert_leaderboard_row(
-        self,
-        user_id: int,
-        display_name: str,
-        pnl_pct: float,
-        trades: int,
-        win_rate: float,
-        period: str,
-        snapshot_date: Optional[date] = None,
-    ) -> None:
+            self.update_leaderboard()
+        except Exception as e:
+            logger.warning(f"[leaderboard] Background refresh failed: {e}")
+
+    def update_leaderboard(self, snapshot_date: Optional[date] = None) -> Dict:
+        """Scheduled job: rebuild today's weekly/monthly/alltime snapshots.
+
+        Paper stats, display names and ranks for every active user are
+        computed by one INSERT ... SELECT over ``user_profiles``; today's
+        rows are replaced in the same transaction so readers always see a
+        complete ranking.
+        """
+        self._ensure_schema()
+        snap_date = snapshot_date or date.today()
         if not self._db_available():
-            return
+            return {"updated_rows": 0, "active_users": 0, "snapshot_date": snap_date.isoformat()}
 
-        snap_date = snapshot_date or date.today()
         db = SessionLocal()
         try:
             db.execute(
                 text("""
-                    INSERT INTO leaderboard_snapshots (
-                        user_id, display_name, paper_pnl_pct, paper_trades, win_rate, period, snapshot_date
-                    )
-                    VALUES (
-                        :user_id, :display_name, :paper_pnl_pct, :paper_trades, :win_rate, :period, :snapshot_date
-                    )
-                    ON CONFLICT (user_id, period, snapshot_date)
-                    DO UPDATE SET
-                        display_name = EXCLUDED.display_name,
-                        paper_pnl_pct = EXCLUDED.paper_pnl_pct,
-                        paper_trades = EXCLUDED.paper_trades,
-                        win_rate = EXCLUDED.win_rate
+                    DELETE FROM leaderboard_snapshots
+                    WHERE snapshot_date = :snapshot_date
+                      AND period = ANY(CAST(:periods AS VARCHAR[]))
                 """),
+                {"snapshot_date": snap_date, "periods": list(LEADERBOARD_PERIODS)},
+            )
+            result = db.execute(
+                text(_REFRESH_SQL),
                 {
-                    "user_id": int(user_id),
-                    "display_name": str(display_name),
-                    "paper_pnl_pct": float(pnl_pct or 0.0),
-                    "paper_trades": int(trades or 0),
-                    "win_rate": float(win_rate or 0.0),
-                    "period": str(period),
                     "snapshot_date": snap_date,
+                    "periods": list(LEADERBOARD_PERIODS),
+                    "adjectives": list(_NAME_ADJECTIVES),
+                    "nouns": list(_NAME_NOUNS),
+                    "initial_balance": float(paper_trading_service._default_balance),
                 },
             )
+            updated = int(result.rowcount or 0)
             db.commit()
         except Exception:
             db.rollback()
+            raise
         finally:
             db.close()
 
-    def update_leaderboard(self) -> Dict:
-        """Scheduled job: build daily snapshots for weekly/monthly/alltime views."""
-        self._ensure_schema()
-
-        users = self._get_active_users()
-        updated = 0
-
-        for user_id in users:
-            stats = self._paper_stats(user_id)
-            display_name = self.get_display_name(user_id)
-
-            for period in LEADERBOARD_PERIODS:
-                self._upsert_leaderboard_row(
-                    user_id=user_id,
-                    display_name=display_name,
-                    pnl_pct=stats["pnl_pct"],
-                    trades=stats["total_trades"],
-                    win_rate=stats["win_rate"],
-                    period=period,
-                )
-                updated += 1
-
         return {
             "updated_rows": updated,
-            "active_users": len(users),
-            "snapshot_date": date.today().isoformat(),
+            "active_users": updated // len(LEADERBOARD_PERIODS),
+            "snapshot_date": snap_date.isoformat(),
         }
 
-    def get_leaderboard(self, user_id: int, period: str = "weekly", limit: int = 50) -> Dict:
+    def get_leaderboard(
+        self,
+        user_id: int,
+        period: str = "weekly",
+        limit: int = 50,
+        after: Optional[int] = None,
+    ) -> Dict:
+        """Read one page of the latest materialized snapshot.
+
+        Pages are keyed on the stored ``position`` (``after`` is the last
+        position of the previous page), and the caller's own row is a
+        single unique-index lookup, so reads never rank or rebuild inline.
+        A missing or stale snapshot triggers a background refresh instead.
+        """
         self._ensure_schema()
 
         p = str(period or "weekly").lower()
@@ -180,6 +229,7 @@ class SocialService:
             p = "weekly"
 
         lim = max(1, min(int(limit or 50), 200))
+        cursor = max(0, int(after or 0))
         rankings: List[Dict] = []
 
         if not self._db_available():
@@ -189,44 +239,41 @@ class SocialService:
                 "my_display_name": self.get_display_name(user_id),
                 "period": p,
                 "snapshot_date": date.today().isoformat(),
+                "next_cursor": None,
                 "database_available": False,
             }
 
         db = SessionLocal()
         try:
-            # Populate snapshot on demand if today's rowset is empty.
-            exists = db.execute(
-                text("""
-                    SELECT COUNT(1)
-                    FROM leaderboard_snapshots
-                    WHERE period = :period AND snapshot_date = CURRENT_DATE
-                """),
+            snap_date = db.execute(
+                text("SELECT MAX(snapshot_date) FROM leaderboard_snapshots WHERE period = :period"),
                 {"period": p},
-            ).scalar() or 0
-            if int(exists) == 0:
-                db.close()
-                self.update_leaderboard()
-                db = SessionLocal()
+            ).scalar()
+            if snap_date is None or str(snap_date) < date.today().isoformat():
+                self._refresh_in_background()
+            if snap_date is None:
+                return {
+                    "rankings": rankings,
+                    "my_rank": None,
+                    "my_position": None,
+                    "my_display_name": self.get_display_name(user_id),
+                    "period": p,
+                    "snapshot_date": None,
+                    "next_cursor": None,
+                    "pending_refresh": True,
+                }
 
             rows = db.execute(
                 text("""
-                    SELECT display_name, paper_pnl_pct, paper_trades, win_rate, rank
-                    FROM (
-                        SELECT
-                            user_id,
-                            display_name,
-                            paper_pnl_pct,
-                            paper_trades,
-                            win_rate,
-                            RANK() OVER (ORDER BY paper_pnl_pct DESC, win_rate DESC, paper_trades DESC) AS rank
-                        FROM leaderboard_snapshots
-                        WHERE period = :period
-                          AND snapshot_date = CURRENT_DATE
-                    ) ranked
-                    ORDER BY rank ASC
+                    SELECT display_name, paper_pnl_pct, paper_trades, win_rate, rank, position
+                    FROM leaderboard_snapshots
+                    WHERE period = :period
+                      AND snapshot_date = :snapshot_date
+                      AND position > :after
+                    ORDER BY position ASC
                     LIMIT :limit
                 """),
-                {"period": p, "limit": lim},
+                {"period": p, "snapshot_date": snap_date, "after": cursor, "limit": lim + 1},
             ).mappings().all()
 
             rankings = [
@@ -236,32 +283,31 @@ class SocialService:
                     "paper_trades": int(r["paper_trades"] or 0),
                     "win_rate": float(r["win_rate"] or 0.0),
                     "rank": int(r["rank"] or 0),
+                    "position": int(r["position"] or 0),
                 }
-                for r in rows
+                for r in rows[:lim]
             ]
+            next_cursor = rankings[-1]["position"] if len(rows) > lim else None
 
-            my_rank_row = db.execute(
+            my_row = db.execute(
                 text("""
-                    SELECT rank
-                    FROM (
-                        SELECT
-                            user_id,
-                            RANK() OVER (ORDER BY paper_pnl_pct DESC, win_rate DESC, paper_trades DESC) AS rank
-                        FROM leaderboard_snapshots
-                        WHERE period = :period
-                          AND snapshot_date = CURRENT_DATE
-                    ) ranked
+                    SELECT rank, position
+                    FROM leaderboard_snapshots
                     WHERE user_id = :user_id
+                      AND period = :period
+                      AND snapshot_date = :snapshot_date
                 """),
-                {"period": p, "user_id": int(user_id)},
+                {"period": p, "user_id": int(user_id), "snapshot_date": snap_date},
             ).first()
 
             return {
                 "rankings": rankings,
-                "my_rank": int(my_rank_row[0]) if my_rank_row else None,
+                "my_rank": int(my_row[0]) if my_row and my_row[0] is not None else None,
+                "my_position": int(my_row[1]) if my_row and my_row[1] is not None else None,
                 "my_display_name": self.get_display_name(user_id),
                 "period": p,
-                "snapshot_date": date.today().isoformat(),
+                "snapshot_date": snap_date.isoformat() if hasattr(snap_date, "isoformat") else str(snap_date),
+                "next_cursor": next_cursor,
             }
         finally:
             db.close()
@@ -374,6 +420,8 @@ class SocialService:
                     {"uid": int(user_id), "expires_at": new_expiry},
                 )
             db.commit()
+            from services.subscription_service import invalidate_tier_cache
+            invalidate_tier_cache(user_id)
         except Exception:
             db.rollback()
         finally:
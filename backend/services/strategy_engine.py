@@ -4,15 +4,98 @@ Defines a Strategy interface and a registry of pluggable strategies.
 The meta engine evaluates all registered strategies and combines results.
 
 Each strategy implements: generate_signal(), score(), explain().
+Strategies may also implement score_batch() over a columnar MarketFrame so
+StrategyRegistry.evaluate_universe() can score a whole universe in one
+vectorized pass; strategies without it are evaluated per symbol.
 """
 
 import logging
+import math
+import numbers
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, NamedTuple, Optional
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 
+# ── Columnar market data ────────────────────────────────────────
+
+class MarketFrame:
+    """Market data for a universe of symbols, one numpy column per field.
+
+    Numeric fields are float arrays with NaN where the key is missing, so
+    each strategy applies its own default (as ``market_data.get`` does).
+    Rows holding values the vectorized path cannot reproduce exactly
+    (None, strings, non-finite numbers, non-dict signals) are listed in
+    ``irregular`` and evaluated per symbol instead.
+    """
+
+    NUMERIC_FIELDS = ("trend_score", "confidence", "smart_score")
+    SIGNAL_FIELDS = ("rsi", "volume")
+
+    def __init__(self, symbols: List[str], data: List[Dict]):
+        self.symbols = symbols
+        self.data = data
+        self.index = {sym: i for i, sym in enumerate(symbols)}
+        n = len(symbols)
+        self.columns: Dict[str, np.ndarray] = {
+            f: np.full(n, np.nan) for f in self.NUMERIC_FIELDS + self.SIGNAL_FIELDS
+        }
+        self.using_ml_model = np.zeros(n, dtype=bool)
+        self.recommendation = np.full(n, "HOLD", dtype=object)
+        self.recommends_trade = np.zeros(n, dtype=bool)
+        self.irregular = np.zeros(n, dtype=bool)
+
+        for i, market_data in enumerate(data):
+            if not isinstance(market_data, dict):
+                self.irregular[i] = True
+                continue
+            for field in self.NUMERIC_FIELDS:
+                if field in market_data and not self._put(field, i, market_data[field]):
+                    self.irregular[i] = True
+            signals = market_data.get("signals", {})
+            if not isinstance(signals, dict):
+                self.irregular[i] = True
+            else:
+                for field in self.SIGNAL_FIELDS:
+                    sig = signals.get(field, {})
+                    if not isinstance(sig, dict) or ("score" in sig and not self._put(field, i, sig["score"])):
+                        self.irregular[i] = True
+            self.using_ml_model[i] = bool(market_data.get("using_ml_model", False))
+            rec = market_data.get("recommendation", "HOLD")
+            self.recommendation[i] = rec
+            self.recommends_trade[i] = isinstance(rec, str) and rec in ("BUY", "SELL")
+
+    def _put(self, field: str, i: int, value) -> bool:
+        if not isinstance(value, numbers.Real) or not math.isfinite(value):
+            return False
+        self.columns[field][i] = float(value)
+        return True
+
+    @classmethod
+    def build(cls, universe: Mapping[str, Dict]) -> "MarketFrame":
+        symbols = list(universe)
+        return cls(symbols, [universe[s] for s in symbols])
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def column(self, field: str, default: float) -> np.ndarray:
+        """``field`` with missing entries replaced by ``default``."""
+        col = self.columns[field]
+        return np.where(np.isnan(col), default, col)
+
+
+class BatchSignals(NamedTuple):
+    """Vectorized generate_signal()/score() output, one entry per frame row."""
+
+    action: np.ndarray
+    confidence: np.ndarray
+    score: np.ndarray
+
+
 # ── Strategy interface ──────────────────────────────────────────
 
 class Strategy(ABC):
@@ -44,6 +127,14 @@ class Strategy(ABC):
         """
         pass
 
+    def score_batch(self, frame: MarketFrame) -> Optional[BatchSignals]:
+        """
+        Vectorized generate_signal() action/confidence and score() for every
+        row of ``frame``. Must match the per-symbol methods exactly; return
+        None to have the registry call them per symbol instead.
+        """
+        return None
+
 
 # ── Built-in strategies ─────────────────────────────────────────
 
@@ -76,6 +167,18 @@ class MLTrendStrategy(Strategy):
             return 20
         return min(100, confidence * 0.6 + trend * 40)
 
+    def score_batch(self, frame: MarketFrame) -> BatchSignals:
+        trend = frame.column("trend_score", 0)
+        confidence_pct = frame.column("confidence", 0)
+        confidence = confidence_pct / 100
+        using_ml = frame.using_ml_model
+        weak = np.abs(trend) < 0.3
+        return BatchSignals(
+            action=np.where(using_ml & ~weak, frame.recommendation, "HOLD").astype(object),
+            confidence=np.where(using_ml, np.where(weak, confidence * 0.5, confidence), 0.3),
+            score=np.where(using_ml, np.minimum(100, confidence_pct * 0.6 + np.abs(trend) * 40), 20.0),
+        )
+
     def explain(self, symbol: str, market_data: Dict) -> List[str]:
         reasons = []
         if market_data.get("using_ml_model"):
@@ -112,6 +215,16 @@ class SmartScoreStrategy(Strategy):
     def score(self, symbol: str, market_data: Dict) -> float:
         return market_data.get("smart_score", 50)
 
+    def score_batch(self, frame: MarketFrame) -> BatchSignals:
+        ss = frame.column("smart_score", 50)
+        strong = (ss >= 75) & frame.recommends_trade
+        weak = ~strong & (ss <= 25)
+        return BatchSignals(
+            action=np.where(strong, frame.recommendation, np.where(weak, "SELL", "HOLD")).astype(object),
+            confidence=np.where(strong, ss / 100, np.where(weak, (100 - ss) / 100, 0.5)),
+            score=ss,
+        )
+
     def explain(self, symbol: str, market_data: Dict) -> List[str]:
         ss = market_data.get("smart_score", 50)
         signals = market_data.get("signals", {})
@@ -144,6 +257,17 @@ class MomentumStrategy(Strategy):
         volume = market_data.get("signals", {}).get("volume", {}).get("score", 50)
         return min(100, trend * 60 + volume * 0.4)
 
+    def score_batch(self, frame: MarketFrame) -> BatchSignals:
+        trend = frame.column("trend_score", 0)
+        volume = frame.column("volume", 50)
+        confidence = frame.column("confidence", 50) / 100
+        strong = (np.abs(trend) > 0.5) & (volume > 60)
+        return BatchSignals(
+            action=np.where(strong, np.where(trend > 0, "BUY", "SELL"), "HOLD").astype(object),
+            confidence=np.where(strong, np.minimum(1.0, confidence * 1.1), 0.4),
+            score=np.minimum(100, np.abs(trend) * 60 + volume * 0.4),
+        )
+
     def explain(self, symbol: str, market_data: Dict) -> List[str]:
         trend = market_data.get("trend_score", 0)
         volume = market_data.get("signals", {}).get("volume", {}).get("score", 50)
@@ -182,6 +306,18 @@ class MeanReversionStrategy(Strategy):
         distance_from_50 = abs(rsi - 50)
         return min(100, distance_from_50 * 2.5)
 
+    def score_batch(self, frame: MarketFrame) -> BatchSignals:
+        rsi = frame.column("rsi", 50)
+        overbought, oversold = rsi > 80, rsi < 20
+        return BatchSignals(
+            action=np.where(overbought, "SELL", np.where(oversold, "BUY", "HOLD")).astype(object),
+            confidence=np.where(
+                overbought, np.minimum(1.0, (rsi - 70) / 30),
+                np.where(oversold, np.minimum(1.0, (30 - rsi) / 30), 0.3),
+            ),
+            score=np.minimum(100, np.abs(rsi - 50) * 2.5),
+        )
+
     def explain(self, symbol: str, market_data: Dict) -> List[str]:
         rsi = market_data.get("signals", {}).get("rsi", {}).get("score", 50)
         if rsi > 80:
@@ -243,30 +379,189 @@ class StrategyRegistry:
         Compute consensus across all strategies.
         Returns the majority action weighted by score.
         """
-        results = self.evaluate_all(symbol, market_data)
-        votes: Dict[str, float] = {}
-
-        for r in results:
-            action = r["signal"].get("action", "HOLD")
-            score = r["score"]
-            conf = r["signal"].get("confidence", 0.5)
-            weight = score * conf
-            votes[action] = votes.get(action, 0) + weight
-
-        if not votes:
-            return {"action": "HOLD", "confidence": 0.5, "agreement": 0, "votes": {}}
-
-        best_action = max(votes, key=votes.get)
-        total_weight = sum(votes.values())
-        agreement = votes[best_action] / total_weight if total_weight > 0 else 0
-
-        return {
-            "action": best_action,
-            "confidence": round(agreement, 3),
-            "agreement": round(agreement, 3),
-            "votes": {k: round(v, 1) for k, v in votes.items()},
-            "strategy_count": len(results),
-        }
+        return self.evaluate_universe({symbol: market_data}).consensus(symbol)
+
+    def evaluate_universe(self, universe: Mapping[str, Dict]) -> "UniverseEvaluation":
+        """
+        Score every strategy over ``universe`` (symbol -> market_data) at once.
+
+        The market data is assembled into one MarketFrame; strategies with a
+        score_batch() are evaluated column-wise, the rest (and irregular rows)
+        per symbol. Signal metadata and explanations are only built when
+        UniverseEvaluation.results() asks for a symbol.
+        """
+        frame = MarketFrame.build(universe)
+        strategies = list(self._strategies.values())
+        n = len(frame)
+        action = np.full((len(strategies), n), "HOLD", dtype=object)
+        confidence = np.zeros((len(strategies), n))
+        score = np.zeros((len(strategies), n))
+        errors: Dict[tuple, str] = {}
+
+        regular = ~frame.irregular
+        for k, strat in enumerate(strategies):
+            batch = None
+            try:
+                batch = strat.score_batch(frame)
+            except Exception as e:
+                logger.error(f"[strategy] {strat.name} score_batch failed, falling back per symbol: {e}")
+            if batch is not None:
+                action[k, regular] = batch.action[regular]
+                confidence[k, regular] = batch.confidence[regular]
+                score[k, regular] = batch.score[regular]
+                per_symbol = np.flatnonzero(frame.irregular)
+            else:
+                per_symbol = range(n)
+            for i in per_symbol:
+                sym, market_data = frame.symbols[i], frame.data[i]
+                try:
+                    signal = strat.generate_signal(sym, market_data)
+                    action[k, i] = signal.get("action", "HOLD")
+                    confidence[k, i] = signal.get("confidence", 0.5)
+                    score[k, i] = strat.score(sym, market_data)
+                except Exception as e:
+                    logger.error(f"[strategy] {strat.name} failed for {sym}: {e}")
+                    action[k, i], confidence[k, i], score[k, i] = "ERROR", 0, 0
+                    errors[(k, i)] = str(e)
+
+        return UniverseEvaluation(strategies, frame, action, confidence, score, errors)
+
+
+def _tally_votes(entries: List[tuple]) -> Dict:
+    """Score-weighted vote over ``(action, score, confidence)`` in result order."""
+    votes: Dict[str, float] = {}
+    for action, score, conf in entries:
+        votes[action] = votes.get(action, 0) + float(score) * float(conf)
+    best_action = max(votes, key=votes.get)
+    total_weight = sum(votes.values())
+    agreement = votes[best_action] / total_weight if total_weight > 0 else 0
+    return {
+        "action": best_action,
+        "confidence": round(agreement, 3),
+        "agreement": round(agreement, 3),
+        "votes": {k: round(v, 1) for k, v in votes.items()},
+        "strategy_count": len(entries),
+    }
+
+
+class UniverseEvaluation:
+    """Strategy scores for a universe, with consensus computed column-wise.
+
+    ``action``, ``confidence`` and ``score`` are (strategies x symbols).
+    Explanations are computed on first request per symbol and cached.
+    """
+
+    def __init__(self, strategies: List[Strategy], frame: MarketFrame,
+                 action: np.ndarray, confidence: np.ndarray, score: np.ndarray,
+                 errors: Dict[tuple, str]):
+        self.strategies = strategies
+        self.frame = frame
+        self.action = action
+        self.confidence = confidence
+        self.score = score
+        self._errors = errors
+        self._consensus: Optional[Dict[str, Dict]] = None
+        self._results: Dict[str, List[Dict]] = {}
+
+    @property
+    def symbols(self) -> List[str]:
+        return self.frame.symbols
+
+    def consensus(self, symbol: str) -> Dict:
+        return self.consensus_all()[symbol]
+
+    def consensus_all(self) -> Dict[str, Dict]:
+        """Score-weighted majority action for every symbol (same rules as StrategyRegistry.consensus)."""
+        if self._consensus is not None:
+            return self._consensus
+        n_strats, n = self.score.shape
+        if n_strats == 0:
+            self._consensus = {
+                sym: {"action": "HOLD", "confidence": 0.5, "agreement": 0, "votes": {}}
+                for sym in self.symbols
+            }
+            return self._consensus
+
+        # Python's round(), as the per-symbol results use, not np.round.
+        rounded = np.array([[round(float(v), 1) for v in row] for row in self.score]).reshape(n_strats, n)
+        weight = rounded * self.confidence
+        labels, codes = np.unique(self.action.astype(str), return_inverse=True)
+        codes = codes.reshape(n_strats, n)
+
+        # Votes accumulate in result order (score desc, registration order on
+        # ties) so sums and max() tie-breaks match the per-symbol tally.
+        order = np.argsort(-rounded, axis=0, kind="stable")
+        cols = np.arange(n)
+        votes = np.zeros((n, len(labels)))
+        first_seen = np.full((n, len(labels)), n_strats)
+        for k in range(n_strats):
+            strat_idx = order[k]
+            code = codes[strat_idx, cols]
+            votes[cols, code] += weight[strat_idx, cols]
+            first_seen[cols, code] = np.minimum(first_seen[cols, code], k)
+
+        seen = first_seen < n_strats
+        masked = np.where(seen, votes, -np.inf)
+        best_value = masked.max(axis=1)
+        best = np.where(masked == best_value[:, None], first_seen, n_strats + 1).argmin(axis=1)
+        by_seen = np.take_along_axis(np.where(seen, votes, 0.0), np.argsort(first_seen, axis=1, kind="stable"), axis=1)
+        total = np.zeros(n)
+        for c in range(by_seen.shape[1]):
+            total = total + by_seen[:, c]
+        agreement = np.where(total > 0, best_value / np.where(total > 0, total, 1.0), 0.0)
+
+        out: Dict[str, Dict] = {}
+        finite = np.isfinite(weight).all(axis=0)
+        for i, sym in enumerate(self.symbols):
+            if not finite[i]:
+                # NaN scores make sort() and max() order-dependent; replay the scalar path.
+                ranked = sorted(range(n_strats), key=lambda k: float(rounded[k, i]), reverse=True)
+                out[sym] = _tally_votes([(self.action[k, i], rounded[k, i], self.confidence[k, i])
+                                         for k in ranked])
+                continue
+            present = sorted(np.flatnonzero(seen[i]), key=lambda c: first_seen[i, c])
+            out[sym] = {
+                "action": str(labels[best[i]]),
+                "confidence": round(float(agreement[i]), 3),
+                "agreement": round(float(agreement[i]), 3),
+                "votes": {str(labels[c]): round(float(votes[i, c]), 1) for c in present},
+                "strategy_count": n_strats,
+            }
+        self._consensus = out
+        return out
+
+    def results(self, symbol: str) -> List[Dict]:
+        """Per-strategy results for ``symbol`` in the evaluate_all() shape, explanations included."""
+        cached = self._results.get(symbol)
+        if cached is not None:
+            return cached
+        i = self.frame.index[symbol]
+        market_data = self.frame.data[i]
+        results = []
+        for k, strat in enumerate(self.strategies):
+            error = self._errors.get((k, i))
+            if error is None:
+                try:
+                    results.append({
+                        "strategy": strat.name,
+                        "description": strat.description,
+                        "signal": strat.generate_signal(symbol, market_data),
+                        "score": round(float(self.score[k, i]), 1),
+                        "explanation": strat.explain(symbol, market_data),
+                    })
+                    continue
+                except Exception as e:
+                    logger.error(f"[strategy] {strat.name} failed for {symbol}: {e}")
+                    error = str(e)
+            results.append({
+                "strategy": strat.name,
+                "signal": {"action": "ERROR", "confidence": 0},
+                "score": 0,
+                "explanation": [f"Strategy error: {error}"],
+            })
+        results.sort(key=lambda r: r["score"], reverse=True)
+        self._results[symbol] = results
+        return results
 
 
 # ── Global registry (pre-populated) ────────────────────────────
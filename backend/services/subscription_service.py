@@ -1,13 +1,17 @@
 """Subscription tiers, feature gates, and FREE quota enforcement."""
 
+import logging
 from datetime import date, datetime
 from typing import Dict, Optional
 
 from fastapi import HTTPException
+from sqlalchemy import select
 
 from database.connection import SessionLocal
 from database.models import PredictionUsage, Subscription
 
+logger = logging.getLogger(__name__)
+
 FREE_TIER = "free"
 PRO_TIER = "pro"
 ELITE_TIER = "elite"
@@ -15,6 +19,7 @@ ELITE_TIER = "elite"
 TIERS = (FREE_TIER, PRO_TIER, ELITE_TIER)
 TIER_RANK = {FREE_TIER: 0, PRO_TIER: 1, ELITE_TIER: 2}
 FREE_DAILY_PREDICTIONS = 10
+TIER_CACHE_TTL = 300
 
 FEATURE_MIN_TIER = {
     "live_trading": PRO_TIER,
@@ -48,15 +53,23 @@ def _build_status(sub: Subscription) -> Dict:
     }
 
 
+def _subscription_statement(user_id: int):
+    return select(Subscription).where(Subscription.user_id == int(user_id)).limit(1)
+
+
+def _new_subscription(user_id: int) -> Subscription:
+    return Subscription(user_id=int(user_id), tier=FREE_TIER, is_active=True, started_at=datetime.utcnow())
+
+
 def ensure_user_subscription(user_id: int, db=None) -> Subscription:
     own_session = db is None
     session = db or SessionLocal()
     try:
-        sub = session.query(Subscription).filter(Subscription.user_id == int(user_id)).first()
+        sub = session.execute(_subscription_statement(user_id)).scalars().first()
         if sub:
             return sub
 
-        sub = Subscription(user_id=int(user_id), tier=FREE_TIER, is_active=True, started_at=datetime.utcnow())
+        sub = _new_subscription(user_id)
         session.add(sub)
         session.commit()
         session.refresh(sub)
@@ -87,12 +100,35 @@ def upgrade_subscription(user_id: int, tier: str, db=None) -> Dict:
         sub.payment_provider = "manual"
         session.commit()
         session.refresh(sub)
+        invalidate_tier_cache(user_id)
         return _build_status(sub)
     finally:
         if own_session:
             session.close()
 
 
+def _tier_cache_key(user_id: int) -> str:
+    return f"subscription:tier:{int(user_id)}"
+
+
+def get_cached_tier(user_id: int) -> str:
+    """Subscription tier via Redis, falling back to (and repopulating from) the DB."""
+    from cache.connection import cache_get, cache_set
+
+    cached = cache_get(_tier_cache_key(user_id))
+    if isinstance(cached, str) and cached in TIERS:
+        return cached
+    tier = normalize_tier(ensure_user_subscription(user_id).tier)
+    cache_set(_tier_cache_key(user_id), tier, expire=TIER_CACHE_TTL)
+    return tier
+
+
+def invalidate_tier_cache(user_id: int) -> None:
+    from cache.connection import cache_delete
+
+    cache_delete(_tier_cache_key(user_id))
+
+
 def has_feature_for_tier(tier: str, feature: str) -> bool:
     required = FEATURE_MIN_TIER.get(feature)
     if not required:
@@ -126,19 +162,68 @@ def enforce_feature(user_id: int, feature: str, db=None) -> None:
     )
 
 
+def _limit_reached(used_today: int) -> HTTPException:
+    return HTTPException(
+        status_code=403,
+        detail={
+            "message": "FREE daily prediction limit reached",
+            "code": "FREE_PREDICTION_LIMIT_REACHED",
+            "current_tier": FREE_TIER,
+            "required_tier": PRO_TIER,
+            "daily_limit": FREE_DAILY_PREDICTIONS,
+            "used_today": int(used_today),
+        },
+    )
+
+
+def _unlimited(tier: str) -> Dict:
+    return {
+        "tier": tier,
+        "used_today": None,
+        "daily_limit": None,
+        "remaining_today": None,
+    }
+
+
+def _free_usage(used_today: int) -> Dict:
+    return {
+        "tier": FREE_TIER,
+        "used_today": int(used_today),
+        "daily_limit": FREE_DAILY_PREDICTIONS,
+        "remaining_today": max(0, FREE_DAILY_PREDICTIONS - int(used_today)),
+    }
+
+
 def consume_prediction_quota(user_id: int, db=None) -> Dict:
+    """Count one prediction request against the FREE daily quota.
+
+    With Redis available (and no caller-provided session) this is a cached
+    tier lookup plus one atomic INCR; the usage row is written by the
+    counters' periodic flush. Otherwise, or if a Redis command fails, the
+    count is kept in the database.
+    """
+    from services.usage_counters import usage_counters
+
+    if db is None and usage_counters.available():
+        tier = get_cached_tier(user_id)
+        if tier != FREE_TIER:
+            return _unlimited(tier)
+        try:
+            allowed, used = usage_counters.try_consume_quota(user_id, FREE_DAILY_PREDICTIONS)
+        except Exception as e:
+            logger.warning(f"[quota] Redis counter failed for user {user_id}, using the database: {e}")
+        else:
+            if not allowed:
+                raise _limit_reached(used)
+            return _free_usage(used)
+
     own_session = db is None
     session = db or SessionLocal()
     try:
         sub = ensure_user_subscription(user_id, db=session)
         tier = normalize_tier(sub.tier)
         if tier != FREE_TIER:
-            return {
-                "tier": tier,
-                "used_today": None,
-                "daily_limit": None,
-                "remaining_today": None,
-            }
+            return _unlimited(tier)
 
         today = date.today()
         usage = (
@@ -152,28 +237,13 @@ def consume_prediction_quota(user_id: int, db=None) -> Dict:
             session.flush()
 
         if int(usage.predictions_requested or 0) >= FREE_DAILY_PREDICTIONS:
-            raise HTTPException(
-                status_code=403,
-                detail={
-                    "message": "FREE daily prediction limit reached",
-                    "code": "FREE_PREDICTION_LIMIT_REACHED",
-                    "current_tier": FREE_TIER,
-                    "required_tier": PRO_TIER,
-                    "daily_limit": FREE_DAILY_PREDICTIONS,
-                    "used_today": int(usage.predictions_requested or 0),
-                },
-            )
+            raise _limit_reached(int(usage.predictions_requested or 0))
 
         usage.predictions_requested = int(usage.predictions_requested or 0) + 1
         usage.updated_at = datetime.utcnow()
         session.commit()
 
-        return {
-            "tier": tier,
-            "used_today": int(usage.predictions_requested or 0),
-            "daily_limit": FREE_DAILY_PREDICTIONS,
-            "remaining_today": max(0, FREE_DAILY_PREDICTIONS - int(usage.predictions_requested or 0)),
-        }
+        return _free_usage(int(usage.predictions_requested or 0))
     finally:
         if own_session:
             session.close()
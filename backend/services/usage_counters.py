@@ -0,0 +1,223 @@
+"""Write-coalescing usage counters.
+
+Per-user counters (FREE-tier daily prediction quota, lifetime predictions
+viewed) live in Redis and are bumped with atomic INCR. Keys are seeded from
+the database with SET NX the first time they are used, and a background thread
+periodically writes the current values of recently touched counters back
+to ``prediction_usage`` and ``user_profiles.behavior_flags_json`` in one
+upsert each. When Redis is unavailable callers fall back to their
+direct database paths.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import date
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+from cache.connection import get_redis
+from database.connection import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FLUSH_SECONDS = 30.0
+QUOTA_KEY_TTL = 2 * 86400  # daily keys outlive their day so late flushes still see them
+VIEWS_KEY_TTL = 30 * 86400
+
+
+def _quota_key(user_id: int, day: date) -> str:
+    return f"counter:predictions_quota:{int(user_id)}:{day.isoformat()}"
+
+
+def _views_key(user_id: int) -> str:
+    return f"counter:predictions_viewed:{int(user_id)}"
+
+
+def _load_quota(user_id: int, day: date) -> int:
+    from database.models import PredictionUsage
+
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(PredictionUsage.predictions_requested)
+            .filter(PredictionUsage.user_id == int(user_id), PredictionUsage.usage_date == day)
+            .first()
+        )
+        return int(row[0] or 0) if row else 0
+    finally:
+        db.close()
+
+
+def _load_views(user_id: int) -> int:
+    from database.models import UserProfile
+
+    db = SessionLocal()
+    try:
+        row = db.query(UserProfile.behavior_flags_json).filter(UserProfile.user_id == int(user_id)).first()
+        flags = (row[0] if row else None) or {}
+        return int(flags.get("predictions_view_count", 0) or 0)
+    finally:
+        db.close()
+
+
+def _write_quota(rows: Dict[Tuple[int, date], int]) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            text("""
+                INSERT INTO prediction_usage (user_id, usage_date, predictions_requested, created_at, updated_at)
+                VALUES (:user_id, :usage_date, :count, NOW(), NOW())
+                ON CONFLICT (user_id, usage_date) DO UPDATE SET
+                    predictions_requested = GREATEST(prediction_usage.predictions_requested, EXCLUDED.predictions_requested),
+                    updated_at = NOW()
+            """),
+            [{"user_id": uid, "usage_date": day, "count": count} for (uid, day), count in rows.items()],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _write_views(rows: Dict[int, int]) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            # Users who never saved a profile have no row yet; create it with the
+            # same defaults as ``UserProfile`` so their count is not lost.
+            text("""
+                INSERT INTO user_profiles (user_id, risk_profile, morning_briefing_enabled, paper_balance,
+                                           behavior_flags_json, created_at, updated_at)
+                VALUES (:user_id, 'moderate', TRUE, 10000.0,
+                        jsonb_build_object('predictions_view_count', CAST(:count AS INTEGER))::json, NOW(), NOW())
+                ON CONFLICT (user_id) DO UPDATE SET
+                    behavior_flags_json = (
+                        COALESCE(user_profiles.behavior_flags_json::jsonb, '{}'::jsonb)
+                        || jsonb_build_object('predictions_view_count', CAST(:count AS INTEGER))
+                    )::json,
+                    updated_at = NOW()
+            """),
+            [{"user_id": uid, "count": count} for uid, count in rows.items()],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class UsageCounters:
+    """Redis-backed counters with periodic batched persistence."""
+
+    def __init__(
+        self,
+        client_factory: Callable = get_redis,
+        load_quota: Callable[[int, date], int] = _load_quota,
+        load_views: Callable[[int], int] = _load_views,
+        write_quota: Callable[[Dict[Tuple[int, date], int]], None] = _write_quota,
+        write_views: Callable[[Dict[int, int]], None] = _write_views,
+    ):
+        self._client_factory = client_factory
+        self._load_quota = load_quota
+        self._load_views = load_views
+        self._write_quota = write_quota
+        self._write_views = write_views
+        self._dirty_quota: Set[Tuple[int, date]] = set()
+        self._dirty_views: Set[int] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def available(self) -> bool:
+        return self._client_factory() is not None
+
+    def _incr(self, key: str, ttl: int, seed: Callable[[], int], by: int = 1) -> Tuple[int, bool]:
+        """INCRBY ``key``; a missing key is first created from ``seed()``. Returns (value, seeded)."""
+        client = self._client_factory()
+        seeded = False
+        if not client.exists(key):
+            # SET NX: when several requests race on a fresh key exactly one seed lands.
+            seeded = bool(client.set(key, int(seed() or 0), ex=ttl, nx=True))
+        return int(client.incrby(key, by)), seeded
+
+    def _mark(self, quota: Optional[Tuple[int, date]] = None, views: Optional[int] = None) -> None:
+        with self._lock:
+            if quota is not None:
+                self._dirty_quota.add(quota)
+            if views is not None:
+                self._dirty_views.add(views)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="usage-counters", daemon=True)
+                self._thread.start()
+
+    def try_consume_quota(self, user_id: int, limit: int, day: Optional[date] = None) -> Tuple[bool, int]:
+        """Atomically take one unit of today's quota. Returns (allowed, used_today)."""
+        day = day or date.today()
+        key = _quota_key(user_id, day)
+        value, _ = self._incr(key, QUOTA_KEY_TTL, lambda: self._load_quota(user_id, day))
+        if value > limit:
+            self._client_factory().decr(key)
+            return False, limit
+        self._mark(quota=(int(user_id), day))
+        return True, value
+
+    def add_views(self, user_id: int, count: int = 1) -> Tuple[int, int]:
+        """Add ``count`` prediction views. Returns (before, after) so callers can detect threshold crossings."""
+        count = max(1, int(count))
+        value, seeded = self._incr(_views_key(user_id), VIEWS_KEY_TTL, lambda: self._load_views(user_id), by=count)
+        self._mark(views=int(user_id))
+        # A freshly seeded counter has no reliable "before": report 0 so thresholds are re-checked once.
+        return (0 if seeded else value - count), value
+
+    def flush(self) -> Dict[str, int]:
+        """Persist the current value of every counter touched since the last flush."""
+        with self._lock:
+            quota, self._dirty_quota = self._dirty_quota, set()
+            views, self._dirty_views = self._dirty_views, set()
+        if not quota and not views:
+            return {"quota": 0, "views": 0}
+
+        client = self._client_factory()
+        if client is None:
+            with self._lock:
+                self._dirty_quota |= quota
+                self._dirty_views |= views
+            return {"quota": 0, "views": 0}
+
+        quota_keys = sorted(quota)
+        view_keys = sorted(views)
+        values = client.mget(
+            [_quota_key(uid, day) for uid, day in quota_keys] + [_views_key(uid) for uid in view_keys]
+        )
+        quota_rows = {k: int(v) for k, v in zip(quota_keys, values[:len(quota_keys)]) if v is not None}
+        view_rows = {k: int(v) for k, v in zip(view_keys, values[len(quota_keys):]) if v is not None}
+
+        try:
+            if quota_rows:
+                self._write_quota(quota_rows)
+            if view_rows:
+                self._write_views(view_rows)
+        except Exception:
+            with self._lock:
+                self._dirty_quota |= quota
+                self._dirty_views |= views
+            raise
+        return {"quota": len(quota_rows), "views": len(view_rows)}
+
+    def _run(self) -> None:
+        while not self._stop.wait(COUNTER_FLUSH_SECONDS):
+            try:
+                written = self.flush()
+                if written["quota"] or written["views"]:
+                    logger.debug(f"[counters] Flushed {written}")
+            except Exception as e:
+                logger.warning(f"[counters] Flush failed, will retry: {e}")
+
+
+usage_counters = UsageCounters()
@@ -6,7 +6,7 @@ import asyncio
 import json
 import logging
 import time
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 import websockets
 
@@ -19,6 +19,18 @@ PRICE_TTL_SECONDS = 60
 
 _feed_instance: Optional["BinanceWebSocketFeed"] = None
 _feed_task: Optional[asyncio.Task] = None
+_tick_listeners: List[Callable[[str, float, int], None]] = []
+
+
+def add_tick_listener(callback: Callable[[str, float, int], None]) -> None:
+    """Register ``callback(symbol, price, ts_ms)`` to run on every ticker message."""
+    if callback not in _tick_listeners:
+        _tick_listeners.append(callback)
+
+
+def remove_tick_listener(callback: Callable[[str, float, int], None]) -> None:
+    if callback in _tick_listeners:
+        _tick_listeners.remove(callback)
 
 
 class BinanceWebSocketFeed:
@@ -98,6 +110,12 @@ class BinanceWebSocketFeed:
         self._last_update_ms[symbol] = ts_ms
         self._set_price_cache(symbol=symbol, price=price, ts_ms=ts_ms)
 
+        for listener in list(_tick_listeners):
+            try:
+                listener(symbol, price, ts_ms)
+            except Exception as e:
+                logger.debug("[WS_FEED] tick listener failed for %s: %s", symbol, e)
+
     async def run(self) -> None:
         """Run websocket client loop with automatic reconnect."""
         backoff = 1
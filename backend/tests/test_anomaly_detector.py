@@ -0,0 +1,169 @@
+"""
+Replay tests for the streaming anomaly detector on synthetic tick series.
+"""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+import ml.anomaly_detector as ad
+from ml.anomaly_detector import StreamingAnomalyDetector
+
+T0_MS = 1_700_000_000_000
+TICK_MS = 1000
+
+
+def _random_walk(n, seed, sigma=0.0005, start=30_000.0):
+    rng = np.random.default_rng(seed)
+    # Student-t shocks: fatter tails than the detector's Gaussian intuition.
+    shocks = rng.standard_t(df=5, size=n) * sigma / np.sqrt(5 / 3)
+    return start * np.exp(np.cumsum(shocks))
+
+
+def _with_crash(prices, at, depth, ticks):
+    """Apply a ``depth`` log-linear drop over ``ticks`` starting at ``at``, then hold it."""
+    out = prices.copy()
+    path = np.concatenate([np.linspace(0, np.log1p(-depth), ticks + 1)[1:],
+                           np.full(len(out) - at - ticks, np.log1p(-depth))])
+    out[at:] *= np.exp(path)
+    return out
+
+
+def _replay(detector, symbol, prices):
+    flagged = []
+    for i, px in enumerate(prices):
+        if detector.on_tick(symbol, float(px), T0_MS + i * TICK_MS)["anomaly"]:
+            flagged.append(i)
+    return flagged
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def hset(self, key, field, value):
+        self.ops.append(("hset", key, field, value))
+
+    def hdel(self, key, *fields):
+        self.ops.append(("hdel", key) + fields)
+
+    def expire(self, key, seconds):
+        self.ops.append(("expire", key, seconds))
+
+    def execute(self):
+        self.redis.executed.append(self.ops)
+        for op in self.ops:
+            if op[0] == "hset":
+                self.redis.hashes.setdefault(op[1], {})[op[2]] = op[3]
+            elif op[0] == "hdel":
+                for f in op[2:]:
+                    self.redis.hashes.get(op[1], {}).pop(f, None)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.executed = []
+        self.reads = 0
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def hgetall(self, key):
+        self.reads += 1
+        return dict(self.hashes.get(key, {}))
+
+
+def test_no_false_positives_on_normal_series():
+    ticks = flagged = 0
+    for seed in range(5):
+        detector = StreamingAnomalyDetector()
+        prices = _random_walk(20_000, seed)
+        flagged += len(_replay(detector, "BTCUSDC", prices))
+        ticks += len(prices)
+    assert flagged / ticks < 1e-4, flagged
+    print(f"PASS: {flagged} flags over {ticks} normal ticks")
+
+
+def test_flash_crash_detected_within_ticks():
+    latencies = []
+    for seed in range(5):
+        detector = StreamingAnomalyDetector()
+        prices = _with_crash(_random_walk(3_000, seed), at=2_000, depth=0.10, ticks=20)
+        flagged = _replay(detector, "BTCUSDC", prices)
+        assert all(i >= 2_000 for i in flagged), flagged[:5]
+        latencies.append(flagged[0] - 2_000)
+        assert detector.is_paused("BTCUSDC", now_ms=T0_MS + 3_000 * TICK_MS)
+        # Only the first flag of the episode is recorded and written.
+        assert detector.stats["anomalies"] == 1
+    assert max(latencies) <= 2, latencies
+    print(f"PASS: flash crash flagged after {latencies} ticks")
+
+
+def test_slow_slide_caught_by_jump_window():
+    detector = StreamingAnomalyDetector()
+    prices = _with_crash(_random_walk(3_000, 11), at=2_000, depth=0.08, ticks=200)
+    flagged = _replay(detector, "ETHUSDC", prices)
+    assert flagged and 2_000 < flagged[0] < 2_200
+    assert detector.active(["ETHUSDC"], now_ms=T0_MS + 3_000 * TICK_MS)[0]["kind"] == "jump"
+    print("PASS: a slide too slow for the z-score trips the jump window")
+
+
+def test_anomaly_persisted_in_one_pipeline_and_served_from_memory(monkeypatch):
+    redis = _FakeRedis()
+    detector = StreamingAnomalyDetector(ttl_seconds=60)
+    detector.hydrate(redis)
+    prices = _with_crash(_random_walk(450, 3), at=400, depth=0.10, ticks=5)
+    _replay(detector, "SOLUSDC", prices)  # the crash is held for under the TTL
+
+    assert len(redis.executed) == 1
+    assert [op[0] for op in redis.executed[0]] == ["hset", "expire"]
+    stored = json.loads(redis.hashes[ad.ACTIVE_ANOMALIES_KEY]["SOLUSDC"])
+    assert stored["expires_at_ms"] > T0_MS + 400 * TICK_MS
+
+    # A second worker (or a restart) picks the pause up with a single HGETALL.
+    other = StreamingAnomalyDetector()
+    redis.reads = 0
+    monkeypatch.setattr(ad, "anomaly_detector", other)
+    monkeypatch.setattr(ad.time, "time", lambda: (T0_MS + 420 * TICK_MS) / 1000)
+    assert ad.is_trading_paused("solusdc", redis)
+    assert [a["symbol"] for a in ad.get_active_anomalies(redis, ["BTCUSDC", "SOLUSDC"])] == ["SOLUSDC"]
+    assert redis.reads == 1
+
+    # Expired entries stop pausing trading and are dropped on the next write.
+    monkeypatch.setattr(ad.time, "time", lambda: (T0_MS + 500 * TICK_MS) / 1000)
+    assert not ad.is_trading_paused("SOLUSDC", redis)
+    other.on_tick("BTCUSDC", 100.0, T0_MS + 500 * TICK_MS)
+    other.on_tick("BTCUSDC", 90.0, T0_MS + 501 * TICK_MS)
+    assert [op[0] for op in redis.executed[-1]] == ["hset", "hdel", "expire"]
+    assert set(redis.hashes[ad.ACTIVE_ANOMALIES_KEY]) == {"BTCUSDC"}
+    print("PASS: one pipelined write per anomaly, reads answered from memory")
+
+
+def test_pause_from_another_worker_seen_after_startup(monkeypatch):
+    redis = _FakeRedis()
+    clock = [T0_MS / 1000]
+    monkeypatch.setattr(ad.time, "time", lambda: clock[0])
+    reader = StreamingAnomalyDetector()
+    monkeypatch.setattr(ad, "anomaly_detector", reader)
+    assert not ad.is_trading_paused("ETHUSDC", redis)  # startup read: nothing active
+
+    writer = StreamingAnomalyDetector(ttl_seconds=600)
+    writer.hydrate(redis)
+    prices = _with_crash(_random_walk(400, 5), at=300, depth=0.10, ticks=5)
+    _replay(writer, "ETHUSDC", prices)
+    assert ad.ACTIVE_ANOMALIES_KEY in redis.hashes
+
+    clock[0] += 400  # the replay's own timeline
+    reads = redis.reads
+    assert ad.is_trading_paused("ETHUSDC", redis)
+    assert redis.reads == reads + 1
+    # Within the sync interval reads stay in memory.
+    clock[0] += ad.ACTIVE_SYNC_SECONDS / 2
+    assert [a["symbol"] for a in ad.get_active_anomalies(redis, ["ETHUSDC"])] == ["ETHUSDC"]
+    assert redis.reads == reads + 1
+    print("PASS: pauses raised by another worker are picked up within the sync interval")
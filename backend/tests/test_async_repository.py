@@ -0,0 +1,175 @@
+"""
+Tests for the async read repository used by the high-traffic endpoints.
+"""
+
+import sys
+import os
+import asyncio
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import database.connection as connection
+import database.schema_registry as schema_registry
+import services.prediction_outcomes as prediction_outcomes
+from database import async_repository as repo
+from database.models import (
+    FeedEventRead, PersistentFeedEvent, PortfolioEquityRollup, PortfolioStateSnapshot,
+    PredictionOutcome, Subscription, User,
+)
+from services import feed_persistence, portfolio_persistence, subscription_service
+from auth import revocation
+
+TABLES = (
+    User, Subscription, PersistentFeedEvent, FeedEventRead,
+    PortfolioStateSnapshot, PortfolioEquityRollup, PredictionOutcome,
+)
+NOW = datetime(2026, 4, 20, 12, 0, 0)
+
+
+class _AsyncSessionOverSync:
+    """Drives a sync Session through the AsyncSession methods the repository awaits.
+
+    Lets the async code path run against in-memory SQLite without an async driver.
+    """
+
+    def __init__(self, session):
+        self._session = session
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._session.close()
+
+    async def execute(self, statement, params=None):
+        return self._session.execute(statement, params or {})
+
+    def add(self, obj):
+        self._session.add(obj)
+
+    async def commit(self):
+        self._session.commit()
+
+    async def rollback(self):
+        self._session.rollback()
+
+
+@pytest.fixture
+def Session(monkeypatch):
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool,
+    )
+    for model in TABLES:
+        model.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(connection, "SessionLocal", Session)
+    monkeypatch.setattr(subscription_service, "SessionLocal", Session)
+    monkeypatch.setattr(prediction_outcomes, "SessionLocal", Session)
+    monkeypatch.setattr(prediction_outcomes.prediction_outcomes_service, "_ensure_table", lambda: True)
+    return Session
+
+
+@pytest.fixture
+def seeded(Session):
+    db = Session()
+    db.add(User(id=7, email="a@example.com", password_hash="x", token_version=3))
+    for i in range(6):
+        db.add(PersistentFeedEvent(
+            user_id=7, source_type="system", event_type="market_insight", priority="medium",
+            title=f"event {i}", short_summary="s", created_at=NOW - timedelta(minutes=i),
+        ))
+    db.add(PersistentFeedEvent(
+        user_id=7, source_type="system", event_type="risk_alert", priority="high",
+        title="expired", short_summary="s", created_at=NOW, expires_at=NOW - timedelta(days=400),
+    ))
+    db.flush()
+    db.add(FeedEventRead(feed_event_id=1, user_id=7))
+    db.add(FeedEventRead(feed_event_id=2, user_id=7))
+    for i in range(3):
+        db.add(PortfolioStateSnapshot(
+            user_id=7, snapshot_timestamp=NOW - timedelta(hours=i), total_equity=10_000 + i,
+            available_cash=5_000, total_exposure=5_000 + i, net_exposure=5_000 + i, gross_exposure=5_000 + i,
+        ))
+        db.add(PortfolioEquityRollup(
+            user_id=7, resolution="1d", bucket_start=datetime(2026, 4, 18 + i),
+            open=100.0 + i, high=110.0 + i, low=90.0 + i, close=105.0 + i,
+            first_ts=datetime(2026, 4, 18 + i), last_ts=datetime(2026, 4, 18 + i, 23), samples=24,
+        ))
+    for symbol, confidence, correct in (("BTC", 0.95, True), ("BTC", 0.85, False), ("ETH", 0.75, True)):
+        db.add(PredictionOutcome(
+            symbol=symbol, action="BUY", confidence=confidence, price_at_prediction=1.0,
+            was_correct_7d=correct,
+        ))
+    db.commit()
+    db.close()
+    return Session
+
+
+def _fetch_all():
+    async def run():
+        return {
+            "token_version": await repo.fetch_token_version(7),
+            "missing_user": await repo.fetch_token_version(999),
+            "feed": await repo.fetch_user_feed(7, limit=4),
+            "unread": await repo.fetch_unread_count(7),
+            "accuracy": await repo.fetch_prediction_accuracy(),
+            "accuracy_btc": await repo.fetch_prediction_accuracy("btc"),
+            "history": await repo.fetch_snapshot_history(7, limit=10),
+            "chart": await repo.fetch_equity_chart(7, days=30, points=10, now=NOW),
+        }
+
+    return asyncio.run(run())
+
+
+def _expected():
+    return {
+        "token_version": revocation._load_token_version(7),
+        "missing_user": revocation._load_token_version(999),
+        "feed": feed_persistence.get_user_feed(7, limit=4),
+        "unread": feed_persistence.get_unread_count(7),
+        "accuracy": prediction_outcomes.prediction_outcomes_service.get_accuracy(),
+        "accuracy_btc": prediction_outcomes.prediction_outcomes_service.get_accuracy("btc"),
+        "history": portfolio_persistence.get_snapshot_history(7, limit=10),
+        "chart": portfolio_persistence.get_equity_chart(7, days=30, points=10, now=NOW),
+    }
+
+
+def test_async_path_matches_sync_services(seeded, monkeypatch):
+    monkeypatch.setattr(connection, "AsyncSessionLocal", lambda: _AsyncSessionOverSync(seeded()))
+    monkeypatch.setattr(schema_registry, "is_ready", lambda name: True)
+    monkeypatch.setattr(repo.asyncio, "to_thread", None)  # must not fall back
+
+    got = _fetch_all()
+    assert got == _expected()
+    assert got["token_version"] == 3 and got["missing_user"] is None
+    assert [e["title"] for e in got["feed"]] == ["event 0", "event 1", "event 2", "event 3"]
+    assert [e["is_read"] for e in got["feed"]] == [True, True, False, False]
+    assert got["unread"] == 4
+    assert got["accuracy"]["total_evaluated"] == 3
+    assert got["chart"]["count"] == 3
+    print("PASS: async repository returns the sync services' payloads")
+
+
+def test_falls_back_to_worker_thread_without_async_engine(seeded, monkeypatch):
+    monkeypatch.setattr(connection, "AsyncSessionLocal", None)
+    assert _fetch_all() == _expected()
+    print("PASS: without an async engine the sync services run in a worker thread")
+
+
+def test_subscription_status_created_once_on_async_path(Session, monkeypatch):
+    monkeypatch.setattr(connection, "AsyncSessionLocal", lambda: _AsyncSessionOverSync(Session()))
+
+    first = asyncio.run(repo.fetch_subscription_status(11))
+    second = asyncio.run(repo.fetch_subscription_status(11))
+    assert first["tier"] == "free" and first["features"]["unlimited_predictions"] is False
+    assert first == second
+
+    db = Session()
+    assert db.query(Subscription).filter(Subscription.user_id == 11).count() == 1
+    db.close()
+    print("PASS: first status read creates the FREE subscription exactly once")
@@ -0,0 +1,153 @@
+"""
+Tests for cached JWT verification and token-version revocation.
+"""
+
+import sys
+import os
+import asyncio
+from datetime import timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+import auth.jwt_handler as jwt_handler
+import auth.revocation as revocation
+from utils.error_handler import AuthenticationError
+
+
+def test_verified_claims_cached_until_expiry(monkeypatch):
+    jwt_handler.clear_claims_cache()
+    decodes = []
+    real_decode = jwt_handler.jwt.decode
+    monkeypatch.setattr(jwt_handler.jwt, "decode", lambda *a, **k: decodes.append(1) or real_decode(*a, **k))
+
+    token = jwt_handler.create_access_token({"sub": "7", "token_version": 0})
+    for _ in range(5):
+        assert jwt_handler.verify_token(token, "access")["sub"] == "7"
+    assert len(decodes) == 1
+    with pytest.raises(AuthenticationError):
+        jwt_handler.verify_token(token, "refresh")
+
+    # A cached entry never outlives the token itself.
+    short = jwt_handler.create_access_token({"sub": "8"}, expires_delta=timedelta(seconds=1))
+    jwt_handler.verify_token(short, "access")
+    jwt_handler.verify_token(short, "access")
+    assert len(decodes) == 2
+    monkeypatch.setattr(jwt_handler.time, "time", lambda: 10**10)
+    jwt_handler.verify_token(short, "access")
+    assert len(decodes) == 3
+
+    assert jwt_handler.invalidate_user_claims(7) == 1
+    jwt_handler.clear_claims_cache()
+    print("PASS: repeated verification of one token decodes once")
+
+
+def test_token_version_served_from_cache_and_published(monkeypatch):
+    store, loads = {}, []
+    monkeypatch.setattr(revocation, "cache_get", lambda key, default=None: store.get(key, default))
+    monkeypatch.setattr(revocation, "cache_set", lambda key, value, expire=0: store.__setitem__(key, value) or True)
+    monkeypatch.setattr(revocation, "cache_add", lambda key, value, expire=0: store.setdefault(key, value) is value)
+    monkeypatch.setattr(revocation, "_load_token_version", lambda uid: loads.append(uid) or 3)
+
+    assert revocation.get_token_version(42) == 3
+    assert revocation.get_token_version(42) == 3
+    assert loads == [42]
+
+    revocation.publish_token_version(42, 4)
+    assert revocation.get_token_version(42) == 4
+    assert loads == [42]
+    print("PASS: revocation state read from cache; bumps published without a DB read")
+
+
+def test_stale_db_read_does_not_overwrite_published_version(monkeypatch):
+    store = {}
+    monkeypatch.setattr(revocation, "cache_get", lambda key, default=None: store.get(key, default))
+    monkeypatch.setattr(revocation, "cache_set", lambda key, value, expire=0: store.__setitem__(key, value) or True)
+    monkeypatch.setattr(revocation, "cache_add", lambda key, value, expire=0: store.setdefault(key, value) is value)
+
+    def _load_then_revoke(uid):
+        # The bump commits and is published after our DB read returned the old version.
+        revocation.publish_token_version(uid, 5)
+        return 4
+
+    monkeypatch.setattr(revocation, "_load_token_version", _load_then_revoke)
+    revocation.get_token_version(42)
+    monkeypatch.setattr(revocation, "_load_token_version", lambda uid: pytest.fail("cache miss"))
+    assert revocation.get_token_version(42) == 5
+    print("PASS: a racing cache fill never replaces a published token version")
+
+
+def test_failed_publish_never_serves_stale_version(monkeypatch):
+    store, db = {}, {"version": 3}
+    deletes = []
+    monkeypatch.setattr(revocation, "_unpublished", {})
+    monkeypatch.setattr(revocation.time, "sleep", lambda s: None)
+    monkeypatch.setattr(revocation, "cache_get", lambda key, default=None: store.get(key, default))
+    monkeypatch.setattr(revocation, "cache_add", lambda key, value, expire=0: store.setdefault(key, value) is value)
+    monkeypatch.setattr(revocation, "_load_token_version", lambda uid: db["version"])
+    assert revocation.get_token_version(42) == 3
+
+    # Publish fails but the delete goes through: every worker falls back to the DB.
+    db["version"] = 4
+    monkeypatch.setattr(revocation, "cache_set", lambda *a, **k: False)
+    monkeypatch.setattr(revocation, "cache_delete", lambda key: deletes.append(key) or store.pop(key, None) or True)
+    revocation.publish_token_version(42, 4)
+    assert deletes == ["auth:token_version:42"] and "auth:token_version:42" not in store
+    assert revocation.get_token_version(42) == 4
+
+    # Redis is unreachable for both: the stale entry stays, but this worker reads the DB
+    # and repairs the entry as soon as a write succeeds.
+    store["auth:token_version:42"] = {"version": 4}
+    db["version"] = 5
+    monkeypatch.setattr(revocation, "cache_delete", lambda key: deletes.append(key) and False)
+    revocation.publish_token_version(42, 5)
+    assert len(deletes) == 1 + revocation.PUBLISH_RETRIES
+    assert revocation.get_token_version(42) == 5
+    monkeypatch.setattr(revocation, "cache_set", lambda key, value, expire=0: store.__setitem__(key, value) or True)
+    assert revocation.get_token_version(42) == 5
+    assert store["auth:token_version:42"] == {"version": 5} and not revocation._unpublished
+    print("PASS: a failed publish drops the cached version and reads the DB until repaired")
+
+
+
+class _FakeAsyncRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+
+def test_async_token_version_uses_async_redis(monkeypatch):
+    redis = _FakeAsyncRedis()
+    loads = []
+
+    async def _get_async_redis():
+        return redis
+
+    async def _fetch(uid):
+        loads.append(uid)
+        return 3
+
+    import database.async_repository as async_repository
+    monkeypatch.setattr(revocation, "get_async_redis", _get_async_redis)
+    monkeypatch.setattr(async_repository, "fetch_token_version", _fetch)
+    for name in ("cache_get", "cache_set", "cache_add"):
+        monkeypatch.setattr(revocation, name, lambda *a, **k: pytest.fail("sync Redis on the event loop"))
+
+    assert asyncio.run(revocation.get_token_version_async(42)) == 3
+    assert asyncio.run(revocation.get_token_version_async(42)) == 3
+    assert loads == [42]
+
+    async def _no_redis():
+        return None
+
+    monkeypatch.setattr(revocation, "get_async_redis", _no_redis)
+    assert asyncio.run(revocation.get_token_version_async(42)) == 3
+    assert loads == [42, 42]
+    print("PASS: async token-version lookups never touch the sync Redis client")
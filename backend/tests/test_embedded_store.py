@@ -0,0 +1,181 @@
+"""
+Tests for the indexed accuracy / notification stores that replaced the JSON files.
+"""
+
+import sys
+import os
+import json
+import multiprocessing
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from sqlalchemy import text
+
+from database.embedded_store import dispose_store_engines, read_conn
+from services.accuracy_tracker import AccuracyTracker
+from services.notifications import NotificationPriority, NotificationType, NotificationsService
+
+
+@pytest.fixture
+def store(tmp_path):
+    yield str(tmp_path / "store.db")
+    dispose_store_engines()
+
+
+def test_accuracy_counters_and_rolling_window(store, tmp_path):
+    tracker = AccuracyTracker(store_path=store, legacy_file=str(tmp_path / "none.json"))
+    now = datetime.now()
+    assert tracker.get_rolling_accuracy("BTC") == 0.5
+    assert tracker.get_accuracy("BTC")["total_predictions"] == 0
+
+    tracker.record_prediction("BTC", 100.0, now, 80.0)
+    tracker.record_prediction("BTC", 110.0, now + timedelta(days=5), 70.0)
+    tracker.record_actual_price("BTC", 105.0, now + timedelta(hours=12))
+    tracker.record_actual_price("BTC", 90.0, now + timedelta(hours=13))  # already evaluated
+
+    acc = tracker.get_accuracy("BTC")
+    expected = 100 - 5 / 105 * 100
+    assert acc["total_predictions"] == 2 and acc["evaluated_predictions"] == 1
+    assert acc["average_accuracy"] == round(expected, 2)
+    assert acc["recent_predictions"][0]["actual_price"] == 105.0
+    assert abs(tracker.get_rolling_accuracy("BTC") - expected / 100) < 1e-12
+
+    # Outcomes take over once present; only those closed inside the window count.
+    for days_ago, exit_price in ((40, 90.0), (29.9, 110.0), (2, 120.0), (1, 95.0)):
+        closed = (now - timedelta(days=days_ago)).isoformat()
+        tracker.record_outcome("BTC", "BUY", 100.0, exit_price, exit_price - 100, closed, closed)
+    assert tracker.get_rolling_accuracy("BTC", days=30) == 2 / 3
+    assert tracker.get_rolling_accuracy("BTC", days=3) == 1 / 2
+
+    overall = tracker.get_accuracy()
+    assert overall["evaluated_predictions"] == 1 and set(overall["by_asset"]) == {"BTC"}
+    print("PASS: accuracy stats served from counters")
+
+
+def test_outcomes_trimmed_to_last_100(store, tmp_path):
+    tracker = AccuracyTracker(store_path=store, legacy_file=str(tmp_path / "none.json"))
+    now = datetime.now()
+    for i in range(130):
+        closed = (now - timedelta(hours=130 - i)).isoformat()
+        # the oldest 30 are all wins, the rest all losses
+        tracker.record_outcome("ETH", "BUY", 100.0, 101.0 if i < 30 else 99.0, 0.0, closed, closed)
+    assert tracker.get_rolling_accuracy("ETH", days=30) == 0.0
+    with read_conn(tracker.engine) as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM accuracy_trade_outcomes")).scalar() == 100
+        assert conn.execute(text("SELECT SUM(outcomes), SUM(correct) FROM accuracy_daily_stats")).one() == (100, 0)
+    print("PASS: trimming keeps counters in step with rows")
+
+
+def test_legacy_json_imported_once(store, tmp_path):
+    recorded = datetime.now() - timedelta(days=1)
+    legacy = tmp_path / "accuracy_data.json"
+    legacy.write_text(json.dumps({"SOL": {
+        "predictions": [
+            {"predicted_price": 10.0, "predicted_date": recorded.isoformat(), "confidence": 60,
+             "recorded_at": recorded.isoformat(), "actual_price": 11.0, "actual_date": recorded.isoformat(),
+             "error": 1.0, "error_pct": 9.09, "accuracy": 90.91},
+            {"predicted_price": 12.0, "predicted_date": recorded.isoformat(), "confidence": 60,
+             "recorded_at": recorded.isoformat()},
+        ],
+        "accuracy_history": [],
+    }}))
+    notif_file = tmp_path / "notifications.json"
+    notif_file.write_text(json.dumps([
+        {"id": "notif_2", "type": "system", "title": "b", "message": "m", "priority": "high",
+         "data": {}, "read": False, "created_at": "2026-01-02T00:00:00", "read_at": None},
+        {"id": "notif_1", "type": "system", "title": "a", "message": "m", "priority": "low",
+         "data": {"k": 1}, "read": True, "created_at": "2026-01-01T00:00:00", "read_at": "2026-01-01T01:00:00"},
+    ]))
+
+    for _ in range(2):  # a second start (or worker) must not import again
+        tracker = AccuracyTracker(store_path=store, legacy_file=str(legacy))
+        acc = tracker.get_accuracy("SOL")
+        assert (acc["total_predictions"], acc["evaluated_predictions"], acc["average_accuracy"]) == (2, 1, 90.91)
+        assert abs(tracker.get_rolling_accuracy("SOL") - 0.9091) < 1e-9
+
+        service = NotificationsService(store_path=store, legacy_file=str(notif_file))
+        assert [n["id"] for n in service.get_notifications()] == ["notif_2", "notif_1"]
+        assert service.get_notification("notif_1")["data"] == {"k": 1}
+        assert service.get_unread_count() == 1
+    print("PASS: legacy JSON files imported exactly once")
+
+
+def test_notification_counters(store, tmp_path, monkeypatch):
+    import services.notifications as notifications
+    monkeypatch.setattr(notifications, "MAX_NOTIFICATIONS", 5)
+    service = NotificationsService(store_path=store, legacy_file=str(tmp_path / "none.json"))
+
+    created = [service.notify_ai_signal(f"S{i}", "BUY", 80) for i in range(4)]
+    created += [service.notify_risk_alert(f"risk {i}", "critical") for i in range(3)]
+    listed = service.get_notifications(limit=10)
+    assert [n["id"] for n in listed] == [n["id"] for n in reversed(created)][:5]  # newest kept
+
+    assert service.mark_as_read(created[-1]["id"]) and service.mark_as_read(created[-1]["id"])
+    assert not service.mark_as_read("missing")
+    assert service.get_unread_count() == 4
+    assert [n["id"] for n in service.get_notifications(unread_only=True,
+                                                         notification_type=NotificationType.RISK_ALERT)] == \
+        [created[-2]["id"], created[-3]["id"]]
+
+    stats = service.get_notification_stats()
+    assert (stats["total"], stats["unread"], stats["read"]) == (5, 4, 1)
+    assert stats["by_type"] == {"ai_signal": 2, "risk_alert": 3}
+    assert stats["by_priority"] == {"high": 2, "urgent": 3}
+
+    assert service.delete_all_read() == 1
+    assert service.mark_all_as_read() == 4
+    assert service.delete_notification(created[2]["id"]) and not service.delete_notification(created[2]["id"])
+    stats = service.get_notification_stats()
+    assert (stats["total"], stats["unread"], stats["by_type"]) == (3, 0, {"ai_signal": 1, "risk_alert": 2})
+    print("PASS: notification counters follow every mutation")
+
+
+def _worker(store, worker_id, rounds):
+    tracker = AccuracyTracker(store_path=store, legacy_file=os.devnull)
+    service = NotificationsService(store_path=store, legacy_file=os.devnull)
+    now = datetime.now()
+    for i in range(rounds):
+        tracker.record_prediction("BTC", 100.0 + i, now, 50.0)
+        closed = now.isoformat()
+        tracker.record_outcome("BTC", "BUY", 100.0, 101.0 if i % 2 else 99.0, 1.0, closed, closed)
+        n = service.create_notification(NotificationType.SYSTEM, f"w{worker_id}", str(i),
+                                        priority=NotificationPriority.LOW)
+        if i % 3 == 0:
+            service.mark_as_read(n["id"])
+
+
+def test_concurrent_processes_lose_no_updates(store):
+    # Make sure the schema exists before workers race to create it.
+    NotificationsService(store_path=store, legacy_file=os.devnull).get_unread_count()
+    dispose_store_engines()
+
+    workers, rounds = 4, 40
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_worker, args=(store, w, rounds)) for w in range(workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=120)
+        assert p.exitcode == 0
+
+    total = workers * rounds
+    tracker = AccuracyTracker(store_path=store, legacy_file=os.devnull)
+    service = NotificationsService(store_path=store, legacy_file=os.devnull)
+    assert tracker.get_accuracy("BTC")["total_predictions"] == total
+
+    stats = service.get_notification_stats()
+    marked = workers * len(range(0, rounds, 3))
+    assert (stats["total"], stats["unread"]) == (total, total - marked)
+    with read_conn(service.engine) as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM notifications")).scalar() == total
+        assert conn.execute(text("SELECT COUNT(*) FROM notifications WHERE read")).scalar() == marked
+        assert conn.execute(text("SELECT COUNT(*) FROM accuracy_predictions")).scalar() == total
+        assert conn.execute(text("SELECT COUNT(*) FROM accuracy_trade_outcomes")).scalar() == 100
+        assert conn.execute(text("SELECT outcome_count FROM accuracy_asset_stats")).scalar() == 100
+        # Which 100 outcomes survive the trim depends on how the workers interleaved.
+        correct = conn.execute(text("SELECT SUM(CASE WHEN correct_direction THEN 1 ELSE 0 END) "
+                                    "FROM accuracy_trade_outcomes")).scalar()
+        assert conn.execute(text("SELECT SUM(outcomes), SUM(correct) FROM accuracy_daily_stats")).one() == (100, correct)
+    assert tracker.get_rolling_accuracy("BTC") == correct / 100
+    print(f"PASS: {workers} processes x {rounds} rounds, counters match rows")
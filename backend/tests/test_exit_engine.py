@@ -0,0 +1,179 @@
+"""
+Tests for the tick-driven trailing-stop / exit engine.
+"""
+
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.exit_engine import TickExitEngine
+from services.trailing_stop import trailing_stop_service
+
+
+def _long(entry=100.0, trail_pct=2.0, qty=1.0):
+    return {
+        "symbol": "BTCUSDC",
+        "side": "BUY",
+        "quantity": qty,
+        "entry_price": entry,
+        "stop_loss": round(entry * 0.97, 2),
+        "trailing_stop": trailing_stop_service.initialize_stop("BUY", entry, trail_pct),
+        "trailing_move_count": 0,
+    }
+
+
+def _short(entry=100.0, trail_pct=2.0, qty=1.0):
+    return {
+        "symbol": "BTCUSDC",
+        "side": "SELL",
+        "quantity": qty,
+        "entry_price": entry,
+        "stop_loss": round(entry * 1.03, 2),
+        "trailing_stop": trailing_stop_service.initialize_stop("SELL", entry, trail_pct),
+        "trailing_move_count": 0,
+    }
+
+
+def test_long_stop_ratchets_up_and_triggers():
+    engine = TickExitEngine()
+    pos = _long(entry=100.0)
+    engine.sync_user(1, {"BTCUSDC": pos}, trail_pct=2.0)
+
+    assert engine.on_tick("BTCUSDC", 110.0) == []
+    assert abs(pos["trailing_stop"] - 107.8) < 1e-6
+    assert pos["trailing_last_move"] == "up"
+
+    # Falling back does not move the stop down.
+    assert engine.on_tick("BTCUSDC", 108.0) == []
+    assert abs(pos["trailing_stop"] - 107.8) < 1e-6
+
+    crossed = engine.on_tick("BTCUSDC", 107.5)
+    assert crossed == [(1, "BTCUSDC")]
+    assert engine.indexed_count() == 0
+    print("PASS: long trailing stop ratchets and triggers on crossing tick")
+
+
+def test_short_stop_ratchets_down_and_triggers():
+    engine = TickExitEngine()
+    pos = _short(entry=100.0)
+    engine.sync_user(2, {"BTCUSDC": pos}, trail_pct=2.0)
+
+    assert engine.on_tick("BTCUSDC", 90.0) == []
+    assert abs(pos["trailing_stop"] - 91.8) < 1e-6
+    assert engine.on_tick("BTCUSDC", 92.0) == [(2, "BTCUSDC")]
+    print("PASS: short trailing stop ratchets down and triggers")
+
+
+def test_tick_touches_only_affected_positions():
+    engine = TickExitEngine()
+    # 200 users with staggered entries: stops from 97.0 up to ~136.8.
+    positions = {}
+    for uid in range(200):
+        pos = _long(entry=100.0 + uid * 0.2)
+        positions[uid] = pos
+        engine.sync_user(uid, {"BTCUSDC": pos}, trail_pct=3.0)
+
+    crossed = engine.on_tick("BTCUSDC", 98.0)
+    assert sorted(k[0] for k in crossed) == sorted(
+        uid for uid, p in positions.items() if float(p["trailing_stop"]) >= 98.0
+    )
+    untouched = [p for p in positions.values() if p["trailing_move_count"] == 0]
+    assert len(untouched) == len(positions)
+    print(f"PASS: tick crossed {len(crossed)} of {len(positions)} positions without touching others")
+
+
+def test_sync_drops_closed_positions_and_other_symbols_ignored():
+    engine = TickExitEngine()
+    engine.sync_user(1, {"BTCUSDC": _long(), "ETHUSDC": dict(_long(), symbol="ETHUSDC")})
+    assert engine.indexed_count() == 2
+    engine.sync_user(1, {"BTCUSDC": _long()})
+    assert engine.indexed_count() == 1
+    assert engine.on_tick("ETHUSDC", 1.0) == []
+    assert engine.on_tick("SOLUSDC", 1.0) == []
+    print("PASS: sync removes closed positions")
+
+
+def test_crossing_tick_closes_position_through_engine():
+    from services.auto_trading_engine import AutoTradingEngine
+
+    class FakeBroker:
+        connected = True
+
+        def __init__(self):
+            self.orders = []
+
+        def place_live_order(self, symbol, side, quantity, order_type="MARKET", **kwargs):
+            self.orders.append((symbol, side, quantity))
+            return {"price": 96.5, "order_id": "x1"}
+
+    broker = FakeBroker()
+    trader = AutoTradingEngine()
+    trader._broker_factory = lambda uid: broker
+    trader._load_user_context(7)
+    trader.open_positions["BTCUSDC"] = _long(entry=100.0)
+
+    exits = TickExitEngine()
+    exits._engine = trader
+    import services.exit_engine as exit_module
+    original = exit_module.exit_engine
+    exit_module.exit_engine = exits
+    try:
+        trader._save_user_context(7)
+        assert exits.indexed_count() == 1
+
+        async def _drive():
+            exits.on_tick("BTCUSDC", 97.0)
+            for _ in range(200):  # the close runs in a worker thread
+                if broker.orders:
+                    break
+                await asyncio.sleep(0.01)
+            for _ in range(5):
+                await asyncio.sleep(0)
+
+        asyncio.run(_drive())
+    finally:
+        exit_module.exit_engine = original
+
+    assert broker.orders == [("BTCUSDC", "SELL", 1.0)]
+    assert trader.get_user_positions(7) == []
+    closed = trader.user_runtime[7]["closed_trades"]
+    assert closed and closed[-1]["reason"] == "trailing_stop"
+    assert exits.indexed_count() == 0
+    print("PASS: crossing tick closes the position via AutoTradingEngine")
+
+
+def test_cancelled_scan_leaves_context_lock_free(monkeypatch):
+    import services.auto_trading_engine as engine_module
+    from services.auto_trading_engine import AutoTradingEngine
+
+    trader = AutoTradingEngine()
+    monkeypatch.setattr(engine_module, "check_pending_dca_orders", lambda uid, broker: [])
+    monkeypatch.setattr(trader, "_update_trailing_stops", lambda uid: None)
+    monkeypatch.setattr(trader, "_evaluate_circuit_breaker", lambda uid: None)
+    monkeypatch.setattr(trader, "_check_circuit_breaker_pause", lambda uid: False)
+
+    async def _drive():
+        fetching = asyncio.Event()
+
+        async def slow_predictions(uid):
+            fetching.set()
+            await asyncio.Event().wait()
+
+        scan = asyncio.create_task(trader._run_user_cycle(
+            7, slow_predictions, lambda uid: object(), lambda uid: {"enabled": True},
+        ))
+        await fetching.wait()
+        assert not trader._context_lock.locked()  # not held across the fetch
+        scan.cancel()
+        try:
+            await scan
+        except asyncio.CancelledError:
+            pass
+        assert not trader._context_lock.locked()
+        async with trader._context_lock:
+            pass
+
+    asyncio.run(_drive())
+    assert trader.user_runtime[7]["config"]["enabled"] is True
+    print("PASS: cancelling a scan mid-fetch never leaves the context lock held")
@@ -0,0 +1,141 @@
+"""
+Parity tests for the point-in-time training-feature builder.
+"""
+
+import sys
+import os
+import math
+from datetime import date, datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import ml.feature_engineer as fe
+from database.models import FinancialNews, HistoricalPrice, TrainingFeature
+
+START = date(2025, 1, 1)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    for model in (HistoricalPrice, FinancialNews, TrainingFeature):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+
+    rng = np.random.default_rng(7)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, 160))
+    close[90] = close[89]  # a flat day (target_return == 0)
+    for i, c in enumerate(close):
+        session.add(HistoricalPrice(
+            symbol="AAA", asset_type="stock", date=START + timedelta(days=i),
+            open=c, high=c * 1.01, low=c * 0.99, close=c, volume=float(rng.integers(1_000, 5_000)),
+        ))
+    # Macro series start late and have gaps, so both the defaults and the
+    # "latest on or before" lookup are exercised.
+    for sym, level in (("^VIX", 18.0), ("^TNX", 4.2), ("^IRX", 5.1), ("EURUSD=X", 1.08)):
+        for i in range(70, 160, 3):
+            session.add(HistoricalPrice(
+                symbol=sym, asset_type="macro", date=START + timedelta(days=i),
+                open=level, high=level, low=level, close=level + 0.01 * i, volume=0.0,
+            ))
+    for i in range(0, 160, 2):
+        day = datetime.combine(START + timedelta(days=i), datetime.min.time())
+        # midnight items count as that day's news; the rest land in the 3d/5d windows
+        session.add(FinancialNews(headline="h", published_at=day, symbols="AAA,BBB",
+                                  sentiment_score=float(rng.uniform(-1, 1))))
+        session.add(FinancialNews(headline="h", published_at=day + timedelta(hours=13), symbols="AAA",
+                                  sentiment_score=float(rng.uniform(-1, 1))))
+        session.add(FinancialNews(headline="h", published_at=day, symbols="BBB", sentiment_score=0.9))
+        session.add(FinancialNews(headline="h", published_at=day, symbols="AAA", sentiment_score=None))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _per_date_reference(db_session, symbol):
+    """The original per-date loop, minus the writes."""
+    prices = db_session.query(HistoricalPrice).filter(HistoricalPrice.symbol == symbol).order_by(HistoricalPrice.date).all()
+    df = pd.DataFrame([{
+        "date": p.date, "open": p.open, "high": p.high, "low": p.low, "close": p.close, "volume": p.volume,
+    } for p in prices]).set_index("date").sort_index()
+    df["label"] = np.where((df["close"].shift(-1) / df["close"] - 1) > 0, 1, -1)
+    df["label_threshold"] = fe.compute_threshold_labels(df, forward_days=1)
+
+    out = {}
+    for target_date in df.index[64:]:
+        price_feats = fe.build_price_features(df.loc[:target_date])
+        sent_feats = fe.build_sentiment_features(db_session, symbol, datetime.combine(target_date, datetime.min.time()))
+        cross_feats = fe.build_cross_asset_features(db_session, target_date)
+        features = {**price_feats, **sent_feats, **cross_feats}
+        idx = list(df.index).index(target_date)
+        if idx + 1 >= len(df):
+            continue
+        curr, nxt = df.iloc[idx]["close"], df.iloc[idx + 1]["close"]
+        if curr == 0:
+            continue
+        ret = (nxt - curr) / curr
+        features["label"] = int(df.loc[target_date, "label"])
+        features["label_threshold"] = int(df.loc[target_date, "label_threshold"])
+        out[target_date] = (features, float(ret), "up" if ret > 0 else "down")
+    return out
+
+
+def _same(a, b):
+    if isinstance(a, float) and math.isnan(a):
+        return isinstance(b, float) and math.isnan(b)
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+
+
+@pytest.mark.parametrize("live", [
+    {"sentiment_score": 0.0, "sentiment_momentum": 0.0, "sentiment_trend": 0.0},
+    {"sentiment_score": 0.4, "sentiment_momentum": -0.3, "sentiment_trend": 0.0},
+])
+def test_point_in_time_builder_matches_per_date_loop(db, monkeypatch, live):
+    monkeypatch.setattr(fe, "_live_sentiment_context", lambda symbol: dict(live))
+    expected = _per_date_reference(db, "AAA")
+
+    assert fe.engineer_features_for_symbol(db, "AAA") == len(expected)
+    rows = {r.date: r for r in db.query(TrainingFeature).filter(TrainingFeature.symbol == "AAA")}
+    assert rows.keys() == expected.keys()
+
+    for d, (features, ret, direction) in expected.items():
+        row = rows[d]
+        assert list(row.features) == list(features), d
+        for key, value in features.items():
+            assert _same(value, row.features[key]), (d, key, value, row.features[key])
+        assert _same(ret, row.target_return)
+        assert row.target_direction == direction
+    print("PASS: vectorized features equal the per-date loop on every row")
+
+
+def test_rerun_upserts_in_place(db, monkeypatch):
+    monkeypatch.setattr(fe, "_live_sentiment_context", lambda symbol: {
+        "sentiment_score": 0.0, "sentiment_momentum": 0.0, "sentiment_trend": 0.0,
+    })
+    first = fe.engineer_features_for_symbol(db, "AAA")
+    assert fe.engineer_features_for_symbol(db, "AAA") == first
+    assert db.query(TrainingFeature).count() == first
+    assert fe.engineer_features_for_symbol(db, "MISSING") == 0
+    print("PASS: re-running updates rows instead of duplicating them")
+
+
+def test_builder_issues_constant_queries(db, monkeypatch):
+    monkeypatch.setattr(fe, "_live_sentiment_context", lambda symbol: {
+        "sentiment_score": 0.0, "sentiment_momentum": 0.0, "sentiment_trend": 0.0,
+    })
+    from sqlalchemy import event
+
+    selects = []
+    listener = lambda conn, cursor, statement, *a: selects.append(statement) if statement.lstrip().upper().startswith("SELECT") else None
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        fe.engineer_features_for_symbol(db, "AAA")
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert len(selects) == 3  # prices, news, macro
+    print("PASS: one query per source regardless of history length")
@@ -0,0 +1,129 @@
+"""
+Tests for keyset-paged history reads and rollup-backed summaries.
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+import database.connection as connection
+from database.keyset import decode_cursor, encode_cursor, next_cursor
+from database.models import (
+    AIDecisionCounterfactual, AIDecisionEvent, AIDecisionReasonCode, AIDecisionReasonCodeRollup,
+    AuditEvent, AuditEventRollup, PersistentRiskEvent, PersistentRiskEventRollup,
+)
+from utils.error_handler import ValidationError
+from services import audit_trail, decision_persistence, risk_event_persistence
+
+TABLES = (
+    AIDecisionEvent, AIDecisionReasonCode, AIDecisionCounterfactual, AIDecisionReasonCodeRollup,
+    AuditEvent, AuditEventRollup, PersistentRiskEvent, PersistentRiskEventRollup,
+)
+
+
+@pytest.fixture
+def Session(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    for model in TABLES:
+        model.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(connection, "SessionLocal", Session)
+    return Session
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    ts = datetime(2026, 4, 17, 12, 30, 0, 123456)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+    assert decode_cursor(encode_cursor(ts.isoformat(), 42)) == (ts, 42)
+    assert decode_cursor(None) is None
+    with pytest.raises(ValidationError):
+        decode_cursor("not-a-cursor")
+    assert next_cursor([{"id": 1, "created_at": ts.isoformat()}], limit=2) is None
+    print("PASS: cursors round-trip; invalid cursors are a 400")
+
+
+def test_audit_pages_cover_ties_exactly_once(Session):
+    db = Session()
+    base = datetime(2026, 4, 1)
+    for i in range(11):
+        # pairs of rows share a timestamp, so ordering relies on the id tie-breaker
+        db.add(AuditEvent(user_id=7, event_domain="risk", event_name="E", severity="info",
+                          summary=str(i), created_at=base + timedelta(minutes=i // 2)))
+    db.add(AuditEvent(user_id=8, event_domain="risk", event_name="E", severity="info",
+                      summary="other user", created_at=base))
+    db.commit()
+    expected = [r.id for r in db.query(AuditEvent.id).filter(AuditEvent.user_id == 7)
+                .order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc())]
+    db.close()
+
+    seen, cursor = [], None
+    while True:
+        page = audit_trail.get_audit_trail(user_id=7, limit=4, cursor=cursor)
+        seen.extend(e["id"] for e in page)
+        cursor = next_cursor(page, 4)
+        if cursor is None:
+            break
+    assert seen == expected
+    print("PASS: keyset pages return every row once, newest first")
+
+
+def test_summaries_come_from_rollups(Session):
+    for domain, severity, uid in [("risk", "warning", 1), ("risk", "warning", 1),
+                                  ("decision", "info", 1), ("system", "bogus", None)]:
+        audit_trail.emit_audit(domain, "E", "s", user_id=uid, severity=severity)
+    risk_event_persistence.emit_risk_event("blocked_trade", "RISK_BLOCK", "s", user_id=1, symbol="btcusdc")
+    risk_event_persistence.emit_risk_event("size_reduced", "SIZE", "s", user_id=1, severity="info")
+
+    db = Session()
+    raw = {(r[0], r[1]): r[2] for r in db.query(
+        AuditEvent.event_domain, AuditEvent.severity, func.count(AuditEvent.id),
+    ).group_by(AuditEvent.event_domain, AuditEvent.severity)}
+    db.close()
+
+    summary = audit_trail.get_audit_summary()
+    assert summary["total"] == 6  # includes the RISK_* audits emitted by emit_risk_event
+    assert summary["by_severity"] == {
+        sev: sum(n for (_, s), n in raw.items() if s == sev) for sev in {s for _, s in raw}
+    }
+    assert audit_trail.get_audit_summary(user_id=1)["by_domain"] == {"risk": 4, "decision": 1}
+
+    risk = risk_event_persistence.get_risk_event_summary(user_id=1)
+    assert risk == {"total": 2, "by_type": {"blocked_trade": 1, "size_reduced": 1},
+                    "by_severity": {"warning": 1, "info": 1}}
+    assert risk_event_persistence.get_risk_event_summary(user_id=1, symbol="BTCUSDC")["total"] == 1
+    print("PASS: audit and risk summaries read the incrementally maintained rollups")
+
+
+def test_decision_history_and_reason_code_stats(Session):
+    def explanation(codes, blocked=()):
+        return SimpleNamespace(
+            action="BUY", confidence_score=0.8, confidence_band="high", market_regime="bullish",
+            narrative_summary="n", machine_summary="m", stop_loss_logic="", take_profit_logic="",
+            expected_holding_profile="", audit_metadata={}, reason_codes=list(codes),
+            blocked_by=list(blocked), sizing_adjustments=[], why_not_opposite=["x"],
+            why_not_wait=[], invalidation_conditions=[], improvement_triggers=[],
+        )
+
+    for sym, codes in [("BTCUSDC", ["TREND_BULLISH", "LOW_CONFIDENCE"]),
+                       ("BTCUSDC", ["TREND_BULLISH"]),
+                       ("ETHUSDC", ["TREND_BULLISH"])]:
+        assert decision_persistence.save_decision_event(explanation(codes, ["cap"]), user_id=3, symbol=sym)
+
+    stats = decision_persistence.get_reason_code_stats()
+    assert [s["count"] for s in stats] == [3, 3, 1]
+    assert {(s["code"], s["category"]) for s in stats[:2]} == {("TREND_BULLISH", "positive"), ("RISK_BLOCK", "risk")}
+    btc = decision_persistence.get_reason_code_stats(symbol="btcusdc")
+    assert {(s["code"], s["count"]) for s in btc} == {("TREND_BULLISH", 2), ("LOW_CONFIDENCE", 1), ("RISK_BLOCK", 2)}
+
+    first = decision_persistence.get_decision_history(user_id=3, limit=2)
+    rest = decision_persistence.get_decision_history(user_id=3, limit=2, cursor=next_cursor(first, 2))
+    assert [e["symbol"] for e in first + rest] == ["ETHUSDC", "BTCUSDC", "BTCUSDC"]
+    assert [c["code"] for c in first[1]["reason_codes"]] == ["TREND_BULLISH", "RISK_BLOCK"]
+    assert first[0]["counterfactuals"] == [{"type": "why_not_opposite", "content": "x"}]
+    print("PASS: decision history pages with batched children; stats read the rollup")
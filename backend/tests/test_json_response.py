@@ -0,0 +1,83 @@
+"""
+Tests for the orjson response layer and list streaming.
+"""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from utils.json_response import (
+    FastJSONResponse, dumps, iter_json_list, json_response, stream_json_list,
+)
+
+
+def test_non_finite_and_numpy_pandas_values():
+    payload = {
+        "nan": float("nan"),
+        "inf": float("-inf"),
+        "np_nan": np.float64("nan"),
+        "np_int": np.int64(7),
+        "np_bool": np.bool_(True),
+        "arr": np.array([1.5, np.nan]),
+        "series": pd.Series([1.0, np.inf]),
+        "ts": pd.Timestamp("2026-01-02T03:04:05"),
+        "nat": pd.NaT,
+        "nested": [{"x": float("inf")}],
+        3: "int key",
+    }
+    out = json.loads(dumps(payload))
+    assert out["nan"] is None and out["inf"] is None and out["np_nan"] is None
+    assert out["np_int"] == 7 and out["np_bool"] is True
+    assert out["arr"] == [1.5, None] and out["series"] == [1.0, None]
+    assert out["ts"] == "2026-01-02T03:04:05" and out["nat"] is None
+    assert out["nested"] == [{"x": None}] and out["3"] == "int key"
+    print("PASS: non-finite floats encode as null; numpy/pandas handled natively")
+
+
+def test_chunked_list_matches_plain_document():
+    items = [{"i": i, "v": float("nan") if i % 3 == 0 else i / 2} for i in range(600)]
+    expected = {"count": 600, "events": [{"i": i, "v": None if i % 3 == 0 else i / 2} for i in range(600)]}
+
+    chunks = list(iter_json_list(items, key="events", envelope={"count": 600}, chunk_items=100))
+    assert len(chunks) == 8  # head + 6 chunks + tail
+    assert json.loads(b"".join(chunks)) == expected
+    assert json.loads(b"".join(iter_json_list([], key="events"))) == {"events": []}
+    assert json.loads(b"".join(iter_json_list(iter(items[:3])))) == expected["events"][:3]
+    print("PASS: chunked JSON arrays decode to the unstreamed document")
+
+
+def test_endpoints_stream_json_or_ndjson():
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/feed")
+    def feed(request: Request):
+        events = [{"id": i, "score": np.float32(i) if i else float("nan")} for i in range(5)]
+        return stream_json_list(request, events, key="events", count=len(events))
+
+    @app.get("/plain")
+    def plain():
+        return {"value": float("inf")}
+
+    @app.get("/direct")
+    def direct():
+        return json_response({"value": np.float64("nan"), "n": np.int32(2)})
+
+    client = TestClient(app)
+    body = client.get("/feed").json()
+    assert body["count"] == 5 and body["events"][0]["score"] is None and body["events"][4]["score"] == 4.0
+
+    resp = client.get("/feed", headers={"Accept": "application/x-ndjson"})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["id"] for line in lines] == list(range(5))
+    assert client.get("/feed?format=ndjson").text.count("\n") == 5
+
+    assert client.get("/plain").json() == {"value": None}
+    assert client.get("/direct").json() == {"value": None, "n": 2}
+    print("PASS: list endpoints stream JSON by default and NDJSON on request")
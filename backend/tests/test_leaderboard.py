@@ -0,0 +1,68 @@
+"""
+Tests for materialized leaderboard reads.
+"""
+
+import sys
+import os
+from datetime import date, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import LeaderboardSnapshot
+import services.social_service as social
+
+
+def _service(monkeypatch, snapshot_date, n_users=7):
+    engine = create_engine("sqlite:///:memory:")
+    LeaderboardSnapshot.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    for pos in range(1, n_users + 1):
+        uid = 100 + pos
+        db.add(LeaderboardSnapshot(
+            user_id=uid, display_name=f"user{uid}", paper_pnl_pct=50.0 - pos,
+            paper_trades=pos, win_rate=60.0, period="weekly",
+            snapshot_date=snapshot_date, rank=min(pos, 5), position=pos,
+        ))
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(social, "SessionLocal", Session)
+    svc = social.SocialService()
+    monkeypatch.setattr(svc, "_ensure_schema", lambda: None)
+    refreshes = []
+    monkeypatch.setattr(svc, "_refresh_in_background", lambda: refreshes.append(1) or True)
+    monkeypatch.setattr(svc, "update_leaderboard", lambda *a, **k: (_ for _ in ()).throw(AssertionError("inline rebuild")))
+    return svc, refreshes
+
+
+def test_keyset_pages_and_my_position(monkeypatch):
+    svc, refreshes = _service(monkeypatch, date.today())
+
+    first = svc.get_leaderboard(user_id=106, period="weekly", limit=3)
+    assert [r["position"] for r in first["rankings"]] == [1, 2, 3]
+    assert first["next_cursor"] == 3
+    assert first["my_rank"] == 5 and first["my_position"] == 6
+
+    second = svc.get_leaderboard(user_id=106, period="weekly", limit=3, after=first["next_cursor"])
+    assert [r["position"] for r in second["rankings"]] == [4, 5, 6]
+    last = svc.get_leaderboard(user_id=106, period="weekly", limit=3, after=second["next_cursor"])
+    assert [r["position"] for r in last["rankings"]] == [7]
+    assert last["next_cursor"] is None
+    assert refreshes == []
+    print("PASS: leaderboard pages by position; my rank is a single lookup")
+
+
+def test_stale_or_missing_snapshot_refreshes_in_background(monkeypatch):
+    svc, refreshes = _service(monkeypatch, date.today() - timedelta(days=1))
+    out = svc.get_leaderboard(user_id=101, period="weekly", limit=10)
+    assert len(out["rankings"]) == 7 and out["my_position"] == 1
+    assert out["snapshot_date"] == (date.today() - timedelta(days=1)).isoformat()
+    assert refreshes == [1]
+
+    missing = svc.get_leaderboard(user_id=101, period="monthly", limit=10)
+    assert missing["rankings"] == [] and missing["pending_refresh"]
+    assert refreshes == [1, 1]
+    print("PASS: stale/missing snapshots are served immediately and rebuilt off-request")
@@ -0,0 +1,122 @@
+"""
+Tests for LSTM sequence windows and batched inference (no TensorFlow needed).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+
+import ml.lstm_model as lstm
+
+
+def _loop_sequences(data, seq_len, labels):
+    X = [data[i - seq_len:i] for i in range(seq_len, len(data))]
+    y = [labels[i] for i in range(seq_len, len(data))]
+    return np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
+
+
+def test_prepare_sequences_matches_loop_without_copying():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(300, 20)).astype(np.float32)
+    labels = (rng.random(300) > 0.5).astype(np.float32)
+
+    X, y = lstm.prepare_sequences(data, seq_len=60, labels=labels)
+    X_loop, y_loop = _loop_sequences(data, 60, labels)
+    assert X.shape == (240, 60, 20)
+    np.testing.assert_array_equal(X, X_loop)
+    np.testing.assert_array_equal(y, y_loop)
+    assert np.shares_memory(X, data)
+
+    empty_X, empty_y = lstm.prepare_sequences(data[:60], seq_len=60)
+    assert len(empty_X) == 0 and len(empty_y) == 0
+    print("PASS: strided windows equal the copied loop windows")
+
+
+def test_batches_cover_each_window_once_per_pass():
+    data = np.arange(130 * 3, dtype=np.float32).reshape(130, 3)
+    X, y = lstm.prepare_sequences(data, seq_len=10, labels=np.arange(130, dtype=np.float32))
+
+    batches = list(lstm.iter_sequence_batches(X, y, batch_size=32, shuffle=True, seed=3, repeat=False))
+    assert [len(b[1]) for b in batches] == [32, 32, 32, 24]
+    seen = np.concatenate([b[1] for b in batches])
+    assert sorted(seen.tolist()) == y.tolist()
+    for xb, yb in batches:
+        assert xb.flags["C_CONTIGUOUS"]
+        # window ending before row i carries label i
+        np.testing.assert_array_equal(xb[:, -1, 0], (yb - 1) * 3)
+
+    again = list(lstm.iter_sequence_batches(X, y, batch_size=32, shuffle=True, seed=3, repeat=False))
+    assert all(np.array_equal(a[1], b[1]) for a, b in zip(batches, again))
+    print("PASS: seeded shuffled batches visit every window exactly once")
+
+
+class _FakeModel:
+    def __init__(self, weight):
+        self.weight = weight
+        self.calls = []
+
+    def __call__(self, x, training=False):
+        self.calls.append(x.shape)
+        return (x.mean(axis=(1, 2)) * self.weight + 0.5).reshape(-1, 1)
+
+
+def test_predict_lstm_batch_groups_by_model(monkeypatch):
+    shared, solo = _FakeModel(0.05), _FakeModel(-0.1)
+    bundles = {"BTCUSDC": shared, "ETHUSDC": shared, "SOLUSDC": solo}
+    meta = {"feature_cols": ["f"], "sequence_length": 4}
+    monkeypatch.setattr(lstm, "_load_lstm_bundle", lambda s: (bundles[s], meta) if s in bundles else (None, None))
+    monkeypatch.setattr(lstm, "_build_feature_matrix", lambda df, cols=None: (df.to_numpy(np.float32), ["f"], None))
+    monkeypatch.setattr(lstm, "_LSTM_INFER_CACHE", {})
+
+    frames = {s: pd.DataFrame({"f": np.arange(10, dtype=float) * k}) for k, s in enumerate(
+        ["BTCUSDC", "ETHUSDC", "SOLUSDC", "DOGEUSDC"], start=1)}
+    frames["LTCUSDC"] = pd.DataFrame({"f": [1.0, 2.0]})
+    bundles["LTCUSDC"] = shared  # too short for a window
+
+    probs = lstm.predict_lstm_batch(frames)
+    assert shared.calls == [(2, 4, 1)] and solo.calls == [(1, 4, 1)]
+    assert probs["DOGEUSDC"] is None and probs["LTCUSDC"] is None
+    assert abs(probs["BTCUSDC"] - (0.5 + 0.05 * 7.5)) < 1e-6
+    assert probs["SOLUSDC"] == 0.0  # clamped
+
+    assert lstm.predict_lstm("ETHUSDC", frames["ETHUSDC"]) == probs["ETHUSDC"]
+    assert set(lstm._LSTM_INFER_CACHE) == {id(shared), id(solo)}
+    print("PASS: symbols sharing a model run in one forward pass")
+
+
+def test_all_predictions_share_one_lstm_batch(monkeypatch):
+    from ai import asset_predictor as ap
+    import services.onchain_service as onchain
+
+    predictor = ap.asset_predictor
+    assets = {
+        "BTCUSDC": {"type": ap.AssetType.CRYPTO}, "ETHUSDC": {"type": ap.AssetType.CRYPTO},
+        "PEPEUSDC": {"type": ap.AssetType.CRYPTO}, "AAPL": {"type": ap.AssetType.STOCK},
+    }
+    features = {s: [f"f{i}" for i in range(12)] for s in assets}
+    monkeypatch.setattr(predictor, "all_assets", assets)
+    monkeypatch.setattr(predictor, "models", {s: object() for s in assets})
+    monkeypatch.setattr(predictor, "scalers", {s: object() for s in assets})
+    monkeypatch.setattr(predictor, "model_features", features)
+    monkeypatch.setattr(predictor, "_get_recent_ohlcv", lambda symbol, days=250: pd.DataFrame({"close": [1.0, 2.0]}))
+    monkeypatch.setattr(onchain, "collect_onchain_signals", lambda symbols: {})
+
+    batches = []
+
+    def _per_symbol(*args):
+        raise AssertionError("per-symbol LSTM call")
+
+    monkeypatch.setattr(lstm, "predict_lstm_batch", lambda frames: batches.append(sorted(frames)) or {s: 0.7 for s in frames})
+    monkeypatch.setattr(lstm, "predict_lstm", _per_symbol)
+    calls = {}
+    monkeypatch.setattr(predictor, "predict_price", lambda symbol, days=7, recent_df=None, lstm_probs=None:
+                        calls.setdefault(symbol, (recent_df is not None, (lstm_probs or {}).get(symbol))))
+
+    out = predictor.get_all_predictions()
+    assert out["count"] == 4
+    assert batches == [["BTCUSDC", "ETHUSDC"]]  # only LSTM symbols, in one call
+    assert calls == {"BTCUSDC": (True, 0.7), "ETHUSDC": (True, 0.7), "PEPEUSDC": (False, None), "AAPL": (False, None)}
+    print("PASS: multi-symbol predictions run the LSTM as one batch")
@@ -0,0 +1,121 @@
+"""
+Tests for the lazy model artifact registry.
+"""
+
+import sys
+import os
+import pickle
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from ml.model_registry import (
+    ModelArtifactRegistry, ArtifactView, KIND_XGBOOST, KIND_ENSEMBLE,
+)
+
+
+def _write(path, payload):
+    with open(path, "wb") as f:
+        pickle.dump(payload, f)
+
+
+def _bump_mtime(path, seconds=10):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 1_000_000_000))
+
+
+def test_index_without_loading(tmp_path):
+    _write(tmp_path / "BTCUSDC_xgboost_latest.pkl", {"model": "xgb-v1", "scaler": "s", "feature_cols": ["a"]})
+    _write(tmp_path / "XAUUSDT_random_forest_20250101_000000.pkl", {"model": "rf-old", "scaler": "s"})
+    _write(tmp_path / "XAUUSDT_random_forest_20250301_000000.pkl", {"model": "rf-new", "scaler": "s"})
+    _write(tmp_path / "XAUUSDT_random_forest_scaler.pkl", {"ignored": True})
+    _write(tmp_path / "BTCUSDC_ensemble_latest.pkl", {"rf_model": "rf", "feature_cols": []})
+
+    reg = ModelArtifactRegistry(models_dir=str(tmp_path))
+    assert reg.scan() == 3
+    assert reg.get_status()["loaded"] == 0
+
+    models = ArtifactView(reg, "model")
+    features = ArtifactView(reg, "feature_cols", kinds=(KIND_XGBOOST,))
+    ensembles = ArtifactView(reg, None, kinds=(KIND_ENSEMBLE,))
+    assert sorted(models) == ["BTCUSDC", "XAUUSDT"]
+    assert "XAUUSDT" in models and "XAUUSDT" not in features
+    assert reg.get_status()["loaded"] == 0
+
+    assert models["XAUUSDT"] == "rf-new"
+    assert features["BTCUSDC"] == ["a"]
+    assert ensembles.get("ETHUSDC") is None
+    assert reg.get_status()["loaded"] == 2
+    print("PASS: registry indexes without loading and loads on first use")
+
+
+def test_evicts_cold_models_under_budget(tmp_path):
+    for sym in ("AAA", "BBB", "CCC"):
+        _write(tmp_path / f"{sym}_xgboost_latest.pkl", {"model": "x" * 50_000, "scaler": "s"})
+    size = os.path.getsize(tmp_path / "AAA_xgboost_latest.pkl")
+
+    reg = ModelArtifactRegistry(models_dir=str(tmp_path), memory_budget_bytes=int(size * 2.5))
+    reg.scan()
+    for sym in ("AAA", "BBB", "CCC"):
+        assert reg.get(sym, KIND_XGBOOST) is not None
+
+    status = reg.get_status()
+    assert status["loaded"] == 2
+    assert status["evictions"] == 1
+    assert status["loaded_bytes"] <= reg.memory_budget_bytes
+    assert [a["symbol"] for a in status["loaded_artifacts"]] == ["BBB", "CCC"]
+    # Evicted artifacts reload transparently.
+    assert reg.get("AAA", KIND_XGBOOST)["model"].startswith("x")
+    print("PASS: cold models evicted under memory budget")
+
+
+def test_hot_swaps_newer_artifact(tmp_path):
+    import ml.model_registry as registry_module
+
+    path = tmp_path / "ETHUSDC_xgboost_latest.pkl"
+    _write(path, {"model": "v1", "scaler": "s"})
+    reg = ModelArtifactRegistry(models_dir=str(tmp_path))
+    reg.scan()
+    assert reg.get("ETHUSDC", KIND_XGBOOST)["model"] == "v1"
+
+    _write(path, {"model": "v2", "scaler": "s"})
+    _bump_mtime(path)
+    original = registry_module.STAT_INTERVAL_SECONDS
+    registry_module.STAT_INTERVAL_SECONDS = 0.0
+    try:
+        assert reg.get("ETHUSDC", KIND_XGBOOST)["model"] == "v2"
+    finally:
+        registry_module.STAT_INTERVAL_SECONDS = original
+    assert reg.stats["reloads"] == 1
+    print("PASS: newer artifact hot-swapped on next access")
+
+
+def test_unreadable_new_version_keeps_serving_old(tmp_path):
+    import ml.model_registry as registry_module
+
+    path = tmp_path / "SOLUSDC_xgboost_latest.pkl"
+    _write(path, {"model": "good", "scaler": "s"})
+    reg = ModelArtifactRegistry(models_dir=str(tmp_path))
+    reg.scan()
+    assert reg.get("SOLUSDC", KIND_XGBOOST)["model"] == "good"
+
+    path.write_bytes(b"partial write")
+    _bump_mtime(path)
+    original = registry_module.STAT_INTERVAL_SECONDS
+    registry_module.STAT_INTERVAL_SECONDS = 0.0
+    try:
+        assert reg.get("SOLUSDC", KIND_XGBOOST)["model"] == "good"
+    finally:
+        registry_module.STAT_INTERVAL_SECONDS = original
+    assert reg.stats["load_errors"] == 1
+    print("PASS: half-written artifact does not replace the loaded model")
+
+
+def test_warm_up_loads_primary_and_ensemble(tmp_path):
+    _write(tmp_path / "BTCUSDC_xgboost_latest.pkl", {"model": "m", "scaler": "s"})
+    _write(tmp_path / "BTCUSDC_ensemble_latest.pkl", {"rf_model": "rf"})
+    reg = ModelArtifactRegistry(models_dir=str(tmp_path))
+    reg.scan()
+    thread = reg.warm_up(["BTCUSDC", "NOPEUSDC"])
+    thread.join(timeout=5)
+    assert reg.get_status()["loaded"] == 2
+    assert reg.hot_symbols() == ["BTCUSDC"]
+    print("PASS: background warm-up")
@@ -0,0 +1,70 @@
+"""
+Tests for indexed, cross-sectional news impact scoring.
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import FinancialNews, NewsSymbol
+import services.news_impact as news_impact
+
+
+def _session():
+    engine = create_engine("sqlite:///:memory:")
+    FinancialNews.__table__.create(engine)
+    NewsSymbol.__table__.create(engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_symbol_keys_normalize_both_sides():
+    assert news_impact.news_symbol_key("BTCUSDC") == "BTC"
+    assert news_impact.news_symbol_key("btc-usd") == "BTC"
+    assert news_impact.news_symbol_key("GC=F") == "GC"
+    assert news_impact.news_symbol_key("^VIX") == "VIX"
+    assert news_impact.news_symbol_key("EURUSD=X") == "EUR"
+    assert news_impact.news_symbol_key("USDC") == "USDC"
+    print("PASS: news symbol keys normalize tradable and news-side symbols")
+
+
+def test_grouped_aggregates_match_per_symbol_windows(monkeypatch):
+    db = _session()
+    now = datetime.utcnow()
+    rows = [
+        FinancialNews(headline="a", published_at=now - timedelta(hours=1), symbols="BTC-USD,ETH-USD", sentiment_score=0.6),
+        FinancialNews(headline="b", published_at=now - timedelta(hours=5), symbols="BTCUSDC", sentiment_score=0.2),
+        FinancialNews(headline="c", published_at=now - timedelta(hours=30), symbols="BTC-USD", sentiment_score=-0.4),
+        FinancialNews(headline="d", published_at=now - timedelta(hours=2), symbols="BA", sentiment_score=-0.5),
+        FinancialNews(headline="e", published_at=now - timedelta(hours=90), symbols="ETH-USD", sentiment_score=0.9),
+    ]
+    db.add_all(rows)
+    db.flush()
+    assert news_impact.index_news(db, rows) == 6
+    db.commit()
+
+    aggregates = news_impact._aggregate_all(db, now)
+    assert aggregates["BTC"] == {"recent_count": 2, "recent_sum": 0.8, "prior_count": 1, "prior_sum": -0.4}
+    assert aggregates["ETH"]["recent_count"] == 1 and aggregates["ETH"]["prior_count"] == 0
+    assert "BAC" not in aggregates  # exact keys: BA news no longer leaks into BAC
+
+    monkeypatch.setattr(news_impact, "_get_aggregates", lambda: aggregates)
+    out = news_impact.compute_news_impact_scores(["BTCUSDC", "BAC", "BA"])
+    btc = out["BTCUSDC"]
+    assert btc["news_count"] == 2
+    assert btc["avg_sentiment"] == 0.4
+    assert btc["sentiment_momentum"] == 0.8
+    assert btc["impact_score"] == 44.0 and btc["impact_level"] == "MEDIUM"
+    assert out["BAC"]["news_count"] == 0
+    assert out["BA"]["avg_sentiment"] == -0.5
+
+    # Re-indexing replaces an article's mappings.
+    rows[0].symbols = "SOL-USD"
+    news_impact.index_news(db, rows[:1])
+    db.commit()
+    aggregates = news_impact._aggregate_all(db, now)
+    assert aggregates["BTC"]["recent_count"] == 1 and "SOL" in aggregates
+    print("PASS: one grouped query yields every symbol's 24h/prior-24h aggregates")
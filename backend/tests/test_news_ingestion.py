@@ -0,0 +1,78 @@
+"""
+Tests for single-pass news ingestion: keyword automaton, memoized scoring, shared index.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.news_fetcher import NewsFetcher, CRYPTO_NAMES, _automaton
+
+
+class CountingAnalyzer:
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_text(self, text):
+        self.calls += 1
+        return {"compound": 0.5 if "surge" in text.lower() else -0.2}
+
+
+def _article(title, summary="", **extra):
+    return dict({"title": title, "summary": summary}, **extra)
+
+
+def test_automaton_matches_substring_semantics():
+    texts = [
+        "Bitcoin Cash forks again while ETH gas falls",
+        "Whether or not the Ripple case settles",  # 'eth' inside 'whether'
+        "Polkadot parachain auction; Chainlink oracles",
+        "nothing relevant here",
+        "DOGE and SHIB rally, avalanche of buyers",
+    ]
+    fetcher = NewsFetcher()
+    for text in texts:
+        expected = {
+            base for base in CRYPTO_NAMES
+            if fetcher._match_articles_to_symbol([_article(text)], base)
+        }
+        assert _automaton.match(text) == expected, text
+    print("PASS: automaton agrees with per-keyword substring matching")
+
+
+def test_single_pass_scores_each_article_once():
+    fetcher = NewsFetcher()
+    analyzer = CountingAnalyzer()
+    fetcher._sentiment_analyzer = analyzer
+    calls = {"fetch": 0}
+
+    shared = [
+        _article("Bitcoin and Ethereum surge", "Solana follows"),
+        _article("Cardano slips", "ADA holders wait"),
+        _article("Markets calm"),
+    ]
+
+    async def fake_fetch_all(symbols):
+        calls["fetch"] += 1
+        return {
+            "coindesk": shared,
+            "cointelegraph": shared[:1],
+            "cryptopanic": {s: [] for s in symbols},
+        }
+
+    fetcher._fetch_all = fake_fetch_all
+    symbols = ["BTCUSDC", "ETHUSDC", "SOLUSDC", "ADAUSDC", "XRPUSDC"]
+    out = fetcher.get_all_sentiment(symbols)
+
+    assert calls["fetch"] == 1
+    # Two relevant unique texts; the third never matches a symbol.
+    assert analyzer.calls == 2
+    assert out["BTCUSDC"]["sources"] == {"cryptopanic": 0, "coindesk": 1, "cointelegraph": 1}
+    assert out["BTCUSDC"]["score"] == 75.0
+    assert out["ADAUSDC"]["label"] == "negative"
+    assert out["XRPUSDC"]["article_count"] == 0
+
+    # Served from cache; no new fetch or scoring.
+    assert fetcher.get_symbol_sentiment("ETHUSDC") == out["ETHUSDC"]
+    assert calls["fetch"] == 1 and analyzer.calls == 2
+    print("PASS: one fetch and one VADER call per unique article across symbols")
@@ -0,0 +1,46 @@
+"""
+Tests for the batched on-chain signal collector.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import services.onchain_service as onchain
+
+
+def test_collector_batches_requests_and_writes(monkeypatch):
+    onchain._local_signals.clear()
+    fetched = []
+    persisted = []
+    cached = {}
+
+    async def fake_fetch(symbols):
+        fetched.append(list(symbols))
+        return {
+            sym: {"funding": 0.02 if sym == "BTCUSDC" else 0.0001, "open_interest": 1000.0,
+                  "fear_greed": 55, "ls_ratio": 2.5 if sym == "ETHUSDC" else 1.1}
+            for sym in symbols
+        }
+
+    monkeypatch.setattr(onchain, "get_supported_futures_symbols", lambda: {"BTCUSDT", "ETHUSDT", "SOLUSDT"})
+    monkeypatch.setattr(onchain, "_fetch_market_structure", fake_fetch)
+    monkeypatch.setattr(onchain, "cache_mget", lambda keys: {})
+    monkeypatch.setattr(onchain, "cache_mset", lambda values, expire=0: cached.update(values) or True)
+    monkeypatch.setattr(onchain, "_persist_snapshots", lambda rows: persisted.append(rows))
+
+    out = onchain.collect_onchain_signals(["BTCUSDC", "ETHUSDC", "SOLUSDC", "AAPL"])
+    assert sorted(out) == ["BTCUSDC", "ETHUSDC", "SOLUSDC"]
+    assert fetched == [["BTCUSDC", "ETHUSDC", "SOLUSDC"]]
+    assert len(persisted) == 1 and len(persisted[0]) == 3
+    assert set(cached) == {"onchain:BTCUSDC", "onchain:ETHUSDC", "onchain:SOLUSDC"}
+
+    assert out["BTCUSDC"]["funding_bearish"] and out["BTCUSDC"]["onchain_score"] == 0.75
+    assert out["ETHUSDC"]["overleveraged_longs"]
+    assert out["SOLUSDC"]["onchain_sentiment"] == "bullish"
+
+    # Per-symbol reads are served from the batch.
+    assert onchain.get_onchain_signals("ethusdc") is out["ETHUSDC"]
+    assert len(fetched) == 1
+    onchain._local_signals.clear()
+    print("PASS: one concurrent collection and one batch write for all symbols")
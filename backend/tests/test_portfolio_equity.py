@@ -0,0 +1,111 @@
+"""
+Tests for compact equity points, OHLC rollups and range-aware charts.
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import database.connection as connection
+from database.models import (
+    PortfolioClusterExposure, PortfolioEquityPoint, PortfolioEquityRollup,
+    PortfolioStateSnapshot, PortfolioSymbolExposure,
+)
+import services.portfolio_persistence as pp
+
+BTC = [{"symbol": "BTC", "quantity": 0.1, "market_value": 7000, "exposure_pct": 70}]
+
+
+@pytest.fixture
+def Session(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    for model in (PortfolioStateSnapshot, PortfolioSymbolExposure, PortfolioClusterExposure,
+                  PortfolioEquityPoint, PortfolioEquityRollup):
+        model.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(connection, "SessionLocal", Session)
+    return Session
+
+
+def _save(ts, equity, positions=BTC):
+    return pp.save_portfolio_snapshot(
+        user_id=1, total_equity=equity, available_cash=equity - 7000,
+        positions=positions, correlated_exposure={}, risk_score=equity / 1000, timestamp=ts,
+    )
+
+
+def test_bucket_starts():
+    ts = datetime(2026, 4, 16, 13, 45, 12)  # a Thursday
+    assert pp.bucket_start(ts, "1h") == datetime(2026, 4, 16, 13)
+    assert pp.bucket_start(ts, "1d") == datetime(2026, 4, 16)
+    assert pp.bucket_start(ts, "1w") == datetime(2026, 4, 13)
+    assert [pp.pick_resolution(d) for d in (1, 20, 21, 365, 2000)] == ["1h", "1h", "1d", "1d", "1w"]
+    print("PASS: UTC buckets and range-based resolution choice")
+
+
+def test_points_rollups_and_keyframes(Session):
+    t0 = datetime(2026, 4, 16, 10, 0)
+    # Out-of-order arrival inside one hour must still yield the right open/close.
+    assert _save(t0 + timedelta(minutes=30), 10300) is not None   # first keyframe
+    assert _save(t0, 10000) is None                               # same symbols, recent keyframe
+    assert _save(t0 + timedelta(minutes=50), 9900) is None
+    assert _save(t0 + timedelta(minutes=10), 10600) is None
+    assert _save(t0 + timedelta(minutes=55), 9950, positions=BTC + [
+        {"symbol": "ETH", "quantity": 1, "market_value": 2000, "exposure_pct": 20}]) is not None
+    assert _save(t0 + timedelta(hours=2), 10100) is not None      # keyframe is stale
+
+    db = Session()
+    assert db.query(PortfolioEquityPoint).count() == 6
+    assert db.query(PortfolioStateSnapshot).count() == 3
+    hour = db.query(PortfolioEquityRollup).filter_by(resolution="1h", bucket_start=datetime(2026, 4, 16, 10)).one()
+    assert (hour.open, hour.high, hour.low, hour.close, hour.samples) == (10000, 10600, 9900, 9950, 5)
+    day = db.query(PortfolioEquityRollup).filter_by(resolution="1d").one()
+    assert (day.open, day.close, day.samples, day.risk_score) == (10000, 10100, 6, 10.1)
+    db.close()
+    print("PASS: every assessment is a point; full snapshots only on keyframes")
+
+
+def test_chart_returns_bounded_points(Session):
+    start = datetime(2026, 1, 1)
+    for h in range(0, 24 * 60, 3):  # 60 days of 3-hourly points
+        _save(start + timedelta(hours=h), 10000 + h)
+    now = start + timedelta(days=60)
+
+    chart = pp.get_equity_chart(1, days=60, points=30, now=now)
+    assert chart["resolution"] == "1d"
+    assert chart["count"] == len(chart["series"]) <= 30
+    first, last = chart["series"][0], chart["series"][-1]
+    assert first["open"] == 10000 and last["close"] == 10000 + 24 * 60 - 3
+    assert sum(p["samples"] for p in chart["series"]) == 480
+    assert all(a["timestamp"] < b["timestamp"] for a, b in zip(chart["series"], chart["series"][1:]))
+
+    week = pp.get_equity_chart(1, days=7, points=50, now=now)
+    assert week["resolution"] == "1h" and week["count"] <= 50
+    assert week["series"][-1]["total_equity"] == last["close"]
+    print("PASS: chart picks the rollup resolution and merges to a fixed point budget")
+
+
+def test_equity_chart_accepts_deprecated_limit(monkeypatch):
+    main = pytest.importorskip("main")
+    from fastapi.testclient import TestClient
+    import database.async_repository as async_repository
+
+    calls = []
+
+    async def _fetch(user_id, days, points):
+        calls.append((user_id, days, points))
+        return {"resolution": "1d", "days": days, "series": [], "count": 0}
+
+    monkeypatch.setattr(async_repository, "fetch_equity_chart", _fetch)
+    monkeypatch.setitem(main.app.dependency_overrides, main.require_auth, lambda: {"sub": "7"})
+    client = TestClient(main.app)
+
+    assert client.get("/api/portfolio/equity-chart?limit=30").status_code == 200
+    assert client.get("/api/portfolio/equity-chart?days=30&points=60").status_code == 200
+    assert calls == [(7, 90, 30), (7, 30, 60)]
+    print("PASS: legacy limit maps onto points")
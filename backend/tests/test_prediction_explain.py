@@ -0,0 +1,49 @@
+"""
+Tests for the prediction explainability endpoints.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from fastapi.testclient import TestClient
+
+main = pytest.importorskip("main")
+
+
+def _stub_prediction_inputs(monkeypatch):
+    import ai.market_regime
+    import services.news_impact
+    import services.smart_score
+
+    monkeypatch.setattr(main.asset_predictor, "all_assets", {"BTCUSDC": {"name": "Bitcoin", "type": None}})
+    monkeypatch.setattr(main.asset_predictor, "predict_price", lambda sym, days=7: {
+        "symbol": sym, "recommendation": "BUY", "confidence": 72.0, "trend_score": 1.2,
+        "price_change_percent": 2.5, "current_price": 100.0, "predicted_price": 102.5,
+        "shap_explanation": {"rsi_14": 0.12, "volume_ratio": -0.04},
+    })
+    monkeypatch.setattr(services.smart_score.smart_score_calculator, "calculate_smart_score",
+                        lambda sym: {"smart_score": 64, "signals": {}})
+    monkeypatch.setattr(main, "compute_ensemble_vote", lambda sym: {"buy": 2, "sell": 0, "hold": 1})
+    monkeypatch.setattr(main, "compute_mtf_agreement", lambda sym: {"aligned": True})
+    monkeypatch.setattr(ai.market_regime, "detect_market_regime", lambda sym: {"regime": "TRENDING_UP"})
+    monkeypatch.setattr(services.news_impact, "compute_news_impact_score", lambda sym: {"score": 0.1})
+    monkeypatch.setattr(services.news_impact, "compute_news_impact_scores",
+                        lambda symbols: {sym: {"score": 0.1} for sym in symbols})
+
+
+def test_batch_explanations_serialize_successful_items(monkeypatch):
+    _stub_prediction_inputs(monkeypatch)
+    client = TestClient(main.app)
+
+    resp = client.get("/api/v1/predictions/explain/batch?symbols=BTCUSDC,NOPE")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == 1 and body["items"][0]["symbol"] == "BTCUSDC"
+    assert body["items"][0]["signal"] == "BUY" and body["items"][0]["confidence"] == 0.72
+    assert [e["symbol"] for e in body["errors"]] == ["NOPE"]
+
+    single = client.get("/api/v1/predictions/explain/BTCUSDC")
+    assert single.status_code == 200 and single.json()["news_impact"] == {"score": 0.1}
+    print("PASS: batch explain returns plain item payloads")
@@ -0,0 +1,90 @@
+"""
+Tests for the buffered prediction tracking pipeline.
+"""
+
+import sys
+import os
+from datetime import datetime
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, text
+
+import services.prediction_outcomes as outcomes
+
+
+def _record(symbol, action, price):
+    return {
+        "symbol": symbol, "action": action, "confidence": 0.7, "price_at_prediction": price,
+        "onchain_score": None, "onchain_sentiment": None, "created_at": datetime.utcnow(),
+    }
+
+
+def test_tracker_dedupes_and_writes_in_batches():
+    batches = []
+    tracker = outcomes.PredictionTracker(writer=lambda records: batches.append(list(records)))
+
+    for _ in range(3):  # the board is rebuilt three times
+        for symbol, price in (("BTCUSDC", 65000.0), ("ETHUSDC", 3200.0), ("AAPL", 190.0)):
+            tracker.track(_record(symbol, "BUY", price))
+    assert tracker.track(_record("BTCUSDC", "BUY", 65100.0)) is False  # same 0.5% bucket
+    assert tracker.track(_record("BTCUSDC", "SELL", 65000.0)) is True
+    assert tracker.track(_record("BTCUSDC", "BUY", 70000.0)) is True
+
+    assert tracker.flush(timeout=5.0)
+    written = [r for batch in batches for r in batch]
+    assert len(written) == 5 and len(batches) == 1
+    assert tracker.stats["deduped"] == 7
+    print("PASS: duplicate predictions collapsed; one batch written off-thread")
+
+
+def test_insert_batch_is_one_statement_per_chunk(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    statements = []
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE prediction_outcomes (
+                id INTEGER PRIMARY KEY, symbol VARCHAR, action VARCHAR, confidence FLOAT,
+                price_at_prediction FLOAT, onchain_score FLOAT, onchain_sentiment VARCHAR,
+                created_at TIMESTAMP
+            )
+        """))
+
+        real_execute = conn.execute
+        monkeypatch.setattr(conn, "execute", lambda stmt, params=None: statements.append(1) or real_execute(stmt, params))
+        monkeypatch.setattr(outcomes, "TRACK_BATCH_SIZE", 100)
+        outcomes._insert_batch(conn, [_record(f"S{i}", "BUY", 10.0 + i) for i in range(250)])
+        monkeypatch.undo()
+
+        assert len(statements) == 3
+        assert conn.execute(text("SELECT COUNT(*) FROM prediction_outcomes")).scalar() == 250
+    print("PASS: 250 records inserted with 3 multi-row statements")
+
+
+def test_failed_batch_retried_with_backoff_then_dropped(monkeypatch):
+    monkeypatch.setattr(outcomes, "TRACK_RETRY_BACKOFF_SECONDS", 0.01)
+    attempts, batches = [], []
+
+    def flaky(records):
+        attempts.append(len(records))
+        if len(attempts) <= 2:
+            raise ConnectionError("database restarting")
+        batches.append(list(records))
+
+    tracker = outcomes.PredictionTracker(writer=flaky)
+    tracker.track(_record("BTCUSDC", "BUY", 65000.0))
+    tracker.track(_record("ETHUSDC", "BUY", 3200.0))
+    assert tracker.flush(timeout=5.0)
+    assert attempts == [2, 2, 2] and len(batches) == 1
+    assert (tracker.stats["written"], tracker.stats["retried"], tracker.stats["failed"]) == (2, 4, 0)
+
+    def down(records):
+        attempts.append(len(records))
+        raise ConnectionError("database down")
+
+    tracker = outcomes.PredictionTracker(writer=down)
+    del attempts[:]
+    tracker.track(_record("SOLUSDC", "SELL", 150.0))
+    assert tracker.flush(timeout=5.0)
+    assert len(attempts) == 1 + outcomes.TRACK_MAX_RETRIES
+    assert tracker.stats["failed"] == 1 and tracker.stats["written"] == 0
+    print("PASS: failed batches are retried with backoff and dropped only after the limit")
@@ -0,0 +1,101 @@
+"""
+Tests for batched Expo push delivery.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import services.push_notifications as push
+
+
+def test_dispatcher_chunks_and_deactivates_dead_tokens(monkeypatch):
+    posts = []
+    deactivated = []
+
+    def fake_post(url, payload):
+        posts.append((url, payload))
+        if url == push.EXPO_RECEIPTS_URL:
+            return {"data": {
+                rid: ({"status": "error", "details": {"error": "DeviceNotRegistered"}}
+                      if rid == "r-5" else {"status": "ok"})
+                for rid in payload["ids"]
+            }}
+        tickets = []
+        for msg in payload:
+            idx = int(msg["to"].split("[")[1].rstrip("]"))
+            if idx == 3:
+                tickets.append({"status": "error", "details": {"error": "DeviceNotRegistered"}})
+            else:
+                tickets.append({"status": "ok", "id": f"r-{idx}"})
+        return {"data": tickets}
+
+    monkeypatch.setattr(push, "_deactivate_tokens", lambda tokens: deactivated.append(sorted(tokens)) or len(tokens))
+    dispatcher = push.PushDispatcher(post=fake_post)
+
+    tokens = [f"ExponentPushToken[{i}]" for i in range(250)] + ["not-a-token"]
+    messages = [push._build_message(t, "T", "B", None) for t in tokens if push._is_valid_token(t)]
+    assert dispatcher.enqueue(messages) == 250
+    assert dispatcher.flush(timeout=5.0)
+
+    send_posts = [p for u, p in posts if u == push.EXPO_PUSH_URL]
+    assert sorted(len(p) for p in send_posts) == [50, 100, 100]
+    assert dispatcher.stats["sent"] == 249
+    assert deactivated == [["ExponentPushToken[3]"]]
+
+    dispatcher._poll_receipts(force=True)
+    assert deactivated[-1] == ["ExponentPushToken[5]"]
+    print("PASS: 250 messages sent in 3 batches; dead tokens deactivated in bulk")
+
+
+def test_token_directory_cached_until_invalidated(monkeypatch):
+    loads = []
+    directory = push._TokenDirectory(client_factory=lambda: None)
+
+    def fake_load():
+        loads.append(1)
+        return {1: ["ExponentPushToken[a]"], 2: ["ExponentPushToken[b]", "ExponentPushToken[c]"]}
+
+    monkeypatch.setattr(directory, "_load", fake_load)
+    assert directory.tokens_for_user(2) == ["ExponentPushToken[b]", "ExponentPushToken[c]"]
+    assert len(directory.all_tokens()) == 3
+    assert len(loads) == 1
+    directory.invalidate()
+    directory.tokens_for_user(1)
+    assert len(loads) == 2
+    print("PASS: token directory loads once until invalidated")
+
+
+def test_token_directory_invalidation_shared_across_workers(monkeypatch):
+    class _Redis:
+        def __init__(self):
+            self.data = {}
+
+        def get(self, key):
+            return self.data.get(key)
+
+        def incr(self, key):
+            self.data[key] = str(int(self.data.get(key, 0)) + 1)
+            return int(self.data[key])
+
+    redis = _Redis()
+    owner = {"ExponentPushToken[a]": 1}
+
+    def _load():
+        by_user = {}
+        for token, uid in owner.items():
+            by_user.setdefault(uid, []).append(token)
+        return by_user
+
+    workers = [push._TokenDirectory(client_factory=lambda: redis) for _ in range(2)]
+    for directory in workers:
+        monkeypatch.setattr(directory, "_load", _load)
+        assert directory.tokens_for_user(1) == ["ExponentPushToken[a]"]
+
+    # The token moves to user 2 and only the worker that handled it invalidates.
+    owner["ExponentPushToken[a]"] = 2
+    workers[0].invalidate()
+    for directory in workers:
+        assert directory.tokens_for_user(1) == []
+        assert directory.tokens_for_user(2) == ["ExponentPushToken[a]"]
+    print("PASS: one worker's invalidation reloads every worker's token directory")
@@ -0,0 +1,105 @@
+"""
+Tests for the in-memory PyTorch data pipeline, early stopping and resume.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from ml import pytorch_model
+from ml.pytorch_model import EpochBatchSampler, PricePredictionNN, PyTorchTrainer, make_loader, materialize_tensors
+
+
+def _data(n=256, d=8, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, d)).astype(np.float32)
+    y = (X @ rng.normal(size=d)).astype(np.float32)
+    return X, y
+
+
+def test_tensors_wrap_float32_arrays_without_copy():
+    X, y = _data()
+    tX, ty = materialize_tensors(X, y, pin_memory=False)
+    assert tX.dtype == torch.float32 and tX.is_contiguous()
+    assert np.shares_memory(tX.numpy(), X)
+    (t64,) = materialize_tensors(X.astype(np.float64), pin_memory=False)
+    assert t64.dtype == torch.float32
+    print("PASS: float32 features are wrapped, not copied")
+
+
+def test_loader_batches_are_deterministic_per_epoch():
+    X, y = _data(n=100)
+    loader = make_loader(X, y, batch_size=32, seed=5, pin_memory=False)
+    first = [b[1].clone() for b in loader]
+    assert [len(b) for b in first] == [32, 32, 32, 4]
+    assert sorted(torch.cat(first).tolist()) == sorted(y.tolist())
+
+    again = [b[1] for b in loader]
+    assert all(torch.equal(a, b) for a, b in zip(first, again))
+    loader.sampler.set_epoch(1)
+    assert not torch.equal(next(iter(loader))[1], first[0])
+    assert len(EpochBatchSampler(100, 32, drop_last=True)) == 3
+    print("PASS: shuffling depends only on seed and epoch")
+
+
+def test_early_stopping_restores_best_weights(tmp_path, monkeypatch):
+    X, y = _data()
+    trainer = PyTorchTrainer(models_dir=str(tmp_path))
+    torch.manual_seed(0)
+    model = PricePredictionNN(input_size=8, hidden_sizes=[16], dropout_rate=0.0)
+    # Validation targets the model cannot fit, so val loss stops improving quickly.
+    history = trainer.train_model(
+        model, make_loader(X, y, seed=1, pin_memory=False),
+        make_loader(X, -y * 50, shuffle=False, pin_memory=False),
+        epochs=60, learning_rate=0.01, patience=3,
+    )
+    assert history["stopped_early"] and len(history["epochs"]) < 60
+    best = history["best_epoch"]
+    assert min(history["val_loss"]) == history["val_loss"][best - 1]
+
+    model.eval()
+    with torch.no_grad():
+        loss = sum(
+            torch.nn.functional.mse_loss(model(f), t).item()
+            for f, t in make_loader(X, -y * 50, shuffle=False, pin_memory=False)
+        ) / 8
+    assert loss == pytest.approx(history["val_loss"][best - 1], rel=1e-5)
+    print("PASS: early stopping keeps the best epoch's weights")
+
+
+def test_interrupted_run_resumes_to_same_result(tmp_path, monkeypatch):
+    X, y = _data()
+    ckpt = str(tmp_path / "run.ckpt")
+
+    def run(epochs, checkpoint_path=None):
+        torch.manual_seed(0)
+        model = PricePredictionNN(input_size=8, hidden_sizes=[16], dropout_rate=0.1)
+        trainer = PyTorchTrainer(models_dir=str(tmp_path))
+        history = trainer.train_model(
+            model, make_loader(X, y, seed=3, pin_memory=False),
+            make_loader(X, y, shuffle=False, pin_memory=False),
+            epochs=epochs, restore_best=False, checkpoint_path=checkpoint_path,
+        )
+        return model, history
+
+    reference, ref_history = run(6)
+
+    # Simulate a crash after epoch 3 by keeping the checkpoint written then.
+    real_remove = os.remove
+    monkeypatch.setattr(pytorch_model.os, "remove", lambda path: None)
+    run(3, ckpt)
+    monkeypatch.setattr(pytorch_model.os, "remove", real_remove)
+    assert os.path.exists(ckpt)
+
+    resumed, history = run(6, ckpt)
+    assert history["epochs"] == ref_history["epochs"]
+    assert history["train_loss"] == pytest.approx(ref_history["train_loss"])
+    for a, b in zip(resumed.state_dict().values(), reference.state_dict().values()):
+        assert torch.allclose(a.float(), b.float())
+    assert not os.path.exists(ckpt)
+    print("PASS: a resumed run matches an uninterrupted one")
@@ -352,13 +352,15 @@ def test_audit_event_model():
 
 
 def test_audit_event_indexes():
-    """AuditEvent should have 4 composite indexes."""
+    """AuditEvent should have keyset indexes per filter shape plus domain/severity timelines."""
     indexes = {idx.name for idx in AuditEvent.__table__.indexes}
-    assert "ix_audit_user_ts" in indexes
+    assert "ix_audit_user_keyset" in indexes
+    assert "ix_audit_user_domain_keyset" in indexes
+    assert "ix_audit_user_severity_keyset" in indexes
+    assert "ix_audit_entity_keyset" in indexes
     assert "ix_audit_domain_ts" in indexes
-    assert "ix_audit_entity" in indexes
     assert "ix_audit_severity_ts" in indexes
-    print("PASS: AuditEvent indexes defined (4 composite)")
+    print("PASS: AuditEvent indexes defined (6 composite)")
 
 
 def test_all_tables_in_metadata():
@@ -402,21 +404,21 @@ def test_indexes_defined():
     assert "ix_autopilot_change_user_ts" in mcl_indexes
 
     ade_indexes = {idx.name for idx in AIDecisionEvent.__table__.indexes}
-    assert "ix_ai_decision_user_ts" in ade_indexes
-    assert "ix_ai_decision_symbol_ts" in ade_indexes
+    assert "ix_ai_decision_user_keyset" in ade_indexes
+    assert "ix_ai_decision_symbol_keyset" in ade_indexes
 
     arc_indexes = {idx.name for idx in AIDecisionReasonCode.__table__.indexes}
     assert "ix_ai_reason_code" in arc_indexes
 
     pre_indexes = {idx.name for idx in PersistentRiskEvent.__table__.indexes}
-    assert "ix_prisk_user_ts" in pre_indexes
-    assert "ix_prisk_symbol_ts" in pre_indexes
+    assert "ix_prisk_user_keyset" in pre_indexes
+    assert "ix_prisk_symbol_keyset" in pre_indexes
     assert "ix_prisk_event_type" in pre_indexes
     assert "ix_prisk_decision_event" in pre_indexes
 
     pfe_indexes = {idx.name for idx in PersistentFeedEvent.__table__.indexes}
-    assert "ix_pfeed_user_ts" in pfe_indexes
-    assert "ix_pfeed_user_type_ts" in pfe_indexes
+    assert "ix_pfeed_user_keyset" in pfe_indexes
+    assert "ix_pfeed_user_type_keyset" in pfe_indexes
     assert "ix_pfeed_dedupe" in pfe_indexes
 
     fer_indexes = {idx.name for idx in FeedEventRead.__table__.indexes}
@@ -0,0 +1,63 @@
+"""
+Tests for the one-time schema readiness registry.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import database.schema_registry as registry
+
+
+class _SQLState(Exception):
+    pgcode = "42P01"
+
+
+def test_ddl_runs_once_until_marked_stale(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    statements = []
+    monkeypatch.setattr(registry, "SessionLocal", sessionmaker(bind=engine))
+    registry.register_schema("widgets", (
+        "CREATE TABLE IF NOT EXISTS widgets (id INTEGER PRIMARY KEY, name VARCHAR)",
+        "CREATE INDEX IF NOT EXISTS ix_widgets_name ON widgets (name)",
+    ))
+    from sqlalchemy import event
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    for _ in range(20):
+        assert registry.ensure_schema("widgets")
+    assert len(statements) == 2
+
+    registry._on_engine_error(type("Ctx", (), {"is_disconnect": True, "original_exception": None})())
+    assert not registry.is_ready("widgets")
+    assert registry.ensure_schema("widgets")
+    assert len(statements) == 4
+
+    registry._on_engine_error(type("Ctx", (), {
+        "is_disconnect": False,
+        "original_exception": OperationalError("SELECT 1", {}, _SQLState()),
+    })())
+    assert not registry.is_ready("widgets")
+    registry._schemas.pop("widgets")
+    print("PASS: schema DDL runs once per process and re-runs after connection/schema errors")
+
+
+def test_failed_ddl_backs_off(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    monkeypatch.setattr(registry, "SessionLocal", sessionmaker(bind=engine))
+    registry.register_schema("broken", ("CREATE TABLE broken (id INTEGER PRIMARY KEY, bad TYPE()",))
+    assert not registry.ensure_schema("broken")
+    assert "broken" in registry._failed_at
+    monkeypatch.setitem(registry._schemas, "broken", ("CREATE TABLE broken (id INTEGER PRIMARY KEY)",))
+    assert not registry.ensure_schema("broken")  # still inside the retry window
+    monkeypatch.setitem(registry._failed_at, "broken", 0.0)
+    assert registry.ensure_schema("broken")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM broken")).scalar() == 0
+    registry._schemas.pop("broken")
+    registry.mark_stale()
+    print("PASS: failing DDL is retried only after the back-off window")
@@ -0,0 +1,79 @@
+"""
+Tests for the non-blocking sentiment read path.
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import cache.connection as cache_connection
+import services.sentiment_scheduler as sched
+from services.news_fetcher import news_fetcher
+
+
+def _reset():
+    sched._snapshot.clear()
+    sched._snapshot_at.clear()
+    sched._snapshot_loaded_at = 0.0
+    sched._refresh_pending.clear()
+
+
+def test_bulk_read_uses_one_mget_and_never_fetches_inline(monkeypatch):
+    _reset()
+    mgets = []
+    fetched = []
+
+    def fake_mget(keys):
+        mgets.append(list(keys))
+        return {"sentiment:BTCUSDC": {"score": 70.0, "label": "positive", "article_count": 4}}
+
+    def fake_fetch(symbols):
+        fetched.append(list(symbols))
+        return {s: {"score": 40.0, "label": "neutral", "article_count": 1, "symbol": s} for s in symbols}
+
+    monkeypatch.setattr(cache_connection, "cache_mget", fake_mget)
+    monkeypatch.setattr(cache_connection, "cache_set", lambda *a, **k: True)
+    monkeypatch.setattr(news_fetcher, "get_all_sentiment", fake_fetch)
+
+    started = time.perf_counter()
+    out = sched.get_cached_sentiments(["BTCUSDC", "ETHUSDC", "ETHUSDC"])
+    assert time.perf_counter() - started < 0.5
+    assert len(mgets) == 1
+    assert out["BTCUSDC"]["score"] == 70.0
+    assert out["ETHUSDC"]["score"] == 50.0 and out["ETHUSDC"]["pending_refresh"]
+
+    # The miss is refreshed in the background and lands in the snapshot.
+    for _ in range(100):
+        if "ETHUSDC" in sched._snapshot:
+            break
+        time.sleep(0.01)
+    assert fetched and "ETHUSDC" in fetched[0]
+    assert sched.get_cached_sentiment("ETHUSDC")["score"] == 40.0
+    # Snapshot still fresh: no further Redis round trips.
+    assert len(mgets) == 1
+    _reset()
+    print("PASS: one MGET per snapshot, neutral on miss, background refresh")
+
+
+def test_expired_redis_entries_leave_the_snapshot(monkeypatch):
+    _reset()
+    redis = {"sentiment:BTCUSDC": {"score": 70.0}, "sentiment:PEPEUSDC": {"score": 80.0}}
+    clock = [1_000_000.0]
+    monkeypatch.setattr(sched.time, "time", lambda: clock[0])
+    monkeypatch.setattr(cache_connection, "cache_mget", lambda keys: {k: redis[k] for k in keys if k in redis})
+    monkeypatch.setattr(sched, "_enqueue_refresh", lambda symbols: None)
+
+    assert sched.get_cached_sentiments(["BTCUSDC", "PEPEUSDC"])["PEPEUSDC"]["score"] == 80.0
+    redis.clear()  # both keys expire in Redis
+
+    # Tracked symbols are dropped on the next reload...
+    clock[0] += sched.SNAPSHOT_TTL_SECONDS
+    assert sched.get_cached_sentiment("BTCUSDC")["score"] == 50.0
+    assert "PEPEUSDC" in sched._snapshot  # not part of that MGET
+    # ...and anything else once Redis would have expired it.
+    clock[0] += sched.SENTIMENT_CACHE_TTL
+    sched.get_cached_sentiment("BTCUSDC")
+    assert "PEPEUSDC" not in sched._snapshot
+    _reset()
+    print("PASS: the local snapshot never outlives the Redis keys")
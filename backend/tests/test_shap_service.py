@@ -0,0 +1,93 @@
+"""
+Tests for cached SHAP explanations.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+
+from ai.shap_service import ShapExplanationService
+
+
+class _LinearModel:
+    def __init__(self, weights):
+        self.weights = np.asarray(weights, dtype=float)
+
+
+class _FakeExplainer:
+    """Exact SHAP values of a linear model with a zero baseline."""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = []
+
+    def shap_values(self, df):
+        self.calls.append(len(df))
+        return df.to_numpy() * self.model.weights
+
+
+def _service(monkeypatch):
+    service = ShapExplanationService()
+    built = []
+
+    def explainer(model):
+        for m, e in built:
+            if m is model:
+                return e
+        e = _FakeExplainer(model)
+        built.append((model, e))
+        service.stats["explainers_built"] += 1
+        return e
+
+    monkeypatch.setattr(service, "_explainer", explainer)
+    return service, built
+
+
+def _rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(size=(n, 8)), columns=[f"f{i}" for i in range(8)])
+
+
+def test_explains_first_row_with_top_features(monkeypatch):
+    model = _LinearModel([3, 0, 0, -1, 0.5, 0, 0, 0.1])
+    X = _rows(3)
+    service, built = _service(monkeypatch)
+
+    explanation = service.explain(model, X, symbol="BTCUSDC", version="v1")
+    assert built[0][1].calls == [1]
+    assert len(explanation) == 5
+    expected = X.iloc[0].to_numpy() * model.weights
+    top = max(explanation, key=lambda k: abs(explanation[k]))
+    assert top == f"f{int(np.argmax(np.abs(expected)))}"
+    print("PASS: explanation covers the latest feature row only")
+
+
+def test_memo_and_explainer_reuse(monkeypatch):
+    model = _LinearModel(np.arange(8))
+    X = _rows(15)
+    service, built = _service(monkeypatch)
+
+    for i in list(range(10)) + list(range(5, 15)):
+        service.explain(model, X.iloc[i:i + 1], symbol="ETHUSDC", version="v1")
+    assert built[0][1].calls == [1] * 15
+    assert service.stats["memo_hits"] == 5
+    assert service.stats["explainers_built"] == 1
+
+    # A new model version is a different memo key.
+    service.explain(model, X.iloc[:1], symbol="ETHUSDC", version="v2")
+    assert len(built[0][1].calls) == 16
+    print("PASS: explainer reused; rows memoized per model version")
+
+
+def test_explain_failure_returns_empty(monkeypatch):
+    service = ShapExplanationService()
+
+    def broken(model):
+        raise RuntimeError("no shap")
+
+    monkeypatch.setattr(service, "_explainer", broken)
+    assert service.explain(object(), _rows(1)) == {}
+    print("PASS: explanation failures degrade to an empty dict")
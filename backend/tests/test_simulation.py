@@ -104,6 +104,133 @@ def test_all_strategies_defined():
     print(f"PASS: {len(STRATEGIES)} strategies defined")
 
 
+# ── Monte Carlo mode ────────────────────────────────────────────
+
+def _synthetic_returns(drift=0.001, vol=0.03, n=500, seed=1):
+    import numpy as np
+    return np.random.default_rng(seed).normal(drift, vol, n)
+
+
+def _mc_prediction(rec="BUY", conf=95, trend=0.6):
+    return {"recommendation": rec, "confidence": conf, "trend_score": trend}
+
+
+def test_monte_carlo_distribution_outputs():
+    from services.simulation_engine import run_monte_carlo_simulation
+    result = run_monte_carlo_simulation(
+        strategy="ai_follow",
+        symbols=["BTCUSDC", "ETHUSDC"],
+        timeframe_days=30,
+        n_paths=2000,
+        seed=7,
+        returns_by_symbol={"BTCUSDC": _synthetic_returns(), "ETHUSDC": _synthetic_returns(seed=2)},
+        predictions={"BTCUSDC": _mc_prediction(), "ETHUSDC": _mc_prediction("SELL")},
+    )
+    assert "error" not in result
+    assert result["mode"] == "monte_carlo"
+    assert result["n_paths"] == 2000
+    p = result["pnl_percentiles"]
+    assert p["p5"] <= p["p25"] <= p["p50"] <= p["p75"] <= p["p95"]
+    assert 0.0 <= result["probability_of_loss"] <= 1.0
+    assert result["drawdown_percentiles"]["p50"] <= result["drawdown_percentiles"]["p99"]
+    assert [s["side"] for s in result["per_symbol"]] == ["BUY", "SELL"]
+    assert result["disclaimer"] == DISCLAIMER
+    print(f"PASS: monte carlo | P(loss)={result['probability_of_loss']:.2%}, p50=${p['p50']}")
+
+
+def test_monte_carlo_stop_loss_caps_losses():
+    """With a 3% stop on a 5% allocation, no path can lose more than $15 of $10k."""
+    from services.simulation_engine import run_monte_carlo_simulation
+    result = run_monte_carlo_simulation(
+        strategy="ai_follow",
+        symbols=["BTCUSDC"],
+        timeframe_days=60,
+        n_paths=3000,
+        seed=3,
+        stop_loss_pct=0.03,
+        take_profit_pct=0.05,
+        returns_by_symbol={"BTCUSDC": _synthetic_returns(drift=-0.002, vol=0.05)},
+        predictions={"BTCUSDC": _mc_prediction()},
+    )
+    assert result["pnl_percentiles"]["p5"] >= -15.0 - 1e-6
+    leg = result["per_symbol"][0]
+    assert leg["stop_loss_hit_pct"] > 0 and leg["take_profit_hit_pct"] > 0
+    print(f"PASS: stop loss caps losses | stop hits={leg['stop_loss_hit_pct']}%")
+
+
+def test_monte_carlo_seeded_and_fast():
+    import time
+    from services.simulation_engine import run_monte_carlo_simulation
+    kwargs = dict(
+        strategy="buy_and_hold",
+        symbols=["BTCUSDC", "ETHUSDC", "SOLUSDC"],
+        timeframe_days=90,
+        n_paths=5000,
+        seed=42,
+        path_model="gbm",
+        returns_by_symbol={s: _synthetic_returns(seed=i) for i, s in enumerate(["BTCUSDC", "ETHUSDC", "SOLUSDC"])},
+    )
+    started = time.perf_counter()
+    a = run_monte_carlo_simulation(**kwargs)
+    elapsed = time.perf_counter() - started
+    b = run_monte_carlo_simulation(**kwargs)
+    assert a["pnl_percentiles"] == b["pnl_percentiles"]
+    assert elapsed < 1.0
+    print(f"PASS: monte carlo seeded and fast | {elapsed * 1000:.0f}ms for 15k symbol-paths")
+
+
+def test_monte_carlo_skips_symbols_without_history():
+    from services.simulation_engine import run_monte_carlo_simulation
+    result = run_monte_carlo_simulation(
+        strategy="buy_and_hold",
+        symbols=["BTCUSDC"],
+        returns_by_symbol={"BTCUSDC": [0.01] * 5},
+    )
+    assert "error" in result
+    assert result["plan"][0]["side"] == "SKIP"
+    print("PASS: monte carlo rejects symbols without enough history")
+
+
+
+def test_monte_carlo_legs_share_draws():
+    """A long and a short on identical returns must hedge exactly on every path."""
+    from services.simulation_engine import run_monte_carlo_simulation
+    returns = _synthetic_returns()
+    for model in ("bootstrap", "gbm"):
+        result = run_monte_carlo_simulation(
+            strategy="ai_follow",
+            symbols=["BTCUSDC", "ETHUSDC"],
+            timeframe_days=30,
+            n_paths=500,
+            seed=5,
+            path_model=model,
+            stop_loss_pct=5.0,
+            take_profit_pct=0.99,
+            returns_by_symbol={"BTCUSDC": returns, "ETHUSDC": returns.copy()},
+            predictions={"BTCUSDC": _mc_prediction(), "ETHUSDC": _mc_prediction("SELL")},
+        )
+        assert set(result["pnl_percentiles"].values()) == {0.0}
+        assert result["drawdown_percentiles"]["p99"] == 0.0
+    print("PASS: legs draw the same days, so a hedged pair nets to zero")
+
+
+def test_monte_carlo_drawdown_marks_to_market():
+    """Drawdown comes from the daily equity curve, not just the settled legs."""
+    import numpy as np
+    from services.simulation_engine import _simulate_paths_chunk
+    out = _simulate_paths_chunk({
+        "seed": 11, "n_paths": 2000, "horizon": 30, "path_model": "bootstrap",
+        "initial_capital": 10000.0, "position_size_pct": 50.0,
+        "stop_loss_pct": 0.03, "take_profit_pct": 0.05,
+        "legs": [{"side": "BUY", "use_stops": False}],
+        "returns": _synthetic_returns().reshape(-1, 1),
+    })
+    winners = out["final"] > 10000.0
+    assert winners.any() and (out["max_dd"][winners] > 0).any()
+    # Drawdown is never smaller than the loss at the horizon.
+    assert np.all(out["max_dd"] >= (10000.0 - out["final"]) / 10000.0 - 1e-12)
+    print("PASS: drawdown measured on the daily portfolio equity curve")
+
 if __name__ == "__main__":
     test_invalid_strategy()
     test_no_symbols()
@@ -114,4 +241,10 @@ if __name__ == "__main__":
     test_risk_metrics_present()
     test_disclaimer_always_present()
     test_all_strategies_defined()
-    print(f"\nAll 9 tests passed!")
+    test_monte_carlo_distribution_outputs()
+    test_monte_carlo_stop_loss_caps_losses()
+    test_monte_carlo_seeded_and_fast()
+    test_monte_carlo_skips_symbols_without_history()
+    test_monte_carlo_legs_share_draws()
+    test_monte_carlo_drawdown_marks_to_market()
+    print(f"\nAll 15 tests passed!")
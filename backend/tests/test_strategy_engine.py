@@ -4,6 +4,7 @@ Tests for the Modular Strategy System.
 
 import sys
 import os
+import random
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from services.strategy_engine import (
@@ -139,6 +140,112 @@ def test_explain_returns_list():
     print("PASS: all explain() return list of strings")
 
 
+def _reference_consensus(registry, symbol, data):
+    """The per-symbol tally over evaluate_all() results."""
+    votes = {}
+    results = registry.evaluate_all(symbol, data)
+    for r in results:
+        action = r["signal"].get("action", "HOLD")
+        votes[action] = votes.get(action, 0) + r["score"] * r["signal"].get("confidence", 0.5)
+    best = max(votes, key=votes.get)
+    total = sum(votes.values())
+    agreement = votes[best] / total if total > 0 else 0
+    return {
+        "action": best,
+        "confidence": round(agreement, 3),
+        "agreement": round(agreement, 3),
+        "votes": {k: round(v, 1) for k, v in votes.items()},
+        "strategy_count": len(results),
+    }
+
+
+def _same_consensus(a, b):
+    """Equal, with NaN votes equal to each other and vote order checked."""
+    nan_safe = lambda votes: [(k, "nan" if v != v else v) for k, v in votes.items()]
+    return ({k: v for k, v in a.items() if k != "votes"} == {k: v for k, v in b.items() if k != "votes"}
+            and nan_safe(a["votes"]) == nan_safe(b["votes"]))
+
+
+def _random_universe(n, seed=0):
+    rng = random.Random(seed)
+    universe = {}
+    for i in range(n):
+        data = _market_data(
+            trend=rng.choice([rng.uniform(-1, 1), 0.3, -0.5, 0]),
+            conf=rng.choice([rng.uniform(0, 100), 90, 0]),
+            pct=rng.uniform(-5, 5),
+            ml=rng.random() > 0.3,
+            ss=rng.choice([rng.uniform(0, 100), 75, 25, 50]),
+            rsi=rng.choice([rng.uniform(0, 100), 80, 20]),
+            vol=rng.choice([rng.uniform(0, 100), 60]),
+        )
+        for key in ("trend_score", "confidence", "smart_score", "recommendation"):
+            if rng.random() < 0.1:
+                del data[key]
+        if rng.random() < 0.1:
+            data["signals"].pop(rng.choice(["rsi", "volume"]))
+        universe[f"SYM{i}"] = data
+    # Values only the per-symbol path handles: errors and NaN must match it.
+    universe["SYM1"]["trend_score"] = None
+    universe["SYM2"]["confidence"] = float("nan")
+    universe["SYM3"]["signals"]["rsi"] = "n/a"
+    universe["SYM4"]["recommendation"] = "STRONG_BUY"
+    return universe
+
+
+def test_evaluate_universe_matches_per_symbol():
+    universe = _random_universe(400)
+    evaluation = strategy_registry.evaluate_universe(universe)
+    consensus = evaluation.consensus_all()
+    assert list(consensus) == list(universe)
+    for sym, data in universe.items():
+        assert _same_consensus(consensus[sym], _reference_consensus(strategy_registry, sym, data)), sym
+        if sym in ("SYM0", "SYM1", "SYM3"):
+            assert evaluation.results(sym) == strategy_registry.evaluate_all(sym, data)
+    assert strategy_registry.consensus("SYM5", universe["SYM5"]) == consensus["SYM5"]
+    print("PASS: vectorized universe consensus equals the per-symbol tally")
+
+
+class _CountingStrategy(Strategy):
+    """No score_batch, so the registry falls back to the per-symbol methods."""
+
+    name = "counting"
+    description = "counts calls"
+
+    def __init__(self):
+        self.calls = {"generate_signal": 0, "score": 0, "explain": 0}
+
+    def generate_signal(self, symbol, market_data):
+        self.calls["generate_signal"] += 1
+        return {"action": "BUY", "confidence": 0.5, "metadata": {}}
+
+    def score(self, symbol, market_data):
+        self.calls["score"] += 1
+        return 50.0
+
+    def explain(self, symbol, market_data):
+        self.calls["explain"] += 1
+        return ["counted"]
+
+
+def test_evaluate_universe_fallback_and_lazy_explain():
+    registry = StrategyRegistry()
+    counting = _CountingStrategy()
+    registry.register(MomentumStrategy())
+    registry.register(counting)
+    universe = _random_universe(50, seed=1)
+
+    evaluation = registry.evaluate_universe(universe)
+    evaluation.consensus_all()
+    assert counting.calls == {"generate_signal": 50, "score": 50, "explain": 0}
+
+    results = evaluation.results("SYM7")
+    assert evaluation.results("SYM7") is results
+    assert counting.calls["explain"] == 1
+    assert results == registry.evaluate_all("SYM7", universe["SYM7"])
+    print("PASS: strategies without score_batch fall back; explain only on request")
+
+
 if __name__ == "__main__":
     test_strategy_interface()
     test_ml_trend_buy()
@@ -152,4 +259,6 @@ if __name__ == "__main__":
     test_evaluate_all()
     test_consensus()
     test_explain_returns_list()
-    print(f"\nAll 12 tests passed!")
+    test_evaluate_universe_matches_per_symbol()
+    test_evaluate_universe_fallback_and_lazy_explain()
+    print(f"\nAll 14 tests passed!")
@@ -0,0 +1,126 @@
+"""
+Tests for the CPU-budgeted training executor and parallel walk-forward validation.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from ml import enhanced_trainer
+from ml.training_executor import TrainingExecutor, plan_torch_threads, plan_workers, in_worker, worker_threads
+
+
+def _square(x):
+    if x < 0:
+        raise ValueError("negative")
+    return x * x
+
+
+def test_plan_respects_budget():
+    assert plan_workers(10, budget=8, threads_per_worker=2) == (4, 2)
+    # Fewer tasks than slots: spare cores go to each task's threads.
+    assert plan_workers(2, budget=8, threads_per_worker=2) == (2, 4)
+    assert plan_workers(10, budget=1, threads_per_worker=4) == (1, 1)
+    for n in range(1, 12):
+        workers, threads = plan_workers(n, budget=6, threads_per_worker=2)
+        assert workers * threads <= 6
+    print("PASS: workers x threads never exceeds the CPU budget")
+
+
+def test_inline_executor_orders_results_and_captures_errors():
+    executor = TrainingExecutor(3, budget=1)
+    assert executor.workers == 1
+    out = executor.map(_square, [(2,), (-1,), (3,)])
+    assert out[0][0] == 4 and out[2][0] == 9
+    assert isinstance(out[1][0], ValueError)
+    assert not in_worker()
+    assert worker_threads() == -1
+    print("PASS: inline executor keeps order and isolates task failures")
+
+
+def _threads_seen(tag, n_jobs=None):
+    return tag, n_jobs, os.environ.get("TRAINING_WORKER_THREADS")
+
+
+def test_inline_executor_passes_threads_without_touching_env(monkeypatch):
+    monkeypatch.delenv("TRAINING_WORKER_THREADS", raising=False)
+    out = TrainingExecutor(2, budget=3, threads_per_worker=3).map(_threads_seen, [("a",), ("b",)], threads_arg="n_jobs")
+    assert [r for r, _ in out] == [("a", 3, None), ("b", 3, None)]
+    assert "TRAINING_WORKER_THREADS" not in os.environ
+    print("PASS: inline tasks get their thread share as an argument")
+
+
+def test_torch_threads_follow_worker_share(monkeypatch):
+    monkeypatch.delenv("TRAINING_WORKER_THREADS", raising=False)
+    monkeypatch.setenv("TRAINING_THREADS_PER_WORKER", "3")
+    monkeypatch.delenv("TORCH_INTEROP_THREADS", raising=False)
+    assert plan_torch_threads(budget=8) == (3, 1)
+    assert plan_torch_threads(budget=2) == (2, 1)
+
+    monkeypatch.setenv("TRAINING_WORKER_THREADS", "4")
+    monkeypatch.setenv("TORCH_INTEROP_THREADS", "8")
+    assert plan_torch_threads(budget=8) == (4, 4)
+    print("PASS: torch threads take one worker's share of the budget")
+
+
+def test_walk_forward_folds_report_timings(monkeypatch):
+    fit_jobs = []
+
+    def _fit_rf(X_train, y_train, X_test, y_test, attempt=0, n_jobs=None):
+        fit_jobs.append(n_jobs)
+        rf = RandomForestClassifier(n_estimators=5, max_depth=3, random_state=0, n_jobs=1)
+        rf.fit(X_train, y_train)
+        return rf
+
+    monkeypatch.setattr(enhanced_trainer, "_fit_ensemble", _fit_rf)
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    y = (X[:, 0] > 0).astype(int)
+
+    results = enhanced_trainer.walk_forward_validate(
+        X, y, train_size=100, test_size=30, step=30, executor=TrainingExecutor(1, budget=1)
+    )
+    assert [r["window_start"] for r in results] == [100, 130, 160]
+    assert fit_jobs == [1, 1, 1]
+    assert all(r["fit_seconds"] >= 0 for r in results)
+    timings = enhanced_trainer.summarize_fold_timings(results)
+    assert timings["folds"] == 3
+    assert timings["max_seconds"] >= timings["mean_seconds"]
+
+    fit_jobs.clear()
+    enhanced_trainer.walk_forward_validate(X, y, train_size=100, test_size=30, step=30, n_jobs=2)
+    assert fit_jobs == [2, 2, 2]
+    print(f"PASS: walk-forward reports per-fold timings {timings}")
+
+
+def test_feature_matrix_cached_until_rows_change(monkeypatch):
+    import pandas as pd
+
+    fingerprint = {"value": ("100", "2025-01-01")}
+    loads = []
+
+    def _load(db_session, symbol):
+        loads.append(symbol)
+        return pd.DataFrame({
+            "rsi": np.arange(120, dtype=float),
+            "_date": range(120),
+            "_target_direction": ["up", "down"] * 60,
+        })
+
+    monkeypatch.setattr(enhanced_trainer, "_feature_fingerprint", lambda db, s: fingerprint["value"])
+    monkeypatch.setattr(enhanced_trainer, "load_features", _load)
+    enhanced_trainer._feature_cache.clear()
+
+    cols, X, y = enhanced_trainer.load_feature_matrix(None, "BTCUSDC")
+    _, X2, _ = enhanced_trainer.load_feature_matrix(None, "BTCUSDC")
+    assert cols == ["rsi"] and X2 is X and len(loads) == 1
+    assert y[:2].tolist() == [1, 0]
+
+    fingerprint["value"] = ("101", "2025-01-02")
+    enhanced_trainer.load_feature_matrix(None, "BTCUSDC")
+    assert len(loads) == 2
+    enhanced_trainer._feature_cache.clear()
+    print("PASS: feature matrix cache invalidates on new rows")
@@ -0,0 +1,176 @@
+"""
+Tests for Redis-backed usage counters and their batched flush.
+"""
+
+import sys
+import os
+from datetime import date
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.models import PredictionUsage, Subscription
+from services import subscription_service
+from services.usage_counters import UsageCounters
+
+
+class _Counters:
+    """The handful of Redis integer commands the counters use."""
+
+    def __init__(self):
+        self.data = {}
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = int(value)
+        return True
+
+    def incrby(self, key, by):
+        self.data[key] = self.data.get(key, 0) + int(by)
+        return self.data[key]
+
+    def decr(self, key):
+        return self.incrby(key, -1)
+
+    def decrby(self, key, by):
+        return self.incrby(key, -int(by))
+
+    def expire(self, key, ttl):
+        return True
+
+    def mget(self, keys):
+        return [str(self.data[k]) if k in self.data else None for k in keys]
+
+
+def _counters(client, quota_seed=0, view_seed=0):
+    writes = {"quota": [], "views": []}
+    counters = UsageCounters(
+        client_factory=lambda: client,
+        load_quota=lambda uid, day: quota_seed,
+        load_views=lambda uid: view_seed,
+        write_quota=lambda rows: writes["quota"].append(dict(rows)),
+        write_views=lambda rows: writes["views"].append(dict(rows)),
+    )
+    return counters, writes
+
+
+def test_quota_enforced_from_seeded_counter():
+    client = _Counters()
+    counters, writes = _counters(client, quota_seed=7)
+    today = date(2026, 5, 1)
+
+    results = [counters.try_consume_quota(1, limit=10, day=today) for _ in range(5)]
+    assert results == [(True, 8), (True, 9), (True, 10), (False, 10), (False, 10)]
+    assert client.data["counter:predictions_quota:1:2026-05-01"] == 10
+
+    assert counters.flush() == {"quota": 1, "views": 0}
+    assert writes["quota"] == [{(1, today): 10}]
+    assert counters.flush() == {"quota": 0, "views": 0}
+    print("PASS: quota counted in Redis, denied past the limit, flushed once")
+
+
+def test_view_counts_report_threshold_crossings():
+    client = _Counters()
+    counters, writes = _counters(client, view_seed=48)
+
+    assert counters.add_views(9) == (0, 49)  # freshly seeded: before reported as 0
+    assert counters.add_views(9) == (49, 50)
+    assert counters.add_views(9) == (50, 51)
+    for uid in (10, 11):
+        counters.add_views(uid)
+    counters.flush()
+    assert writes["views"] == [{9: 51, 10: 49, 11: 49}]
+    print("PASS: view counters expose crossings and flush as one batch")
+
+
+def test_failed_seed_leaves_key_for_retry():
+    client = _Counters()
+    calls = []
+
+    def flaky(uid, day):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("db down")
+        return 3
+
+    counters, _ = _counters(client)
+    counters._load_quota = flaky
+    try:
+        counters.try_consume_quota(2, limit=10, day=date(2026, 5, 1))
+    except RuntimeError:
+        pass
+    assert counters.try_consume_quota(2, limit=10, day=date(2026, 5, 1)) == (True, 4)
+    print("PASS: a failed seed is retried on the next increment")
+
+
+def test_racing_first_increments_seed_once():
+    client = _Counters()
+    counters, _ = _counters(client)
+    today = date(2026, 5, 1)
+    results, seeds = [], []
+
+    def seed_while_another_request_seeds(uid, day):
+        seeds.append(uid)
+        if len(seeds) == 1:
+            # A second request sees the key missing too and seeds it first.
+            results.append(counters.try_consume_quota(uid, limit=10, day=day))
+        return 5
+
+    counters._load_quota = seed_while_another_request_seeds
+    results.append(counters.try_consume_quota(3, limit=10, day=today))
+    assert results == [(True, 6), (True, 7)]
+    assert counters.add_views(3) == (0, 1) and counters.add_views(3) == (1, 2)
+    print("PASS: concurrent first increments apply the DB seed once")
+
+
+def test_quota_falls_back_to_database_on_redis_error(monkeypatch):
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    for model in (Subscription, PredictionUsage):
+        model.__table__.create(engine)
+    monkeypatch.setattr(subscription_service, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(subscription_service, "get_cached_tier", lambda uid: subscription_service.FREE_TIER)
+
+    class _Broken:
+        def exists(self, key):
+            raise ConnectionError("redis went away")
+
+    import services.usage_counters as usage_counters
+    counters, _ = _counters(_Broken())
+    monkeypatch.setattr(usage_counters, "usage_counters", counters)
+
+    assert subscription_service.consume_prediction_quota(5)["used_today"] == 1
+    assert subscription_service.consume_prediction_quota(5)["used_today"] == 2
+    print("PASS: a failing Redis counter falls through to the database quota")
+
+
+def test_view_flush_creates_missing_profiles(monkeypatch):
+    executed = []
+
+    class _Session:
+        def execute(self, statement, params):
+            executed.append((" ".join(str(statement).split()), params))
+
+        def commit(self):
+            pass
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    import services.usage_counters as usage_counters
+    monkeypatch.setattr(usage_counters, "SessionLocal", _Session)
+    # User 9 has never saved a profile, so there is no user_profiles row to UPDATE.
+    usage_counters._write_views({9: 4})
+
+    (sql, params), = executed
+    assert sql.startswith("INSERT INTO user_profiles") and "ON CONFLICT (user_id) DO UPDATE" in sql
+    assert params == [{"user_id": 9, "count": 4}]
+    print("PASS: view counts are upserted, so users without a profile keep their count")
@@ -0,0 +1,18 @@
+"""
+Async helpers for AURA
+
+Bridges coroutine-based fetchers into the synchronous service APIs.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_sync(coro):
+    """Run ``coro`` to completion from sync code, even if this thread has a running loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
@@ -0,0 +1,147 @@
+"""
+Fast JSON responses for AURA
+
+Responses are encoded with orjson, which writes NaN/Infinity as ``null`` and
+serializes NumPy arrays and scalars natively, so payloads no longer need a
+recursive sanitizing pass before encoding. Large list payloads can be
+streamed either as NDJSON (``Accept: application/x-ndjson`` or
+``?format=ndjson``) or as a chunked JSON document.
+"""
+
+import json
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from starlette.responses import JSONResponse, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with requirements.txt
+    orjson = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_CHUNK_ITEMS = 256
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def sanitize_floats(obj):
+    """Replace NaN/Infinity with None to prevent JSON serialization errors."""
+    if isinstance(obj, float):
+        if math.isnan(obj) or math.isinf(obj):
+            return None
+        return obj
+    if isinstance(obj, dict):
+        return {k: sanitize_floats(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [sanitize_floats(i) for i in obj]
+    return obj
+
+
+def _default(obj: Any) -> Any:
+    """Encode types orjson does not handle natively."""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, (datetime, date)):  # pd.Timestamp and other subclasses
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        value = obj.item()
+        return None if isinstance(value, float) and not math.isfinite(value) else value
+    if isinstance(obj, np.ndarray):
+        return sanitize_floats(obj.tolist())
+    if isinstance(obj, pd.Series):
+        return sanitize_floats(obj.tolist())
+    if isinstance(obj, pd.DataFrame):
+        return sanitize_floats(obj.to_dict(orient="records"))
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to JSON bytes; non-finite floats become ``null``."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        sanitize_floats(obj), default=_default, allow_nan=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with :func:`dumps`."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[dict] = None) -> FastJSONResponse:
+    """Return ``content`` directly as a response, skipping FastAPI's jsonable_encoder pass."""
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def wants_ndjson(request) -> bool:
+    if request is None:
+        return False
+    if request.query_params.get("format") == "ndjson":
+        return True
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_ndjson(items: Iterable[Any], chunk_items: int = STREAM_CHUNK_ITEMS) -> Iterator[bytes]:
+    for batch in _chunks(items, chunk_items):
+        yield b"".join(dumps(item) + b"\n" for item in batch)
+
+
+def iter_json_list(
+    items: Iterable[Any],
+    key: Optional[str] = None,
+    envelope: Optional[dict] = None,
+    chunk_items: int = STREAM_CHUNK_ITEMS,
+) -> Iterator[bytes]:
+    """Yield a JSON document in chunks: ``[...]`` or ``{**envelope, key: [...]}``."""
+    if key is None:
+        yield b"["
+    else:
+        head = dumps(envelope or {})[:-1]
+        yield head + (b"," if len(head) > 1 else b"") + dumps(key) + b":["
+    first = True
+    for batch in _chunks(items, chunk_items):
+        body = b",".join(dumps(item) for item in batch)
+        yield body if first else b"," + body
+        first = False
+    yield b"]" if key is None else b"]}"
+
+
+def stream_json_list(request, items: Iterable[Any], key: Optional[str] = None, **envelope) -> StreamingResponse:
+    """Stream a list payload.
+
+    NDJSON clients get one item per line (envelope fields are dropped);
+    everyone else gets the same JSON document the endpoint returned before,
+    written in chunks of ``STREAM_CHUNK_ITEMS`` items.
+    """
+    if wants_ndjson(request):
+        return StreamingResponse(iter_ndjson(items), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(iter_json_list(items, key=key, envelope=envelope), media_type="application/json")